@@ -3,13 +3,19 @@ Documents API Endpoints
 Provides REST API for document processing (doc-master, OmniParse, AgentParse)
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import logging
-import tempfile
+import json
 import os
 
+from app.modules.agent_rag_protocol_integration import get_agent_rag_protocol_integration
+from app.modules.agentparse_integration import get_agentparse_integration
+from app.modules.doc_master_integration import get_doc_master_integration
+from app.modules.omniparse_integration import get_omniparse_integration
+from app.modules.ingestion import IngestionPipeline, spool_upload
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/documents", tags=["Documents"])
@@ -28,15 +34,10 @@ class AgentParseRequest(BaseModel):
 async def read_document(file: UploadFile = File(...)):
     """Read a file using doc-master"""
     try:
-        from app.modules.doc_master_integration import get_doc_master_integration
-        
         doc_master = get_doc_master_integration()
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
+        # Stream the upload to a temp file in fixed-size reads
+        tmp_path, _, _ = await spool_upload(file, suffix=os.path.splitext(file.filename)[1])
         
         try:
             # Read file
@@ -57,12 +58,33 @@ async def read_document(file: UploadFile = File(...)):
         logger.error(f"Document read error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/ingest")
+async def ingest_document(
+    file: UploadFile = File(...),
+    domains: str = Form("[\"general\"]")
+):
+    """Stream a document into HDAM and the RAG index as overlapping chunks"""
+    try:
+        from app.api.hdam import get_hdam
+        
+        rag = get_agent_rag_protocol_integration()
+        pipeline = IngestionPipeline(get_hdam(), rag.engine)
+        result = await pipeline.ingest_upload(
+            file, file.filename, json.loads(domains), {"content_type": file.content_type}
+        )
+        
+        return {
+            "status": "success",
+            **result
+        }
+    except Exception as e:
+        logger.error(f"Document ingest error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/parse")
 async def parse_document(request: ParseRequest):
     """Parse document using OmniParse"""
     try:
-        from app.modules.omniparse_integration import get_omniparse_integration
-        
         omniparse = get_omniparse_integration()
         result = omniparse.parse_document(request.content, request.document_type)
         
@@ -81,8 +103,6 @@ async def parse_document(request: ParseRequest):
 async def parse_for_agent(request: AgentParseRequest):
     """Parse structured data for agent consumption using AgentParse"""
     try:
-        from app.modules.agentparse_integration import get_agentparse_integration
-        
         agentparse = get_agentparse_integration()
         blocks = agentparse.parse_to_blocks(request.data, request.format)
         
@@ -99,8 +119,6 @@ async def parse_for_agent(request: AgentParseRequest):
 async def get_supported_formats():
     """Get list of supported file formats"""
     try:
-        from app.modules.doc_master_integration import get_doc_master_integration
-        
         doc_master = get_doc_master_integration()
         formats = doc_master.get_supported_formats()
         
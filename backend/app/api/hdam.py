@@ -7,26 +7,15 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import logging
-import os
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/hdam", tags=["HDAM"])
 
-# Global HDAM instance
-_hdam_instance = None
-
 def get_hdam():
-    """Get or create HDAM instance"""
-    global _hdam_instance
-    if _hdam_instance is None:
-        from app.modules.hdam import initialize_hdam
-        _hdam_instance = initialize_hdam(
-            supabase_url=os.getenv("SUPABASE_URL"),
-            supabase_key=os.getenv("SUPABASE_KEY"),
-            enable_quantum=os.getenv("ENABLE_QUANTUM", "false").lower() == "true"
-        )
-    return _hdam_instance
+    """Get the process-wide HDAM instance (default memory space)"""
+    from app.modules.hdam import get_hdam as get_shared_hdam
+    return get_shared_hdam()
 
 # Request Models
 class LearnRequest(BaseModel):
@@ -43,6 +32,11 @@ class ReasonRequest(BaseModel):
     quantum_assisted: bool = Field(False, description="Use quantum-assisted selection")
     reasoning_mode: str = Field("associative", description="Reasoning mode: associative, analytical, or creative")
 
+class SearchContextsRequest(BaseModel):
+    query: str = Field(..., description="Query string")
+    contexts: Optional[List[str]] = Field(None, description="Contexts/domains to search (all when omitted)")
+    top_k: int = Field(5, description="Number of merged results to return")
+
 class AnalogyRequest(BaseModel):
     a: str = Field(..., description="First term")
     b: str = Field(..., description="Second term")
@@ -58,6 +52,9 @@ class ExtrapolateRequest(BaseModel):
     step_size: float = Field(0.5, description="Step size for extrapolation")
     context: str = Field("general", description="Context/domain")
 
+class ForgetRequest(BaseModel):
+    item_ids: List[str] = Field(..., description="Ids of items to delete")
+
 class OptimizePathRequest(BaseModel):
     goals: List[str] = Field(..., description="Learning goals")
     context: str = Field("general", description="Context/domain")
@@ -99,6 +96,20 @@ async def reason(request: ReasonRequest):
         logger.error(f"HDAM reason error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/search")
+async def search_contexts(request: SearchContextsRequest):
+    """Search many contexts in one pass: merged top-k plus each domain's best score"""
+    try:
+        hdam = get_hdam()
+        return await hdam.search_contexts(
+            query=request.query,
+            contexts=request.contexts,
+            top_k=request.top_k
+        )
+    except Exception as e:
+        logger.error(f"HDAM search error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/analogy")
 async def analogy(request: AnalogyRequest):
     """Perform analogical reasoning: a : b :: c : ?"""
@@ -150,6 +161,26 @@ async def optimize_path(request: OptimizePathRequest):
         logger.error(f"HDAM optimize-path error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/forget")
+async def forget(request: ForgetRequest):
+    """Delete items and subtract them from their context traces"""
+    try:
+        hdam = get_hdam()
+        return await hdam.forget(request.item_ids)
+    except Exception as e:
+        logger.error(f"HDAM forget error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/context/{context}")
+async def clear_context(context: str):
+    """Delete a context and all of its items"""
+    try:
+        hdam = get_hdam()
+        return await hdam.clear_context(context)
+    except Exception as e:
+        logger.error(f"HDAM clear-context error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/metrics")
 async def get_metrics():
     """Get HDAM memory metrics"""
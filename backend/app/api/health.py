@@ -42,6 +42,23 @@ async def components_health():
         logger.error(f"Components health check error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/registry")
+async def registry_stats():
+    """Shared integration instances with build and reuse counts"""
+    try:
+        from app.core.integration_registry import get_integration_registry
+        
+        registry = get_integration_registry()
+        
+        return {
+            "status": "success",
+            "enabled": registry.enabled,
+            "integrations": registry.stats()
+        }
+    except Exception as e:
+        logger.error(f"Registry stats error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/component/{component_name}")
 async def component_health(component_name: str):
     """Health check for a specific component"""
@@ -18,6 +18,10 @@ from datetime import datetime
 import uuid
 import logging
 from ..core.enhanced_system import genius_system
+from ..modules.progress_rollups import create_progress_rollups
+from ..modules.quiz_grading import AnswerKey, QuizAttemptWriter, QuizGradingEngine
+from ..modules.record_cache import CachedPersistence
+from ..modules.zettel_graph import get_zettel_graph
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +78,9 @@ class SubmitQuizRequest(BaseModel):
     user_id: str
     answers: List[QuizAnswer]
 
+class SubmitQuizBatchRequest(BaseModel):
+    submissions: List[SubmitQuizRequest]
+
 class QuizResponse(BaseModel):
     id: str
     topic: str
@@ -85,6 +92,23 @@ class QuizResponse(BaseModel):
 class StartFeynmanRequest(BaseModel):
     concept: str
     topic: str
+    target_audience: str = "child"  # child, teenager, novice_adult, expert
+
+class AnalyzeExplanationRequest(BaseModel):
+    session_id: str
+    explanation: str
+
+class SubmitQuestionResponseRequest(BaseModel):
+    session_id: str
+    iteration_id: str
+    question_id: str
+    response: str
+
+class FeynmanSessionResponse(BaseModel):
+    id: str
+    concept: str
+    topic: str
+    target_audience: str
     iterations: List[Dict[str, Any]]
     created_at: datetime
 
@@ -118,6 +142,7 @@ class PalaceResponse(BaseModel):
 
 # Zettelkasten Models
 class CreateNoteRequest(BaseModel):
+    user_id: str = "default"
     title: str
     content: str
     note_type: str = "permanent"  # fleeting, literature, permanent
@@ -131,6 +156,7 @@ class UpdateNoteRequest(BaseModel):
     content: Optional[str] = None
     note_type: Optional[str] = None
     tags: Optional[List[str]] = None
+    links: Optional[List[str]] = None
 
 class ElaborationAnswerRequest(BaseModel):
     session_id: str
@@ -166,9 +192,34 @@ quizzes_db: Dict[str, Dict] = {}
 quiz_attempts_db: Dict[str, List[Dict]] = {}
 feynman_sessions_db: Dict[str, Dict] = {}
 memory_palaces_db: Dict[str, Dict] = {}
-zettel_notes_db: Dict[str, Dict] = {}
 comprehension_metrics_db: Dict[str, List[Dict]] = {}
 
+# Plans, quizzes, palaces and Feynman sessions are read through per-type
+# LRU/TTL caches; saves invalidate them (across workers with RECORD_CACHE_NOTIFY)
+database = CachedPersistence(genius_system.database)
+
+# Daily/weekly progress buckets: TimescaleDB continuous aggregates over
+# quiz_attempts, or in-memory rollups updated as attempts are stored; attempts
+# the database rejects reach record() through the fallback and are merged in
+progress_rollups = create_progress_rollups(database)
+
+
+def _store_attempts_in_memory(attempts: List[Dict]) -> None:
+    for attempt in attempts:
+        quiz_attempts_db.setdefault(attempt["user_id"], []).append(attempt)
+    progress_rollups.record(attempts)
+
+
+# Attempts are bulk-inserted in the background, on a connection of their own so
+# the flusher's commits never touch a request's transaction; without a database
+# they go straight to the in-memory fallback so progress reads see them immediately
+attempt_database = database.open_writer() if database.available else database
+grading_engine = QuizGradingEngine(QuizAttemptWriter(
+    attempt_database.save_quiz_attempts,
+    fallback=_store_attempts_in_memory,
+    flush_interval=None if database.available else 0
+))
+
 
 # ============ Learning Plan Endpoints ============
 
@@ -291,7 +342,7 @@ async def create_learning_plan(request: CreateLearningPlanRequest):
         plan["assessment_workflow_id"] = assessment_workflow.get("workflow_id")
         
         # Save to database
-        saved = genius_system.database.save_learning_plan(plan)
+        saved = database.save_learning_plan(plan)
         if not saved:
             logger.warning(f"Failed to save learning plan {plan_id} to database, using in-memory fallback")
             learning_plans_db[plan_id] = plan
@@ -307,7 +358,7 @@ async def create_learning_plan(request: CreateLearningPlanRequest):
 async def get_learning_plan(plan_id: str):
     """Get a specific learning plan"""
     # Try database first
-    plan = genius_system.database.get_learning_plan(plan_id)
+    plan = database.get_learning_plan(plan_id)
     
     # Fallback to in-memory if not found (or if DB failed)
     if not plan:
@@ -322,7 +373,7 @@ async def get_learning_plan(plan_id: str):
 async def get_user_learning_plans(user_id: str):
     """Get all learning plans for a user"""
     # Try database
-    plans = genius_system.database.get_user_learning_plans(user_id)
+    plans = database.get_user_learning_plans(user_id)
     
     # If empty, check in-memory (legacy/fallback)
     if not plans:
@@ -393,7 +444,7 @@ async def generate_quiz(request: GenerateQuizRequest):
         }
         
         # Save to database
-        saved = genius_system.database.save_quiz(quiz)
+        saved = database.save_quiz(quiz)
         if not saved:
             logger.warning(f"Failed to save quiz {quiz_id} to database, using in-memory fallback")
             quizzes_db[quiz_id] = quiz
@@ -405,64 +456,114 @@ async def generate_quiz(request: GenerateQuizRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/quiz/submit")
-async def submit_quiz(request: SubmitQuizRequest):
-    """Submit quiz answers and get feedback"""
+def _answer_key(quiz_id: str) -> AnswerKey:
+    """Compiled answer key for a quiz, loading and compiling it on first use"""
+    key = grading_engine.key(quiz_id)
+    if key:
+        return key
+    
     # Try database first
-    quiz = genius_system.database.get_quiz(request.quiz_id)
+    quiz = database.get_quiz(quiz_id)
     
     # Fallback
     if not quiz:
-        quiz = quizzes_db.get(request.quiz_id)
+        quiz = quizzes_db.get(quiz_id)
         
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
-    # Grade answers
-    results = []
-    correct_count = 0
+    return grading_engine.compile(quiz)
+
+
+def _answer_keys(quiz_ids: List[str]) -> Dict[str, AnswerKey]:
+    """Compiled answer keys for many quizzes, loading all uncached ones in one query"""
+    keys = {quiz_id: grading_engine.key(quiz_id) for quiz_id in quiz_ids}
+    missing = [quiz_id for quiz_id, key in keys.items() if key is None]
+    if missing:
+        quizzes = database.get_many_quizzes(missing)
+        for quiz_id in missing:
+            quiz = quizzes.get(quiz_id) or quizzes_db.get(quiz_id)
+            if not quiz:
+                raise HTTPException(status_code=404, detail=f"Quiz not found: {quiz_id}")
+            keys[quiz_id] = grading_engine.compile(quiz)
+    return keys
+
+
+@router.post("/quiz/submit")
+async def submit_quiz(request: SubmitQuizRequest):
+    """Submit quiz answers and get feedback"""
+    key = _answer_key(request.quiz_id)
+    return grading_engine.grade(key, request.user_id, [answer.dict() for answer in request.answers])
+
+
+@router.post("/quiz/submit/batch")
+async def submit_quiz_batch(request: SubmitQuizBatchRequest):
+    """Grade many submissions at once (e.g. a whole class), grouped by quiz"""
+    by_quiz: Dict[str, List[int]] = {}
+    for i, submission in enumerate(request.submissions):
+        by_quiz.setdefault(submission.quiz_id, []).append(i)
+    keys = _answer_keys(list(by_quiz))
+    
+    attempts: List[Optional[Dict]] = [None] * len(request.submissions)
+    for quiz_id, indexes in by_quiz.items():
+        graded = grading_engine.grade_batch(keys[quiz_id], [
+            {
+                "user_id": request.submissions[i].user_id,
+                "answers": [answer.dict() for answer in request.submissions[i].answers]
+            }
+            for i in indexes
+        ])
+        for i, attempt in zip(indexes, graded):
+            attempts[i] = attempt
     
-    for answer in request.answers:
-        question = next((q for q in quiz["questions"] if q["id"] == answer.question_id), None)
-        if not question:
-            continue
-            
-        # Simple grading logic
-        is_correct = str(answer.user_answer).lower().strip() == str(question["correct_answer"]).lower().strip()
-        if is_correct:
-            correct_count += 1
-            
-        results.append({
-            "question_id": answer.question_id,
-            "is_correct": is_correct,
-            "correct_answer": question["correct_answer"],
-            "explanation": question.get("explanation", ""),
-            "time_spent": answer.time_spent_seconds
-        })
-    
-    attempt = {
+    return {"attempts": attempts, "graded": len(attempts)}
+
+
+@router.get("/quiz/{quiz_id}/analytics")
+async def get_quiz_analytics(quiz_id: str):
+    """Per-question difficulty and discrimination for attempts graded by this server"""
+    analytics = grading_engine.analytics(quiz_id)
+    if not analytics:
+        raise HTTPException(status_code=404, detail="No graded attempts for this quiz")
+    return analytics
+
+
+# ============ Feynman Technique Endpoints ============
+
+@router.post("/feynman/start", response_model=FeynmanSessionResponse)
+async def start_feynman_session(request: StartFeynmanRequest):
+    """Start a new Feynman technique session"""
+    session = {
         "id": str(uuid.uuid4()),
-        "quiz_id": request.quiz_id,
-        "user_id": request.user_id,
-        "answers": results,
-        "score": correct_count,
-        "max_score": len(request.answers),
-        "percent_correct": (correct_count / len(request.answers)) * 100 if request.answers else 0,
-        "timestamp": datetime.now()
+        "concept": request.concept,
+        "topic": request.topic,
+        "target_audience": request.target_audience,
+        "iterations": [],
+        "status": "active",
+        "created_at": datetime.now()
     }
     
-    # Store attempt
-    saved = genius_system.database.save_quiz_attempt(attempt)
-    if not saved:
-        if request.user_id not in quiz_attempts_db:
-            quiz_attempts_db[request.user_id] = []
-        quiz_attempts_db[request.user_id].append(attempt)
+    if not database.save_feynman_session(session):
+        logger.warning(f"Failed to save Feynman session {session['id']} to database, using in-memory fallback")
+    feynman_sessions_db[session["id"]] = session
     
-    return attempt
-
+    return FeynmanSessionResponse(**session)
 
-# ============ Feynman Technique Endpoints ============
 
+@router.post("/feynman/analyze")
+async def analyze_explanation(request: AnalyzeExplanationRequest):
+    """Analyze an explanation and generate novice questions"""
+    session = feynman_sessions_db.get(request.session_id)
+    if not session:
+        session = database.get_feynman_session(request.session_id)
+        if session:
+            feynman_sessions_db[request.session_id] = session
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    try:
+        from ..modules.swarms_agentic_system import agentic_system
         
         result = await agentic_system.process_agentically(
             task_type="feynman_technique",
@@ -527,7 +628,7 @@ async def get_feynman_session(session_id: str):
 async def submit_question_response(request: SubmitQuestionResponseRequest):
     """Submit a response to a novice question"""
     # Try database first
-    session = genius_system.database.get_feynman_session(request.session_id)
+    session = database.get_feynman_session(request.session_id)
     
     # Fallback
     if not session:
@@ -598,7 +699,7 @@ async def create_memory_palace(request: CreatePalaceRequest):
     }
     
     # Save to database
-    saved = genius_system.database.save_memory_palace(palace)
+    saved = database.save_memory_palace(palace)
     if not saved:
         logger.warning(f"Failed to save Memory Palace {palace_id} to database, using in-memory fallback")
         memory_palaces_db[palace_id] = palace
@@ -610,7 +711,7 @@ async def create_memory_palace(request: CreatePalaceRequest):
 async def generate_palace_imagery(request: GenerateImageryRequest):
     """Generate AI imagery for a palace locus"""
     # Try database first
-    palace = genius_system.database.get_memory_palace(request.palace_id)
+    palace = database.get_memory_palace(request.palace_id)
     
     # Fallback
     if not palace:
@@ -658,7 +759,7 @@ async def generate_palace_imagery(request: GenerateImageryRequest):
         locus["imagery"] = imagery
         
         # Save updated palace
-        saved = genius_system.database.save_memory_palace(palace)
+        saved = database.save_memory_palace(palace)
         if not saved:
             if request.palace_id not in memory_palaces_db:
                 memory_palaces_db[request.palace_id] = palace
@@ -674,7 +775,7 @@ async def generate_palace_imagery(request: GenerateImageryRequest):
 async def get_memory_palace(palace_id: str):
     """Get a memory palace"""
     # Try database first
-    palace = genius_system.database.get_memory_palace(palace_id)
+    palace = database.get_memory_palace(palace_id)
     
     # Fallback
     if not palace:
@@ -700,7 +801,6 @@ async def create_zettel_note(request: CreateNoteRequest):
         "note_type": request.note_type,
         "maturity": "seedling",
         "links": request.links,
-        "backlinks": [],
         "tags": request.tags,
         "source": request.source,
         "elaboration_score": min(len(request.content) / 10, 60),
@@ -709,12 +809,8 @@ async def create_zettel_note(request: CreateNoteRequest):
         "updated_at": now
     }
     
-    # Add backlinks to linked notes
-    for linked_id in request.links:
-        if linked_id in zettel_notes_db:
-            zettel_notes_db[linked_id]["backlinks"].append(note_id)
-    
-    zettel_notes_db[note_id] = note
+    # Links go into the graph's edge table; backlinks are read from its target index
+    note = get_zettel_graph().create_note(request.user_id, note)
     
     return NoteResponse(**note)
 
@@ -722,7 +818,7 @@ async def create_zettel_note(request: CreateNoteRequest):
 @router.get("/zettel/{note_id}", response_model=NoteResponse)
 async def get_zettel_note(note_id: str):
     """Get a Zettelkasten note"""
-    note = zettel_notes_db.get(note_id)
+    note = get_zettel_graph().get_note(note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     return NoteResponse(**note)
@@ -731,21 +827,20 @@ async def get_zettel_note(note_id: str):
 @router.put("/zettel/{note_id}", response_model=NoteResponse)
 async def update_zettel_note(note_id: str, request: UpdateNoteRequest):
     """Update a Zettelkasten note"""
-    note = zettel_notes_db.get(note_id)
-    if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
-    
+    fields = {}
     if request.title is not None:
-        note["title"] = request.title
+        fields["title"] = request.title
     if request.content is not None:
-        note["content"] = request.content
-        note["elaboration_score"] = min(len(request.content) / 10, 100)
+        fields["content"] = request.content
+        fields["elaboration_score"] = min(len(request.content) / 10, 100)
     if request.note_type is not None:
-        note["note_type"] = request.note_type
+        fields["note_type"] = request.note_type
     if request.tags is not None:
-        note["tags"] = request.tags
+        fields["tags"] = request.tags
     
-    note["updated_at"] = datetime.now()
+    note = get_zettel_graph().update_note(note_id, fields, links=request.links)
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
     
     return NoteResponse(**note)
 
@@ -753,7 +848,7 @@ async def update_zettel_note(note_id: str, request: UpdateNoteRequest):
 @router.post("/zettel/{note_id}/elaborate")
 async def start_elaboration_session(note_id: str):
     """Start an AI elaboration interview for a note"""
-    note = zettel_notes_db.get(note_id)
+    note = get_zettel_graph().get_note(note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
@@ -798,29 +893,47 @@ async def start_elaboration_session(note_id: str):
 
 
 @router.get("/zettel/{user_id}/graph")
-async def get_knowledge_graph(user_id: str):
-    """Get the user's knowledge graph"""
-    # In production, filter by user_id
-    nodes = list(zettel_notes_db.values())
-    edges = []
-    
-    for note in nodes:
-        for linked_id in note.get("links", []):
-            edges.append({
-                "from": note["id"],
-                "to": linked_id,
-                "type": "links_to"
-            })
-    
-    return {
-        "nodes": nodes,
-        "edges": edges,
-        "statistics": {
-            "total_notes": len(nodes),
-            "total_connections": len(edges),
-            "average_connections": len(edges) / max(len(nodes), 1)
-        }
-    }
+async def get_knowledge_graph(user_id: str, limit: int = 500, cursor: Optional[str] = None):
+    """Get one page of the user's knowledge graph (pass next_cursor for the next page)"""
+    graph = get_zettel_graph()
+    page = graph.page(user_id, limit=limit, cursor=cursor)
+    page["statistics"] = graph.statistics(user_id)
+    return page
+
+
+@router.get("/zettel/{user_id}/graph/neighborhood/{note_id}")
+async def get_note_neighborhood(user_id: str, note_id: str, hops: int = 1, direction: str = "both",
+                                limit: int = 100, offset: int = 0):
+    """Notes within `hops` links of a note, nearest first, with the edges between them"""
+    if direction not in ("out", "in", "both"):
+        raise HTTPException(status_code=400, detail="direction must be out, in or both")
+    result = get_zettel_graph().neighborhood(user_id, note_id, hops=hops, direction=direction,
+                                             limit=limit, offset=offset)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Note not found")
+    return result
+
+
+@router.get("/zettel/{user_id}/graph/hubs")
+async def get_graph_hubs(user_id: str, limit: int = 20, cursor: Optional[str] = None,
+                         rank_by: str = "degree"):
+    """Most connected notes, by degree or by (background) PageRank"""
+    try:
+        return get_zettel_graph().hubs(user_id, limit=limit, cursor=cursor, rank_by=rank_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/zettel/{user_id}/graph/metrics")
+async def get_graph_metrics(user_id: str):
+    """Note/link counts plus the last background component and PageRank run"""
+    return get_zettel_graph().statistics(user_id)
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Hit ratio, latency and eviction counters of the plan/quiz/palace/Feynman record caches"""
+    return database.cache_metrics()
 
 
 # ============ Progress & Comprehension Endpoints ============
@@ -828,12 +941,12 @@ async def get_knowledge_graph(user_id: str):
 @router.get("/progress/{user_id}", response_model=ComprehensionReportResponse)
 async def get_comprehension_report(user_id: str, topic: Optional[str] = None):
     """Get comprehension report for a user"""
-    # Aggregate from various sources
-    quiz_attempts = quiz_attempts_db.get(user_id, [])
+    # Totals come from the progress rollups, not a scan of every attempt
+    progress = progress_rollups.summary(user_id)
     
     # Calculate scores
-    if quiz_attempts:
-        avg_score = sum(a["percent_correct"] for a in quiz_attempts) / len(quiz_attempts)
+    if progress["attempts"]:
+        avg_score = progress["score_sum"] / progress["attempts"]
     else:
         avg_score = 0
     
@@ -849,9 +962,8 @@ async def get_comprehension_report(user_id: str, topic: Optional[str] = None):
     overall_score = sum(dimensions.values()) / len(dimensions)
     
     # Determine trend
-    if len(quiz_attempts) >= 2:
-        recent = quiz_attempts[-1]["percent_correct"]
-        previous = quiz_attempts[-2]["percent_correct"]
+    if len(progress["recent"]) >= 2:
+        previous, recent = progress["recent"][-2:]
         trend = "improving" if recent > previous else ("declining" if recent < previous else "stable")
     else:
         trend = "stable"
@@ -880,18 +992,23 @@ async def get_comprehension_report(user_id: str, topic: Optional[str] = None):
 
 
 @router.get("/progress/{user_id}/history")
-async def get_progress_history(user_id: str, period: str = "weekly"):
-    """Get progress history for a user"""
-    # In production, query TimescaleDB for time-series data
+async def get_progress_history(user_id: str, period: str = "weekly", limit: int = 12):
+    """Get daily or weekly progress history for a user (the latest `limit` buckets)"""
+    try:
+        data_points = progress_rollups.history(user_id, period, max(1, min(limit, 366)))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    progress = progress_rollups.summary(user_id)
+    
     return {
         "user_id": user_id,
         "period": period,
-        "data_points": [],
+        "data_points": data_points,
         "summary": {
             "study_time_minutes": 0,
-            "activities_completed": 0,
-            "quizzes_completed": len(quiz_attempts_db.get(user_id, [])),
-            "average_score": 0
+            "activities_completed": sum(point["quizzes_completed"] for point in data_points),
+            "quizzes_completed": progress["attempts"],
+            "average_score": progress["score_sum"] / progress["attempts"] if progress["attempts"] else 0
         }
     }
 
@@ -4,27 +4,37 @@ Provides REST API for RAG operations (AgentRAGProtocol, Multi-Agent-RAG)
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import logging
 
+from app.modules.agent_rag_protocol_integration import get_agent_rag_protocol_integration
+from app.modules.multi_agent_rag_integration import get_multi_agent_rag_integration
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/rag", tags=["RAG"])
 
+# Encoding, BM25 scoring, SQLite and LLM calls are all synchronous; handlers
+# run them in the threadpool so the event loop keeps serving other requests
+
 # Request Models
 class IndexDocumentsRequest(BaseModel):
     documents: List[str] = Field(..., description="List of document texts")
     metadata: Optional[List[Dict[str, Any]]] = Field(None, description="Optional metadata for each document")
+    ids: Optional[List[str]] = Field(None, description="Optional stable document ids (re-indexing an id replaces it)")
 
 class RAGQueryRequest(BaseModel):
     query: str = Field(..., description="Query string")
     top_k: int = Field(5, description="Number of results to return")
-    filters: Optional[Dict[str, Any]] = Field(None, description="Optional filters")
+    filters: Optional[Dict[str, Any]] = Field(None, description="Optional metadata filters")
+    mode: str = Field("hybrid", description="Retrieval mode: hybrid, bm25 or dense")
 
 class GetContextRequest(BaseModel):
     agent_query: str = Field(..., description="Agent's query")
-    context_length: int = Field(2000, description="Maximum context length")
+    context_length: int = Field(2000, description="Token budget for the context")
+    filters: Optional[Dict[str, Any]] = Field(None, description="Optional metadata filters")
 
 class ProcessDocumentsRequest(BaseModel):
     documents: List[str] = Field(..., description="List of document texts")
@@ -39,10 +49,8 @@ class GenerateInsightsRequest(BaseModel):
 async def index_documents(request: IndexDocumentsRequest):
     """Index documents for RAG retrieval using AgentRAGProtocol"""
     try:
-        from app.modules.agent_rag_protocol_integration import get_agent_rag_protocol_integration
-        
         rag = get_agent_rag_protocol_integration()
-        result = rag.index_documents(request.documents, request.metadata)
+        result = await run_in_threadpool(rag.index_documents, request.documents, request.metadata, request.ids)
         
         return result
     except Exception as e:
@@ -53,10 +61,8 @@ async def index_documents(request: IndexDocumentsRequest):
 async def query_rag(request: RAGQueryRequest):
     """Query RAG system using AgentRAGProtocol"""
     try:
-        from app.modules.agent_rag_protocol_integration import get_agent_rag_protocol_integration
-        
         rag = get_agent_rag_protocol_integration()
-        results = rag.query(request.query, request.top_k, request.filters)
+        results = await run_in_threadpool(rag.query, request.query, request.top_k, request.filters, request.mode)
         
         return {
             "status": "success",
@@ -71,10 +77,9 @@ async def query_rag(request: RAGQueryRequest):
 async def get_context(request: GetContextRequest):
     """Get RAG context for an agent"""
     try:
-        from app.modules.agent_rag_protocol_integration import get_agent_rag_protocol_integration
-        
         rag = get_agent_rag_protocol_integration()
-        context = rag.get_context_for_agent(request.agent_query, request.context_length)
+        context = await run_in_threadpool(
+            rag.get_context_for_agent, request.agent_query, request.context_length, request.filters)
         
         return {
             "status": "success",
@@ -89,10 +94,8 @@ async def get_context(request: GetContextRequest):
 async def process_documents(request: ProcessDocumentsRequest):
     """Process documents using Multi-Agent-RAG"""
     try:
-        from app.modules.multi_agent_rag_integration import get_multi_agent_rag_integration
-        
         multi_rag = get_multi_agent_rag_integration()
-        result = multi_rag.process_documents(request.documents, request.analysis_type)
+        result = await run_in_threadpool(multi_rag.process_documents, request.documents, request.analysis_type)
         
         return result
     except Exception as e:
@@ -103,10 +106,8 @@ async def process_documents(request: ProcessDocumentsRequest):
 async def generate_insights(request: GenerateInsightsRequest):
     """Generate insights using Multi-Agent-RAG"""
     try:
-        from app.modules.multi_agent_rag_integration import get_multi_agent_rag_integration
-        
         multi_rag = get_multi_agent_rag_integration()
-        insights = multi_rag.generate_insights(request.documents, request.focus_areas)
+        insights = await run_in_threadpool(multi_rag.generate_insights, request.documents, request.focus_areas)
         
         return {
             "status": "success",
@@ -8,6 +8,9 @@ from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import logging
 
+from app.modules.advanced_research_integration import get_advanced_research_integration
+from app.modules.research_paper_hive_integration import get_research_paper_hive_integration
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/research", tags=["Research"])
@@ -32,8 +35,6 @@ class OrchestrateResearchRequest(BaseModel):
 async def discover_papers(request: DiscoverPapersRequest):
     """Discover research papers using Research-Paper-Hive"""
     try:
-        from app.modules.research_paper_hive_integration import get_research_paper_hive_integration
-        
         hive = get_research_paper_hive_integration()
         papers = hive.discover_papers(
             query=request.query,
@@ -54,8 +55,6 @@ async def discover_papers(request: DiscoverPapersRequest):
 async def engage_with_paper(request: EngagePaperRequest):
     """Engage with a research paper"""
     try:
-        from app.modules.research_paper_hive_integration import get_research_paper_hive_integration
-        
         hive = get_research_paper_hive_integration()
         result = hive.engage_with_paper(request.paper_id, request.action)
         
@@ -68,8 +67,6 @@ async def engage_with_paper(request: EngagePaperRequest):
 async def get_paper_details(paper_id: str):
     """Get detailed information about a paper"""
     try:
-        from app.modules.research_paper_hive_integration import get_research_paper_hive_integration
-        
         hive = get_research_paper_hive_integration()
         details = hive.get_paper_details(paper_id)
         
@@ -90,8 +87,6 @@ async def get_paper_details(paper_id: str):
 async def orchestrate_research(request: OrchestrateResearchRequest):
     """Orchestrate research using AdvancedResearch"""
     try:
-        from app.modules.advanced_research_integration import get_advanced_research_integration
-        
         research = get_advanced_research_integration()
         result = await research.orchestrate_research(
             research_query=request.research_query,
@@ -108,8 +103,6 @@ async def orchestrate_research(request: OrchestrateResearchRequest):
 async def create_research_plan(query: str):
     """Create a research plan"""
     try:
-        from app.modules.advanced_research_integration import get_advanced_research_integration
-        
         research = get_advanced_research_integration()
         plan = research.create_research_plan(query)
         
@@ -3,7 +3,8 @@ Security API Endpoints
 Provides REST API for SwarmShield security operations
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import logging
@@ -27,7 +28,7 @@ class AddMessageRequest(BaseModel):
 
 class ExportConversationRequest(BaseModel):
     conversation_id: str = Field(..., description="Conversation ID")
-    format: str = Field("json", description="Export format")
+    format: str = Field("json", description="Export format: json, jsonl, text")
     path: Optional[str] = Field(None, description="Optional export path")
 
 # Endpoints
@@ -93,19 +94,26 @@ async def add_message(conversation_id: str, request: AddMessageRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/shield/conversations/{conversation_id}")
-async def get_conversation(conversation_id: str):
-    """Get messages from a conversation"""
+async def get_conversation(
+    conversation_id: str,
+    offset: int = Query(0, ge=0, description="Index of the first message"),
+    limit: int = Query(100, ge=1, le=1000, description="Messages per page")
+):
+    """Get one page of messages from a conversation"""
     try:
         from app.modules.swarm_shield_integration import get_swarm_shield_integration
         
         shield = get_swarm_shield_integration()
-        messages = shield.get_messages(conversation_id)
+        messages = shield.get_messages(conversation_id, offset=offset, limit=limit)
         summary = shield.get_conversation_summary(conversation_id)
+        total = summary["message_count"] if summary else 0
         
         return {
             "status": "success",
             "conversation_id": conversation_id,
             "messages": messages,
+            "offset": offset,
+            "next_offset": offset + len(messages) if offset + len(messages) < total else None,
             "summary": summary
         }
     except Exception as e:
@@ -138,6 +146,22 @@ async def export_conversation(conversation_id: str, request: ExportConversationR
         logger.error(f"Export conversation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/shield/conversations/{conversation_id}/export")
+async def stream_conversation_export(conversation_id: str, format: str = "jsonl"):
+    """Stream a conversation export without materializing it"""
+    from app.modules.swarm_shield_integration import get_swarm_shield_integration
+    
+    shield = get_swarm_shield_integration()
+    try:
+        lines = shield.stream_conversation(conversation_id, format)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    media_types = {"jsonl": "application/x-ndjson", "json": "application/json", "text": "text/plain"}
+    return StreamingResponse(lines, media_type=media_types[format])
+
 @router.get("/shield/agents/{agent_name}/stats")
 async def get_agent_stats(agent_name: str):
     """Get statistics for an agent"""
@@ -6,17 +6,43 @@ Provides REST API for MonteCarloSwarm, Education Swarm, and custom swarm managem
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any, Callable
+import asyncio
 import logging
 
+from app.core.integration_registry import integration_registry
+from app.modules.education_swarm import EducationSwarm
+from app.modules.monte_carlo_swarm import (
+    Agent,
+    MonteCarloSwarm,
+    average_aggregator,
+    aggregate_most_common_result,
+    aggregate_consensus
+)
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/swarms", tags=["Swarms"])
 
+
+def _build_monte_carlo_agents() -> List[Agent]:
+    """
+    Fresh agents for one MonteCarloSwarm run. Agents keep their own
+    conversation memory, so they are never shared between requests.
+    """
+    return [
+        Agent(agent_name=f"Agent-{i}", system_prompt="You are a helpful assistant.")
+        for i in range(3)
+    ]
+
 # Request Models
 class MonteCarloRunRequest(BaseModel):
     task: str = Field(..., description="Task for the swarm to execute")
     parallel: bool = Field(False, description="Run agents in parallel")
     aggregator: str = Field("default", description="Result aggregator: default, average, most_common, weighted_vote, consensus")
+    streaming: bool = Field(False, description="Aggregate votes as results arrive and stop early (most_common/consensus)")
+    sample_budget: Optional[int] = Field(None, description="Max agent calls in streaming mode (default: one per agent)")
+    quorum: Optional[int] = Field(None, description="Votes for one answer that end a streaming run")
+    confidence: Optional[float] = Field(None, description="Leader vote share that ends a streaming run")
 
 class EducationSwarmRequest(BaseModel):
     subjects: str = Field(..., description="Subjects to learn")
@@ -34,21 +60,7 @@ class CustomSwarmCreateRequest(BaseModel):
 async def run_monte_carlo(request: MonteCarloRunRequest):
     """Run MonteCarloSwarm with given task"""
     try:
-        from app.modules.monte_carlo_swarm import (
-            MonteCarloSwarm,
-            average_aggregator,
-            aggregate_most_common_result,
-            aggregate_consensus
-        )
-        from app.modules.swarms_agentic_system import agentic_system
-        
-        # Get agents from agentic system
-        # For now, create simple agents - in production, use agentic_system
-        from swarms import Agent
-        agents = [
-            Agent(agent_name=f"Agent-{i}", system_prompt="You are a helpful assistant.")
-            for i in range(3)
-        ]
+        agents = _build_monte_carlo_agents()
         
         # Select aggregator
         aggregator_map = {
@@ -66,7 +78,24 @@ async def run_monte_carlo(request: MonteCarloRunRequest):
             result_aggregator=aggregator
         )
         
-        result = swarm.run(request.task)
+        if request.streaming:
+            run = await swarm.run_streaming(
+                request.task,
+                sample_budget=request.sample_budget,
+                quorum=request.quorum,
+                confidence=request.confidence,
+                consensus=request.aggregator == "consensus"
+            )
+            return {
+                "status": "success",
+                "streaming": True,
+                "aggregator": request.aggregator,
+                **run
+            }
+        
+        # Agent calls block, so keep them off the event loop
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, swarm.run, request.task)
         
         return {
             "status": "success",
@@ -82,9 +111,9 @@ async def run_monte_carlo(request: MonteCarloRunRequest):
 async def generate_education(request: EducationSwarmRequest):
     """Generate education workflow using Education Swarm"""
     try:
-        from app.modules.education_swarm import EducationSwarm
-        
-        swarm = EducationSwarm()
+        # Only the LLM client and settings are shared; run_workflow builds its
+        # agents per call, so no conversation state crosses requests
+        swarm = integration_registry.get("education_swarm", EducationSwarm, env_keys=["OPENAI_API_KEY"])
         
         user_preferences = {
             "subjects": request.subjects,
@@ -92,7 +121,8 @@ async def generate_education(request: EducationSwarmRequest):
             "challenge_level": request.challenge_level
         }
         
-        result = swarm.run_workflow(user_preferences, request.initial_task)
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, swarm.run_workflow, user_preferences, request.initial_task)
         
         return result
     except Exception as e:
@@ -137,9 +137,9 @@ class IntegrationManager:
         # Initialize HDAM (Holographic Associative Memory) - Priority 1
         logger.info("Initializing HDAM...")
         try:
-            from app.modules.hdam import initialize_hdam
+            from app.modules.hdam import get_hdam
             hdam_config = self.config.get("hdam", {})
-            self.hdam = initialize_hdam(
+            self.hdam = get_hdam(
                 supabase_url=hdam_config.get("supabase_url") or os.getenv("SUPABASE_URL"),
                 supabase_key=hdam_config.get("supabase_key") or os.getenv("SUPABASE_KEY"),
                 enable_quantum=hdam_config.get("enable_quantum", False) or os.getenv("ENABLE_QUANTUM", "false").lower() == "true"
@@ -0,0 +1,148 @@
+"""
+Integration Registry
+Process-wide cache of integration objects (RAG, document, research, swarm
+backends). Each entry is constructed once, warmed up, shared across
+requests, and rebuilt only when its config (or the env vars it depends on)
+changes. Stateful entries (keep_on_change) are never rebuilt while live: a
+caller asking with a different config gets the existing instance and a
+warning. Set INTEGRATION_REGISTRY=off to construct on every call.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def config_fingerprint(config: Optional[Dict], env_keys: Optional[List[str]] = None) -> str:
+    """Stable hash of a config dict plus the current values of env_keys"""
+    payload = {
+        "config": config or {},
+        "env": {key: os.getenv(key) for key in (env_keys or [])},
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=repr).encode()
+    return hashlib.md5(encoded).hexdigest()
+
+
+class _Entry:
+    def __init__(self, instance: Any, fingerprint: str, build_seconds: float):
+        self.instance = instance
+        self.fingerprint = fingerprint
+        self.build_seconds = build_seconds
+        self.builds = 1
+        self.hits = 0
+        # Fingerprints already warned about for keep_on_change entries
+        self.mismatches = set()
+
+
+class IntegrationRegistry:
+    """Named singletons with config-aware rebuilds and warmup/close hooks"""
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return os.getenv("INTEGRATION_REGISTRY", "on").lower() != "off"
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    @staticmethod
+    def _warmup(instance: Any) -> None:
+        warmup = getattr(instance, "warmup", None)
+        if callable(warmup):
+            warmup()
+
+    @staticmethod
+    def _close(instance: Any) -> None:
+        close = getattr(instance, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logger.warning(f"Error closing {type(instance).__name__}: {e}")
+
+    def get(
+        self,
+        name: str,
+        factory: Callable[..., Any],
+        config: Optional[Dict] = None,
+        env_keys: Optional[List[str]] = None,
+        keep_on_change: bool = False,
+    ) -> Any:
+        """
+        Return the shared instance for name, constructing it with
+        factory(config) (or factory() when config is None) on first use or
+        when the config fingerprint changed. With keep_on_change, a live
+        instance holding state other callers depend on is returned as is and
+        the mismatch is logged once per config.
+        """
+        if not self.enabled:
+            return factory(config) if config is not None else factory()
+
+        fingerprint = config_fingerprint(config, env_keys)
+        entry = self._entries.get(name)
+        if entry is not None and (entry.fingerprint == fingerprint or keep_on_change):
+            entry.hits += 1
+            if entry.fingerprint != fingerprint and fingerprint not in entry.mismatches:
+                entry.mismatches.add(fingerprint)
+                logger.warning(f"{name} requested with a different config; keeping the live instance")
+            return entry.instance
+
+        with self._lock_for(name):
+            entry = self._entries.get(name)
+            if entry is not None and (entry.fingerprint == fingerprint or keep_on_change):
+                entry.hits += 1
+                return entry.instance
+
+            start = time.perf_counter()
+            instance = factory(config) if config is not None else factory()
+            self._warmup(instance)
+            build_seconds = time.perf_counter() - start
+
+            if entry is not None:
+                logger.info(f"Config changed for {name}; rebuilding")
+                self._close(entry.instance)
+                new_entry = _Entry(instance, fingerprint, build_seconds)
+                new_entry.builds = entry.builds + 1
+                self._entries[name] = new_entry
+            else:
+                self._entries[name] = _Entry(instance, fingerprint, build_seconds)
+            return instance
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Drop (and close) one entry, or all entries"""
+        names = [name] if name else list(self._entries)
+        for key in names:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._close(entry.instance)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "type": type(entry.instance).__name__,
+                "builds": entry.builds,
+                "hits": entry.hits,
+                "build_seconds": entry.build_seconds,
+            }
+            for name, entry in self._entries.items()
+        }
+
+
+# Global instance
+integration_registry = IntegrationRegistry()
+
+
+def get_integration_registry() -> IntegrationRegistry:
+    """Get the process-wide integration registry"""
+    return integration_registry
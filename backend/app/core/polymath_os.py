@@ -1,6 +1,6 @@
 from ..modules.researcher import ScholarlyResearcher
 from ..modules.rl_trainer import ReinforcementLearningTrainer
-from ..modules.hdam import HDAM
+from ..modules.hdam import get_hdam
 from ..modules.curriculum import CurriculumGenerator
 
 class PolyMathOS:
@@ -8,7 +8,7 @@ class PolyMathOS:
     
     def __init__(self):
         print("[PolyMathOS] Initializing PolyMathOS - The Ultimate Learning Acceleration System")
-        self.hdam = HDAM()  # Your existing HDAM system
+        self.hdam = get_hdam()  # Shared with the API and learning system
         self.researcher = ScholarlyResearcher()
         self.rl_trainer = ReinforcementLearningTrainer(self.hdam)
         self.curriculum_gen = CurriculumGenerator(self.hdam, self.researcher, self.rl_trainer)
@@ -0,0 +1,204 @@
+"""
+Schema Migrations
+Versioned DDL for the database components (persistence, storage, tigerdb,
+learning_models). Each component declares an ordered list of migrations;
+applied versions are recorded per component in schema_migrations, so:
+
+- when nothing is pending, startup costs one SELECT (run in autocommit, no
+  BEGIN/COMMIT round-trips);
+- otherwise the runner takes a per-component advisory lock (concurrent
+  workers wait instead of racing; on a fresh database a shared lock is taken
+  first so only one of them creates schema_migrations), re-reads the recorded
+  versions and applies
+  every pending migration in a single transaction. Each migration's SQL is
+  sent as one multi-statement batch.
+
+Optional migrations (TimescaleDB/pgvector features) run inside a savepoint.
+If one fails it is recorded as skipped and the rest still commit. Set
+SCHEMA_RETRY_SKIPPED=true to try skipped migrations again, e.g. after enabling
+an extension. Statements that cannot run inside a transaction (such as
+refresh_continuous_aggregate) go in `after_commit` and run once, in
+autocommit mode, after the migration that needs them has committed.
+
+Migrations are append-only: changing a shipped migration's SQL only logs a
+checksum warning; add a new version instead.
+"""
+
+import os
+import time
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        component VARCHAR(100) NOT NULL,
+        version INTEGER NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        checksum VARCHAR(64) NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        duration_ms FLOAT,
+        error TEXT,
+        applied_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (component, version)
+    )
+"""
+# Serializes creating schema_migrations itself, which every component shares
+TABLE_LOCK_KEY = int.from_bytes(
+    hashlib.blake2b(b"schema_migrations", digest_size=8).digest(), "big", signed=True)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema version: SQL sent as a single batch inside the migration transaction"""
+    version: int
+    name: str
+    sql: str
+    optional: bool = False
+    after_commit: Tuple[str, ...] = ()
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode()).hexdigest()
+
+
+class MigrationRunner:
+    """Applies a component's pending migrations on a psycopg2 connection"""
+
+    def __init__(self, conn, component: str, migrations: Sequence[Migration]):
+        versions = [m.version for m in migrations]
+        if len(set(versions)) != len(versions):
+            raise ValueError(f"Duplicate migration versions for {component}")
+        self.conn = conn
+        self.component = component
+        self.migrations = sorted(migrations, key=lambda m: m.version)
+        self.recorded: Dict[int, Tuple[str, str]] = {}  # version -> (status, checksum)
+        # Transaction-scoped advisory lock key, stable across processes
+        self.lock_key = int.from_bytes(
+            hashlib.blake2b(f"schema_migrations:{component}".encode(), digest_size=8).digest(),
+            "big", signed=True)
+
+    def _read_recorded(self, cur) -> Dict[int, Tuple[str, str]]:
+        cur.execute(
+            "SELECT version, status, checksum FROM schema_migrations WHERE component = %s",
+            (self.component,))
+        return {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+
+    def _pending(self, retry_skipped: bool) -> List[Migration]:
+        return [m for m in self.migrations
+                if m.version not in self.recorded
+                or (retry_skipped and self.recorded[m.version][0] == "skipped")]
+
+    def applied_names(self) -> Set[str]:
+        """Names of migrations recorded as applied (not skipped)"""
+        return {m.name for m in self.migrations
+                if self.recorded.get(m.version, ("",))[0] == "applied"}
+
+    @property
+    def version(self) -> int:
+        return max(self.recorded, default=0)
+
+    def run(self, retry_skipped: Optional[bool] = None) -> Dict[str, Any]:
+        """Bring the component up to date; returns a report with per-migration timings"""
+        if retry_skipped is None:
+            retry_skipped = os.getenv("SCHEMA_RETRY_SKIPPED", "false").lower() == "true"
+        start = time.perf_counter()
+        autocommit = self.conn.autocommit
+        try:
+            # Fast path: one query, no transaction
+            self.conn.autocommit = True
+            try:
+                with self.conn.cursor() as cur:
+                    self.recorded = self._read_recorded(cur)
+                table_exists = True
+            except Exception:
+                table_exists = False
+                self.recorded = {}
+
+            for m in self.migrations:
+                recorded = self.recorded.get(m.version)
+                if recorded and recorded[1] != m.checksum:
+                    logger.warning(f"Migration {self.component} v{m.version} ({m.name}) changed after it was applied; "
+                                   "add a new migration instead")
+
+            if table_exists and not self._pending(retry_skipped):
+                elapsed = (time.perf_counter() - start) * 1000
+                logger.info(f"Schema {self.component} up to date at v{self.version} ({elapsed:.1f} ms)")
+                return {"component": self.component, "status": "up_to_date", "version": self.version,
+                        "migrations": [], "elapsed_ms": elapsed}
+
+            results = self._apply(retry_skipped, create_table=not table_exists)
+        finally:
+            self.conn.autocommit = autocommit
+
+        elapsed = (time.perf_counter() - start) * 1000
+        for result in results:
+            logger.info(f"Schema {self.component} v{result['version']} {result['name']}: "
+                        f"{result['status']} in {result['duration_ms']:.1f} ms"
+                        + (f" ({result['error']})" if result.get("error") else ""))
+        logger.info(f"Schema {self.component} migrated to v{self.version} ({elapsed:.1f} ms)")
+        return {"component": self.component, "status": "migrated" if results else "up_to_date",
+                "version": self.version, "migrations": results, "elapsed_ms": elapsed}
+
+    def _apply(self, retry_skipped: bool, create_table: bool = True) -> List[Dict[str, Any]]:
+        results = []
+        self.conn.autocommit = False
+        try:
+            with self.conn.cursor() as cur:
+                # Lock before CREATE TABLE IF NOT EXISTS: run concurrently it can still collide in pg_type
+                if create_table:
+                    cur.execute("SELECT pg_advisory_xact_lock(%s)", (TABLE_LOCK_KEY,))
+                    cur.execute(MIGRATIONS_TABLE_SQL)
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (self.lock_key,))
+                # Another worker may have migrated while we waited for the lock
+                self.recorded = self._read_recorded(cur)
+                for m in self._pending(retry_skipped):
+                    started = time.perf_counter()
+                    status, error = "applied", None
+                    if m.optional:
+                        cur.execute("SAVEPOINT optional_migration")
+                    try:
+                        cur.execute(m.sql)
+                        if m.optional:
+                            cur.execute("RELEASE SAVEPOINT optional_migration")
+                    except Exception as e:
+                        if not m.optional:
+                            raise RuntimeError(f"Migration {self.component} v{m.version} ({m.name}) failed: {e}") from e
+                        cur.execute("ROLLBACK TO SAVEPOINT optional_migration")
+                        status, error = "skipped", str(e).strip()
+                    duration = (time.perf_counter() - started) * 1000
+                    cur.execute("""
+                        INSERT INTO schema_migrations
+                        (component, version, name, checksum, status, duration_ms, error)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s)
+                        ON CONFLICT (component, version) DO UPDATE SET
+                            name = EXCLUDED.name, checksum = EXCLUDED.checksum, status = EXCLUDED.status,
+                            duration_ms = EXCLUDED.duration_ms, error = EXCLUDED.error,
+                            applied_at = CURRENT_TIMESTAMP
+                    """, (self.component, m.version, m.name, m.checksum, status, duration, error))
+                    self.recorded[m.version] = (status, m.checksum)
+                    results.append({"version": m.version, "name": m.name, "status": status,
+                                    "duration_ms": duration, "error": error})
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            self.recorded = {}
+            raise
+
+        self.conn.autocommit = True
+        by_version = {m.version: m for m in self.migrations}
+        for result in results:
+            if result["status"] != "applied":
+                continue
+            for statement in by_version[result["version"]].after_commit:
+                try:
+                    started = time.perf_counter()
+                    with self.conn.cursor() as cur:
+                        cur.execute(statement)
+                    result["duration_ms"] += (time.perf_counter() - started) * 1000
+                except Exception as e:
+                    logger.warning(f"Post-commit step of {self.component} v{result['version']} failed: {e}")
+        return results
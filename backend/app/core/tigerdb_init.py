@@ -10,6 +10,8 @@ from typing import Optional
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
+from .schema_migrations import Migration, MigrationRunner
+
 logger = logging.getLogger(__name__)
 
 # Combined schema from all models
@@ -492,6 +494,17 @@ FROM learning_progress
 GROUP BY user_id, week
 WITH NO DATA;
 
+-- Keep the aggregates materialized; rows newer than the last refresh are still
+-- read in real time
+ALTER MATERIALIZED VIEW daily_comprehension_summary SET (timescaledb.materialized_only = false);
+ALTER MATERIALIZED VIEW weekly_progress_summary SET (timescaledb.materialized_only = false);
+SELECT add_continuous_aggregate_policy('daily_comprehension_summary',
+    start_offset => INTERVAL '7 days', end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '1 hour', if_not_exists => TRUE);
+SELECT add_continuous_aggregate_policy('weekly_progress_summary',
+    start_offset => INTERVAL '4 weeks', end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '1 hour', if_not_exists => TRUE);
+
 -- ============ Swarm Corporation Integration Tables ============
 
 -- SwarmShield encrypted conversations
@@ -645,6 +658,11 @@ CREATE INDEX IF NOT EXISTS idx_custom_swarms_user ON custom_swarm_specs(user_id)
 CREATE INDEX IF NOT EXISTS idx_custom_swarms_status ON custom_swarm_specs(validation_status);
 """
 
+# Append new versions rather than editing shipped ones
+TIGERDB_MIGRATIONS = [
+    Migration(1, "complete schema", TIGERDB_COMPLETE_SCHEMA),
+]
+
 
 class TigerDBInitializer:
     """Initialize and verify TigerDB database schema"""
@@ -653,6 +671,7 @@ class TigerDBInitializer:
         self.connection_string = connection_string or os.getenv("DATABASE_URL") or os.getenv("TIGERDB_URL")
         self.conn = None
         self.available = False
+        self.schema_report = None
         
         if not self.connection_string:
             logger.warning("No database connection string provided. Set DATABASE_URL or TIGERDB_URL environment variable.")
@@ -674,12 +693,10 @@ class TigerDBInitializer:
             return False
         
         try:
-            with self.conn.cursor() as cur:
-                # Execute the entire schema as a single block
-                logger.info("Executing schema...")
-                cur.execute(TIGERDB_COMPLETE_SCHEMA)
-                logger.info("Schema execution completed")
-                return True
+            # Skips everything after one query when the recorded version is current
+            self.schema_report = MigrationRunner(self.conn, "tigerdb", TIGERDB_MIGRATIONS).run()
+            logger.info(f"Schema at v{self.schema_report['version']} ({self.schema_report['elapsed_ms']:.1f} ms)")
+            return True
                 
         except Exception as e:
             logger.error(f"Failed to initialize schema: {e}")
@@ -279,11 +279,10 @@ async def upload_resource(
     """Upload a single learning resource"""
     try:
         domain_list = json.loads(domains)
-        content = await file.read()
         
-        # Use the file processor directly through the system
-        result = await genius_system.learning_system.file_processor.process_file(
-            file_content=content,
+        # Stream the upload through the file processor's ingestion pipeline
+        result = await genius_system.learning_system.file_processor.process_upload(
+            file,
             filename=file.filename,
             domains=domain_list,
             metadata={"content_type": file.content_type}
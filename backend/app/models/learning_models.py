@@ -11,13 +11,15 @@ import json
 import os
 import logging
 
+from ..core.schema_migrations import Migration, MigrationRunner
+
 logger = logging.getLogger(__name__)
 
 # SQL Schema for TimescaleDB
 TIMESCALE_SCHEMA = """
 -- Enable required extensions
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
-CREATE EXTENSION IF NOT EXISTS "pgvector";
+CREATE EXTENSION IF NOT EXISTS "vector";
 
 -- ============ Quiz System Tables ============
 
@@ -354,8 +356,24 @@ SELECT
 FROM learning_progress
 GROUP BY user_id, week
 WITH NO DATA;
+
+-- Keep the aggregates materialized; rows newer than the last refresh are still
+-- read in real time
+ALTER MATERIALIZED VIEW daily_comprehension_summary SET (timescaledb.materialized_only = false);
+ALTER MATERIALIZED VIEW weekly_progress_summary SET (timescaledb.materialized_only = false);
+SELECT add_continuous_aggregate_policy('daily_comprehension_summary',
+    start_offset => INTERVAL '7 days', end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '1 hour', if_not_exists => TRUE);
+SELECT add_continuous_aggregate_policy('weekly_progress_summary',
+    start_offset => INTERVAL '4 weeks', end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '1 hour', if_not_exists => TRUE);
 """
 
+# Append new versions rather than editing shipped ones
+LEARNING_MIGRATIONS = [
+    Migration(1, "learning schema", TIMESCALE_SCHEMA),
+]
+
 
 @dataclass
 class QuizSession:
@@ -483,6 +501,7 @@ class LearningModelsManager:
         self.connection_string = connection_string or os.getenv("DATABASE_URL")
         self.available = False
         self.conn = None
+        self.schema_report = None
         
         if self.connection_string:
             try:
@@ -494,30 +513,17 @@ class LearningModelsManager:
                 logger.warning(f"TimescaleDB not available: {e}")
     
     def initialize_schema(self) -> bool:
-        """Initialize the database schema"""
+        """Initialize the database schema (one query once it is up to date)"""
         if not self.available or not self.conn:
             logger.warning("Cannot initialize schema - database not available")
             return False
         
         try:
-            with self.conn.cursor() as cur:
-                # Execute schema SQL in parts to handle errors gracefully
-                statements = TIMESCALE_SCHEMA.split(';')
-                for statement in statements:
-                    statement = statement.strip()
-                    if statement and not statement.startswith('--'):
-                        try:
-                            cur.execute(statement + ';')
-                        except Exception as e:
-                            # Log but continue - some statements may fail if already exists
-                            logger.debug(f"Schema statement skipped: {e}")
-                
-                self.conn.commit()
-                logger.info("Learning schema initialized successfully")
-                return True
+            self.schema_report = MigrationRunner(self.conn, "learning_models", LEARNING_MIGRATIONS).run()
+            logger.info("Learning schema initialized successfully")
+            return True
         except Exception as e:
             logger.error(f"Failed to initialize schema: {e}")
-            self.conn.rollback()
             return False
     
     def save_quiz_session(self, session: QuizSession) -> bool:
@@ -571,36 +577,46 @@ class LearningModelsManager:
     def get_comprehension_history(
         self, user_id: str, topic: Optional[str] = None, days: int = 30
     ) -> List[Dict[str, Any]]:
-        """Get comprehension history for time-series analysis"""
+        """Get daily comprehension history (one row per day, topic and dimension)
+        
+        Reads the daily_comprehension_summary continuous aggregate, so the cost
+        grows with days rather than with measurements; scans comprehension_metrics
+        if the aggregate is missing.
+        """
         if not self.available:
             return []
         
-        try:
-            with self.conn.cursor() as cur:
-                query = """
-                    SELECT dimension, score, measured_at
-                    FROM comprehension_metrics
-                    WHERE user_id = %s 
-                    AND measured_at > NOW() - INTERVAL '%s days'
-                """
-                params = [user_id, days]
-                
-                if topic:
-                    query += " AND topic = %s"
-                    params.append(topic)
-                
-                query += " ORDER BY measured_at DESC"
-                
-                cur.execute(query, params)
-                rows = cur.fetchall()
-                
-                return [
-                    {"dimension": row[0], "score": row[1], "measured_at": row[2]}
-                    for row in rows
-                ]
-        except Exception as e:
-            logger.error(f"Failed to get comprehension history: {e}")
-            return []
+        filters = " AND topic = %s" if topic else ""
+        params = [user_id, days] + ([topic] if topic else [])
+        queries = (
+            """
+                SELECT dimension, avg_score, day, measurement_count, topic
+                FROM daily_comprehension_summary
+                WHERE user_id = %s 
+                AND day >= time_bucket(INTERVAL '1 day', NOW() - %s * INTERVAL '1 day')
+            """ + filters + " ORDER BY day DESC",
+            """
+                SELECT dimension, AVG(score), date_trunc('day', measured_at) AS day, COUNT(*), topic
+                FROM comprehension_metrics
+                WHERE user_id = %s 
+                AND measured_at > NOW() - %s * INTERVAL '1 day'
+            """ + filters + " GROUP BY topic, dimension, day ORDER BY day DESC",
+        )
+        
+        for query in queries:
+            try:
+                with self.conn.cursor() as cur:
+                    cur.execute(query, params)
+                    return [
+                        {"dimension": row[0], "score": row[1], "measured_at": row[2],
+                         "measurement_count": row[3], "topic": row[4]}
+                        for row in cur.fetchall()
+                    ]
+            except Exception as e:
+                logger.warning(f"Comprehension history query failed: {e}")
+                self.conn.rollback()
+        logger.error("Failed to get comprehension history")
+        return []
     
     def close(self):
         """Close database connection"""
@@ -8,6 +8,8 @@ import logging
 from typing import Optional, Dict, Any, List
 import asyncio
 
+from app.core.integration_registry import integration_registry
+
 logger = logging.getLogger(__name__)
 
 # Try to import AdvancedResearch
@@ -111,6 +113,6 @@ class AdvancedResearchIntegration:
 
 def get_advanced_research_integration(config: Optional[Dict] = None) -> AdvancedResearchIntegration:
     """Get or create AdvancedResearch integration instance"""
-    return AdvancedResearchIntegration(config)
+    return integration_registry.get("advanced_research", AdvancedResearchIntegration, config)
 
 
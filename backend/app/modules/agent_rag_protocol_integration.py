@@ -1,6 +1,8 @@
 """
 AgentRAGProtocol Integration Module
-Protocol for integrating RAG into agents
+Protocol for integrating RAG into agents.
+Retrieval is served by the built-in hybrid engine (BM25 + dense, RRF fusion)
+in hybrid_retrieval.py, with dense embeddings taken from the shared HDAM encoder.
 """
 
 import os
@@ -8,6 +10,9 @@ import logging
 from typing import Optional, Dict, Any, List
 import numpy as np
 
+from app.core.integration_registry import integration_registry
+from .hybrid_retrieval import HybridRetrievalEngine
+
 logger = logging.getLogger(__name__)
 
 # Try to import AgentRAGProtocol
@@ -16,7 +21,7 @@ try:
     AGENT_RAG_PROTOCOL_AVAILABLE = True
 except ImportError:
     AGENT_RAG_PROTOCOL_AVAILABLE = False
-    logger.warning("AgentRAGProtocol not available. Install from: https://github.com/The-Swarm-Corporation/AgentRAGProtocol.git")
+    logger.warning("AgentRAGProtocol not available. Using built-in hybrid retrieval.")
     agent_rag_protocol = None
 
 
@@ -25,31 +30,41 @@ class AgentRAGProtocolIntegration:
     
     def __init__(self, config: Optional[Dict] = None):
         self.config = config or {}
-        self.available = AGENT_RAG_PROTOCOL_AVAILABLE
+        self.protocol_available = AGENT_RAG_PROTOCOL_AVAILABLE
         
-        if not self.available:
-            logger.warning("AgentRAGProtocol package not installed. RAG features will be unavailable.")
-            return
+        encode_fn = self.config.get("encode_fn")
+        dense_enabled = os.getenv("RAG_DENSE_ENABLED", "true").lower() == "true"
+        if encode_fn is None and dense_enabled:
+            from .hdam import shared_encode_fn
+            encode_fn = shared_encode_fn()
         
         try:
-            # Initialize AgentRAGProtocol (adjust based on actual API)
-            # self.rag = agent_rag_protocol.AgentRAGProtocol(**self.config)
-            logger.info("AgentRAGProtocol initialized successfully")
+            self.engine = HybridRetrievalEngine(
+                index_dir=self.config.get("index_dir", os.getenv("RAG_INDEX_DIR", "./rag_index")),
+                encode_fn=encode_fn,
+                rrf_k=int(self.config.get("rrf_k", os.getenv("RAG_RRF_K", "60"))),
+            )
+            self.available = True
+            logger.info(f"Hybrid retrieval initialized (dense: {encode_fn is not None})")
         except Exception as e:
-            logger.error(f"Failed to initialize AgentRAGProtocol: {e}")
+            logger.error(f"Failed to initialize hybrid retrieval: {e}")
+            self.engine = None
             self.available = False
     
     def index_documents(
         self,
         documents: List[str],
-        metadata: Optional[List[Dict[str, Any]]] = None
+        metadata: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """
-        Index documents for RAG retrieval.
+        Index documents for RAG retrieval. Documents are upserted by id
+        (content hash when ids are not given) and persisted incrementally.
         
         Args:
             documents: List of document texts
             metadata: Optional metadata for each document
+            ids: Optional stable document ids
         
         Returns:
             Indexing result
@@ -57,16 +72,16 @@ class AgentRAGProtocolIntegration:
         if not self.available:
             return {
                 "status": "error",
-                "message": "AgentRAGProtocol not available"
+                "message": "Hybrid retrieval not available"
             }
         
         try:
-            # In production, use actual AgentRAGProtocol API
-            # result = self.rag.index(documents, metadata)
+            doc_ids = self.engine.index_documents(documents, metadata, ids)
             return {
                 "status": "success",
-                "indexed_count": len(documents),
-                "index_id": f"index_{hash(str(documents))}"
+                "indexed_count": len(doc_ids),
+                "ids": doc_ids,
+                "index_id": self.engine.index_dir
             }
         except Exception as e:
             logger.error(f"Document indexing failed: {e}")
@@ -76,7 +91,8 @@ class AgentRAGProtocolIntegration:
         self,
         query: str,
         top_k: int = 5,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        mode: str = "hybrid"
     ) -> List[Dict[str, Any]]:
         """
         Query the RAG system.
@@ -84,7 +100,8 @@ class AgentRAGProtocolIntegration:
         Args:
             query: Query string
             top_k: Number of results to return
-            filters: Optional filters
+            filters: Optional metadata filters ({key: value} or {key: [values]})
+            mode: "hybrid", "bm25" or "dense"
         
         Returns:
             List of relevant documents with scores
@@ -93,9 +110,7 @@ class AgentRAGProtocolIntegration:
             return []
         
         try:
-            # In production, use actual AgentRAGProtocol API
-            # results = self.rag.query(query, top_k, filters)
-            return []
+            return self.engine.query(query, top_k, filters, mode)
         except Exception as e:
             logger.error(f"RAG query failed: {e}")
             return []
@@ -103,14 +118,16 @@ class AgentRAGProtocolIntegration:
     def get_context_for_agent(
         self,
         agent_query: str,
-        context_length: int = 2000
+        context_length: int = 2000,
+        filters: Optional[Dict[str, Any]] = None
     ) -> str:
         """
         Get RAG context for an agent.
         
         Args:
             agent_query: Agent's query
-            context_length: Maximum context length
+            context_length: Token budget for the returned context
+            filters: Optional metadata filters
         
         Returns:
             Context string for the agent
@@ -119,23 +136,29 @@ class AgentRAGProtocolIntegration:
             return ""
         
         try:
-            # In production, use actual AgentRAGProtocol API
-            # context = self.rag.get_context(agent_query, context_length)
-            return ""
+            return self.engine.get_context(agent_query, context_length, filters)
         except Exception as e:
             logger.error(f"Get context failed: {e}")
             return ""
     
+    def close(self):
+        """Release the index's database handle"""
+        if self.engine is not None:
+            self.engine.close()
+    
     def health_check(self) -> Dict[str, Any]:
         """Perform health check"""
         return {
             "status": "healthy" if self.available else "unavailable",
-            "available": self.available
+            "available": self.available,
+            "protocol_available": self.protocol_available,
+            "index": self.engine.stats() if self.engine else None
         }
 
 
 def get_agent_rag_protocol_integration(config: Optional[Dict] = None) -> AgentRAGProtocolIntegration:
     """Get or create AgentRAGProtocol integration instance"""
-    return AgentRAGProtocolIntegration(config)
-
-
+    return integration_registry.get(
+        "agent_rag_protocol", AgentRAGProtocolIntegration, config,
+        env_keys=["RAG_INDEX_DIR", "RAG_DENSE_ENABLED", "RAG_RRF_K"]
+    )
@@ -11,6 +11,8 @@ import yaml
 import csv
 from io import StringIO
 
+from app.core.integration_registry import integration_registry
+
 logger = logging.getLogger(__name__)
 
 # Try to import AgentParse
@@ -143,6 +145,6 @@ class AgentParseIntegration:
 
 def get_agentparse_integration(config: Optional[Dict] = None) -> AgentParseIntegration:
     """Get or create AgentParse integration instance"""
-    return AgentParseIntegration(config)
+    return integration_registry.get("agentparse", AgentParseIntegration, config)
 
 
@@ -1,10 +1,17 @@
 """
 ChromaDB Memory System
-Long-term memory storage for agents using ChromaDB
+Long-term memory storage for agents using ChromaDB.
+Writes are embedded with the shared HDAM encoder, upserted in batches off
+the event loop under content-derived ids (retries are idempotent), and
+single memories can be buffered and flushed on an interval.
 """
 
 import os
+import json
+import asyncio
+import hashlib
 import logging
+import threading
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
@@ -30,6 +37,12 @@ except ImportError:
     SwarmsChromaDB = None
 
 
+def memory_id(content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """Deterministic id for a memory, so re-sending it overwrites instead of duplicating"""
+    payload = json.dumps({"content": content, "metadata": metadata or {}}, sort_keys=True, default=str)
+    return hashlib.md5(payload.encode()).hexdigest()
+
+
 class ChromaDBMemory:
     """
     ChromaDB-based long-term memory system for agents.
@@ -39,6 +52,15 @@ class ChromaDBMemory:
     def __init__(self, config: Optional[Dict] = None):
         self.config = config or {}
         self.available = CHROMADB_AVAILABLE
+        self.batch_size = int(self.config.get("batch_size", os.getenv("CHROMADB_BATCH_SIZE", "256")))
+        self.buffer_size = int(self.config.get("buffer_size", os.getenv("CHROMADB_BUFFER_SIZE", "64")))
+        self.flush_interval = float(self.config.get("flush_interval", os.getenv("CHROMADB_FLUSH_INTERVAL", "2")))
+        self.encode_fn = None
+        self._buffer: List[tuple] = []
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
         
         if not self.available:
             logger.warning("ChromaDB not available")
@@ -46,8 +68,8 @@ class ChromaDBMemory:
         
         try:
             # Configuration
-            persist_directory = self.config.get("chromadb_path", "./chromadb")
-            collection_name = self.config.get("collection_name", "polymathos_memory")
+            persist_directory = self.config.get("chromadb_path", os.getenv("CHROMADB_PATH", "./chromadb"))
+            collection_name = self.config.get("collection_name", os.getenv("CHROMADB_COLLECTION", "polymathos_memory"))
             metric = self.config.get("metric", "cosine")
             
             # Initialize ChromaDB client
@@ -55,12 +77,21 @@ class ChromaDBMemory:
                 path=persist_directory,
                 settings=Settings(anonymized_telemetry=False)
             )
+            if hasattr(self.client, "get_max_batch_size"):
+                self.batch_size = min(self.batch_size, self.client.get_max_batch_size())
+            
+            # Embed with the shared HDAM encoder; Chroma's default function otherwise
+            self.encode_fn = self.config.get("encode_fn")
+            if self.encode_fn is None:
+                from .hdam import shared_encode_fn
+                self.encode_fn = shared_encode_fn()
+            collection_kwargs = {"embedding_function": None} if self.encode_fn else {}
             
             # Get or create collection
             self.collection = self.client.get_or_create_collection(
                 name=collection_name,
                 metadata={"description": "PolyMathOS agent memory"},
-                embedding_function=None  # Use default
+                **collection_kwargs
             )
             
             # Try to use swarms-memory wrapper if available
@@ -73,11 +104,157 @@ class ChromaDBMemory:
             else:
                 self.swarms_memory = None
             
-            logger.info(f"ChromaDB Memory initialized: {collection_name}")
+            self._start_flusher()
+            logger.info(f"ChromaDB Memory initialized: {collection_name} (HDAM embeddings: {self.encode_fn is not None})")
         except Exception as e:
             logger.error(f"Failed to initialize ChromaDB Memory: {e}")
             self.available = False
     
+    def _embed(self, texts: List[str]) -> Optional[List[List[float]]]:
+        if self.encode_fn is None:
+            return None
+        return [list(map(float, vector)) for vector in self.encode_fn(texts)]
+    
+    def _write(self, contents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]) -> None:
+        """Upsert in batch_size slices (blocking)"""
+        with self._write_lock:
+            for start in range(0, len(contents), self.batch_size):
+                end = start + self.batch_size
+                batch = contents[start:end]
+                self.collection.upsert(
+                    ids=ids[start:end],
+                    documents=batch,
+                    # Chroma rejects empty metadata dicts
+                    metadatas=[m or None for m in metadatas[start:end]],
+                    embeddings=self._embed(batch)
+                )
+    
+    def store_many_sync(
+        self,
+        contents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """Blocking form of store_many"""
+        metadatas = metadatas or [{} for _ in contents]
+        ids = ids or [memory_id(c, m) for c, m in zip(contents, metadatas)]
+        self._write(list(contents), list(metadatas), list(ids))
+        return ids
+    
+    async def store_many(
+        self,
+        contents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Embed and upsert many memories in batches on a worker thread.
+        
+        Args:
+            contents: Texts to store
+            metadatas: Optional metadata per text
+            ids: Optional ids; derived from content and metadata when omitted
+        
+        Returns:
+            The ids written
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.store_many_sync, contents, metadatas, ids)
+    
+    def query_many_sync(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, List]:
+        """Blocking form of query_many"""
+        try:
+            self.flush()
+        except Exception as e:
+            # The rows stay buffered for the next flush; the query still answers from what is stored
+            logger.warning(f"ChromaDB buffer flush before query failed: {e}")
+        embeddings = self._embed(queries)
+        kwargs = {"query_embeddings": embeddings} if embeddings is not None else {"query_texts": queries}
+        results = self.collection.query(n_results=n_results, where=where, **kwargs)
+        return {
+            "ids": results.get("ids") or [],
+            "documents": results.get("documents") or [],
+            "metadatas": results.get("metadatas") or [],
+            "distances": results.get("distances") or []
+        }
+    
+    async def query_many(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, List]:
+        """
+        Query with several texts in one embedding call and one Chroma call.
+        Buffered memories are flushed first so they are visible; if that
+        write fails they stay buffered and the query runs without them.
+        
+        Returns:
+            ids/documents/metadatas/distances, one list per query
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.query_many_sync, queries, n_results, where)
+    
+    def remember(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Buffer one memory (e.g. a conversation turn). The buffer is written
+        when it reaches buffer_size, every flush_interval seconds, and
+        before queries.
+        """
+        doc_id = memory_id(content, metadata)
+        with self._buffer_lock:
+            self._buffer.append((content, metadata or {}, doc_id))
+            full = len(self._buffer) >= self.buffer_size
+        if full:
+            self.flush()
+        return doc_id
+    
+    def flush(self) -> int:
+        """Write buffered memories; returns how many were written"""
+        if not self.available:
+            return 0
+        with self._buffer_lock:
+            pending, self._buffer = self._buffer, []
+        if not pending:
+            return 0
+        contents, metadatas, ids = (list(column) for column in zip(*pending))
+        try:
+            self._write(contents, metadatas, ids)
+        except Exception:
+            # Put them back; ids are deterministic so a retry cannot duplicate
+            with self._buffer_lock:
+                self._buffer = pending + self._buffer
+            raise
+        return len(pending)
+    
+    def _start_flusher(self) -> None:
+        if self.flush_interval <= 0 or self._flusher is not None:
+            return
+        
+        def loop():
+            while not self._stop.wait(self.flush_interval):
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.warning(f"ChromaDB buffer flush failed: {e}")
+        
+        self._flusher = threading.Thread(target=loop, name="chromadb-flush", daemon=True)
+        self._flusher.start()
+    
+    def close(self) -> None:
+        """Flush the buffer and stop the background flusher"""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+            self._flusher = None
+        if self.available:
+            self.flush()
+    
     async def execute(
         self,
         task: str,
@@ -105,43 +282,42 @@ class ChromaDBMemory:
             operation = pattern_config.get("operation", "query")
             
             if operation == "store":
-                # Store content in memory
-                content = pattern_config.get("content", task)
-                metadata = pattern_config.get("metadata", {})
-                doc_id = pattern_config.get("doc_id")
+                # Store content in memory ("contents" is written as one batch)
+                if "contents" in pattern_config:
+                    contents = pattern_config["contents"]
+                    metadatas = pattern_config.get("metadatas")
+                    ids = pattern_config.get("doc_ids")
+                else:
+                    contents = [pattern_config.get("content", task)]
+                    metadatas = [pattern_config.get("metadata", {})]
+                    ids = [pattern_config["doc_id"]] if pattern_config.get("doc_id") else None
                 
-                self.collection.add(
-                    documents=[content],
-                    metadatas=[metadata],
-                    ids=[doc_id] if doc_id else None
-                )
+                doc_ids = await self.store_many(contents, metadatas, ids)
                 
                 return {
                     "status": "success",
                     "operation": "store",
-                    "doc_id": doc_id,
+                    "doc_id": doc_ids[0] if len(doc_ids) == 1 else None,
+                    "doc_ids": doc_ids,
                     "message": "Content stored in memory"
                 }
             
             elif operation == "query":
-                # Query memory
-                query_texts = [task]
+                # Query memory (all "queries" go out in one call)
+                query_texts = pattern_config.get("queries") or [task]
                 n_results = pattern_config.get("n_results", 5)
                 
-                results = self.collection.query(
-                    query_texts=query_texts,
-                    n_results=n_results
+                results = await self.query_many(
+                    query_texts,
+                    n_results=n_results,
+                    where=pattern_config.get("where")
                 )
                 
                 return {
                     "status": "success",
                     "operation": "query",
                     "query": task,
-                    "results": {
-                        "documents": results.get("documents", []),
-                        "metadatas": results.get("metadatas", []),
-                        "distances": results.get("distances", [])
-                    }
+                    "results": results
                 }
             
             else:
@@ -0,0 +1,418 @@
+"""
+Conversation Log Store
+Segmented append-only message log per conversation, used by
+SwarmShieldIntegration instead of keeping whole conversations in memory.
+
+On-disk layout (root/<conversation_id>/):
+    meta.json               name, created_at
+    <segment>.log           framed records: flags (u8), length (u32), crc32 (u32), payload
+    index.bin               one (segment u32, offset u64, length u32) entry per message
+    stats.json              rolling summary, replayed forward from the index on open
+
+Payloads are AES-256-GCM encrypted (nonce + ciphertext) with the conversation
+id and message number as associated data, so records cannot be swapped
+between positions. The key comes from SWARM_SHIELD_LOG_KEY or a key file kept
+outside root (SWARM_SHIELD_LOG_KEY_FILE), so a copy of the logs does not carry
+its key; without the cryptography package records are stored unencrypted.
+"""
+
+import os
+import json
+import zlib
+import uuid
+import base64
+import struct
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    CRYPTOGRAPHY_AVAILABLE = False
+    logger.warning("cryptography not available; conversation logs are stored unencrypted. Install: pip install cryptography")
+    AESGCM = None
+
+HEADER = struct.Struct("<BII")
+INDEX_ENTRY = struct.Struct("<IQI")
+FLAG_ENCRYPTED = 1
+STATS_FLUSH_EVERY = 64
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class _RecordCipher:
+    """AES-GCM record encryption bound to (conversation, message number)"""
+
+    def __init__(self, key: Optional[bytes]):
+        self.aead = AESGCM(key) if key is not None and CRYPTOGRAPHY_AVAILABLE else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.aead is not None
+
+    def seal(self, data: bytes, aad: bytes) -> bytes:
+        nonce = os.urandom(12)
+        return nonce + self.aead.encrypt(nonce, data, aad)
+
+    def open(self, payload: bytes, aad: bytes) -> bytes:
+        return self.aead.decrypt(payload[:12], payload[12:], aad)
+
+
+class ConversationLog:
+    """One conversation: append-only segments, offset index and rolling stats"""
+
+    def __init__(
+        self,
+        path: str,
+        conversation_id: str,
+        cipher: _RecordCipher,
+        segment_bytes: int,
+        on_append: Optional[Callable[[Dict[str, Any], bool], None]] = None,
+    ):
+        self.path = path
+        self.id = conversation_id
+        self.cipher = cipher
+        self.segment_bytes = segment_bytes
+        # Called with (record, first message of this agent here) after each append
+        self.on_append = on_append
+        self.lock = threading.Lock()
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.index_path = os.path.join(path, "index.bin")
+        self._recover()
+        self.stats = self._load_stats()
+        self._unflushed = 0
+
+    # ------------------------------------------------------------------
+    # Files and recovery
+    # ------------------------------------------------------------------
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.path, f"{segment:08d}.log")
+
+    @property
+    def message_count(self) -> int:
+        return self._index_size // INDEX_ENTRY.size
+
+    def _recover(self) -> None:
+        """Drop torn index entries and index (or truncate) records written after the last index entry"""
+        size = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+        size -= size % INDEX_ENTRY.size
+        with open(self.index_path, "ab") as f:
+            f.truncate(size)
+        self._index_size = size
+
+        if size:
+            segment, offset, length = self._entries(self.message_count - 1, 1)[0]
+            end = offset + HEADER.size + length
+        else:
+            segment, end = 0, 0
+
+        recovered = []
+        while True:
+            seg_path = self._segment_path(segment)
+            actual = os.path.getsize(seg_path) if os.path.exists(seg_path) else 0
+            torn = False
+            with open(seg_path, "ab+") as f:
+                f.seek(end)
+                while end + HEADER.size <= actual:
+                    flags, length, crc = HEADER.unpack(f.read(HEADER.size))
+                    payload = f.read(length)
+                    if len(payload) < length or zlib.crc32(payload) != crc:
+                        torn = True
+                        break
+                    recovered.append(INDEX_ENTRY.pack(segment, end, length))
+                    end += HEADER.size + length
+                torn = torn or end < actual
+                f.truncate(end)
+            # An append that rolled over may have left its record in the next segment
+            next_path = self._segment_path(segment + 1)
+            if not os.path.exists(next_path):
+                break
+            if torn:
+                # Nothing after a torn record is reachable; later segments would skew append offsets
+                stale = segment + 1
+                while os.path.exists(self._segment_path(stale)):
+                    os.remove(self._segment_path(stale))
+                    stale += 1
+                break
+            segment, end = segment + 1, 0
+        if recovered:
+            with open(self.index_path, "ab") as f:
+                f.write(b"".join(recovered))
+            self._index_size += len(recovered) * INDEX_ENTRY.size
+            logger.warning(f"Recovered {len(recovered)} unindexed messages in conversation {self.id}")
+        self._segment, self._segment_size = segment, end
+
+    def _entries(self, start: int, count: int) -> List[tuple]:
+        with open(self.index_path, "rb") as f:
+            f.seek(start * INDEX_ENTRY.size)
+            data = f.read(count * INDEX_ENTRY.size)
+        return [INDEX_ENTRY.unpack_from(data, i) for i in range(0, len(data), INDEX_ENTRY.size)]
+
+    # ------------------------------------------------------------------
+    # Records
+    # ------------------------------------------------------------------
+    def _aad(self, number: int) -> bytes:
+        return f"{self.id}:{number}".encode()
+
+    def _encode(self, record: Dict[str, Any], number: int) -> bytes:
+        data = json.dumps(record, separators=(",", ":")).encode()
+        flags = 0
+        if self.cipher.enabled:
+            data = self.cipher.seal(data, self._aad(number))
+            flags = FLAG_ENCRYPTED
+        return HEADER.pack(flags, len(data), zlib.crc32(data)) + data
+
+    def _decode(self, frame: bytes, number: int) -> Dict[str, Any]:
+        flags, length, crc = HEADER.unpack_from(frame)
+        payload = frame[HEADER.size:HEADER.size + length]
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f"Corrupt record {number} in conversation {self.id}")
+        if flags & FLAG_ENCRYPTED:
+            if not self.cipher.enabled:
+                raise ValueError("Encrypted conversation log but no decryption key available")
+            payload = self.cipher.open(payload, self._aad(number))
+        return json.loads(payload)
+
+    def append(self, agent: str, message: str) -> Dict[str, Any]:
+        record = {"agent": agent, "message": message, "timestamp": _now()}
+        with self.lock:
+            number = self.message_count
+            frame = self._encode(record, number)
+            if self._segment_size and self._segment_size + len(frame) > self.segment_bytes:
+                self._segment, self._segment_size = self._segment + 1, 0
+            offset = self._segment_size
+            with open(self._segment_path(self._segment), "ab") as f:
+                f.write(frame)
+            with open(self.index_path, "ab") as f:
+                f.write(INDEX_ENTRY.pack(self._segment, offset, len(frame) - HEADER.size))
+            self._segment_size += len(frame)
+            self._index_size += INDEX_ENTRY.size
+            new_agent = self._apply_stats(record)
+            self._unflushed += 1
+            if self._unflushed >= STATS_FLUSH_EVERY:
+                self.flush()
+            if self.on_append is not None:
+                self.on_append(record, new_agent)
+        return record
+
+    def read(self, offset: int = 0, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield messages [offset, offset + limit) without loading the rest"""
+        end = self.message_count if limit is None else min(self.message_count, offset + limit)
+        handles: Dict[int, Any] = {}
+        try:
+            for start in range(offset, end, 1024):
+                for i, (segment, position, length) in enumerate(self._entries(start, min(1024, end - start))):
+                    f = handles.get(segment)
+                    if f is None:
+                        f = handles[segment] = open(self._segment_path(segment), "rb")
+                    f.seek(position)
+                    yield self._decode(f.read(HEADER.size + length), start + i)
+        finally:
+            for f in handles.values():
+                f.close()
+
+    # ------------------------------------------------------------------
+    # Rolling stats
+    # ------------------------------------------------------------------
+    def _load_stats(self) -> Dict[str, Any]:
+        stats = {"message_count": 0, "agents": {}, "first_message": None, "last_message": None}
+        stats_path = os.path.join(self.path, "stats.json")
+        if os.path.exists(stats_path):
+            try:
+                with open(stats_path) as f:
+                    stats = json.load(f)
+            except ValueError:
+                pass
+        if stats["message_count"] > self.message_count:
+            stats = {"message_count": 0, "agents": {}, "first_message": None, "last_message": None}
+        if stats["message_count"] < self.message_count:
+            # Replay only the messages appended since stats were last written
+            self.stats = stats
+            for record in self.read(stats["message_count"]):
+                self._apply_stats(record)
+            self.flush()
+        return stats
+
+    def _apply_stats(self, record: Dict[str, Any]) -> bool:
+        """Fold record into the rolling stats; True if it is the agent's first message here"""
+        stats = self.stats
+        timestamp = record["timestamp"]
+        new_agent = record["agent"] not in stats["agents"]
+        agent = stats["agents"].setdefault(
+            record["agent"], {"messages": 0, "chars": 0, "first_message": timestamp, "last_message": timestamp}
+        )
+        agent["messages"] += 1
+        agent["chars"] += len(record["message"])
+        agent["last_message"] = timestamp
+        stats["message_count"] += 1
+        stats["first_message"] = stats["first_message"] or timestamp
+        stats["last_message"] = timestamp
+        return new_agent
+
+    def flush(self) -> None:
+        tmp = os.path.join(self.path, "stats.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.stats, f)
+        os.replace(tmp, os.path.join(self.path, "stats.json"))
+        self._unflushed = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.meta.get("name", ""),
+            "created_at": self.meta.get("created_at"),
+            "message_count": self.stats["message_count"],
+            "agents": list(self.stats["agents"]),
+            "first_message": self.stats["first_message"],
+            "last_message": self.stats["last_message"],
+        }
+
+
+class ConversationLogStore:
+    """All conversation logs under one root directory"""
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        key: Optional[bytes] = None,
+        segment_bytes: Optional[int] = None,
+        key_path: Optional[str] = None,
+    ):
+        self.root = root or os.getenv("SWARM_SHIELD_LOG_DIR", "./swarm_shield_logs")
+        self.segment_bytes = segment_bytes or int(os.getenv("SWARM_SHIELD_SEGMENT_BYTES", str(8 * 1024 * 1024)))
+        self.key_path = os.path.expanduser(
+            key_path or os.getenv("SWARM_SHIELD_LOG_KEY_FILE", "~/.polymathos/swarm_shield_log.key")
+        )
+        os.makedirs(self.root, exist_ok=True)
+        self.cipher = _RecordCipher(key if key is not None else self._load_key())
+        self._lock = threading.Lock()
+        # Per-agent totals across conversations, kept current by every append
+        self._agents: Dict[str, Dict[str, Any]] = {}
+        self._agents_lock = threading.Lock()
+        self.conversations: Dict[str, ConversationLog] = {}
+        for name in sorted(os.listdir(self.root)):
+            if os.path.exists(os.path.join(self.root, name, "meta.json")):
+                try:
+                    self.conversations[name] = self._open(name)
+                except Exception as e:
+                    logger.error(f"Failed to open conversation log {name}: {e}")
+
+    def _load_key(self) -> Optional[bytes]:
+        if not CRYPTOGRAPHY_AVAILABLE:
+            return None
+        env_key = os.getenv("SWARM_SHIELD_LOG_KEY")
+        if env_key:
+            return base64.urlsafe_b64decode(env_key)
+        if os.path.exists(self.key_path):
+            with open(self.key_path, "rb") as f:
+                return base64.urlsafe_b64decode(f.read())
+        legacy_path = os.path.join(self.root, "log.key")
+        if os.path.exists(legacy_path):
+            # Earlier versions kept the key beside the ciphertext; keep reading it
+            logger.warning(
+                f"Conversation log key found in {self.root}; move it to {self.key_path} "
+                f"or set SWARM_SHIELD_LOG_KEY"
+            )
+            with open(legacy_path, "rb") as f:
+                return base64.urlsafe_b64decode(f.read())
+        key = AESGCM.generate_key(bit_length=256)
+        os.makedirs(os.path.dirname(os.path.abspath(self.key_path)), mode=0o700, exist_ok=True)
+        fd = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(base64.urlsafe_b64encode(key))
+        logger.info(f"Generated conversation log key at {self.key_path}")
+        return key
+
+    def _open(self, conversation_id: str) -> ConversationLog:
+        log = ConversationLog(
+            os.path.join(self.root, conversation_id), conversation_id, self.cipher, self.segment_bytes,
+            on_append=self._track_append,
+        )
+        with self._agents_lock:
+            for name, agent in log.stats["agents"].items():
+                self._merge_agent(name, agent["messages"], agent["chars"],
+                                  agent["first_message"], agent["last_message"], 1)
+        return log
+
+    def _merge_agent(self, name: str, messages: int, chars: int, first: str, last: str, conversations: int) -> None:
+        total = self._agents.get(name)
+        if total is None:
+            self._agents[name] = {"messages": messages, "chars": chars, "conversations": conversations,
+                                  "first_message": first, "last_message": last}
+            return
+        total["messages"] += messages
+        total["chars"] += chars
+        total["conversations"] += conversations
+        total["first_message"] = min(total["first_message"], first)
+        total["last_message"] = max(total["last_message"], last)
+
+    def _track_append(self, record: Dict[str, Any], new_agent: bool) -> None:
+        timestamp = record["timestamp"]
+        with self._agents_lock:
+            self._merge_agent(record["agent"], 1, len(record["message"]), timestamp, timestamp, int(new_agent))
+
+    @property
+    def encrypted(self) -> bool:
+        return self.cipher.enabled
+
+    def create(self, name: str = "") -> str:
+        conversation_id = str(uuid.uuid4())
+        path = os.path.join(self.root, conversation_id)
+        os.makedirs(path)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"id": conversation_id, "name": name, "created_at": _now()}, f)
+        with self._lock:
+            self.conversations[conversation_id] = self._open(conversation_id)
+        return conversation_id
+
+    def get(self, conversation_id: str) -> ConversationLog:
+        log = self.conversations.get(conversation_id)
+        if log is None:
+            raise KeyError(f"Invalid conversation ID: {conversation_id}")
+        return log
+
+    def agent_stats(self, agent_name: str) -> Optional[Dict[str, Any]]:
+        """Totals for one agent across conversations, from the store-level aggregate"""
+        with self._agents_lock:
+            agent = self._agents.get(agent_name)
+            if agent is None or not agent["messages"]:
+                return None
+            return {
+                "total_messages": agent["messages"],
+                "conversations": agent["conversations"],
+                "first_message": agent["first_message"],
+                "last_message": agent["last_message"],
+                "avg_message_length": agent["chars"] / agent["messages"],
+            }
+
+    def export_lines(self, conversation_id: str, format: str = "jsonl") -> Iterator[str]:
+        """Stream a conversation as JSONL, a JSON document or text, one message at a time"""
+        log = self.get(conversation_id)
+        if format == "jsonl":
+            for record in log.read():
+                yield json.dumps(record) + "\n"
+        elif format == "json":
+            header = {"conversation_id": conversation_id, "exported_at": _now()}
+            yield json.dumps(header)[:-1] + ', "messages": ['
+            for i, record in enumerate(log.read()):
+                yield ("," if i else "") + "\n  " + json.dumps(record)
+            yield "\n]}\n"
+        elif format == "text":
+            for record in log.read():
+                yield f"[{record['timestamp']}] {record['agent']}: {record['message']}\n"
+        else:
+            raise ValueError(f"Unsupported export format: {format}")
+
+    def close(self) -> None:
+        for log in list(self.conversations.values()):
+            with log.lock:
+                if log._unflushed:
+                    log.flush()
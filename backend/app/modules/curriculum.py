@@ -1,14 +1,28 @@
 import re
+import os
+import asyncio
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 class CurriculumGenerator:
     """Generates personalized learning paths and content"""
     
-    def __init__(self, hdam_system, researcher, rl_trainer):
+    def __init__(self, hdam_system, researcher, rl_trainer, max_workers: int = None):
         self.hdam = hdam_system
         self.researcher = researcher
         self.rl_trainer = rl_trainer
         self.user_profiles = {}
+        # Shared pool so module generation for all skills runs concurrently
+        self.max_workers = max_workers or int(os.getenv("CURRICULUM_MAX_WORKERS", "8"))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # HDAM memory is not thread-safe; research fetches overlap, HDAM updates serialize
+        self._hdam_lock = threading.Lock()
+        # Async HDAM calls run on one long-lived event loop thread, started on first use
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
         
     def create_learning_path(self, user_id: str, target_skills: list) -> dict:
         """Generate a complete learning path for target skills"""
@@ -28,9 +42,13 @@ class CurriculumGenerator:
             'generated_at': datetime.now().isoformat()
         }
         
+        # Generate all modules concurrently; map() keeps the skill order
+        modules = list(self.executor.map(
+            lambda skill: self._generate_module(skill, user_id), target_skills
+        ))
+        
         total_duration = 0
-        for skill in target_skills:
-            module = self._generate_module(skill, user_id)
+        for module in modules:
             learning_path['modules'].append(module)
             total_duration += module['estimated_time']
             
@@ -49,18 +67,20 @@ class CurriculumGenerator:
         ds_list = datasets.get(skill, [])
         knowledge_facts.extend([f"Dataset available: {ds}" for ds in ds_list[:2]])
         
-        # Teach HDAM about this skill
-        self.hdam.learn(knowledge_facts, verbose=False)
-        
-        # Generate lesson structure using HDAM reasoning
-        lesson_plan_query = f"How to teach {skill} effectively to beginners?"
-        lesson_plan_result = self.hdam.reason(lesson_plan_query, steps=100)
+        with self._hdam_lock:
+            # Teach HDAM about this skill
+            self._call_hdam(self.hdam.learn, knowledge_facts, verbose=False)
+            
+            # Generate lesson structure using HDAM reasoning
+            lesson_plan_query = f"How to teach {skill} effectively to beginners?"
+            lesson_plan_result = self._call_hdam(self.hdam.reason, lesson_plan_query)
+            quizzes = self._generate_quizzes(skill)
         
         module = {
             'skill': skill,
             'description': lesson_plan_result['result'][:200],
             'lessons': self._create_lessons(skill, papers),
-            'quizzes': self._generate_quizzes(skill),
+            'quizzes': quizzes,
             'projects': self._suggest_projects(skill, datasets),
             'resources': [{'title': p['title'], 'url': p['url']} for p in papers],
             'estimated_time': len(papers) * 45 + 60,  # Minutes
@@ -69,6 +89,38 @@ class CurriculumGenerator:
         
         return module
     
+    def _call_hdam(self, method, *args, **kwargs):
+        """Call an HDAM method, driving it to completion on the HDAM loop if it is async"""
+        result = method(*args, **kwargs)
+        if not inspect.isawaitable(result):
+            return result
+        
+        async def _await():
+            return await result
+        
+        return asyncio.run_coroutine_threadsafe(_await(), self._hdam_loop()).result()
+    
+    def _hdam_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="curriculum-hdam", daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+    
+    def close(self) -> None:
+        """Shut down the module pool and the HDAM event loop thread"""
+        self.executor.shutdown(wait=True)
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+    
     def _create_lessons(self, skill: str, papers: list) -> list:
         """Create structured lessons from research papers"""
         lessons = []
@@ -90,7 +142,7 @@ class CurriculumGenerator:
         
         for i, qtype in enumerate(question_types):
             query = f"Generate a {qtype} question about {skill}"
-            result = self.hdam.reason(query, steps=50)
+            result = self._call_hdam(self.hdam.reason, query)
             
             quiz_questions.append({
                 'id': f"{skill}_quiz_{i+1}",
@@ -8,6 +8,8 @@ import logging
 from typing import Optional, Dict, Any, List
 from pathlib import Path
 
+from app.core.integration_registry import integration_registry
+
 logger = logging.getLogger(__name__)
 
 # Try to import doc-master
@@ -102,6 +104,6 @@ class DocMasterIntegration:
 
 def get_doc_master_integration(config: Optional[Dict] = None) -> DocMasterIntegration:
     """Get or create doc-master integration instance"""
-    return DocMasterIntegration(config)
+    return integration_registry.get("doc_master", DocMasterIntegration, config)
 
 
@@ -0,0 +1,482 @@
+"""
+Document Text Extraction Service
+Extracts PDF and DOCX text in a shared process pool: PDFs are split into
+page ranges that run in parallel and stream back in page order. Extracted
+text is cached on disk by file content hash, so a file uploaded many times
+is extracted once. Each file gets a wall-clock budget and each worker an
+address-space cap; files that exceed them raise ExtractionLimitError.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import tempfile
+import threading
+import weakref
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import PyPDF2
+import docx
+
+from app.core.integration_registry import integration_registry
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction output changes so stale cache entries are ignored
+EXTRACTOR_VERSION = 1
+# Extra time a task may overrun its file budget before the pool is torn down
+HARD_KILL_GRACE_SECONDS = 5.0
+
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+class ExtractionLimitError(Exception):
+    """A file exceeded its extraction time or memory limit"""
+
+
+class _DeadlineExceeded(Exception):
+    """Raised inside a worker that notices its file's deadline has passed"""
+
+
+def extraction_workers() -> int:
+    return int(os.getenv("INGEST_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+def _limit_worker_memory(max_bytes: int) -> None:
+    """Pool initializer: cap the worker's address space"""
+    if RESOURCE_AVAILABLE and max_bytes > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+
+
+def get_extraction_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared extraction process pool (None when INGEST_EXTRACT_WORKERS=0)"""
+    global _extraction_pool
+    workers = extraction_workers()
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _extraction_pool is None:
+            max_bytes = int(os.getenv("INGEST_EXTRACT_MAX_MEMORY_MB", "2048")) * 1024 * 1024
+            # spawn: the API process holds threads (encoder, executors) that fork would copy
+            _extraction_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_limit_worker_memory,
+                initargs=(max_bytes,),
+            )
+        return _extraction_pool
+
+
+def reset_extraction_pool(pool: Optional[ProcessPoolExecutor] = None, terminate: bool = False) -> None:
+    """
+    Drop the shared pool (only if it is still `pool`, when given) so the next
+    call starts a fresh one. terminate kills workers stuck on a runaway task.
+    """
+    global _extraction_pool
+    with _pool_lock:
+        if _extraction_pool is None or (pool is not None and _extraction_pool is not pool):
+            return
+        pool, _extraction_pool = _extraction_pool, None
+    if terminate:
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------------------------------------------------------------
+# Extraction workers (run in the process pool)
+# ---------------------------------------------------------------------
+# Open readers kept per worker; each holds its file's bytes in memory
+READERS_PER_WORKER = 4
+
+_worker_state = threading.local()
+
+
+def _pdf_reader(path: str) -> PyPDF2.PdfReader:
+    """
+    Reader for path, reused across page-range tasks of the same file on this
+    worker (re-parsing the xref and page tree per range costs ~30%).
+    """
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    readers = getattr(_worker_state, "readers", None)
+    if readers is None:
+        readers = _worker_state.readers = OrderedDict()
+    reader = readers.pop(key, None) or PyPDF2.PdfReader(path)
+    readers[key] = reader
+    while len(readers) > READERS_PER_WORKER:
+        readers.popitem(last=False)
+    return reader
+
+
+def _pdf_page_count(path: str) -> int:
+    return len(_pdf_reader(path).pages)
+
+
+def _extract_pdf_pages(path: str, start: int, end: int, deadline: Optional[float] = None) -> List[str]:
+    reader = _pdf_reader(path)
+    pages = []
+    for i in range(start, end):
+        if deadline is not None and time.time() > deadline:
+            raise _DeadlineExceeded(f"exceeded its time limit at page {i + 1}")
+        pages.append(reader.pages[i].extract_text() or "")
+    return pages
+
+
+def _extract_docx_paragraphs(path: str) -> List[str]:
+    return [paragraph.text for paragraph in docx.Document(path).paragraphs]
+
+
+def file_digest(path: str, chunk_bytes: int = 1 << 20) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_bytes), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ---------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------
+class ExtractionCache:
+    """
+    Extracted segments by content hash, one JSONL file per document
+    ([text, page] per line). Entries are written to a temp file and renamed
+    when extraction completes; least recently used entries are evicted once
+    the cache exceeds max_bytes.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = path or os.getenv("INGEST_EXTRACT_CACHE_DIR", "./cache/extraction")
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.getenv("INGEST_EXTRACT_CACHE_MB", "2048")) * 1024 * 1024
+        os.makedirs(self.path, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, digest: str, kind: str) -> str:
+        return os.path.join(self.path, f"{digest}.{kind}.v{EXTRACTOR_VERSION}.jsonl")
+
+    def get(self, digest: str, kind: str, count_miss: bool = True) -> Optional[Iterator[Tuple[str, Optional[int]]]]:
+        path = self._entry(digest, kind)
+        try:
+            f = open(path, encoding="utf-8")
+        except FileNotFoundError:
+            self.misses += count_miss
+            return None
+        self.hits += 1
+        os.utime(path)
+
+        def segments():
+            with f:
+                for line in f:
+                    text, page = json.loads(line)
+                    yield text, page
+
+        return segments()
+
+    def writer(self, digest: str, kind: str) -> "_CacheWriter":
+        return _CacheWriter(self, self._entry(digest, kind))
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".jsonl"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "hits": self.hits, "misses": self.misses}
+
+
+class _CacheWriter:
+    def __init__(self, cache: ExtractionCache, path: str):
+        self.cache = cache
+        self.path = path
+        self.tmp = tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=cache.path, suffix=".tmp", delete=False
+        )
+
+    def write(self, text: str, page: Optional[int]) -> None:
+        self.tmp.write(json.dumps([text, page]) + "\n")
+
+    def commit(self) -> None:
+        self.tmp.close()
+        os.replace(self.tmp.name, self.path)
+        self.cache._evict()
+
+    def abort(self) -> None:
+        self.tmp.close()
+        os.unlink(self.tmp.name)
+
+
+# ---------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------
+class ExtractionService:
+    """Parallel, cached, time-boxed PDF/DOCX text extraction"""
+
+    def __init__(
+        self,
+        cache: Optional[ExtractionCache] = None,
+        pages_per_task: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        max_files: Optional[int] = None,
+    ):
+        self.cache = cache if cache is not None else ExtractionCache()
+        self.pages_per_task = pages_per_task or int(os.getenv("INGEST_PDF_PAGES_PER_TASK", "16"))
+        self.max_seconds = max_seconds if max_seconds is not None else float(
+            os.getenv("INGEST_EXTRACT_MAX_SECONDS", "300"))
+        # Files extracting at once; more would interleave page ranges from too
+        # many files on each worker and evict its cached readers
+        self.max_files = max_files or int(os.getenv("INGEST_EXTRACT_MAX_FILES", str(READERS_PER_WORKER)))
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self.limit_errors = 0
+
+    @staticmethod
+    def kind(extension: str) -> Optional[str]:
+        if extension == ".pdf":
+            return "pdf"
+        # Legacy binary .doc is not OOXML; python-docx cannot open it
+        if extension == ".docx":
+            return "docx"
+        return None
+
+    def _file_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.max_files)
+        return slots
+
+    def _deadline(self, spent: float = 0.0) -> Optional[float]:
+        """Wall-clock deadline for work started now, given `spent` seconds of the file's budget used"""
+        return time.time() + self.max_seconds - spent if self.max_seconds > 0 else None
+
+    def _limit_error(self, filename: str, reason: str) -> ExtractionLimitError:
+        self.limit_errors += 1
+        logger.warning(f"Extraction of {filename} stopped: {reason}")
+        return ExtractionLimitError(f"{filename}: {reason}")
+
+    async def _run(self, fn, *args, deadline: Optional[float] = None, filename: str = ""):
+        """Run fn in the pool, retrying once on a pool broken by another file's kill"""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool = get_extraction_pool()
+            future = loop.run_in_executor(pool, fn, *args)
+            timeout = None if deadline is None else max(0.0, deadline - time.time()) + HARD_KILL_GRACE_SECONDS
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except _DeadlineExceeded as e:
+                raise self._limit_error(filename, str(e))
+            except asyncio.TimeoutError:
+                if pool is not None:
+                    reset_extraction_pool(pool, terminate=True)
+                raise self._limit_error(filename, f"exceeded {self.max_seconds:.0f}s")
+            except MemoryError:
+                raise self._limit_error(filename, "exceeded the worker memory limit")
+            except BrokenProcessPool:
+                reset_extraction_pool(pool)
+                if attempt:
+                    raise self._limit_error(filename, "extraction worker crashed")
+
+    async def _pdf_segments(self, path: str, filename: str, metrics) -> AsyncIterator[Tuple[str, Optional[int]]]:
+        # The budget covers time spent waiting on extraction, not time the
+        # consumer (chunking, embedding) takes between pages
+        spent = 0.0
+        t0 = time.perf_counter()
+        n_pages = await self._run(_pdf_page_count, path, deadline=self._deadline(), filename=filename)
+        spent += time.perf_counter() - t0
+        ranges = iter([(s, min(s + self.pages_per_task, n_pages)) for s in range(0, n_pages, self.pages_per_task)])
+        max_in_flight = max(1, extraction_workers()) * 2
+
+        def submit(start, end):
+            deadline = self._deadline(spent)
+            return start, asyncio.ensure_future(
+                self._run(_extract_pdf_pages, path, start, end, deadline, deadline=deadline, filename=filename)
+            )
+
+        # Keep a bounded window of page ranges in flight and yield them in order
+        pending = deque()
+        try:
+            for start, end in ranges:
+                pending.append(submit(start, end))
+                if len(pending) >= max_in_flight:
+                    break
+            while pending:
+                start, future = pending.popleft()
+                t0 = time.perf_counter()
+                pages = await future
+                spent += time.perf_counter() - t0
+                if metrics is not None:
+                    metrics.add("extract", time.perf_counter() - t0, pages=len(pages))
+                next_range = next(ranges, None)
+                if next_range is not None:
+                    pending.append(submit(*next_range))
+                for offset, text in enumerate(pages):
+                    yield text + "\n", start + offset + 1
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    async def _docx_segments(self, path: str, filename: str, metrics) -> AsyncIterator[Tuple[str, Optional[int]]]:
+        t0 = time.perf_counter()
+        paragraphs = await self._run(_extract_docx_paragraphs, path, deadline=self._deadline(), filename=filename)
+        if metrics is not None:
+            metrics.add("extract", time.perf_counter() - t0, paragraphs=len(paragraphs))
+        for paragraph in paragraphs:
+            yield paragraph + "\n", None
+
+    async def segments(
+        self,
+        path: str,
+        filename: str,
+        digest: Optional[str] = None,
+        metrics=None,
+    ) -> AsyncIterator[Tuple[str, Optional[int]]]:
+        """
+        Yield (text, page) segments of a PDF or DOCX in document order, from
+        the cache when this content has been extracted before. metrics is an
+        optional ingestion StageMetrics.
+        """
+        kind = self.kind(os.path.splitext(filename)[1].lower())
+        if kind is None:
+            raise ValueError(f"Unsupported document type: {filename}")
+        digest = digest or file_digest(path)
+
+        cached = self.cache.get(digest, kind)
+        if cached is None:
+            async with self._file_slots():
+                # An identical upload may have finished while this one waited
+                cached = self.cache.get(digest, kind, count_miss=False)
+                if cached is None:
+                    source = (self._pdf_segments(path, filename, metrics) if kind == "pdf"
+                              else self._docx_segments(path, filename, metrics))
+                    writer = self.cache.writer(digest, kind)
+                    try:
+                        async for text, page in source:
+                            writer.write(text, page)
+                            yield text, page
+                    except BaseException:
+                        writer.abort()
+                        raise
+                    writer.commit()
+                    return
+
+        t0 = time.perf_counter()
+        count = 0
+        for segment in cached:
+            count += 1
+            yield segment
+        if metrics is not None:
+            metrics.add("extract", time.perf_counter() - t0, cache_hits=1, segments=count)
+
+    async def extract_text(self, path: str, filename: str, digest: Optional[str] = None) -> str:
+        return "".join([text async for text, _ in self.segments(path, filename, digest)])
+
+    def extract_bytes(self, content: bytes, extension: str) -> str:
+        """
+        Blocking variant for callers holding the whole file in memory: page
+        ranges are still extracted in parallel and the result is cached.
+        """
+        kind = self.kind(extension)
+        if kind is None:
+            raise ValueError(f"Unsupported document type: {extension}")
+        digest = hashlib.md5(content).hexdigest()
+        cached = self.cache.get(digest, kind)
+        if cached is not None:
+            return "".join(text for text, _ in cached)
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as tmp:
+            tmp.write(content)
+        writer = self.cache.writer(digest, kind)
+        try:
+            deadline = self._deadline()
+            pool = get_extraction_pool()
+            if kind == "docx":
+                segments = [(p + "\n", None) for p in self._call(pool, deadline, _extract_docx_paragraphs, tmp.name)]
+            else:
+                n_pages = self._call(pool, deadline, _pdf_page_count, tmp.name)
+                starts = range(0, n_pages, self.pages_per_task)
+                if pool is None:
+                    chunks = [_extract_pdf_pages(tmp.name, s, min(s + self.pages_per_task, n_pages), deadline)
+                              for s in starts]
+                else:
+                    futures = [pool.submit(_extract_pdf_pages, tmp.name, s, min(s + self.pages_per_task, n_pages),
+                                           deadline) for s in starts]
+                    chunks = [self._result(pool, deadline, future) for future in futures]
+                segments = [(text + "\n", start + offset + 1)
+                            for start, chunk in zip(starts, chunks) for offset, text in enumerate(chunk)]
+            for text, page in segments:
+                writer.write(text, page)
+        except BaseException:
+            writer.abort()
+            raise
+        finally:
+            os.unlink(tmp.name)
+        writer.commit()
+        return "".join(text for text, _ in segments)
+
+    def _call(self, pool, deadline, fn, *args):
+        if pool is None:
+            return fn(*args)
+        return self._result(pool, deadline, pool.submit(fn, *args))
+
+    def _result(self, pool, deadline, future):
+        timeout = None if deadline is None else max(0.0, deadline - time.time()) + HARD_KILL_GRACE_SECONDS
+        try:
+            return future.result(timeout)
+        except _DeadlineExceeded as e:
+            raise self._limit_error("upload", str(e))
+        except FutureTimeoutError:
+            reset_extraction_pool(pool, terminate=True)
+            raise self._limit_error("upload", f"exceeded {self.max_seconds:.0f}s")
+        except MemoryError:
+            raise self._limit_error("upload", "exceeded the worker memory limit")
+        except BrokenProcessPool:
+            reset_extraction_pool(pool)
+            raise self._limit_error("upload", "extraction worker crashed")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": extraction_workers(),
+            "pages_per_task": self.pages_per_task,
+            "max_seconds": self.max_seconds,
+            "max_files": self.max_files,
+            "limit_errors": self.limit_errors,
+            "cache": self.cache.stats(),
+        }
+
+
+def get_extraction_service() -> ExtractionService:
+    """Shared extraction service (and cache) for all ingestion pipelines"""
+    return integration_registry.get(
+        "extraction_service",
+        ExtractionService,
+        env_keys=["INGEST_EXTRACT_CACHE_DIR", "INGEST_EXTRACT_CACHE_MB", "INGEST_PDF_PAGES_PER_TASK",
+                  "INGEST_EXTRACT_MAX_SECONDS", "INGEST_EXTRACT_MAX_FILES"],
+    )
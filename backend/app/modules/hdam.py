@@ -1,17 +1,36 @@
 import asyncio
+import base64
+import bisect
 import hashlib
+import inspect
+import io
 import os
+import queue
+import time
 import warnings
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List, Optional, Tuple, Union
 from functools import lru_cache
 import math
+import threading
 import numpy as np
-import torch
-import torch.nn.functional as F
-from sentence_transformers import SentenceTransformer
 from supabase import Client, create_client
+from postgrest.types import ReturnMethod
+
+from app.core.integration_registry import integration_registry
+
+# Torch is only needed for the default encoder backend; ONNX-only nodes can omit it
+try:
+    import torch
+    import torch.nn.functional as F
+    from sentence_transformers import SentenceTransformer
+    TORCH_AVAILABLE = True
+except ImportError:
+    torch = None
+    SentenceTransformer = None
+    TORCH_AVAILABLE = False
 
 # Optional quantum / optimization libs
 try:
@@ -31,13 +50,31 @@ except ImportError:
 # ---------------------------------------------------------------------
 # Global numeric configuration (15+ decimal precision)
 # ---------------------------------------------------------------------
-TORCH_FLOAT = torch.float64          # ~15 decimal digits
-TORCH_COMPLEX = torch.complex128     # PyTorch complex type
+TORCH_FLOAT = torch.float64 if TORCH_AVAILABLE else None          # ~15 decimal digits
+TORCH_COMPLEX = torch.complex128 if TORCH_AVAILABLE else None     # PyTorch complex type
 NP_FLOAT = np.float64                # ~15 decimal digits
 NP_COMPLEX = np.complex128           # NumPy complex type (for numpy operations)
 SIMILARITY_DECIMALS = 15             # for display / formatting
 PRECISION_THRESHOLD = 1e-15          # Minimum distinguishable difference
 
+# Storage precision modes: (item vector storage, compute, memory trace) dtypes.
+# float32/float16 trade the 15-digit default for 2-4x less memory per fact.
+PRECISION_MODES = {
+    "float64": (np.float64, np.float64, np.complex128),
+    "float32": (np.float32, np.float32, np.complex64),
+    "float16": (np.float16, np.float32, np.complex64),
+}
+
+# Stored vectors live in arena pages that double from ARENA_FIRST_PAGE_ROWS up
+# to INDEX_SLAB_ROWS rows; scoring upcasts at most one page at a time, so no
+# full-size compute copy is made
+ARENA_FIRST_PAGE_ROWS = 64
+INDEX_SLAB_ROWS = 8192
+
+# search_contexts scores a page run by run when its same-context runs average
+# at least this many rows, else pairs every row with its context's vector
+SEARCH_RUN_ROWS = 64
+
 # ---------------------------------------------------------------------
 # Advanced Quantum Holographic Processor
 # ---------------------------------------------------------------------
@@ -109,6 +146,19 @@ class QuantumHolographicProcessor:
         bound_freq = key_freq * np.conj(value_freq)
         return bound_freq
     
+    def holographic_binding_batch(self, keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """
+        Bind a whole chunk of key/value rows with one 2-D FFT call.
+        Row i of the result equals holographic_binding(keys[i], values[i]).
+        """
+        padded_length = 2**math.ceil(math.log2(keys.shape[1]))
+        key_freq = np.fft.fft(keys, n=padded_length, axis=1)[:, :self.dimensions]
+        if values is keys:
+            value_freq = key_freq
+        else:
+            value_freq = np.fft.fft(values, n=padded_length, axis=1)[:, :self.dimensions]
+        return key_freq * np.conj(value_freq)
+    
     def holographic_unbinding(self, memory_trace: np.ndarray, query: np.ndarray) -> np.ndarray:
         """
         Perform holographic unbinding to retrieve associated value from memory trace.
@@ -201,36 +251,23 @@ class QuantumHolographicProcessor:
             return list(range(n))
         
         # Simple greedy approach with diversity consideration
-        selected = []
-        remaining = list(range(n))
+        similarities = np.asarray(similarities, dtype=NP_FLOAT)
+        available = np.ones(n, dtype=bool)
         
         # First select the highest similarity item
-        first = np.argmax(similarities)
-        selected.append(first)
-        remaining.remove(first)
+        selected = [int(np.argmax(similarities))]
+        available[selected[0]] = False
+        selected_sum = similarities[selected[0]]
         
         # Iteratively select items that maximize similarity while minimizing redundancy
         for _ in range(min(k - 1, n - 1)):
-            best_score = -np.inf
-            best_idx = -1
-            
-            for idx in remaining:
-                # Calculate score as similarity minus average similarity to already selected items
-                sim_to_selected = np.mean([similarities[idx] * similarities[s] for s in selected])
-                score = similarities[idx] - 0.3 * sim_to_selected  # Diversity weight
-                
-                if score > best_score:
-                    best_score = score
-                    best_idx = idx
-            
-            if best_idx != -1:
-                selected.append(best_idx)
-                remaining.remove(best_idx)
-            else:
-                # If no good candidate, just pick the next best
-                next_best = max(remaining, key=lambda i: similarities[i])
-                selected.append(next_best)
-                remaining.remove(next_best)
+            # Similarity minus average similarity to already selected items:
+            # s_i - 0.3 * mean_j(s_i * s_j) = s_i * (1 - 0.3 * mean_j(s_j)), for all i at once
+            scores = np.where(available, similarities * (1 - 0.3 * selected_sum / len(selected)), -np.inf)
+            best_idx = int(np.argmax(scores))
+            selected.append(best_idx)
+            available[best_idx] = False
+            selected_sum += similarities[best_idx]
         
         return selected
     
@@ -239,6 +276,10 @@ class QuantumHolographicProcessor:
         Compute multidimensional correlation with quantum-enhanced precision.
         This measures the degree of association between two high-dimensional vectors.
         """
+        # float16 storage is computed in float32; float32/float64 are left as-is
+        vec1 = np.asarray(vec1, dtype=np.result_type(vec1, np.float32))
+        vec2 = np.asarray(vec2, dtype=np.result_type(vec2, np.float32))
+        
         # Normalize vectors to unit length
         norm1 = np.linalg.norm(vec1)
         norm2 = np.linalg.norm(vec2)
@@ -285,10 +326,20 @@ class AdvancedHolographicMemory:
     and quantum-enhanced operations for exponential learning acceleration.
     """
     
-    def __init__(self, dimensions: int, enable_quantum: bool = False):
+    def __init__(self, dimensions: int, enable_quantum: bool = False,
+                 precision: str = "float64", max_items_per_context: int = 0,
+                 max_bytes_per_context: int = 0, ttl_seconds: float = 0.0):
         self.dimensions = dimensions
         self.processor = QuantumHolographicProcessor(dimensions, enable_quantum)
         
+        if precision not in PRECISION_MODES:
+            raise ValueError(f"Unknown precision mode '{precision}', expected one of {list(PRECISION_MODES)}")
+        self.precision = precision
+        self.storage_dtype, self.compute_dtype, self.trace_dtype = PRECISION_MODES[precision]
+        
+        # Bytes held by stored item vectors (kept incrementally for metrics)
+        self.vector_bytes = 0
+        
         # Memory traces organized by domain/context
         self.memory_traces: Dict[str, np.ndarray] = {}
         
@@ -300,31 +351,85 @@ class AdvancedHolographicMemory:
         
         # Learning acceleration cache
         self.acceleration_cache: Dict[str, Dict[str, Any]] = {}
+        
+        # Vector arena: every stored value is a row of one of these pages (item
+        # values are views into them), and scoring reads the pages in place.
+        # Per row: the item id (None once removed), its context slot (-1 once
+        # removed) and the cached 1/||value|| (0 for zero vectors and dead rows)
+        self._pages: List[np.ndarray] = []
+        self._page_starts: List[int] = []
+        self._rows = 0
+        self._dead_rows = 0
+        self._row_ids: List[Optional[str]] = []
+        self._row_owner = np.empty(0, dtype=np.int32)
+        self._inv_norm = np.empty(0, dtype=self.compute_dtype)
+        self._context_slots: Dict[str, int] = {}
+        
+        # Sorted arena rows per context; rows added since the last read are
+        # queued and appended on the next one
+        self._context_rows: Dict[str, np.ndarray] = {}
+        self._rows_pending: Dict[str, List[int]] = {}
+        
+        # Per-context budgets (0 = unlimited): items beyond them are evicted least
+        # recently used first; items idle longer than ttl_seconds expire
+        self.max_items_per_context = max_items_per_context
+        self.max_bytes_per_context = max_bytes_per_context
+        self.ttl_seconds = ttl_seconds
+        self.context_bytes: Dict[str, int] = {}
+        self.removal_counts = {"removed": 0, "expired": 0, "evicted": 0}
+        self.compactions = 0
+        
+        # Owners of per-item side tables (e.g. HDAM.local_memory) follow removals
+        # and compaction through these hooks
+        self.on_remove: Optional[Callable[[List[str]], None]] = None
+        self.on_relocate: Optional[Callable[[List[str]], None]] = None
     
     def add_item(self, key: np.ndarray, value: np.ndarray, 
-                 context: str = "general", metadata: Optional[Dict] = None) -> str:
+                 context: str = "general", metadata: Optional[Dict] = None,
+                 item_id: Optional[str] = None) -> str:
         """
         Add an item to holographic memory with context-aware organization.
+        Without an explicit item_id, the id is derived from the vectors.
         """
         # Generate unique ID
-        item_id = hashlib.sha256((str(key.tolist()) + str(value.tolist()) + context).encode()).hexdigest()[:16]
+        if item_id is None:
+            item_id = hashlib.sha256((str(key.tolist()) + str(value.tolist()) + context).encode()).hexdigest()[:16]
         
         # Perform holographic binding
         bound_freq = self.processor.holographic_binding(key, value)
         
         # Add to appropriate memory trace
         if context not in self.memory_traces:
-            self.memory_traces[context] = np.zeros(self.dimensions, dtype=np.complex128)
-        
-        self.memory_traces[context] += bound_freq
-        
-        # Store item details
+            self.memory_traces[context] = np.zeros(self.dimensions, dtype=self.trace_dtype)
+        
+        self.memory_traces[context] += bound_freq.astype(self.trace_dtype, copy=False)
+        
+        now = time.time()
+        existing = self.items.get(item_id)
+        if existing is not None:
+            # Re-learning reinforces the trace; the stored vectors are unchanged
+            existing["bindings"] += 1
+            existing["last_access"] = now
+            return item_id
+        
+        # Store item details; the value lives in the arena and auto-associative
+        # items (key is value) share it
+        rows, views = self._store_rows([item_id], np.atleast_2d(value), context)
+        stored_value = views[0]
+        stored_key = stored_value if value is key else key.astype(self.storage_dtype, copy=True)
         self.items[item_id] = {
-            "key": key.copy(),
-            "value": value.copy(),
+            "key": stored_key,
+            "value": stored_value,
             "context": context,
-            "metadata": metadata or {}
+            "metadata": metadata or {},
+            "bindings": 1,
+            "added_at": now,
+            "last_access": now,
+            "row": int(rows[0])
         }
+        nbytes = self._item_vector_bytes(self.items[item_id])
+        self.vector_bytes += nbytes
+        self.context_bytes[context] = self.context_bytes.get(context, 0) + nbytes
         
         # Update context associations
         if context not in self.context_associations:
@@ -333,51 +438,163 @@ class AdvancedHolographicMemory:
         
         return item_id
     
-    def retrieve(self, query: np.ndarray, context: str = "general", 
-                 top_k: int = 5, quantum_assisted: bool = False) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _item_vector_bytes(item: Dict[str, Any]) -> int:
+        """Bytes used by an item's key/value vectors, counting shared vectors once."""
+        nbytes = item["key"].nbytes
+        if item["value"] is not item["key"]:
+            nbytes += item["value"].nbytes
+        return nbytes
+    
+    def add_items_batch(self, item_ids: List[str], vectors: np.ndarray,
+                        context: str = "general",
+                        metadata: Optional[List[Dict]] = None) -> List[np.ndarray]:
         """
-        Retrieve items associated with a query using holographic unbinding.
+        Add a chunk of self-associative items (key == value) in one pass.
+        The chunk is bound with a single 2-D FFT and summed into the trace with
+        one reduction, and the new rows are copied into the arena together.
+        Returns each item's stored vector, in item_ids order.
         """
-        if context not in self.memory_traces:
+        if len(item_ids) == 0:
             return []
         
-        # Perform holographic unbinding
-        retrieved_value = self.processor.holographic_unbinding(
-            self.memory_traces[context], query
-        )
-        
-        # Find closest matches in stored items
-        similarities = []
-        item_ids = []
+        # An id moving to another context leaves its old trace first
+        moved = [item_id for item_id in item_ids if item_id in self.items and self.items[item_id]["context"] != context]
+        if moved:
+            self.remove_items(moved)
         
-        # Only consider items in the same context for efficiency
-        relevant_items = self.context_associations.get(context, [])
+        bound_freq = self.processor.holographic_binding_batch(vectors, vectors)
         
-        for item_id in relevant_items:
-            if item_id in self.items:
-                item = self.items[item_id]
-                # Compute similarity between retrieved value and stored value
-                similarity = self.processor.multidimensional_correlation(
-                    retrieved_value, item["value"]
-                )
-                similarities.append(similarity)
-                item_ids.append(item_id)
+        if context not in self.memory_traces:
+            self.memory_traces[context] = np.zeros(self.dimensions, dtype=self.trace_dtype)
+        self.memory_traces[context] += bound_freq.sum(axis=0).astype(self.trace_dtype, copy=False)
+        
+        # First occurrences of unknown ids get arena rows; known ids (and
+        # repeats within the chunk) only count another binding
+        now = time.time()
+        positions: Dict[str, int] = {}
+        repeats: List[str] = []
+        for i, item_id in enumerate(item_ids):
+            if item_id in self.items or item_id in positions:
+                repeats.append(item_id)
+            else:
+                positions[item_id] = i
+        
+        if positions:
+            new_ids = list(positions)
+            rows, views = self._store_rows(new_ids, vectors[list(positions.values())], context)
+            for item_id, row, view in zip(new_ids, rows, views):
+                self.items[item_id] = {
+                    "key": view,
+                    "value": view,
+                    "context": context,
+                    "metadata": metadata[positions[item_id]] if metadata else {},
+                    "bindings": 1,
+                    "added_at": now,
+                    "last_access": now,
+                    "row": int(row)
+                }
+            self.context_associations.setdefault(context, []).extend(new_ids)
+            added_bytes = len(new_ids) * views[0].nbytes
+            self.vector_bytes += added_bytes
+            self.context_bytes[context] = self.context_bytes.get(context, 0) + added_bytes
         
-        if not similarities:
+        for item_id in repeats:
+            item = self.items[item_id]
+            item["bindings"] += 1
+            item["last_access"] = now
+        return [self.items[item_id]["value"] for item_id in item_ids]
+    
+    def _store_rows(self, item_ids: List[str], vectors: np.ndarray,
+                    context: str) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """Copy vectors into new arena rows owned by context"""
+        slot = self._context_slots.setdefault(context, len(self._context_slots))
+        rows, views = self._write_rows(item_ids, vectors, slot)
+        self._rows_pending.setdefault(context, []).extend(rows.tolist())
+        return rows, views
+    
+    def _write_rows(self, item_ids: List[str], vectors: np.ndarray, owner: Any,
+                    inv_norm: Optional[np.ndarray] = None) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+        Append rows to the arena, adding pages as needed. Returns the row
+        numbers and a view of each stored row. Inverse norms are computed
+        from the stored (storage dtype) values unless given.
+        """
+        count = len(item_ids)
+        first = self._rows
+        self._reserve(first + count)
+        views: List[np.ndarray] = []
+        page_index = bisect.bisect_right(self._page_starts, first) - 1
+        done = 0
+        while done < count:
+            page = self._pages[page_index]
+            offset = first + done - self._page_starts[page_index]
+            take = min(count - done, len(page) - offset)
+            stored = page[offset:offset + take]
+            stored[:] = vectors[done:done + take]
+            if inv_norm is None:
+                self._inv_norm[first + done:first + done + take] = self._inverse_norms(stored)
+            views.extend(stored)
+            done += take
+            page_index += 1
+        if inv_norm is not None:
+            self._inv_norm[first:first + count] = inv_norm
+        self._row_owner[first:first + count] = owner
+        self._row_ids.extend(item_ids)
+        self._rows += count
+        return np.arange(first, first + count, dtype=np.int64), views
+    
+    def _reserve(self, rows: int) -> None:
+        """
+        Grow the arena to hold `rows` rows. Pages double from
+        ARENA_FIRST_PAGE_ROWS up to INDEX_SLAB_ROWS rows and never move once
+        added; the per-row arrays grow geometrically.
+        """
+        capacity = self._page_starts[-1] + len(self._pages[-1]) if self._pages else 0
+        while capacity < rows:
+            size = min(INDEX_SLAB_ROWS, max(ARENA_FIRST_PAGE_ROWS, capacity))
+            self._pages.append(np.empty((size, self.dimensions), dtype=self.storage_dtype))
+            self._page_starts.append(capacity)
+            capacity += size
+        if len(self._row_owner) < capacity:
+            length = max(capacity, len(self._row_owner) * 3 // 2)
+            owner = np.full(length, -1, dtype=np.int32)
+            owner[:self._rows] = self._row_owner[:self._rows]
+            inv_norm = np.zeros(length, dtype=self.compute_dtype)
+            inv_norm[:self._rows] = self._inv_norm[:self._rows]
+            self._row_owner, self._inv_norm = owner, inv_norm
+    
+    def _inverse_norms(self, rows: np.ndarray) -> np.ndarray:
+        """1/||row|| in the compute dtype; 0 for rows too small to normalize"""
+        norms = np.linalg.norm(rows.astype(self.compute_dtype, copy=False), axis=1)
+        return np.divide(1.0, norms, out=np.zeros_like(norms), where=norms >= PRECISION_THRESHOLD)
+    
+    def retrieve(self, query: np.ndarray, context: str = "general", 
+                 top_k: int = 5, quantum_assisted: bool = False) -> List[Dict[str, Any]]:
+        """
+        Retrieve items associated with a query using holographic unbinding.
+        """
+        rows = self._context_rows_of(context)
+        if rows is None:
             return []
         
-        similarities = np.array(similarities, dtype=NP_FLOAT)
+        # Perform holographic unbinding, then score the context's items in one product
+        retrieved_value = self._unbind_normalized(self.memory_traces[context], query)
+        similarities = self._correlate(rows, retrieved_value)[:, 0].astype(NP_FLOAT, copy=False)
         
         # Select top-k items using quantum/classical optimization
         if quantum_assisted:
             selected_indices = self.processor.quantum_optimized_selection(similarities, top_k)
         else:
-            selected_indices = np.argsort(-similarities)[:min(top_k, len(similarities))].tolist()
+            k = min(top_k, len(similarities))
+            top = np.argpartition(-similarities, k - 1)[:k] if 0 < k < len(similarities) else np.arange(k)
+            selected_indices = top[np.argsort(-similarities[top], kind="stable")].tolist()
         
         # Prepare results
         results = []
-        for idx in selected_indices:
-            item_id = item_ids[idx]
+        item_ids = [self._row_ids[rows[idx]] for idx in selected_indices]
+        self._touch(item_ids)
+        for idx, item_id in zip(selected_indices, item_ids):
             item = self.items[item_id]
             results.append({
                 "id": item_id,
@@ -390,6 +607,189 @@ class AdvancedHolographicMemory:
         
         return results
     
+    def _context_rows_of(self, context: str) -> Optional[np.ndarray]:
+        """
+        A context's arena rows, with rows queued since the last read appended
+        (new rows always come after existing ones, so the array stays sorted).
+        Arrays are replaced, never changed in place.
+        """
+        rows = self._context_rows.get(context)
+        pending = self._rows_pending.pop(context, None)
+        if pending:
+            added = np.asarray(pending, dtype=np.int64)
+            rows = self._context_rows[context] = added if rows is None else np.concatenate((rows, added))
+        return rows if rows is not None and len(rows) else None
+    
+    def _forget_rows(self, context: str) -> None:
+        self._context_rows.pop(context, None)
+        self._rows_pending.pop(context, None)
+    
+    def index_bytes(self) -> int:
+        """Bytes held by the arena's per-row arrays and the per-context row lists"""
+        return int(self._row_owner.nbytes + self._inv_norm.nbytes
+                   + sum(rows.nbytes for rows in self._context_rows.values()))
+    
+    def arena_bytes(self) -> int:
+        """Bytes of arena pages, including removed and not yet used rows"""
+        return int(sum(page.nbytes for page in self._pages))
+    
+    def _unbind_normalized(self, traces: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """
+        holographic_unbinding for many traces and/or many queries at once
+        (rows broadcast against each other) as unit-normalized rows in the
+        compute dtype; rows too small to normalize become zero.
+        """
+        padded_length = 2**math.ceil(math.log2(self.dimensions))
+        query_freq = np.fft.fft(np.asarray(queries, dtype=NP_FLOAT), n=padded_length, axis=-1)[..., :self.dimensions]
+        retrieved = np.fft.ifft(traces * query_freq, n=padded_length, axis=-1)[..., :self.dimensions].real
+        return self._normalize_rows(retrieved)
+    
+    def _normalize_rows(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.result_type(vectors, np.float32)))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        normalized = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms >= PRECISION_THRESHOLD)
+        return normalized.astype(self.compute_dtype, copy=False)
+    
+    def _row_slabs(self, rows: np.ndarray) -> Iterable[Tuple[int, np.ndarray, np.ndarray, Optional[np.ndarray]]]:
+        """
+        Split sorted arena rows by page: (offset into rows, the rows, a
+        matrix holding them, positions of the rows in that matrix or None
+        when it holds exactly them). Rows filling at least half of their
+        span are read as a view of the span; sparser ones are gathered.
+        """
+        if not len(rows):
+            return
+        pages = np.searchsorted(self._page_starts, rows, side="right") - 1
+        cuts = np.flatnonzero(np.diff(pages)) + 1
+        for lo, hi in zip(np.concatenate(([0], cuts)), np.concatenate((cuts, [len(rows)]))):
+            page = self._pages[pages[lo]]
+            local = rows[lo:hi] - self._page_starts[pages[lo]]
+            span = int(local[-1] - local[0]) + 1
+            if span == hi - lo:
+                yield int(lo), rows[lo:hi], page[local[0]:local[0] + span], None
+            elif span <= 2 * (hi - lo):
+                yield int(lo), rows[lo:hi], page[local[0]:local[0] + span], local - local[0]
+            else:
+                yield int(lo), rows[lo:hi], page[local], None
+    
+    def _correlate(self, rows: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        """
+        multidimensional_correlation of arena rows against each unit-normalized
+        vector, as (rows x vectors) products over the stored values scaled by
+        the cached inverse norms. Pages are upcast to the compute dtype one
+        at a time, so no full-size copy is made.
+        """
+        scores = np.empty((len(rows), len(vectors)), dtype=self.compute_dtype)
+        for lo, part, matrix, select in self._row_slabs(rows):
+            matrix = matrix.astype(self.compute_dtype, copy=False)
+            block = matrix @ vectors.T
+            if select is not None:
+                block = block[select]
+            inv_norm = self._inv_norm[part]
+            block *= inv_norm[:, None]
+            if self.processor.enable_quantum:
+                # _quantum_precision_enhancement, applied elementwise
+                row_std = np.std(matrix, axis=1)
+                if select is not None:
+                    row_std = row_std[select]
+                correction = np.outer(row_std * inv_norm, np.std(vectors, axis=1)) * 1e-12
+                block = np.clip(block + correction * np.sign(block), -1.0, 1.0)
+            scores[lo:lo + len(part)] = block
+        return scores
+    
+    def search_contexts(self, query: np.ndarray, contexts: Optional[List[str]] = None,
+                        top_k: int = 5) -> Dict[str, Any]:
+        """
+        Associative retrieval across many contexts in one pass. Every
+        context trace is unbound with the query in a single batched FFT, and
+        the selected contexts' arena rows are scored together, each against
+        its own context's retrieved vector (the same cosine score retrieve()
+        gives) picked through the row owner array. Returns the merged top-k
+        matches and each context's best match.
+        """
+        names = [context for context in dict.fromkeys(contexts if contexts is not None else self.context_associations)
+                 if context in self.memory_traces and context in self._context_slots]
+        if not names:
+            return {"matches": [], "contexts": {}}
+        
+        # Unbind all selected traces at once (holographic_unbinding, batched)
+        retrieved = self._unbind_normalized(np.stack([self.memory_traces[name] for name in names]), query)
+        
+        # Each arena row's position in `names` (-1: removed or not searched);
+        # row i is paired with padded[segment[i] + 1], a zero vector for -1
+        position = np.full(len(self._context_slots), -1, dtype=np.int64)
+        position[[self._context_slots[name] for name in names]] = np.arange(len(names))
+        owners = self._row_owner[:self._rows]
+        segment = np.where(owners >= 0, position[owners], -1)
+        padded = np.concatenate((np.zeros((1, self.dimensions), dtype=retrieved.dtype), retrieved))
+        arena_rows = np.flatnonzero(segment >= 0)
+        owner = segment[arena_rows]
+        if not len(arena_rows):
+            return {"matches": [], "contexts": {}}
+        
+        # One pass over the rows: row-wise dot products with their own context's vector
+        scores = np.empty(len(arena_rows), dtype=self.compute_dtype)
+        retrieved_std = np.std(retrieved, axis=1) if self.processor.enable_quantum else None
+        for lo, part, matrix, select in self._row_slabs(arena_rows):
+            matrix = matrix.astype(self.compute_dtype, copy=False)
+            paired = segment[part] if select is None else segment[part[0]:part[0] + len(matrix)]
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(paired)) + 1))
+            if len(matrix) >= SEARCH_RUN_ROWS * len(starts):
+                # Rows written in batches sit in long same-context runs: one
+                # matrix-vector product per run
+                block = np.empty(len(matrix), dtype=self.compute_dtype)
+                for start, stop in zip(starts, np.append(starts[1:], len(matrix))):
+                    np.matmul(matrix[start:stop], padded[paired[start] + 1], out=block[start:stop])
+            else:
+                block = np.einsum("ij,ij->i", matrix, padded[paired + 1])
+            if select is not None:
+                block = block[select]
+            inv_norm = self._inv_norm[part]
+            block *= inv_norm
+            if retrieved_std is not None:
+                # _quantum_precision_enhancement, applied elementwise
+                row_std = np.std(matrix, axis=1)
+                if select is not None:
+                    row_std = row_std[select]
+                correction = row_std * inv_norm * retrieved_std[owner[lo:lo + len(part)]] * 1e-12
+                block = np.clip(block + correction * np.sign(block), -1.0, 1.0)
+            scores[lo:lo + len(part)] = block
+        sizes = np.bincount(owner, minlength=len(names))
+        
+        def row_id(row: int) -> str:
+            return self._row_ids[arena_rows[row]]
+        
+        # Best match per context: its maximum, then the first row reaching it
+        best = np.full(len(names), -np.inf, dtype=scores.dtype)
+        np.maximum.at(best, owner, scores)
+        hits = np.flatnonzero(scores == best[owner])
+        segment_of_hit, first = np.unique(owner[hits], return_index=True)
+        best_rows = hits[first]
+        
+        def match(row: int) -> Dict[str, Any]:
+            item_id = row_id(row)
+            item = self.items[item_id]
+            return {
+                "id": item_id,
+                "similarity": float(scores[row]),
+                "key": item["key"],
+                "value": item["value"],
+                "metadata": item["metadata"],
+                "context": item["context"]
+            }
+        
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k] if k else np.array([], dtype=np.int64)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        self._touch(row_id(row) for row in top)
+        return {
+            "matches": [match(int(row)) for row in top],
+            "contexts": {
+                names[index]: {"items": int(sizes[index]), **match(int(row))}
+                for index, row in zip(segment_of_hit, best_rows)
+            },
+        }
+    
     def analogy_reasoning(self, a: np.ndarray, b: np.ndarray, c: np.ndarray,
                          context: str = "general", top_k: int = 5) -> List[Dict[str, Any]]:
         """
@@ -414,8 +814,6 @@ class AdvancedHolographicMemory:
         Extrapolate through embedding space in a semantic direction.
         This enables "derivative thinking" - exploring conceptual trajectories.
         """
-        trajectory = []
-        
         # Normalize direction vector
         dir_norm = np.linalg.norm(direction)
         if dir_norm < PRECISION_THRESHOLD:
@@ -423,30 +821,41 @@ class AdvancedHolographicMemory:
         
         unit_direction = direction / dir_norm
         
-        for step in range(1, steps + 1):
-            # Compute point along trajectory
-            point = base + step * step_size * unit_direction
-            
-            # Normalize point
-            point_norm = np.linalg.norm(point)
-            if point_norm > PRECISION_THRESHOLD:
-                point = point / point_norm
-            
-            # Find closest memory item to this point
-            matches = self.retrieve(point, context, top_k=1)
-            
-            if matches:
-                trajectory.append({
-                    "step": step,
-                    "point": point,
-                    "closest_match": matches[0]
-                })
-            else:
-                trajectory.append({
-                    "step": step,
-                    "point": point,
-                    "closest_match": None
-                })
+        # All trajectory points at once, normalized
+        step_numbers = np.arange(1, steps + 1)
+        points = base + (step_numbers * step_size)[:, None] * unit_direction
+        point_norms = np.linalg.norm(points, axis=1, keepdims=True)
+        points = np.divide(points, point_norms, out=points.copy(), where=point_norms > PRECISION_THRESHOLD)
+        
+        # Unbind every point in one batched FFT and score them in one product
+        best, similarities, item_ids = [None] * steps, None, []
+        rows = self._context_rows_of(context)
+        if rows is not None:
+            retrieved = self._unbind_normalized(self.memory_traces[context], points)
+            similarities = self._correlate(rows, retrieved)
+            best = np.argmax(similarities, axis=0)
+            item_ids = [self._row_ids[rows[row]] for row in best]
+            self._touch(item_ids)
+        
+        trajectory = []
+        for i, step in enumerate(step_numbers):
+            closest_match = None
+            if similarities is not None:
+                item_id = item_ids[i]
+                item = self.items[item_id]
+                closest_match = {
+                    "id": item_id,
+                    "similarity": float(similarities[best[i], i]),
+                    "key": item["key"],
+                    "value": item["value"],
+                    "metadata": item["metadata"],
+                    "context": item["context"]
+                }
+            trajectory.append({
+                "step": int(step),
+                "point": points[i],
+                "closest_match": closest_match
+            })
         
         return trajectory
     
@@ -456,36 +865,17 @@ class AdvancedHolographicMemory:
         Optimize a learning path that maximizes knowledge acquisition efficiency.
         This uses quantum-enhanced optimization to balance relevance and diversity.
         """
-        if not self.items:
+        if not self.items or len(goals) == 0:
             return []
         
         # Only consider items in the specified context
-        relevant_items = self.context_associations.get(context, [])
-        if not relevant_items:
+        rows = self._context_rows_of(context)
+        if rows is None:
             return []
         
-        # Compute goal relevance scores
-        goal_similarities = []
-        item_values = []
-        item_ids = []
-        
-        for item_id in relevant_items:
-            if item_id in self.items:
-                item = self.items[item_id]
-                item_values.append(item["value"])
-                item_ids.append(item_id)
-                
-                # Compute average similarity to all goals
-                avg_goal_sim = np.mean([
-                    self.processor.multidimensional_correlation(item["value"], goal)
-                    for goal in goals
-                ])
-                goal_similarities.append(avg_goal_sim)
-        
-        if not goal_similarities:
-            return []
-        
-        goal_similarities = np.array(goal_similarities, dtype=NP_FLOAT)
+        # Goal relevance: (items x goals) correlations in one product, averaged over goals
+        relevance = self._correlate(rows, self._normalize_rows(goals))
+        goal_similarities = relevance.mean(axis=1).astype(NP_FLOAT, copy=False)
         
         # Use quantum optimization to select diverse, goal-relevant items
         selected_indices = self.processor.quantum_optimized_selection(
@@ -494,8 +884,9 @@ class AdvancedHolographicMemory:
         
         # Prepare optimized learning path
         learning_path = []
-        for idx in selected_indices:
-            item_id = item_ids[idx]
+        item_ids = [self._row_ids[rows[idx]] for idx in selected_indices]
+        self._touch(item_ids)
+        for idx, item_id in zip(selected_indices, item_ids):
             item = self.items[item_id]
             learning_path.append({
                 "id": item_id,
@@ -519,78 +910,555 @@ class AdvancedHolographicMemory:
         """
         Clear memory for a specific context.
         """
-        if context in self.memory_traces:
-            self.memory_traces[context].fill(0)
-        if context in self.context_associations:
-            # Remove items associated with this context
-            for item_id in self.context_associations[context]:
-                if item_id in self.items:
-                    del self.items[item_id]
-            self.context_associations[context] = []
+        item_ids = [item_id for item_id in self.context_associations.get(context, []) if item_id in self.items]
+        self._drop(item_ids)
+        self.memory_traces.pop(context, None)
+        self.context_associations.pop(context, None)
+        self.context_bytes.pop(context, None)
+        self.removal_counts["removed"] += len(item_ids)
+        self._forget_rows(context)
+        if item_ids and self.on_remove:
+            self.on_remove(item_ids)
+    
+    def _drop(self, item_ids: List[str]) -> None:
+        """
+        Forget stored vectors and byte accounting for items (traces
+        untouched); their arena rows are marked dead until the next compact().
+        """
+        for item_id in item_ids:
+            item = self.items.pop(item_id)
+            nbytes = self._item_vector_bytes(item)
+            self.vector_bytes -= nbytes
+            self.context_bytes[item["context"]] = self.context_bytes.get(item["context"], 0) - nbytes
+            row = item["row"]
+            self._row_ids[row] = None
+            self._row_owner[row] = -1
+            self._inv_norm[row] = 0
+            self._dead_rows += 1
+    
+    def remove_items(self, item_ids: Iterable[str], reason: str = "removed") -> List[str]:
+        """
+        Delete items: subtract each one's bound spectrum (once per time it was
+        bound) from its context trace, then drop its vectors. A context left
+        empty loses its trace. Returns the ids that were present.
+        """
+        by_context: Dict[str, List[str]] = {}
+        for item_id in dict.fromkeys(item_ids):
+            item = self.items.get(item_id)
+            if item is not None:
+                by_context.setdefault(item["context"], []).append(item_id)
+        
+        removed: List[str] = []
+        for context, ids in by_context.items():
+            items = [self.items[item_id] for item_id in ids]
+            keys = np.stack([item["key"] for item in items])
+            if all(item["value"] is item["key"] for item in items):
+                values = keys
+            else:
+                values = np.stack([item["value"] for item in items])
+            bindings = np.array([item["bindings"] for item in items], dtype=NP_FLOAT)
+            bound = self.processor.holographic_binding_batch(keys, values)
+            
+            self._drop(ids)
+            gone = set(ids)
+            remaining = [i for i in self.context_associations.get(context, []) if i not in gone]
+            if remaining:
+                self.context_associations[context] = remaining
+                self.memory_traces[context] -= (bindings @ bound).astype(self.trace_dtype, copy=False)
+                self._remove_rows(context)
+            else:
+                self.memory_traces.pop(context, None)
+                self.context_associations.pop(context, None)
+                self.context_bytes.pop(context, None)
+                self._forget_rows(context)
+            removed.extend(ids)
+        
+        if removed:
+            self.removal_counts[reason] = self.removal_counts.get(reason, 0) + len(removed)
+            if self.on_remove:
+                self.on_remove(removed)
+        return removed
+    
+    def _remove_rows(self, context: str) -> None:
+        """Cut dead rows out of a context's row list and its queue"""
+        pending = self._rows_pending.get(context)
+        if pending:
+            self._rows_pending[context] = [row for row in pending if self._row_owner[row] >= 0]
+        rows = self._context_rows.get(context)
+        if rows is not None:
+            self._context_rows[context] = rows[self._row_owner[rows] >= 0]
+    
+    def _touch(self, item_ids: Iterable[str]) -> None:
+        now = time.time()
+        for item_id in item_ids:
+            item = self.items.get(item_id)
+            if item is not None:
+                item["last_access"] = now
+    
+    def enforce_budgets(self, contexts: Optional[List[str]] = None, expire: bool = True) -> Dict[str, int]:
+        """
+        Expire items idle longer than ttl_seconds (when expire is set), then
+        evict least recently used items from every context over its item or
+        byte budget. Returns the number of items expired and evicted.
+        """
+        now = time.time()
+        expired: List[str] = []
+        evicted: List[str] = []
+        for context in (contexts if contexts is not None else list(self.context_associations)):
+            ids = self.context_associations.get(context)
+            if not ids:
+                continue
+            over_items = self.max_items_per_context and len(ids) > self.max_items_per_context
+            over_bytes = self.max_bytes_per_context and self.context_bytes.get(context, 0) > self.max_bytes_per_context
+            if not (over_items or over_bytes or (expire and self.ttl_seconds)):
+                continue
+            
+            items = [self.items[item_id] for item_id in ids]
+            last_access = np.fromiter((item["last_access"] for item in items), dtype=np.float64, count=len(items))
+            order = np.argsort(last_access, kind="stable")  # least recently used first
+            if expire and self.ttl_seconds:
+                stale = last_access[order] < now - self.ttl_seconds
+                expired.extend(ids[j] for j in order[stale])
+                order = order[~stale]
+            
+            sizes = np.fromiter((self._item_vector_bytes(items[j]) for j in order), dtype=np.int64, count=len(order))
+            n_evict = max(0, len(order) - self.max_items_per_context) if self.max_items_per_context else 0
+            if self.max_bytes_per_context and sizes.sum() > self.max_bytes_per_context:
+                excess = sizes.sum() - self.max_bytes_per_context
+                n_evict = max(n_evict, int(np.searchsorted(np.cumsum(sizes), excess)) + 1)
+            evicted.extend(ids[j] for j in order[:n_evict])
+        
+        return {
+            "expired": len(self.remove_items(expired, reason="expired")),
+            "evicted": len(self.remove_items(evicted, reason="evicted")),
+        }
+    
+    def pinned_bytes(self) -> int:
+        """Arena bytes still held by rows of removed items"""
+        return self._dead_rows * self.dimensions * np.dtype(self.storage_dtype).itemsize
+    
+    def compact(self, min_waste_ratio: float = 0.0) -> int:
+        """
+        Once removed rows are at least min_waste_ratio of the arena rows in
+        use, copy the live rows, in order, into fresh pages; each old page is
+        released as soon as its rows (and their on_relocate owners) have moved.
+        Returns the bytes released.
+        """
+        if not self._dead_rows or self._dead_rows / self._rows < min_waste_ratio:
+            return 0
+        
+        old_bytes = self.arena_bytes()
+        pages, starts, used = self._pages, self._page_starts, self._rows
+        row_ids, owner, inv_norm = self._row_ids, self._row_owner, self._inv_norm
+        self._pages, self._page_starts, self._row_ids = [], [], []
+        self._row_owner = np.empty(0, dtype=np.int32)
+        self._inv_norm = np.empty(0, dtype=self.compute_dtype)
+        self._rows = self._dead_rows = 0
+        for index, start in enumerate(starts):
+            page, pages[index] = pages[index], None
+            live = np.flatnonzero(owner[start:min(used, start + len(page))] >= 0)
+            if not len(live):
+                continue
+            ids = [row_ids[start + row] for row in live]
+            rows, views = self._write_rows(ids, page[live], owner[start + live], inv_norm[start + live])
+            for item_id, row, view in zip(ids, rows, views):
+                item = self.items[item_id]
+                if item["key"] is item["value"]:
+                    item["key"] = view
+                item["value"] = view
+                item["row"] = int(row)
+            if self.on_relocate:
+                self.on_relocate(ids)
+        
+        # Row lists follow the new numbering: live rows grouped by context slot
+        slot_names = {slot: name for name, slot in self._context_slots.items()}
+        owners = self._row_owner[:self._rows]
+        order = np.argsort(owners, kind="stable")
+        self._context_rows = {
+            slot_names[int(owners[group[0]])]: group
+            for group in np.split(order, np.flatnonzero(np.diff(owners[order])) + 1) if len(group)
+        }
+        self._rows_pending = {}
+        self.compactions += 1
+        return old_bytes - self.arena_bytes()
+    
+    def memory_usage(self) -> Dict[str, Any]:
+        """Item, byte and removal accounting, overall and per context"""
+        return {
+            "items": len(self.items),
+            "vector_bytes": self.vector_bytes,
+            "trace_bytes": sum(trace.nbytes for trace in self.memory_traces.values()),
+            "index_bytes": self.index_bytes(),
+            "arena_bytes": self.arena_bytes(),
+            "pinned_bytes": self.pinned_bytes(),
+            "contexts": {
+                context: {"items": len(ids), "bytes": self.context_bytes.get(context, 0)}
+                for context, ids in self.context_associations.items()
+            },
+            "removed_items": self.removal_counts.get("removed", 0),
+            "expired_items": self.removal_counts.get("expired", 0),
+            "evicted_items": self.removal_counts.get("evicted", 0),
+            "compactions": self.compactions,
+            "budgets": {
+                "max_items_per_context": self.max_items_per_context,
+                "max_bytes_per_context": self.max_bytes_per_context,
+                "ttl_seconds": self.ttl_seconds,
+            },
+        }
 
 # ---------------------------------------------------------------------
 # Supabase Storage (Enhanced for holographic data)
 # ---------------------------------------------------------------------
+def content_item_id(text: str, context: str) -> str:
+    """Cheap content-derived item id, shared by local memory and Supabase rows."""
+    return hashlib.blake2b(f"{context}\x00{text}".encode(), digest_size=8).hexdigest()
+
+
+def encode_float32_base64(vectors: np.ndarray) -> List[str]:
+    """Rows as base64 of their little-endian float32 bytes (4 bytes per component)."""
+    block = np.ascontiguousarray(np.atleast_2d(vectors), dtype="<f4")
+    return [base64.b64encode(row.tobytes()).decode("ascii") for row in block]
+
+
+def encode_pgvector_text(vectors: np.ndarray) -> List[str]:
+    """Rows in pgvector's text input form, '[x1,x2,...]', at float32 precision."""
+    buffer = io.StringIO()
+    np.savetxt(buffer, np.atleast_2d(vectors).astype(np.float32), fmt="%.7g", delimiter=",")
+    return [f"[{line}]" for line in buffer.getvalue().splitlines()]
+
+
+def decode_embedding(payload: Dict[str, Any]) -> np.ndarray:
+    """
+    Inverse of the stored "embedding" payload: base64 float32 parts, or the
+    older {"real": [...], "imag": [...]} float lists.
+    """
+    def _part(value) -> np.ndarray:
+        if isinstance(value, str):
+            return np.frombuffer(base64.b64decode(value), dtype="<f4").astype(NP_FLOAT)
+        return np.asarray(value, dtype=NP_FLOAT)
+    
+    real = _part(payload["real"])
+    if payload.get("imag") is None:
+        return real
+    return real + 1j * _part(payload["imag"])
+
+
 class SupabaseHDAMStorage:
     """Enhanced Supabase integration for holographic HDAM storage."""
     
-    def __init__(self, supabase_url: str, supabase_key: str):
+    def __init__(self, supabase_url: str, supabase_key: str,
+                 chunk_size: Optional[int] = None,
+                 max_inflight: Optional[int] = None,
+                 max_retries: Optional[int] = None,
+                 retry_backoff: Optional[float] = None,
+                 vector_column: Optional[bool] = None):
         self.supabase: Client = create_client(supabase_url, supabase_key)
-        self.executor = ThreadPoolExecutor(max_workers=10)
+        
+        # Upserts are sent in chunks, up to max_inflight at a time; a failed
+        # chunk is retried with exponential backoff
+        self.chunk_size = max(1, chunk_size or int(os.getenv("HDAM_SUPABASE_CHUNK_SIZE", "500")))
+        self.max_inflight = max(1, max_inflight or int(os.getenv("HDAM_SUPABASE_MAX_INFLIGHT", "4")))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("HDAM_SUPABASE_MAX_RETRIES", "3"))
+        self.retry_backoff = retry_backoff if retry_backoff is not None else float(os.getenv("HDAM_SUPABASE_RETRY_BACKOFF", "0.5"))
+        # embedding_vector (pgvector text) is only needed for server-side similarity
+        # search and needs the column from supabase_schema.sql, so it is opt-in
+        if vector_column is None:
+            vector_column = os.getenv("HDAM_SUPABASE_VECTOR_COLUMN", "off").lower() in ("on", "true", "1")
+        self.vector_column = vector_column
+        self.executor = ThreadPoolExecutor(max_workers=self.max_inflight, thread_name_prefix="hdam-supabase")
+    
+    def _build_rows(self, embeddings: np.ndarray, metadata: List[Dict[str, Any]],
+                    ids: Optional[List[str]], quantum_enhanced: bool,
+                    context: str, created_at: str) -> List[Dict[str, Any]]:
+        """One chunk of upsert records; vectors are encoded a block at a time."""
+        real = encode_float32_base64(embeddings.real)
+        imag = encode_float32_base64(embeddings.imag) if np.iscomplexobj(embeddings) else None
+        vectors = encode_pgvector_text(embeddings.real) if self.vector_column else None
+        
+        rows = []
+        for i, meta in enumerate(metadata):
+            meta = meta or {}
+            # Extract context from metadata if available
+            item_context = meta.get("context", context)
+            if ids is not None:
+                item_id = ids[i]
+            elif "original_text" in meta:
+                item_id = content_item_id(meta["original_text"], item_context)
+            else:
+                item_id = hashlib.blake2b(real[i].encode() + item_context.encode(), digest_size=8).hexdigest()
+            
+            embedding = {"dtype": "float32", "real": real[i]}
+            if imag is not None:
+                embedding["imag"] = imag[i]
+            record = {
+                "id": item_id,
+                "embedding": embedding,
+                "metadata": meta,
+                "quantum_enhanced": quantum_enhanced,
+                "context": item_context,
+                "created_at": created_at,
+            }
+            if vectors is not None:
+                record["embedding_vector"] = vectors[i]  # pgvector text for similarity search
+            rows.append(record)
+        return rows
+    
+    def _upsert(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        self.supabase.table(table).upsert(rows, returning=ReturnMethod.minimal).execute()
     
     async def store_embeddings(
         self,
-        embeddings: List[np.ndarray],
+        embeddings: Union[np.ndarray, List[np.ndarray]],
         metadata: List[Dict[str, Any]],
         table: str = "holographic_embeddings",
         quantum_enhanced: bool = False,
         context: str = "general",
+        ids: Optional[List[str]] = None,
     ) -> Dict[str, Any]:
         """
-        Store high-precision embeddings with metadata.
-        Now includes vector column for pgvector similarity search.
+        Upsert embeddings with metadata in pipelined, retried chunks.
+        Row ids come from `ids`, else from each row's original_text and
+        context (as in learn_stream), so re-learning a fact updates its row.
+        Vectors are stored as base64 float32, plus pgvector text in
+        embedding_vector when vector_column is on; the imaginary part is only
+        sent for complex input.
         """
+        count = min(len(embeddings), len(metadata))
+        if count == 0:
+            return {"success": True, "inserted_count": 0}
+        
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_inflight)
+        created_at = datetime.utcnow().isoformat()
+        retries = 0
+        
+        async def _upload(start: int) -> Tuple[int, Optional[str]]:
+            nonlocal retries
+            stop = min(start + self.chunk_size, count)
+            async with semaphore:
+                try:
+                    rows = await loop.run_in_executor(
+                        self.executor, self._build_rows,
+                        np.asarray(embeddings[start:stop]), metadata[start:stop],
+                        ids[start:stop] if ids is not None else None,
+                        quantum_enhanced, context, created_at,
+                    )
+                except Exception as e:
+                    return 0, str(e)
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        await loop.run_in_executor(self.executor, self._upsert, table, rows)
+                        return len(rows), None
+                    except Exception as e:
+                        if attempt == self.max_retries:
+                            return 0, str(e)
+                        retries += 1
+                        await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+        
+        results = await asyncio.gather(*(_upload(start) for start in range(0, count, self.chunk_size)))
+        inserted = sum(stored for stored, _ in results)
+        errors = [error for _, error in results if error is not None]
+        result = {
+            "success": not errors,
+            "inserted_count": inserted,
+            "failed_count": count - inserted,
+            "chunks": len(results),
+            "retries": retries,
+        }
+        if errors:
+            result["error"] = errors[0]
+        return result
+
+# ---------------------------------------------------------------------
+# Micro-batching inference executor
+# ---------------------------------------------------------------------
+class MicroBatchEncoder:
+    """
+    Runs encoder inference off the event loop and merges concurrent encode
+    requests that arrive within `max_wait_ms` into a single model call.
+    Batching happens on one worker thread fed by a thread-safe queue, so
+    callers on any event loop (the API loop, or the per-call loops worker
+    threads create) can share it; each caller's future is resolved on its
+    own loop. The request queue is bounded, so callers wait (backpressure)
+    when full.
+    """
+    
+    def __init__(self, encode_fn, max_batch_size: int = 64, max_wait_ms: float = 5.0,
+                 max_queue: int = 1024, max_workers: int = 1):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hdam-encode")
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        
+        self.latencies_ms: deque = deque(maxlen=1000)
+        self.total_requests = 0
+        self.total_batches = 0
+        self.total_texts = 0
+    
+    def _ensure_worker(self) -> None:
+        """Start the batching thread on first use."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="hdam-batcher", daemon=True)
+                self._worker.start()
+    
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts, possibly batched together with concurrent callers."""
+        self._ensure_worker()
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        future = loop.create_future()
+        request = (texts, loop, future)
         try:
-            rows = []
-            
-            for i, (emb, meta) in enumerate(zip(embeddings, metadata)):
-                # Handle complex embeddings
-                if np.iscomplexobj(emb):
-                    emb_real = emb.real.astype(NP_FLOAT).tolist()
-                    emb_imag = emb.imag.astype(NP_FLOAT).tolist()
-                else:
-                    emb_real = emb.astype(NP_FLOAT).tolist()
-                    emb_imag = None
-                
-                # Extract context from metadata if available
-                item_context = meta.get("context", context) if meta else context
-                
-                record = {
-                    "id": hashlib.md5(
-                        (str(emb_real) + str(sorted(meta.items()))).encode()
-                    ).hexdigest(),
-                    "embedding": {"real": emb_real, "imag": emb_imag if emb_imag is not None else [0.0]*len(emb_real)},
-                    "embedding_vector": emb_real,  # Real part as vector for pgvector
-                    "metadata": meta,
-                    "quantum_enhanced": quantum_enhanced,
-                    "context": item_context,
-                    "created_at": datetime.utcnow().isoformat(),
-                }
-                rows.append(record)
-            
-            if not rows:
-                return {"success": True, "inserted_count": 0}
-            
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(
-                self.executor,
-                lambda: self.supabase.table(table).upsert(rows).execute(),
-            )
+            self._queue.put_nowait(request)
+        except queue.Full:
+            # Wait for room off the loop instead of blocking it
+            await loop.run_in_executor(None, self._queue.put, request)
+        embeddings = await future
+        self.latencies_ms.append((time.perf_counter() - start) * 1000.0)
+        self.total_requests += 1
+        return embeddings
+    
+    @staticmethod
+    def _resolve(loop: asyncio.AbstractEventLoop, future: asyncio.Future,
+                 result: Any = None, error: Optional[BaseException] = None) -> None:
+        def _set() -> None:
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        try:
+            loop.call_soon_threadsafe(_set)
+        except RuntimeError:
+            # The caller's loop was closed while it waited; nobody is listening
+            pass
+    
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            size = len(first[0])
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+                size += len(request[0])
             
-            return {"success": True, "inserted_count": len(rows)}
-        
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+            texts = [text for request_texts, _, _ in batch for text in request_texts]
+            try:
+                embeddings = self.executor.submit(self.encode_fn, texts).result()
+            except Exception as e:
+                for _, loop, future in batch:
+                    self._resolve(loop, future, error=e)
+            else:
+                self.total_batches += 1
+                self.total_texts += len(texts)
+                offset = 0
+                for request_texts, loop, future in batch:
+                    count = len(request_texts)
+                    self._resolve(loop, future, embeddings[offset:offset + count])
+                    offset += count
+            if stop:
+                return
+    
+    def close(self) -> None:
+        """Stop the batching thread after the queued requests and the encode pool."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+        self.executor.shutdown(wait=False)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, batching efficiency and per-call latency percentiles."""
+        latencies = np.array(self.latencies_ms) if self.latencies_ms else np.zeros(1)
+        return {
+            "requests": self.total_requests,
+            "batches": self.total_batches,
+            "avg_batch_size": self.total_texts / self.total_batches if self.total_batches else 0.0,
+            "queue_depth": self._queue.qsize(),
+            "latency_ms_p50": float(np.percentile(latencies, 50)),
+            "latency_ms_p95": float(np.percentile(latencies, 95)),
+        }
+
+# ---------------------------------------------------------------------
+# Process-wide encoders
+# ---------------------------------------------------------------------
+DEFAULT_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+_encoders: Dict[Tuple[Any, ...], Any] = {}
+_encoder_locks: Dict[Tuple[Any, ...], threading.Lock] = {}
+_encoders_guard = threading.Lock()
+
+
+def _encoder_key(backend: str, model_name: str) -> Tuple[Any, ...]:
+    if backend == "onnx":
+        model_dir = os.getenv(
+            "HDAM_ONNX_MODEL_DIR",
+            os.path.join("./models", model_name.split("/")[-1] + "-onnx")
+        )
+        return ("onnx", os.path.abspath(model_dir), os.getenv("HDAM_ONNX_QUANTIZE", "false").lower() in ("true", "int8"))
+    return ("torch", model_name)
+
+
+def _build_encoder(key: Tuple[Any, ...]):
+    if key[0] == "onnx":
+        from .onnx_encoder import OnnxSentenceEncoder
+        return OnnxSentenceEncoder(key[1], quantize=key[2])
+    if SentenceTransformer is None:
+        raise ImportError("sentence-transformers is not installed")
+    return SentenceTransformer(key[1])
+
+
+def load_encoder(backend: str, model_name: str = DEFAULT_MODEL_NAME):
+    """
+    Encoder for (backend, model), loaded once per process and shared by
+    reference between every HDAM memory space. Encoders hold no per-caller
+    state, so sharing is safe; failed loads are not cached. Set
+    HDAM_SHARED_ENCODER=off to load a private copy per caller.
+    """
+    key = _encoder_key(backend, model_name)
+    if os.getenv("HDAM_SHARED_ENCODER", "on").lower() == "off":
+        return _build_encoder(key)
+    encoder = _encoders.get(key)
+    if encoder is not None:
+        return encoder
+    with _encoders_guard:
+        lock = _encoder_locks.setdefault(key, threading.Lock())
+    with lock:
+        encoder = _encoders.get(key)
+        if encoder is None:
+            encoder = _encoders[key] = _build_encoder(key)
+        return encoder
+
+
+def loaded_encoders() -> List[Tuple[Any, ...]]:
+    """Keys of the encoders currently held by the process"""
+    return list(_encoders)
+
+
+def reset_encoders() -> None:
+    """Drop the shared encoders (they are freed once no memory space uses them)"""
+    with _encoders_guard:
+        _encoders.clear()
 
 # ---------------------------------------------------------------------
 # Enhanced Quantum Holographic HDAM
@@ -603,29 +1471,43 @@ class EnhancedQuantumHolographicHDAM:
     
     def __init__(
         self,
-        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        model_name: str = DEFAULT_MODEL_NAME,
         supabase_url: Optional[str] = None,
         supabase_key: Optional[str] = None,
-        device: Optional[torch.device] = None,
+        device: Optional["torch.device"] = None,
         enable_quantum: bool = False,
         quantum_backend: str = "dwave",
+        encoder_backend: Optional[str] = None,
+        precision: Optional[str] = None,
     ):
-        self.device = device or torch.device("cpu")
+        self.device = device or (torch.device("cpu") if TORCH_AVAILABLE else "cpu")
         self.enable_quantum = enable_quantum and DWAVE_AVAILABLE
         
+        # Encoder backend: "torch" (SentenceTransformer) or "onnx" (ONNX Runtime, CPU)
+        self.encoder_backend = (encoder_backend or os.getenv("HDAM_ENCODER_BACKEND", "torch")).lower()
         try:
-            self.encoder = SentenceTransformer(model_name)
+            self.encoder = self._load_encoder(model_name)
             self.embedding_dim = int(self.encoder.get_sentence_embedding_dimension())
         except Exception as e:
-            print(f"Warning: could not load SentenceTransformer: {e}")
+            print(f"Warning: could not load {self.encoder_backend} encoder: {e}")
             self.encoder = None
             self.embedding_dim = 384
         
+        # Storage precision: float64 (default), float32 or float16 (float32 compute)
+        self.precision = (precision or os.getenv("HDAM_PRECISION", "float64")).lower()
+        
         # Advanced holographic memory system
         self.holographic_memory = AdvancedHolographicMemory(
             dimensions=self.embedding_dim,
-            enable_quantum=self.enable_quantum
+            enable_quantum=self.enable_quantum,
+            precision=self.precision,
+            max_items_per_context=int(os.getenv("HDAM_CONTEXT_MAX_ITEMS", "0")),
+            max_bytes_per_context=int(float(os.getenv("HDAM_CONTEXT_MAX_MB", "0")) * 1024 * 1024),
+            ttl_seconds=float(os.getenv("HDAM_ITEM_TTL_SECONDS", "0"))
         )
+        self.compute_dtype = self.holographic_memory.compute_dtype
+        self.holographic_memory.on_remove = self._forget_local
+        self.holographic_memory.on_relocate = self._relocate_local
         
         # Supabase integration for persistence
         # Try to get credentials from credential manager if not provided
@@ -662,33 +1544,133 @@ class EnhancedQuantumHolographicHDAM:
         # Local in-memory store for fast access
         self.local_memory: Dict[str, Dict[str, Any]] = {}
         
-        # Learning acceleration tracking
-        self.learning_history: List[Dict[str, Any]] = []
+        # Learning acceleration tracking (most recent events only)
+        self.learning_history: deque = deque(maxlen=int(os.getenv("HDAM_HISTORY_LIMIT", "1000")) or None)
         self.knowledge_graph: Dict[str, List[str]] = {}
+        
+        # Async entry points encode through the micro-batcher and run memory
+        # scans on a dedicated thread so the event loop is never blocked
+        self.inference = MicroBatchEncoder(
+            self.encode_texts,
+            max_batch_size=int(os.getenv("HDAM_INFERENCE_MAX_BATCH", "64")),
+            max_wait_ms=float(os.getenv("HDAM_INFERENCE_MAX_WAIT_MS", "5")),
+            max_queue=int(os.getenv("HDAM_INFERENCE_MAX_QUEUE", "1024")),
+        )
+        self.memory_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hdam-memory")
+        
+        # Background expiry and compaction, started with the first write
+        self.maintenance_interval = float(os.getenv("HDAM_MAINTENANCE_INTERVAL", "60"))
+        self.compact_ratio = float(os.getenv("HDAM_COMPACT_RATIO", "0.25"))
+        self._maintenance_stop = threading.Event()
+        self._maintenance_thread: Optional[threading.Thread] = None
+    
+    def _load_encoder(self, model_name: str):
+        """
+        Load the configured encoder backend (shared with other HDAM instances).
+        """
+        return load_encoder(self.encoder_backend, model_name)
+    
+    def close(self) -> None:
+        """Stop the encode, memory and maintenance threads; the shared encoder stays loaded."""
+        self._maintenance_stop.set()
+        self.inference.close()
+        self.memory_executor.shutdown(wait=False)
+    
+    def _forget_local(self, item_ids: List[str]) -> None:
+        """Drop removed items from the local store and the knowledge graph."""
+        for item_id in item_ids:
+            self.local_memory.pop(item_id, None)
+        if self.knowledge_graph:
+            removed = set(item_ids)
+            for item_id in removed.intersection(self.knowledge_graph):
+                del self.knowledge_graph[item_id]
+            for item_id, related in self.knowledge_graph.items():
+                self.knowledge_graph[item_id] = [r for r in related if r not in removed]
+    
+    def _relocate_local(self, item_ids: List[str]) -> None:
+        """Point local entries at their items' vectors after compaction."""
+        items = self.holographic_memory.items
+        for item_id in item_ids:
+            entry = self.local_memory.get(item_id)
+            if entry is not None:
+                entry["embedding"] = items[item_id]["value"]
+    
+    def maintain(self) -> Dict[str, int]:
+        """
+        Expire idle items, enforce context budgets and compact the vector arena
+        once removed rows pin more than compact_ratio of the live vector bytes.
+        """
+        memory = self.holographic_memory
+        result = memory.enforce_budgets()
+        result["compacted_bytes"] = 0
+        if memory.pinned_bytes() > self.compact_ratio * max(memory.vector_bytes, 1):
+            result["compacted_bytes"] = memory.compact(self.compact_ratio)
+        return result
+    
+    def _ensure_maintenance(self) -> None:
+        if self.maintenance_interval <= 0 or self._maintenance_thread is not None:
+            return
+        
+        def _loop():
+            while not self._maintenance_stop.wait(self.maintenance_interval):
+                try:
+                    self.memory_executor.submit(self.maintain)
+                except RuntimeError:
+                    return  # executor shut down
+        
+        self._maintenance_thread = threading.Thread(target=_loop, name="hdam-maintenance", daemon=True)
+        self._maintenance_thread.start()
+    
+    async def forget(self, item_ids: List[str]) -> Dict[str, Any]:
+        """
+        Delete items: their bindings are subtracted from the context traces
+        and their local entries dropped.
+        """
+        removed = await self._run_memory(self.holographic_memory.remove_items, item_ids)
+        return {"removed": len(removed), "item_ids": removed}
+    
+    async def clear_context(self, context: str) -> Dict[str, Any]:
+        """Delete a context's trace and every item in it."""
+        count = len(self.holographic_memory.context_associations.get(context, []))
+        await self._run_memory(self.holographic_memory.clear_context, context)
+        return {"context": context, "removed": count}
     
     def encode_texts(self, texts: List[str]) -> np.ndarray:
         """
         Encode texts to high-precision embeddings.
         """
         if not texts:
-            return np.empty((0, self.embedding_dim), dtype=NP_FLOAT)
+            return np.empty((0, self.embedding_dim), dtype=self.compute_dtype)
         
         if self.encoder is None:
             # Deterministic random embeddings as fallback
             rng = np.random.default_rng(42)
             return rng.standard_normal(
                 (len(texts), self.embedding_dim), dtype=NP_FLOAT
-            )
+            ).astype(self.compute_dtype, copy=False)
         
         embeddings = self.encoder.encode(
             texts,
             convert_to_numpy=True,
             show_progress_bar=False,
             normalize_embeddings=False,
-        ).astype(NP_FLOAT)
+        ).astype(self.compute_dtype, copy=False)
         
         return embeddings
     
+    async def encode_texts_async(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts without blocking the event loop.
+        """
+        if not texts:
+            return np.empty((0, self.embedding_dim), dtype=self.compute_dtype)
+        return await self.inference.encode(texts)
+    
+    async def _run_memory(self, fn, *args):
+        """Run a holographic memory operation on the memory thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.memory_executor, fn, *args)
+    
     async def learn(self, facts: List[str], 
                    metadata: Optional[List[Dict[str, Any]]] = None,
                    context: str = "general",
@@ -704,29 +1686,37 @@ class EnhancedQuantumHolographicHDAM:
             print(f"Learning {len(facts)} facts in context '{context}'...")
         
         # Encode facts
-        embeddings = self.encode_texts(facts)
+        embeddings = await self.encode_texts_async(facts)
         
         # Store in holographic memory and local storage
-        item_ids = []
-        for i, (fact, embedding) in enumerate(zip(facts, embeddings)):
-            # Self-associative storage (key=value for auto-association)
-            item_id = self.holographic_memory.add_item(
-                key=embedding,
-                value=embedding,
-                context=context,
-                metadata=metadata[i] if metadata and i < len(metadata) else {}
-            )
-            
-            # Store in local memory for fast access
-            self.local_memory[item_id] = {
-                "text": fact,
-                "embedding": embedding,
-                "context": context,
-                "metadata": metadata[i] if metadata and i < len(metadata) else {},
-                "timestamp": datetime.utcnow()
-            }
-            
-            item_ids.append(item_id)
+        def _store() -> List[str]:
+            item_ids = []
+            for i, (fact, embedding) in enumerate(zip(facts, embeddings)):
+                # Self-associative storage (key=value for auto-association), under
+                # the same text-derived id learn_stream and Supabase use
+                item_id = self.holographic_memory.add_item(
+                    key=embedding,
+                    value=embedding,
+                    context=context,
+                    metadata=metadata[i] if metadata and i < len(metadata) else {},
+                    item_id=self.text_item_id(fact, context)
+                )
+                
+                # Store in local memory for fast access (shares the stored vector)
+                self.local_memory[item_id] = {
+                    "text": fact,
+                    "embedding": self.holographic_memory.items[item_id]["value"],
+                    "context": context,
+                    "metadata": metadata[i] if metadata and i < len(metadata) else {},
+                    "timestamp": datetime.utcnow()
+                }
+                
+                item_ids.append(item_id)
+            self.holographic_memory.enforce_budgets([context], expire=False)
+            return item_ids
+        
+        self._ensure_maintenance()
+        item_ids = await self._run_memory(_store)
         
         # Store in Supabase if available
         if self.storage:
@@ -738,7 +1728,7 @@ class EnhancedQuantumHolographicHDAM:
                 storage_metadata.append(meta)
             
             result = await self.storage.store_embeddings(
-                list(embeddings),
+                embeddings,
                 storage_metadata,
                 table="holographic_embeddings",
                 quantum_enhanced=quantum_enhanced or self.enable_quantum,
@@ -758,6 +1748,147 @@ class EnhancedQuantumHolographicHDAM:
         
         return {"stored_facts": len(facts), "item_ids": item_ids}
     
+    @staticmethod
+    def text_item_id(text: str, context: str) -> str:
+        """Content-derived item id shared by learn, learn_stream and Supabase rows."""
+        return content_item_id(text, context)
+    
+    async def learn_stream(self, facts: Union[Iterable, AsyncIterable],
+                           batch_size: int = 512,
+                           context: str = "general",
+                           verbose: bool = False,
+                           quantum_enhanced: bool = False,
+                           on_batch: Optional[Callable] = None,
+                           include_known: bool = False) -> Dict[str, Any]:
+        """
+        Bulk-load facts from a (possibly async) iterable of texts or
+        (text, metadata) pairs. Facts are encoded and bound chunk by chunk,
+        ids come from a text hash, and facts already in the context are skipped.
+        on_batch(ids, texts, metadata, embeddings) is called (and awaited if it
+        returns an awaitable) after each stored chunk, so callers can reuse the
+        embeddings without encoding twice. With include_known, on_batch also
+        gets the chunk's facts that were already in memory, with their stored
+        vectors, so downstream indexes can be rebuilt from a re-upload.
+        """
+        start = time.perf_counter()
+        stored = 0
+        duplicates = 0
+        batches = 0
+        self._ensure_maintenance()
+        
+        async def _chunks():
+            chunk = []
+            if hasattr(facts, "__aiter__"):
+                async for fact in facts:
+                    chunk.append(fact)
+                    if len(chunk) >= batch_size:
+                        yield chunk
+                        chunk = []
+            else:
+                for fact in facts:
+                    chunk.append(fact)
+                    if len(chunk) >= batch_size:
+                        yield chunk
+                        chunk = []
+            if chunk:
+                yield chunk
+        
+        async for chunk in _chunks():
+            texts, metas, ids = [], [], []
+            known = []
+            seen = set()
+            for fact in chunk:
+                text, meta = fact if isinstance(fact, tuple) else (fact, None)
+                item_id = self.text_item_id(text, context)
+                if item_id in seen or item_id in self.local_memory:
+                    duplicates += 1
+                    if include_known and item_id not in seen:
+                        known.append((item_id, text, meta or {}))
+                    seen.add(item_id)
+                    continue
+                seen.add(item_id)
+                texts.append(text)
+                metas.append(meta or {})
+                ids.append(item_id)
+            
+            embeddings = np.empty((0, self.embedding_dim), dtype=self.compute_dtype)
+            if texts:
+                embeddings = await self.encode_texts_async(texts)
+                
+                # Memory, local store and budgets change together on the memory
+                # thread, so removals and compaction never see half a chunk
+                def _store() -> None:
+                    vectors = self.holographic_memory.add_items_batch(ids, embeddings, context, metas)
+                    timestamp = datetime.utcnow()
+                    for i, item_id in enumerate(ids):
+                        self.local_memory[item_id] = {
+                            "text": texts[i],
+                            "embedding": vectors[i],
+                            "context": context,
+                            "metadata": metas[i],
+                            "timestamp": timestamp
+                        }
+                    self.holographic_memory.enforce_budgets([context], expire=False)
+                
+                await self._run_memory(_store)
+                
+                if self.storage:
+                    storage_metadata = [
+                        {**meta, "original_text": text, "context": context}
+                        for text, meta in zip(texts, metas)
+                    ]
+                    await self.storage.store_embeddings(
+                        embeddings,
+                        storage_metadata,
+                        table="holographic_embeddings",
+                        quantum_enhanced=quantum_enhanced or self.enable_quantum,
+                        context=context,
+                        ids=ids
+                    )
+                
+                stored += len(ids)
+                batches += 1
+                if verbose:
+                    print(f"Streamed batch {batches}: {stored} facts stored in context '{context}'")
+            
+            if on_batch is not None:
+                # Facts already in memory are passed on with their stored vectors,
+                # read on the memory thread
+                def _known():
+                    present = [entry for entry in known if entry[0] in self.local_memory]
+                    vectors = [self.local_memory[item_id]["embedding"] for item_id, _, _ in present]
+                    return present, np.stack(vectors) if vectors else None
+                
+                known, known_vectors = await self._run_memory(_known) if known else ([], None)
+                if known:
+                    ids = ids + [item_id for item_id, _, _ in known]
+                    texts = texts + [text for _, text, _ in known]
+                    metas = metas + [meta for _, _, meta in known]
+                    embeddings = np.concatenate([embeddings, known_vectors.astype(self.compute_dtype, copy=False)])
+                if ids:
+                    callback_result = on_batch(ids, texts, metas, embeddings)
+                    if inspect.isawaitable(callback_result):
+                        await callback_result
+            
+            # Yield to the event loop between chunks
+            await asyncio.sleep(0)
+        
+        elapsed = time.perf_counter() - start
+        self.learning_history.append({
+            "timestamp": datetime.utcnow(),
+            "facts_learned": stored,
+            "context": context,
+            "bulk": True
+        })
+        
+        return {
+            "stored_facts": stored,
+            "skipped_duplicates": duplicates,
+            "batches": batches,
+            "elapsed_seconds": elapsed,
+            "facts_per_second": stored / elapsed if elapsed > 0 else 0.0
+        }
+    
     async def reason(self, query: str,
                     context: str = "general",
                     top_k: int = 5,
@@ -778,23 +1909,22 @@ class EnhancedQuantumHolographicHDAM:
             }
         
         # Encode query
-        query_embedding = self.encode_texts([query])[0]
+        query_embedding = (await self.encode_texts_async([query]))[0]
         
-        if reasoning_mode == "associative":
-            # Standard holographic associative reasoning
-            matches = self.holographic_memory.retrieve(
-                query_embedding, context, top_k, quantum_assisted
-            )
-        elif reasoning_mode == "analytical":
+        if reasoning_mode == "analytical":
             # Analytical reasoning based on logical relationships
-            matches = self._analytical_reasoning(query_embedding, context, top_k)
+            matches = await self._run_memory(
+                self._analytical_reasoning, query_embedding, context, top_k
+            )
         elif reasoning_mode == "creative":
             # Creative reasoning combining multiple concepts
-            matches = self._creative_reasoning(query_embedding, context, top_k)
+            matches = await self._run_memory(
+                self._creative_reasoning, query_embedding, context, top_k
+            )
         else:
-            # Default to associative
-            matches = self.holographic_memory.retrieve(
-                query_embedding, context, top_k, quantum_assisted
+            # Standard holographic associative reasoning (default)
+            matches = await self._run_memory(
+                self.holographic_memory.retrieve, query_embedding, context, top_k, quantum_assisted
             )
         
         if not matches:
@@ -827,6 +1957,37 @@ class EnhancedQuantumHolographicHDAM:
             "matches": matches
         }
     
+    def _search_result(self, query: str, found: Dict[str, Any]) -> Dict[str, Any]:
+        def text(match):
+            return self.local_memory.get(match["id"], {}).get("text", "")
+        return {
+            "query": query,
+            "matches": [
+                {"id": m["id"], "context": m["context"], "similarity": m["similarity"],
+                 "text": text(m), "metadata": m["metadata"]}
+                for m in found["matches"]
+            ],
+            "domains": {
+                context: {"best_similarity": best["similarity"], "best_id": best["id"],
+                          "best_text": text(best), "items": best["items"]}
+                for context, best in found["contexts"].items()
+            },
+        }
+    
+    async def search_contexts(self, query: str, contexts: Optional[List[str]] = None,
+                              top_k: int = 5) -> Dict[str, Any]:
+        """
+        Score a query against many contexts (all when None) in one pass:
+        merged top-k matches plus each context's best similarity.
+        """
+        if not self.local_memory:
+            return {"query": query, "matches": [], "domains": {}}
+        query_embedding = (await self.encode_texts_async([query]))[0]
+        found = await self._run_memory(
+            self.holographic_memory.search_contexts, query_embedding, contexts, top_k
+        )
+        return self._search_result(query, found)
+    
     def _analytical_reasoning(self, query_embedding: np.ndarray, 
                              context: str, top_k: int) -> List[Dict[str, Any]]:
         """
@@ -1008,11 +2169,12 @@ class EnhancedQuantumHolographicHDAM:
             return {"path": [], "objective_value": 0.0, "quantum_accelerated": False}
         
         # Encode goals
-        goal_embeddings = self.encode_texts(goals)
+        goal_embeddings = await self.encode_texts_async(goals)
         
         # Optimize learning path
-        optimized_path = self.holographic_memory.learning_acceleration_path(
-            goal_embeddings.tolist(), max_items, context
+        optimized_path = await self._run_memory(
+            self.holographic_memory.learning_acceleration_path,
+            goal_embeddings, max_items, context
         )
         
         if not optimized_path:
@@ -1051,12 +2213,33 @@ class EnhancedQuantumHolographicHDAM:
             for ctx, items in self.holographic_memory.context_associations.items()
         }
         
+        memory = self.holographic_memory
+        usage = memory.memory_usage()
+        vector_bytes = usage["vector_bytes"]
+        trace_bytes = usage["trace_bytes"]
+        index_bytes = usage["index_bytes"]
+        stored_items = usage["items"]
+        
         return {
             "total_items": total_items,
             "contexts": contexts,
             "items_per_context": context_sizes,
             "learning_events": len(self.learning_history),
-            "quantum_enabled": self.enable_quantum
+            "quantum_enabled": self.enable_quantum,
+            "inference": self.inference.get_metrics(),
+            "precision": self.precision,
+            "vector_bytes": vector_bytes,
+            "trace_bytes": trace_bytes,
+            "bytes_per_item": (vector_bytes + trace_bytes + index_bytes) / stored_items if stored_items else 0.0,
+            "index_bytes": index_bytes,
+            "pinned_bytes": usage["pinned_bytes"],
+            "bytes_per_context": {ctx: stats["bytes"] for ctx, stats in usage["contexts"].items()},
+            "removed_items": usage["removed_items"],
+            "expired_items": usage["expired_items"],
+            "evicted_items": usage["evicted_items"],
+            "compactions": usage["compactions"],
+            "budgets": usage["budgets"],
+            "history_limit": self.learning_history.maxlen
         }
 
     # --- Fallback/Compatibility Methods for existing code ---
@@ -1067,24 +2250,24 @@ class EnhancedQuantumHolographicHDAM:
         asyncio.create_task(self.learn(facts, context=skill))
         
     def cross_domain_reasoning(self, query: str, domains: List[str]) -> dict:
-        """Compatibility wrapper for cross_domain_reasoning"""
-        # Just calls reason, aggregating results across domains if needed
-        # For now, simplest compatibility is just reasoning in 'general' or first domain
-        # Ideally we would reason across all domains and merge
-        # This is a simplified sync wrapper
-        
-        # Since this is likely called synchronously in existing code, we might have issues.
-        # If existing code awaits this, we should make it async.
-        # Checking previous implementation: it was sync.
-        # But learn was async in previous impl.
-        
-        # Let's implement a best-effort sync version or assume it will be awaited if converted.
-        # Given the signature doesn't have async, it's sync.
-        # We can't easily await here. We'll use the sync methods of underlying memory directly if possible,
-        # or just return a placeholder if strict async is required.
-        # However, our new `reason` is async.
-        
-        return {'best_domain': domains[0] if domains else 'general', 'confidence': 0.5}
+        """
+        Compatibility wrapper for cross_domain_reasoning (sync): the domain
+        whose best match scores highest, from one multi-context search.
+        """
+        fallback = domains[0] if domains else 'general'
+        if not self.local_memory:
+            return {'best_domain': fallback, 'confidence': 0.0, 'domain_scores': {}}
+        
+        # The scan runs on the memory thread, like every other memory operation
+        query_embedding = self.encode_texts([query])[0]
+        found = self.memory_executor.submit(
+            self.holographic_memory.search_contexts, query_embedding, domains or None, 0
+        ).result()
+        scores = {context: best["similarity"] for context, best in found["contexts"].items()}
+        if not scores:
+            return {'best_domain': fallback, 'confidence': 0.0, 'domain_scores': {}}
+        best_domain = max(scores, key=scores.get)
+        return {'best_domain': best_domain, 'confidence': scores[best_domain], 'domain_scores': scores}
 
     async def associate_resources(self, resource_id: str, content: str, 
                                  domains: List[str], metadata: Dict = None):
@@ -1094,19 +2277,19 @@ class EnhancedQuantumHolographicHDAM:
 
     async def find_related_resources(self, query: str, domains: List[str] = None, 
                                    top_k: int = 10) -> List[Dict]:
-        """Compatibility wrapper for find_related_resources"""
-        context = domains[0] if domains else "general"
-        result = await self.reason(query, context=context, top_k=top_k)
+        """Compatibility wrapper for find_related_resources (all domains when none are given)"""
+        result = await self.search_contexts(query, contexts=domains or None, top_k=top_k)
         
         # Convert result format to expected list
-        matches = []
-        for m in result.get("matches", []):
-            matches.append({
+        return [
+            {
                 "similarity": m["similarity"],
-                "content": self.local_memory.get(m["id"], {}).get("text", ""),
-                "resource_id": m["id"]
-            })
-        return matches
+                "content": m["text"],
+                "resource_id": m["id"],
+                "domain": m["context"]
+            }
+            for m in result["matches"]
+        ]
 
 # ---------------------------------------------------------------------
 # Convenience initializer
@@ -1114,23 +2297,85 @@ class EnhancedQuantumHolographicHDAM:
 def initialize_hdam(
     supabase_url: Optional[str] = None,
     supabase_key: Optional[str] = None,
-    device: Optional[torch.device] = None,
+    device: Optional["torch.device"] = None,
     enable_quantum: bool = False,
     quantum_backend: str = "dwave",
+    encoder_backend: Optional[str] = None,
+    precision: Optional[str] = None,
 ) -> EnhancedQuantumHolographicHDAM:
     """
     Initialize the enhanced quantum holographic HDAM system.
     Naming kept compatible with previous initialize_hdam.
     """
     return EnhancedQuantumHolographicHDAM(
-        model_name="sentence-transformers/all-MiniLM-L6-v2",
+        model_name=os.getenv("HDAM_MODEL_NAME", DEFAULT_MODEL_NAME),
         supabase_url=supabase_url or os.getenv("SUPABASE_URL"),
         supabase_key=supabase_key or os.getenv("SUPABASE_KEY"),
         device=device,
         enable_quantum=enable_quantum,
         quantum_backend=quantum_backend,
+        encoder_backend=encoder_backend,
+        precision=precision,
     )
 
+# ---------------------------------------------------------------------
+# Shared memory spaces
+# ---------------------------------------------------------------------
+HDAM_ENV_KEYS = [
+    "SUPABASE_URL", "SUPABASE_KEY", "ENABLE_QUANTUM", "HDAM_MODEL_NAME",
+    "HDAM_ENCODER_BACKEND", "HDAM_PRECISION", "HDAM_ONNX_MODEL_DIR", "HDAM_ONNX_QUANTIZE",
+    "HDAM_CONTEXT_MAX_ITEMS", "HDAM_CONTEXT_MAX_MB", "HDAM_ITEM_TTL_SECONDS",
+    "HDAM_SUPABASE_CHUNK_SIZE", "HDAM_SUPABASE_MAX_INFLIGHT", "HDAM_SUPABASE_MAX_RETRIES",
+    "HDAM_SUPABASE_VECTOR_COLUMN",
+]
+
+
+def get_hdam(
+    space: str = "default",
+    supabase_url: Optional[str] = None,
+    supabase_key: Optional[str] = None,
+    enable_quantum: Optional[bool] = None,
+) -> EnhancedQuantumHolographicHDAM:
+    """
+    Process-wide HDAM memory for a named space. The API, PolyMathOS, the
+    learning system and file uploads all use the "default" space, so facts
+    learned through one are visible to the others; other spaces keep
+    separate memories on top of the same shared encoder. A space is built
+    with the config of its first caller and never replaced while live (its
+    facts and threads are shared); later callers passing other settings get
+    the existing space and a logged warning. Use another space name, or
+    integration_registry.reset(f"hdam:{space}"), for a differently
+    configured memory.
+    """
+    if enable_quantum is None:
+        enable_quantum = os.getenv("ENABLE_QUANTUM", "false").lower() == "true"
+    config = {
+        "supabase_url": supabase_url or os.getenv("SUPABASE_URL"),
+        "supabase_key": supabase_key or os.getenv("SUPABASE_KEY"),
+        "enable_quantum": enable_quantum,
+    }
+    return integration_registry.get(f"hdam:{space}", lambda cfg: initialize_hdam(**cfg),
+                                    config=config, env_keys=HDAM_ENV_KEYS, keep_on_change=True)
+
+
+def shared_encode_fn(model_name: str = DEFAULT_MODEL_NAME) -> Optional[Callable[[List[str]], np.ndarray]]:
+    """
+    Encode function over the shared HDAM encoder, or None without a real
+    model. Only the encoder is loaded; no memory space is built.
+    """
+    try:
+        encoder = load_encoder(os.getenv("HDAM_ENCODER_BACKEND", "torch").lower(), model_name)
+    except Exception as e:
+        print(f"Warning: HDAM encoder unavailable: {e}")
+        return None
+
+    def encode(texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, encoder.get_sentence_embedding_dimension()), dtype=np.float32)
+        return encoder.encode(texts, convert_to_numpy=True, show_progress_bar=False, normalize_embeddings=False)
+
+    return encode
+
 # Alias for backward compatibility if needed
 EnhancedHDAM = EnhancedQuantumHolographicHDAM
 HDAM = EnhancedQuantumHolographicHDAM
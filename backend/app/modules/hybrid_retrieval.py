@@ -0,0 +1,777 @@
+"""
+Hybrid Retrieval Engine
+Built-in BM25 + dense retrieval with reciprocal-rank fusion, metadata filters
+and token-budgeted context assembly. Backs the /api/rag/agent/* endpoints.
+
+On-disk layout (index_dir):
+    documents.db            SQLite doc store (text, metadata, length, tombstones,
+                            facets) and the current generation
+    manifest.json           embedding dimension (and generation, informational)
+    postings_<gen>.npz      compacted BM25 postings (CSR: offsets, doc ids, term freqs)
+    vocab.txt               append-only vocabulary, term id = line number
+    delta_<gen>.{docs,terms,tfs}
+                            append-only postings log since the last compaction
+    vectors_<gen>.f32       append-only L2-normalized dense vectors
+
+Files are written before the database commit that makes their rows visible;
+on load, data past the committed documents is ignored. Compaction writes the
+next generation's files and switches to it in the same transaction that drops
+tombstoned rows, so a crash leaves exactly one consistent generation.
+"""
+
+import os
+import re
+import json
+import math
+import sqlite3
+import hashlib
+import logging
+import threading
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens used for BM25 indexing and querying"""
+    return TOKEN_RE.findall(text.lower())
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def _document_id(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+
+
+class _GrowableMatrix:
+    """Row-appendable 2-D array with capacity doubling"""
+
+    def __init__(self, cols: int, dtype=np.float32, rows: Optional[np.ndarray] = None):
+        self.cols = cols
+        self.dtype = dtype
+        self.size = 0
+        self.data = np.zeros((max(1024, 0 if rows is None else len(rows)), cols), dtype=dtype)
+        if rows is not None and len(rows):
+            self.append(rows)
+
+    def append(self, rows: np.ndarray) -> None:
+        needed = self.size + len(rows)
+        if needed > len(self.data):
+            capacity = max(needed, 2 * len(self.data))
+            grown = np.zeros((capacity, self.cols), dtype=self.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:needed] = rows
+        self.size = needed
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+
+class BM25Index:
+    """
+    Inverted index with BM25 scoring over compact postings arrays.
+    Postings live in a compacted CSR segment plus an in-memory delta of
+    array('i')/array('H') per term that is merged on compaction.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab: Dict[str, int] = {}
+        self.terms: List[str] = []
+        # Compacted CSR segment
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.int32)
+        self.tfs = np.zeros(0, dtype=np.uint16)
+        # Uncompacted postings
+        self.delta: Dict[int, Tuple[array, array]] = {}
+        self.delta_count = 0
+        self.doc_lengths = array('I')
+        self.total_length = 0
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.doc_lengths)
+
+    def term_id(self, term: str) -> int:
+        tid = self.vocab.get(term)
+        if tid is None:
+            tid = len(self.terms)
+            self.vocab[term] = tid
+            self.terms.append(term)
+        return tid
+
+    def add_batch(self, start_idx: int, token_lists: List[List[str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Index documents start_idx, start_idx + 1, ...; returns the new
+        (doc, term id, tf) postings so the caller can log them.
+        """
+        vocab_get = self.vocab.get
+        flat = [tid if (tid := vocab_get(token)) is not None else self.term_id(token)
+                for tokens in token_lists for token in tokens]
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+        local_docs = np.repeat(np.arange(len(token_lists), dtype=np.int64), lengths)
+
+        # Unique (doc, term) pairs with their counts
+        n_terms = max(1, len(self.terms))
+        keys = local_docs * n_terms + np.asarray(flat, dtype=np.int64)
+        keys, freqs = np.unique(keys, return_counts=True)
+        docs = (keys // n_terms + start_idx).astype(np.int32)
+        term_ids = (keys % n_terms).astype(np.int32)
+        freqs = np.minimum(freqs, 65535).astype(np.uint16)
+
+        self.add_postings(docs, term_ids, freqs)
+        self.doc_lengths.frombytes(lengths.astype(np.uint32).tobytes())
+        self.total_length += int(lengths.sum())
+        return docs, term_ids, freqs
+
+    def add_postings(self, docs: np.ndarray, term_ids: np.ndarray, freqs: np.ndarray) -> None:
+        """Append (doc, term, tf) triples to the delta postings"""
+        if len(term_ids) == 0:
+            return
+        order = np.argsort(term_ids, kind="stable")
+        term_ids, docs, freqs = term_ids[order], docs[order], freqs[order]
+        boundaries = np.flatnonzero(np.diff(term_ids)) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(term_ids)]))
+        for start, end in zip(starts, ends):
+            tid = int(term_ids[start])
+            entry = self.delta.get(tid)
+            if entry is None:
+                entry = (array('i'), array('H'))
+                self.delta[tid] = entry
+            entry[0].frombytes(docs[start:end].tobytes())
+            entry[1].frombytes(freqs[start:end].tobytes())
+        self.delta_count += len(term_ids)
+
+    def postings(self, tid: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Doc ids and term freqs for a term across both segments"""
+        if tid + 1 < len(self.offsets):
+            start, end = self.offsets[tid], self.offsets[tid + 1]
+            base_docs, base_tfs = self.doc_ids[start:end], self.tfs[start:end]
+        else:
+            base_docs, base_tfs = self.doc_ids[:0], self.tfs[:0]
+        entry = self.delta.get(tid)
+        if entry is None:
+            return base_docs, base_tfs
+        delta_docs = np.frombuffer(entry[0], dtype=np.int32)
+        delta_tfs = np.frombuffer(entry[1], dtype=np.uint16)
+        if len(base_docs) == 0:
+            return delta_docs, delta_tfs
+        return np.concatenate((base_docs, delta_docs)), np.concatenate((base_tfs, delta_tfs))
+
+    def score(self, tokens: List[str], live: np.ndarray) -> np.ndarray:
+        """BM25 score of every document; documents not in `live` score 0"""
+        n_docs = self.num_docs
+        scores = np.zeros(n_docs, dtype=np.float32)
+        if n_docs == 0:
+            return scores
+        doc_lengths = np.frombuffer(self.doc_lengths, dtype=np.uint32)
+        avgdl = self.total_length / n_docs or 1.0
+        for token in set(tokens):
+            tid = self.vocab.get(token)
+            if tid is None:
+                continue
+            docs, freqs = self.postings(tid)
+            df = len(docs)
+            if df == 0:
+                continue
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            tf = freqs.astype(np.float32)
+            norm = self.k1 * (1.0 - self.b + self.b * doc_lengths[docs] / avgdl)
+            scores[docs] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+        scores[~live] = 0.0
+        return scores
+
+    def compact(self) -> None:
+        """Merge the delta postings into the CSR segment"""
+        if not self.delta:
+            return
+        n_terms = len(self.terms)
+        counts = np.zeros(n_terms, dtype=np.int64)
+        base_counts = np.diff(self.offsets)
+        counts[:len(base_counts)] = base_counts
+        for tid, (docs, _) in self.delta.items():
+            counts[tid] += len(docs)
+        offsets = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        doc_ids = np.empty(offsets[-1], dtype=np.int32)
+        tfs = np.empty(offsets[-1], dtype=np.uint16)
+
+        for tid in range(len(base_counts)):
+            start, end = self.offsets[tid], self.offsets[tid + 1]
+            doc_ids[offsets[tid]:offsets[tid] + end - start] = self.doc_ids[start:end]
+            tfs[offsets[tid]:offsets[tid] + end - start] = self.tfs[start:end]
+        for tid, (docs, freqs) in self.delta.items():
+            base = base_counts[tid] if tid < len(base_counts) else 0
+            start = offsets[tid] + base
+            doc_ids[start:start + len(docs)] = np.frombuffer(docs, dtype=np.int32)
+            tfs[start:start + len(freqs)] = np.frombuffer(freqs, dtype=np.uint16)
+
+        self.offsets, self.doc_ids, self.tfs = offsets, doc_ids, tfs
+        self.delta = {}
+        self.delta_count = 0
+
+    def without_documents(self, keep: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The compacted segment with documents outside `keep` dropped and the
+        rest renumbered in order: (offsets, doc ids, term freqs, doc lengths).
+        Call after compact().
+        """
+        renumber = np.cumsum(keep, dtype=np.int64) - 1
+        kept = keep[self.doc_ids]
+        n_terms = len(self.offsets) - 1
+        terms = np.repeat(np.arange(n_terms, dtype=np.int32), np.diff(self.offsets))
+        offsets = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms[kept], minlength=n_terms), out=offsets[1:])
+        doc_ids = renumber[self.doc_ids[kept]].astype(np.int32)
+        lengths = np.frombuffer(self.doc_lengths, dtype=np.uint32)[keep]
+        return offsets, doc_ids, self.tfs[kept], lengths
+
+
+class DenseIndex:
+    """Cosine-similarity index over L2-normalized float32 vectors"""
+
+    def __init__(self, dim: int, vectors: Optional[np.ndarray] = None):
+        self.dim = dim
+        self.matrix = _GrowableMatrix(dim, np.float32, vectors)
+
+    @property
+    def size(self) -> int:
+        return self.matrix.size
+
+    @staticmethod
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.clip(norms, 1e-12, None)
+
+    def pad_to(self, n_docs: int) -> np.ndarray:
+        """Zero rows for documents indexed while no encoder was available"""
+        missing = n_docs - self.size
+        rows = np.zeros((max(0, missing), self.dim), dtype=np.float32)
+        if len(rows):
+            self.matrix.append(rows)
+        return rows
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        rows = self.normalize(vectors)
+        self.matrix.append(rows)
+        return rows
+
+    def score(self, query_vector: np.ndarray, live: np.ndarray) -> np.ndarray:
+        query = self.normalize(query_vector.reshape(1, -1))[0]
+        sims = self.matrix.view() @ query
+        return np.where(live[:len(sims)], sims, -np.inf)
+
+
+def _top_indices(scores: np.ndarray, k: int, floor: float) -> np.ndarray:
+    """Indices of the k highest scores above floor, best first"""
+    candidates = np.flatnonzero(scores > floor)
+    if len(candidates) > k:
+        part = np.argpartition(-scores[candidates], k - 1)[:k]
+        candidates = candidates[part]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class HybridRetrievalEngine:
+    """
+    Persistent hybrid retriever. Documents are upserted by id; BM25 and dense
+    candidates are fused with reciprocal-rank fusion (RRF).
+    """
+
+    def __init__(
+        self,
+        index_dir: str = "./rag_index",
+        encode_fn: Optional[Callable[[List[str]], np.ndarray]] = None,
+        rrf_k: int = 60,
+        compact_threshold: int = 5_000_000,
+        facet_keys: Optional[Iterable[str]] = None,
+        compact_dead_ratio: float = 0.5,
+    ):
+        self.index_dir = index_dir
+        self.encode_fn = encode_fn
+        self.rrf_k = rrf_k
+        self.compact_threshold = compact_threshold
+        # Compact once tombstoned rows reach this share of all rows (0 = never)
+        self.compact_dead_ratio = compact_dead_ratio
+        # Metadata keys usable as filters (None = every scalar metadata value)
+        self.facet_keys = set(facet_keys) if facet_keys is not None else None
+        self._lock = threading.RLock()
+        os.makedirs(index_dir, exist_ok=True)
+
+        self.db = sqlite3.connect(os.path.join(index_dir, "documents.db"), check_same_thread=False)
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                idx INTEGER PRIMARY KEY,
+                doc_id TEXT NOT NULL,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_doc_id ON documents(doc_id);
+            CREATE TABLE IF NOT EXISTS facets (
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                idx INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_facets_key_value ON facets(key, value);
+            CREATE TABLE IF NOT EXISTS index_state (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            """
+        )
+        self.bm25 = BM25Index()
+        self.dense: Optional[DenseIndex] = None
+        self.live = np.zeros(0, dtype=bool)
+        self.generation = 0
+        self.postings_path = self._path("postings_0.npz")
+        self.vectors_path = self._path("vectors_0.f32")
+        # Facet match masks, invalidated on every write
+        self._facet_masks: Dict[Tuple[str, Tuple[str, ...]], np.ndarray] = {}
+        self.max_cached_facets = 64
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    def _delta_paths(self, generation: int) -> Dict[str, str]:
+        return {part: self._path(f"delta_{generation}.{part}") for part in ("docs", "terms", "tfs")}
+
+    def _generation_paths(self, generation: int) -> Tuple[str, str]:
+        """Postings and vectors files of a generation"""
+        return self._path(f"postings_{generation}.npz"), self._path(f"vectors_{generation}.f32")
+
+    def _load(self) -> None:
+        manifest_path = self._path("manifest.json")
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        # Indexes written before the generation moved into the database keep
+        # it in the manifest and use unnumbered postings/vectors files
+        state = self.db.execute("SELECT value FROM index_state WHERE key = 'generation'").fetchone()
+        self.generation = state[0] if state else manifest.get("generation", 0)
+        self.postings_path, self.vectors_path = self._generation_paths(self.generation)
+        if state is None:
+            for legacy, attr in (("postings.npz", "postings_path"), ("vectors.f32", "vectors_path")):
+                if os.path.exists(self._path(legacy)):
+                    setattr(self, attr, self._path(legacy))
+        self._remove_stale_generations()
+
+        if os.path.exists(self._path("vocab.txt")):
+            size = 0
+            with open(self._path("vocab.txt"), encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    self.bm25.term_id(line[:-1])
+                    size += len(line.encode("utf-8"))
+            self._truncate(self._path("vocab.txt"), size)
+
+        if os.path.exists(self.postings_path):
+            with np.load(self.postings_path) as segment:
+                self.bm25.offsets = segment["offsets"]
+                self.bm25.doc_ids = segment["doc_ids"]
+                self.bm25.tfs = segment["tfs"]
+
+        rows = self.db.execute("SELECT length, deleted FROM documents ORDER BY idx").fetchall()
+        if rows:
+            lengths = np.array([r[0] for r in rows], dtype=np.uint32)
+            self.bm25.doc_lengths = array('I', lengths.tobytes())
+            self.bm25.total_length = int(lengths.sum())
+            self.live = np.array([not r[1] for r in rows], dtype=bool)
+
+        # Postings and vectors appended by a batch whose commit never happened
+        # are cut off (the log is in document order)
+        delta = self._delta_paths(self.generation)
+        log = {
+            part: np.fromfile(delta[part], dtype=dtype) if os.path.exists(delta[part]) else np.zeros(0, dtype)
+            for part, dtype in (("docs", np.int32), ("terms", np.int32), ("tfs", np.uint16))
+        }
+        count = int(np.searchsorted(log["docs"][:min(map(len, log.values()))], len(rows)))
+        for part, values in log.items():
+            if os.path.exists(delta[part]):
+                self._truncate(delta[part], count * values.itemsize)
+        self.bm25.add_postings(log["docs"][:count], log["terms"][:count], log["tfs"][:count])
+
+        dim = manifest.get("dim")
+        if dim and os.path.exists(self.vectors_path):
+            vectors = np.fromfile(self.vectors_path, dtype=np.float32)
+            vectors = vectors[:min(len(vectors) // dim, len(rows)) * dim].reshape(-1, dim)
+            self._truncate(self.vectors_path, vectors.nbytes)
+            self.dense = DenseIndex(dim, vectors)
+
+    @staticmethod
+    def _truncate(path: str, size: int) -> None:
+        if os.path.getsize(path) > size:
+            os.truncate(path, size)
+
+    def _remove_stale_generations(self) -> None:
+        """Delete generation files left behind by an interrupted compaction"""
+        pattern = re.compile(r"(?:delta|postings|vectors)_(\d+)\.")
+        for name in os.listdir(self.index_dir):
+            match = pattern.match(name)
+            if match and int(match.group(1)) != self.generation:
+                os.remove(self._path(name))
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "generation": self.generation,
+            "dim": self.dense.dim if self.dense else None,
+            "documents": self.bm25.num_docs,
+        }
+        tmp = self._path("manifest.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._path("manifest.json"))
+
+    def compact(self) -> None:
+        """
+        Merge logged postings into a new generation and reclaim tombstoned
+        documents: their postings, vectors, rows and facets are dropped and
+        the remaining documents renumbered in order.
+        """
+        with self._lock:
+            keep = self.live
+            reclaim = not keep.all()
+            if not self.bm25.delta and not reclaim:
+                return
+            self.bm25.compact()
+            offsets, doc_ids, tfs = self.bm25.offsets, self.bm25.doc_ids, self.bm25.tfs
+            lengths = np.frombuffer(self.bm25.doc_lengths, dtype=np.uint32)
+            vectors = self.dense.matrix.view() if self.dense is not None else None
+            if reclaim:
+                offsets, doc_ids, tfs, lengths = self.bm25.without_documents(keep)
+                if vectors is not None:
+                    vectors = vectors[keep[:len(vectors)]]
+
+            # The next generation's files first...
+            generation = self.generation + 1
+            postings_path, vectors_path = self._generation_paths(generation)
+            tmp = self._path("postings.tmp.npz")
+            np.savez(tmp, offsets=offsets, doc_ids=doc_ids, tfs=tfs)
+            os.replace(tmp, postings_path)
+            if vectors is not None:
+                vectors.tofile(vectors_path)
+
+            # ...then one transaction drops dead rows, renumbers and switches generation
+            try:
+                if reclaim:
+                    self.db.execute("DELETE FROM facets WHERE idx IN (SELECT idx FROM documents WHERE deleted = 1)")
+                    self.db.execute("DELETE FROM documents WHERE deleted = 1")
+                    self.db.execute(
+                        "CREATE TEMP TABLE IF NOT EXISTS renumber (old INTEGER PRIMARY KEY, new INTEGER NOT NULL)"
+                    )
+                    self.db.execute("DELETE FROM temp.renumber")
+                    renumber = np.cumsum(keep) - 1
+                    moved = np.flatnonzero(keep & (renumber != np.arange(len(keep))))
+                    self.db.executemany(
+                        "INSERT INTO temp.renumber (old, new) VALUES (?, ?)",
+                        zip(moved.tolist(), renumber[moved].tolist()),
+                    )
+                    # Negated first so no two rows ever share an idx mid-update
+                    self.db.execute(
+                        "UPDATE documents SET idx = -1 - (SELECT new FROM temp.renumber WHERE old = documents.idx) "
+                        "WHERE idx IN (SELECT old FROM temp.renumber)"
+                    )
+                    self.db.execute("UPDATE documents SET idx = -1 - idx WHERE idx < 0")
+                    self.db.execute(
+                        "UPDATE facets SET idx = (SELECT new FROM temp.renumber WHERE old = facets.idx) "
+                        "WHERE idx IN (SELECT old FROM temp.renumber)"
+                    )
+                self.db.execute(
+                    "INSERT OR REPLACE INTO index_state (key, value) VALUES ('generation', ?)", (generation,)
+                )
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            old_paths = [self.postings_path, self.vectors_path, *self._delta_paths(self.generation).values()]
+            self.generation, self.postings_path, self.vectors_path = generation, postings_path, vectors_path
+            if reclaim:
+                self.bm25.offsets, self.bm25.doc_ids, self.bm25.tfs = offsets, doc_ids, tfs
+                self.bm25.doc_lengths = array('I', lengths.tobytes())
+                self.bm25.total_length = int(lengths.sum(dtype=np.int64))
+                self.live = np.ones(len(lengths), dtype=bool)
+                if vectors is not None:
+                    self.dense = DenseIndex(self.dense.dim, vectors)
+                self._facet_masks.clear()
+            self._write_manifest()
+            for path in old_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _maybe_compact(self) -> None:
+        dead = len(self.live) - int(self.live.sum())
+        if self.bm25.delta_count > self.compact_threshold or (
+                self.compact_dead_ratio > 0 and dead and dead >= self.compact_dead_ratio * len(self.live)):
+            self.compact()
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+    def index_documents(
+        self,
+        documents: List[str],
+        metadata: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        vectors: Optional[np.ndarray] = None,
+    ) -> List[str]:
+        """
+        Upsert documents; re-indexing an existing id replaces it.
+        Precomputed embeddings may be passed as vectors to skip encoding.
+        """
+        if not documents:
+            return []
+        ids = ids or [_document_id(text) for text in documents]
+        metadata = metadata or [{} for _ in documents]
+
+        if vectors is None and self.encode_fn is not None:
+            vectors = self.encode_fn(list(documents))
+        if vectors is not None:
+            vectors = np.asarray(vectors, dtype=np.float32)
+
+        with self._lock:
+            self._tombstone(ids)
+            self._facet_masks.clear()
+            start_idx = self.bm25.num_docs
+            known_terms = len(self.bm25.terms)
+            token_lists = [tokenize(text) for text in documents]
+            log_docs, log_terms, log_tfs = self.bm25.add_batch(start_idx, token_lists)
+
+            rows, facets = [], []
+            for offset, (doc_id, text, meta, tokens) in enumerate(zip(ids, documents, metadata, token_lists)):
+                idx = start_idx + offset
+                meta = meta or {}
+                rows.append((idx, doc_id, text, json.dumps(meta), len(tokens)))
+                for key, value in meta.items():
+                    if self.facet_keys is not None and key not in self.facet_keys:
+                        continue
+                    for item in (value if isinstance(value, list) else [value]):
+                        if isinstance(item, (str, int, float, bool)):
+                            facets.append((key, json.dumps(item), idx))
+
+            self.live = np.concatenate((self.live, np.ones(len(ids), dtype=bool)))
+            self.db.executemany(
+                "INSERT INTO documents (idx, doc_id, text, metadata, length) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self.db.executemany("INSERT INTO facets (key, value, idx) VALUES (?, ?, ?)", facets)
+
+            # Append-only persistence of new vocabulary, postings and vectors,
+            # all written before the commit that makes the rows visible
+            with open(self._path("vocab.txt"), "a", encoding="utf-8") as f:
+                for term in self.bm25.terms[known_terms:]:
+                    f.write(term + "\n")
+            delta = self._delta_paths(self.generation)
+            for part, values in (("docs", log_docs), ("terms", log_terms), ("tfs", log_tfs)):
+                with open(delta[part], "ab") as f:
+                    f.write(values.tobytes())
+
+            if vectors is not None:
+                if self.dense is None:
+                    self.dense = DenseIndex(vectors.shape[1])
+                padding = self.dense.pad_to(start_idx)
+                added = self.dense.add(vectors)
+                with open(self.vectors_path, "ab") as f:
+                    f.write(padding.tobytes())
+                    f.write(added.tobytes())
+            self._write_manifest()
+            self.db.commit()
+
+            self._maybe_compact()
+        return ids
+
+    def _tombstone(self, ids: Iterable[str]) -> int:
+        ids = list(ids)
+        if not ids:
+            return 0
+        placeholders = ",".join("?" * len(ids))
+        rows = self.db.execute(
+            f"SELECT idx FROM documents WHERE deleted = 0 AND doc_id IN ({placeholders})", ids
+        ).fetchall()
+        if not rows:
+            return 0
+        idxs = [r[0] for r in rows]
+        self.live[idxs] = False
+        self.db.execute(
+            f"UPDATE documents SET deleted = 1 WHERE idx IN ({','.join('?' * len(idxs))})", idxs
+        )
+        return len(idxs)
+
+    def delete_documents(self, ids: List[str]) -> int:
+        """Remove documents by id"""
+        with self._lock:
+            removed = self._tombstone(ids)
+            self._facet_masks.clear()
+            self.db.commit()
+            self._maybe_compact()
+            return removed
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+    def _filter_mask(self, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Live documents matching all filters (list values mean any-of)"""
+        mask = self.live.copy()
+        for key, value in (filters or {}).items():
+            values = tuple(json.dumps(v) for v in (value if isinstance(value, list) else [value]))
+            key_mask = self._facet_masks.get((key, values))
+            if key_mask is None:
+                placeholders = ",".join("?" * len(values))
+                idxs = np.fromiter(
+                    (r[0] for r in self.db.execute(
+                        f"SELECT idx FROM facets WHERE key = ? AND value IN ({placeholders})", [key, *values]
+                    )),
+                    dtype=np.int64,
+                )
+                key_mask = np.zeros_like(mask)
+                key_mask[idxs] = True
+                if len(self._facet_masks) >= self.max_cached_facets:
+                    self._facet_masks.clear()
+                self._facet_masks[(key, values)] = key_mask
+            mask &= key_mask
+        return mask
+
+    def query(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: str = "hybrid",
+        candidate_pool: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retrieve top_k documents; mode is "hybrid", "bm25" or "dense" """
+        pool = candidate_pool or max(top_k * 4, 50)
+        query_vector = None
+        if mode in ("hybrid", "dense") and self.encode_fn is not None:
+            query_vector = np.asarray(self.encode_fn([query]), dtype=np.float32)[0]
+
+        with self._lock:
+            live = self._filter_mask(filters)
+            ranked: List[np.ndarray] = []
+            bm25_scores = dense_scores = None
+
+            if mode in ("hybrid", "bm25"):
+                bm25_scores = self.bm25.score(tokenize(query), live)
+                ranked.append(_top_indices(bm25_scores, pool, 0.0))
+            if query_vector is not None and self.dense is not None and self.dense.size:
+                dense_scores = self.dense.score(query_vector, live)
+                ranked.append(_top_indices(dense_scores, pool, -np.inf))
+
+            fused: Dict[int, float] = {}
+            for ranking in ranked:
+                for rank, idx in enumerate(ranking.tolist()):
+                    fused[idx] = fused.get(idx, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+            best = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
+            if not best:
+                return []
+            rows = self._rows([idx for idx, _ in best])
+
+        results = []
+        for idx, score in best:
+            _, doc_id, text, meta = rows[idx]
+            result = {"id": doc_id, "text": text, "metadata": json.loads(meta), "score": score}
+            if bm25_scores is not None:
+                result["bm25_score"] = float(bm25_scores[idx])
+            if dense_scores is not None and idx < len(dense_scores):
+                result["dense_score"] = float(dense_scores[idx])
+            results.append(result)
+        return results
+
+    def _rows(self, idxs: List[int]) -> Dict[int, Tuple]:
+        return {
+            r[0]: r for r in self.db.execute(
+                f"SELECT idx, doc_id, text, metadata FROM documents WHERE idx IN ({','.join('?' * len(idxs))})",
+                idxs,
+            )
+        }
+
+    def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a live document by id"""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT doc_id, text, metadata FROM documents WHERE doc_id = ? AND deleted = 0", (doc_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "text": row[1], "metadata": json.loads(row[2])}
+
+    def similar(
+        self,
+        doc_id: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Nearest neighbours of a stored document by its dense vector"""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT idx FROM documents WHERE doc_id = ? AND deleted = 0", (doc_id,)
+            ).fetchone()
+            if row is None or self.dense is None or row[0] >= self.dense.size:
+                return []
+            live = self._filter_mask(filters)
+            live[row[0]] = False
+            scores = self.dense.score(self.dense.matrix.view()[row[0]], live)
+            best = _top_indices(scores, top_k, -np.inf)
+            if len(best) == 0:
+                return []
+            rows = self._rows(best.tolist())
+
+        results = []
+        for idx in best.tolist():
+            _, other_id, text, meta = rows[idx]
+            results.append({"id": other_id, "text": text, "metadata": json.loads(meta), "dense_score": float(scores[idx])})
+        return results
+
+    def get_context(
+        self,
+        query: str,
+        max_tokens: int = 2000,
+        filters: Optional[Dict[str, Any]] = None,
+        separator: str = "\n\n---\n\n",
+    ) -> str:
+        """Concatenate the best chunks until the token budget is spent"""
+        parts: List[str] = []
+        used = 0
+        for result in self.query(query, top_k=max(5, max_tokens // 100), filters=filters):
+            cost = estimate_tokens(result["text"]) + (estimate_tokens(separator) if parts else 0)
+            if used + cost > max_tokens:
+                remaining = max_tokens - used
+                if remaining > 32:
+                    parts.append(result["text"][:remaining * 4])
+                break
+            parts.append(result["text"])
+            used += cost
+        return separator.join(parts)
+
+    def close(self) -> None:
+        with self._lock:
+            self.db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": int(self.live.sum()),
+            "tombstoned": int(len(self.live) - self.live.sum()),
+            "terms": len(self.bm25.terms),
+            "compacted_postings": int(len(self.bm25.doc_ids)),
+            "delta_postings": self.bm25.delta_count,
+            "dense_vectors": self.dense.size if self.dense else 0,
+            "generation": self.generation,
+        }
@@ -0,0 +1,287 @@
+"""
+Streaming Document Ingestion
+Upload -> spool to disk in fixed-size reads -> page-by-page extraction in a
+process pool (cached by content hash, see extraction.py) -> token-bounded
+overlapping chunks -> content-hash dedup -> micro-batched embedding into HDAM
+and the hybrid RAG index.
+Stages are connected by bounded queues so memory stays flat for large files.
+"""
+
+import os
+import time
+import codecs
+import asyncio
+import hashlib
+import inspect
+import logging
+import tempfile
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from .extraction import ExtractionService, get_extraction_service
+from .hybrid_retrieval import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_BYTES = 1 << 20
+
+
+# ---------------------------------------------------------------------
+# Chunking
+# ---------------------------------------------------------------------
+class TextChunker:
+    """
+    Streaming splitter into chunks of at most max_tokens (estimated) tokens,
+    each repeating the last overlap_tokens of its predecessor. Text may be fed
+    in arbitrary pieces; words split across pieces are rejoined.
+    """
+
+    def __init__(self, max_tokens: int = 256, overlap_tokens: int = 32):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.words: deque = deque()  # (word, tokens, page)
+        self.tokens = 0
+        self.fresh = 0  # words not yet emitted in any chunk
+        self.partial = ""
+        self.partial_page = None
+
+    def _emit(self) -> Tuple[str, Dict[str, Any]]:
+        text = " ".join(word for word, _, _ in self.words)
+        meta = {"page": self.words[0][2], "tokens": self.tokens}
+        while self.words and self.tokens > self.overlap_tokens:
+            _, cost, _ = self.words.popleft()
+            self.tokens -= cost
+        self.fresh = 0
+        return text, meta
+
+    def _add(self, word: str, page: Optional[int]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        cost = estimate_tokens(word)
+        if self.tokens + cost > self.max_tokens and self.fresh:
+            yield self._emit()
+        self.words.append((word, cost, page))
+        self.tokens += cost
+        self.fresh += 1
+
+    def feed(self, text: str, page: Optional[int] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        if self.partial:
+            text = self.partial + text
+            page = self.partial_page if self.partial_page is not None else page
+        words = text.split()
+        self.partial = ""
+        if words and not text[-1].isspace():
+            self.partial, self.partial_page = words.pop(), page
+        for word in words:
+            yield from self._add(word, page)
+
+    def flush(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        if self.partial:
+            yield from self._add(self.partial, self.partial_page)
+            self.partial = ""
+        if self.fresh:
+            yield self._emit()
+        self.words.clear()
+        self.tokens = 0
+
+
+# ---------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------
+class StageMetrics:
+    """Per-stage counters and busy time"""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def add(self, stage: str, seconds: float, **counts) -> None:
+        entry = self.stages.setdefault(stage, {"seconds": 0.0})
+        entry["seconds"] += seconds
+        for key, value in counts.items():
+            entry[key] = entry.get(key, 0) + value
+
+    def set_max(self, stage: str, key: str, value: float) -> None:
+        entry = self.stages.setdefault(stage, {"seconds": 0.0})
+        entry[key] = max(entry.get(key, 0), value)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for stage, entry in self.stages.items():
+            entry = dict(entry)
+            for key in ("bytes", "pages", "chunks"):
+                if key in entry and entry["seconds"] > 0:
+                    entry[f"{key}_per_second"] = entry[key] / entry["seconds"]
+            summary[stage] = entry
+        return summary
+
+
+async def spool_upload(reader, chunk_bytes: int = READ_CHUNK_BYTES, suffix: str = "") -> Tuple[str, str, int]:
+    """
+    Copy an upload (UploadFile or any object with a sync/async read(n)) to a
+    temp file in fixed-size reads. Returns (path, md5 hex digest, size).
+    """
+    digest = hashlib.md5()
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        while True:
+            block = reader.read(chunk_bytes)
+            if inspect.isawaitable(block):
+                block = await block
+            if not block:
+                break
+            digest.update(block)
+            tmp.write(block)
+            size += len(block)
+    return tmp.name, digest.hexdigest(), size
+
+
+class IngestionPipeline:
+    """Streams one file into HDAM (and optionally the RAG index)"""
+
+    def __init__(
+        self,
+        hdam,
+        rag_engine=None,
+        chunk_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        extractor: Optional[ExtractionService] = None,
+    ):
+        self.hdam = hdam
+        self.rag_engine = rag_engine
+        self.chunk_tokens = chunk_tokens or int(os.getenv("INGEST_CHUNK_TOKENS", "256"))
+        self.overlap_tokens = overlap_tokens if overlap_tokens is not None else int(os.getenv("INGEST_CHUNK_OVERLAP", "32"))
+        self.batch_size = batch_size or int(os.getenv("INGEST_BATCH_SIZE", "64"))
+        self.queue_size = queue_size or int(os.getenv("INGEST_QUEUE_SIZE", "256"))
+        self.extractor = extractor or get_extraction_service()
+
+    async def _text_segments(self, path: str, metrics: StageMetrics) -> AsyncIterator[Tuple[str, Optional[int]]]:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        with open(path, "rb") as f:
+            while True:
+                t0 = time.perf_counter()
+                block = f.read(READ_CHUNK_BYTES)
+                text = decoder.decode(block, final=not block)
+                metrics.add("extract", time.perf_counter() - t0, bytes=len(block))
+                if text:
+                    yield text, None
+                if not block:
+                    break
+
+    def _segments(self, path: str, filename: str, digest: Optional[str], metrics: StageMetrics):
+        if self.extractor.kind(os.path.splitext(filename)[1].lower()):
+            return self.extractor.segments(path, filename, digest, metrics)
+        return self._text_segments(path, metrics)
+
+    async def ingest_file(
+        self,
+        path: str,
+        filename: str,
+        domains: List[str],
+        metadata: Optional[Dict] = None,
+        resource_id: Optional[str] = None,
+        metrics: Optional[StageMetrics] = None,
+        digest: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Extract, chunk and store a file already on disk. digest is the file's
+        md5, when already known, for the extraction cache.
+        """
+        metrics = metrics or StageMetrics()
+        extension = os.path.splitext(filename)[1].lower()
+        context = domains[0] if domains else "general"
+        base_meta = {"resource_id": resource_id, "filename": filename, "file_type": extension,
+                     "domains": domains, **(metadata or {})}
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        seen = set()
+
+        async def produce():
+            chunker = TextChunker(self.chunk_tokens, self.overlap_tokens)
+            chunk_index = 0
+
+            async def put(chunks):
+                nonlocal chunk_index
+                for text, chunk_meta in chunks:
+                    content_hash = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+                    if content_hash in seen:
+                        metrics.add("chunk", 0.0, duplicates=1)
+                        continue
+                    seen.add(content_hash)
+                    t0 = time.perf_counter()
+                    await queue.put((text, {**base_meta, **chunk_meta, "chunk_index": chunk_index}))
+                    metrics.add("queue", time.perf_counter() - t0)
+                    metrics.set_max("queue", "max_depth", queue.qsize())
+                    chunk_index += 1
+
+            try:
+                async for text, page in self._segments(path, filename, digest, metrics):
+                    t0 = time.perf_counter()
+                    chunks = list(chunker.feed(text, page))
+                    metrics.add("chunk", time.perf_counter() - t0, chunks=len(chunks))
+                    await put(chunks)
+                chunks = list(chunker.flush())
+                metrics.add("chunk", 0.0, chunks=len(chunks))
+                await put(chunks)
+            finally:
+                await queue.put(None)
+
+        async def consume():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                yield item
+
+        async def index_batch(ids, texts, metas, embeddings):
+            if self.rag_engine is None:
+                return
+            t0 = time.perf_counter()
+            vectors = embeddings if self.rag_engine.encode_fn is not None else None
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.rag_engine.index_documents, texts, metas, ids, vectors)
+            metrics.add("index", time.perf_counter() - t0, chunks=len(ids))
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            result = await self.hdam.learn_stream(
+                consume(), batch_size=self.batch_size, context=context, on_batch=index_batch,
+                # Chunks HDAM already holds still go to the RAG engine, whose
+                # index may have been cleared since; upserts by id are idempotent
+                include_known=self.rag_engine is not None
+            )
+        except BaseException:
+            producer.cancel()
+            raise
+        await producer
+
+        # learn_stream time includes waiting on the producer; index time is reported separately
+        embed_seconds = result["elapsed_seconds"] - metrics.stages.get("index", {}).get("seconds", 0.0)
+        metrics.add("embed", embed_seconds, chunks=result["stored_facts"], batches=result["batches"])
+        return {
+            "resource_id": resource_id,
+            "filename": filename,
+            "chunks": len(seen),
+            "stored_chunks": result["stored_facts"],
+            "skipped_duplicates": result["skipped_duplicates"] + int(metrics.stages.get("chunk", {}).get("duplicates", 0)),
+            "metrics": metrics.summary(),
+        }
+
+    async def ingest_upload(
+        self,
+        reader,
+        filename: str,
+        domains: List[str],
+        metadata: Optional[Dict] = None,
+    ) -> Dict[str, Any]:
+        """Spool an upload to disk in chunks, then stream it through the pipeline"""
+        metrics = StageMetrics()
+        t0 = time.perf_counter()
+        path, digest, size = await spool_upload(reader, suffix=os.path.splitext(filename)[1])
+        metrics.add("read", time.perf_counter() - t0, bytes=size)
+        try:
+            return await self.ingest_file(
+                path, filename, domains, metadata, resource_id=digest, metrics=metrics, digest=digest
+            )
+        finally:
+            os.unlink(path)
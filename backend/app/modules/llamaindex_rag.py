@@ -1,24 +1,142 @@
 """
 LlamaIndex RAG System
-Document indexing and querying using LlamaIndex with VectorStoreIndex
+Document indexing and querying using LlamaIndex with VectorStoreIndex.
+The index is persisted under persist_dir and refreshed incrementally: only
+files whose size/mtime and content hash changed are re-embedded.
 """
 
 import os
+import json
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 # Try to import LlamaIndex
 try:
-    from llama_index.core import SimpleDirectoryReader, VectorStoreIndex
+    from llama_index.core import (
+        Settings,
+        SimpleDirectoryReader,
+        StorageContext,
+        VectorStoreIndex,
+        load_index_from_storage
+    )
+    from llama_index.core.indices.utils import embed_nodes
+    from llama_index.core.ingestion.pipeline import run_transformations
+    from llama_index.core.storage.docstore import SimpleDocumentStore
+    from llama_index.core.storage.index_store import SimpleIndexStore
+    from llama_index.core.vector_stores.simple import SimpleVectorStore, SimpleVectorStoreData
     LLAMAINDEX_AVAILABLE = True
 except ImportError:
     LLAMAINDEX_AVAILABLE = False
     logger.warning("LlamaIndex not available. Install: pip install llama-index llama-index-core")
+    Settings = None
     SimpleDirectoryReader = None
+    StorageContext = None
     VectorStoreIndex = None
+    load_index_from_storage = None
+    embed_nodes = None
+    run_transformations = None
+    SimpleDocumentStore = None
+    SimpleIndexStore = None
+    SimpleVectorStore = None
+    SimpleVectorStoreData = None
+
+
+def _file_hash(path: Path, chunk_bytes: int = 1 << 20) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_bytes), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileManifest:
+    """
+    Tracks size, mtime, content hash and indexed doc ids for every file in
+    a data directory, so a refresh only touches files that actually changed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                self.files = json.loads(self.path.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+
+    def scan(
+        self,
+        data_dir: Path,
+        recursive: bool = True,
+        required_exts: Optional[List[str]] = None,
+        exclude_hidden: bool = True
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Compare data_dir with the manifest.
+
+        Returns:
+            (changed, removed): new or modified files, and files that are gone
+        """
+        pattern = "**/*" if recursive else "*"
+        data_dir = Path(data_dir).resolve()
+        current = {}
+        for path in data_dir.glob(pattern):
+            if not path.is_file():
+                continue
+            rel = path.relative_to(data_dir)
+            if exclude_hidden and any(part.startswith(".") for part in rel.parts):
+                continue
+            if required_exts and path.suffix not in required_exts:
+                continue
+            # Absolute keys, so they match the file_path the reader reports
+            current[str(path)] = path
+
+        changed = []
+        for key, path in current.items():
+            stat = path.stat()
+            entry = self.files.get(key)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                continue
+            digest = _file_hash(path)
+            if entry and entry["hash"] == digest:
+                # Touched but identical: remember the new mtime, skip re-embedding
+                entry["mtime"] = stat.st_mtime
+                continue
+            changed.append(key)
+
+        removed = [key for key in self.files if key not in current]
+        return changed, removed
+
+    def record(self, key: str, doc_ids: List[str]) -> None:
+        path = Path(key)
+        stat = path.stat()
+        self.files[key] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "hash": _file_hash(path),
+            "doc_ids": doc_ids
+        }
+
+    def doc_ids(self, key: str) -> List[str]:
+        entry = self.files.get(key)
+        return entry["doc_ids"] if entry else []
+
+    def forget(self, key: str) -> None:
+        self.files.pop(key, None)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.files))
+        os.replace(tmp, self.path)
 
 
 class LlamaIndexRAG:
@@ -32,6 +150,18 @@ class LlamaIndexRAG:
         self.available = LLAMAINDEX_AVAILABLE
         self.index = None
         self.data_dir = self.config.get("data_dir", "docs")
+        self.persist_dir = Path(
+            self.config.get("persist_dir") or os.getenv("LLAMAINDEX_PERSIST_DIR", "./cache/llamaindex")
+        )
+        self.refresh_interval = float(
+            self.config.get("refresh_interval", os.getenv("LLAMAINDEX_REFRESH_INTERVAL", "300"))
+        )
+        self.manifest = FileManifest(self.persist_dir / "manifest.json")
+        self._refresh_lock = threading.Lock()
+        # Guards self.index against the refresher swapping or editing it mid-query
+        self._index_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
         
         if not self.available:
             logger.warning("LlamaIndex not available")
@@ -41,25 +171,154 @@ class LlamaIndexRAG:
             # Initialize index from data directory
             data_path = Path(self.data_dir)
             if data_path.exists():
-                documents = SimpleDirectoryReader(
-                    self.data_dir,
-                    filename_as_id=self.config.get("filename_as_id", True),
-                    recursive=self.config.get("recursive", True),
-                    required_exts=self.config.get("required_exts"),
-                    exclude_hidden=self.config.get("exclude_hidden", True)
-                ).load_data()
-                
-                self.index = VectorStoreIndex.from_documents(
-                    documents,
-                    similarity_top_k=self.config.get("similarity_top_k", 10)
+                self._load_persisted()
+                stats = self.refresh()
+                logger.info(
+                    f"LlamaIndex RAG initialized with {len(self.manifest.files)} files "
+                    f"({stats['updated']} re-embedded, {stats['removed']} removed)"
                 )
-                logger.info(f"LlamaIndex RAG initialized with {len(documents)} documents")
+                self._start_refresher()
             else:
                 logger.warning(f"Data directory not found: {self.data_dir}")
         except Exception as e:
             logger.error(f"Failed to initialize LlamaIndex RAG: {e}")
             self.available = False
     
+    def _persist(self) -> None:
+        """
+        Persist the docstore and index store as usual, but write embeddings
+        as a float32 matrix: SimpleVectorStore's JSON decodes every float
+        through dataclasses_json, which dominates warm startup.
+        """
+        storage_context = self.index.storage_context
+        self.persist_dir.mkdir(parents=True, exist_ok=True)
+        storage_context.docstore.persist(persist_path=str(self.persist_dir / "docstore.json"))
+        storage_context.index_store.persist(persist_path=str(self.persist_dir / "index_store.json"))
+        
+        data = storage_context.vector_store.data
+        ids = list(data.embedding_dict)
+        vectors = np.asarray([data.embedding_dict[i] for i in ids], dtype=np.float32)
+        with open(self.persist_dir / "vectors.npy", "wb") as f:
+            np.save(f, vectors)
+        (self.persist_dir / "vector_meta.json").write_text(json.dumps({
+            "ids": ids,
+            "text_id_to_ref_doc_id": data.text_id_to_ref_doc_id,
+            "metadata_dict": data.metadata_dict
+        }))
+    
+    def _load_persisted(self) -> None:
+        """Reload the persisted index; fall back to a full rebuild if it is unusable"""
+        if not (self.persist_dir / "vector_meta.json").exists():
+            self.manifest.files = {}
+            return
+        try:
+            meta = json.loads((self.persist_dir / "vector_meta.json").read_text())
+            vectors = np.load(self.persist_dir / "vectors.npy")
+            vector_store = SimpleVectorStore(data=SimpleVectorStoreData(
+                embedding_dict=dict(zip(meta["ids"], vectors.tolist())),
+                text_id_to_ref_doc_id=meta["text_id_to_ref_doc_id"],
+                metadata_dict=meta["metadata_dict"]
+            ))
+            storage_context = StorageContext.from_defaults(
+                docstore=SimpleDocumentStore.from_persist_dir(str(self.persist_dir)),
+                index_store=SimpleIndexStore.from_persist_dir(str(self.persist_dir)),
+                vector_store=vector_store
+            )
+            index = load_index_from_storage(storage_context)
+            with self._index_lock:
+                self.index = index
+        except Exception as e:
+            logger.warning(f"Persisted LlamaIndex unusable, rebuilding: {e}")
+            self.index = None
+            self.manifest.files = {}
+    
+    def _read_files(self, files: List[str]) -> List[Any]:
+        return SimpleDirectoryReader(
+            input_files=files,
+            filename_as_id=self.config.get("filename_as_id", True),
+            exclude_hidden=self.config.get("exclude_hidden", True)
+        ).load_data()
+    
+    def refresh(self) -> Dict[str, int]:
+        """
+        Re-embed new or modified files, drop deleted ones and persist the
+        index. Unchanged files are never re-read.
+        """
+        stats = {"updated": 0, "removed": 0}
+        if not self.available or not Path(self.data_dir).exists():
+            return stats
+        
+        with self._refresh_lock:
+            changed, removed = self.manifest.scan(
+                Path(self.data_dir),
+                recursive=self.config.get("recursive", True),
+                required_exts=self.config.get("required_exts"),
+                exclude_hidden=self.config.get("exclude_hidden", True)
+            )
+            
+            documents = self._read_files(changed) if changed else []
+            if self.index is None:
+                index = VectorStoreIndex.from_documents(
+                    documents,
+                    similarity_top_k=self.config.get("similarity_top_k", 10)
+                )
+                with self._index_lock:
+                    self.index = index
+            else:
+                # Chunk and embed before taking the lock so queries keep running
+                nodes = run_transformations(documents, Settings.transformations) if documents else []
+                embeddings = embed_nodes(nodes, Settings.embed_model) if nodes else {}
+                for node in nodes:
+                    node.embedding = embeddings[node.node_id]
+                with self._index_lock:
+                    for key in changed + removed:
+                        for doc_id in self.manifest.doc_ids(key):
+                            self.index.delete_ref_doc(doc_id, delete_from_docstore=True)
+                    self.index.insert_nodes(nodes)
+            for key in removed:
+                self.manifest.forget(key)
+            
+            doc_ids: Dict[str, List[str]] = {key: [] for key in changed}
+            for document in documents:
+                file_path = document.metadata.get("file_path")
+                key = str(Path(file_path).resolve()) if file_path else None
+                if key in doc_ids:
+                    doc_ids[key].append(document.doc_id)
+            for key, ids in doc_ids.items():
+                self.manifest.record(key, ids)
+            
+            if changed or removed or not (self.persist_dir / "vector_meta.json").exists():
+                with self._index_lock:
+                    self._persist()
+            self.manifest.save()
+            
+            stats = {"updated": len(changed), "removed": len(removed)}
+        if stats["updated"] or stats["removed"]:
+            logger.info(f"LlamaIndex refreshed: {stats['updated']} updated, {stats['removed']} removed")
+        return stats
+    
+    def _start_refresher(self) -> None:
+        """Keep the loaded index in sync with data_dir in the background"""
+        if self.refresh_interval <= 0 or self._refresher is not None:
+            return
+        
+        def loop():
+            while not self._stop.wait(self.refresh_interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning(f"LlamaIndex background refresh failed: {e}")
+        
+        self._refresher = threading.Thread(target=loop, name="llamaindex-refresh", daemon=True)
+        self._refresher.start()
+    
+    def close(self) -> None:
+        """Stop the background refresher"""
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join(timeout=5)
+            self._refresher = None
+    
     async def execute(
         self,
         task: str,
@@ -83,16 +342,19 @@ class LlamaIndexRAG:
                 "message": "LlamaIndex RAG not available or no documents indexed"
             }
         
+        def query():
+            # The refresher edits the index in place; hold it still for the query
+            with self._index_lock:
+                query_engine = self.index.as_query_engine(
+                    similarity_top_k=pattern_config.get("similarity_top_k", 10),
+                    streaming=pattern_config.get("streaming", False),
+                    response_mode=pattern_config.get("response_mode", "compact")
+                )
+                return query_engine.query(task)
+        
         try:
-            # Get query engine
-            query_engine = self.index.as_query_engine(
-                similarity_top_k=pattern_config.get("similarity_top_k", 10),
-                streaming=pattern_config.get("streaming", False),
-                response_mode=pattern_config.get("response_mode", "compact")
-            )
-            
-            # Execute query
-            response = query_engine.query(task)
+            # Off the event loop, so waiting on a refresh never stalls it
+            response = await asyncio.to_thread(query)
             
             return {
                 "status": "success",
@@ -5,9 +5,13 @@ Each agent's output is passed to the next, refining the result progressively.
 Supports parallel execution, dynamic agent selection, and custom result aggregation.
 """
 
+import os
+import time
+import asyncio
 import logging
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from collections import Counter
 
 logger = logging.getLogger(__name__)
@@ -32,6 +36,27 @@ except ImportError:
             return f"[Agent {self.agent_name} would process: {task[:100]}...]"
 
 
+_agent_executor: Optional[ThreadPoolExecutor] = None
+_agent_executor_lock = threading.Lock()
+
+
+def get_agent_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by all MonteCarloSwarm runs"""
+    global _agent_executor
+    with _agent_executor_lock:
+        if _agent_executor is None:
+            _agent_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("MONTE_CARLO_MAX_WORKERS", "16")),
+                thread_name_prefix="monte-carlo"
+            )
+    return _agent_executor
+
+
+def normalize_vote(result: Any) -> str:
+    """Vote key: whitespace- and case-insensitive string form of a result"""
+    return " ".join(str(result).split()).lower()
+
+
 class MonteCarloSwarm(BaseSwarm):
     """
     MonteCarloSwarm leverages multiple agents to collaborate in a Monte Carlo fashion.
@@ -125,21 +150,170 @@ class MonteCarloSwarm(BaseSwarm):
             List[Any]: A list of results from each agent.
         """
         results = []
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_agent = {
-                executor.submit(agent.run, task): agent
-                for agent in self.agents
-            }
-            for future in as_completed(future_to_agent):
-                try:
-                    result = future.result()
-                    results.append(result)
-                    logger.info(f"Agent completed with result: {result}")
-                except Exception as e:
-                    logger.error(f"Agent encountered an error: {e}")
-                    results.append(None)
+        executor = get_agent_executor()
+        future_to_agent = {
+            executor.submit(agent.run, task): agent
+            for agent in self.agents
+        }
+        for future in as_completed(future_to_agent):
+            try:
+                result = future.result()
+                results.append(result)
+                logger.info(f"Agent completed with result: {result}")
+            except Exception as e:
+                logger.error(f"Agent encountered an error: {e}")
+                results.append(None)
         return results
 
+    async def run_streaming(
+        self,
+        task: str,
+        sample_budget: Optional[int] = None,
+        quorum: Optional[int] = None,
+        confidence: Optional[float] = None,
+        min_samples: int = 3,
+        consensus: bool = False,
+        max_concurrency: Optional[int] = None,
+        vote_key: Callable[[Any], str] = normalize_vote,
+    ) -> Dict[str, Any]:
+        """
+        Sample agents in parallel and aggregate votes as results arrive,
+        stopping as soon as the outcome is settled. Samples not yet started
+        are cancelled; calls already running cannot be interrupted, so they
+        are abandoned (their results ignored) and reported separately, since
+        they keep holding threads of the shared agent pool until they return.
+
+        Stops when any of these holds:
+            - the leading answer has `quorum` votes
+            - at least `min_samples` votes are in and the leader's share is >= `confidence`
+            - the leader cannot be overtaken by the remaining budget
+            - consensus=True and two answers disagree (no consensus possible)
+
+        Args:
+            task (str): The input every sample receives.
+            sample_budget (Optional[int]): Max agent calls; agents are reused
+                round-robin (never concurrently) when it exceeds len(agents).
+                Defaults to len(agents).
+            quorum (Optional[int]): Votes needed for the leader to win outright.
+            confidence (Optional[float]): Leader vote share needed to stop early.
+            min_samples (int): Votes required before the confidence rule
+                applies; ignored without `confidence`.
+            consensus (bool): Require unanimity instead of a majority.
+            max_concurrency (Optional[int]): Samples in flight at once. Defaults
+                to a bare majority of the budget (all agents for consensus), so
+                calls that an early stop would make redundant are never started.
+            vote_key (Callable[[Any], str]): Maps a result to its vote.
+
+        Returns:
+            Dict[str, Any]: result, votes, samples used and launched vs budget,
+            cancelled and abandoned samples, stop reason, latency.
+        """
+        budget = sample_budget or len(self.agents)
+        if max_concurrency is None:
+            max_concurrency = len(self.agents) if consensus else budget // 2 + 1
+        loop = asyncio.get_running_loop()
+        executor = get_agent_executor()
+        start = time.perf_counter()
+
+        votes: Counter = Counter()
+        representative: Dict[str, Any] = {}
+        errors = 0
+        launched = 0
+        free_agents = list(self.agents)
+        # asyncio wrapper -> (agent, pool future); the pool future tells started from queued
+        running: Dict[asyncio.Future, Any] = {}
+        stop_reason = "budget_exhausted"
+        # The confidence rule's sample floor can never exceed what the budget allows
+        floor = min(min_samples, budget) if confidence else 0
+
+        def in_flight_target() -> int:
+            # Only keep as many samples running as could still be needed to settle
+            if consensus:
+                return max_concurrency
+            completed = sum(votes.values())
+            leader_votes = votes.most_common(1)[0][1] if votes else 0
+            needed = max(floor - completed, budget // 2 + 1 - leader_votes, 1)
+            return min(max_concurrency, needed)
+
+        def launch():
+            nonlocal launched
+            while free_agents and launched < budget and len(running) < in_flight_target():
+                agent = free_agents.pop(0)
+                pool_future = executor.submit(agent.run, task)
+                running[asyncio.wrap_future(pool_future, loop=loop)] = (agent, pool_future)
+                launched += 1
+
+        def settled() -> Optional[str]:
+            completed = sum(votes.values())
+            if not votes:
+                return None
+            ranked = votes.most_common(2)
+            leader_votes = ranked[0][1]
+            runner_up = ranked[1][1] if len(ranked) > 1 else 0
+            remaining = budget - completed - errors
+            if consensus:
+                return "no_consensus" if len(votes) > 1 else None
+            if quorum and leader_votes >= quorum:
+                return "quorum"
+            if confidence and completed >= min_samples and leader_votes / completed >= confidence:
+                return "confidence"
+            if leader_votes - runner_up > remaining:
+                return "decided"
+            return None
+
+        launch()
+        try:
+            while running:
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    free_agents.append(running.pop(future)[0])
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Agent encountered an error: {e}")
+                        errors += 1
+                        continue
+                    key = vote_key(result)
+                    votes[key] += 1
+                    representative.setdefault(key, result)
+                reason = settled()
+                if reason:
+                    stop_reason = reason
+                    break
+                launch()
+        finally:
+            cancelled = abandoned = 0
+            for future, (_, pool_future) in running.items():
+                # Only a call still queued in the pool can be cancelled
+                if pool_future.cancel():
+                    cancelled += 1
+                else:
+                    abandoned += 1
+                future.cancel()
+            if abandoned:
+                logger.info(f"MonteCarloSwarm stopped with {abandoned} agent calls still running; results ignored")
+
+        completed = sum(votes.values())
+        winner = votes.most_common(1)[0][0] if votes else None
+        if stop_reason == "no_consensus":
+            result = None
+        else:
+            result = representative.get(winner)
+        return {
+            "result": result,
+            "votes": dict(votes),
+            "confidence": votes[winner] / completed if completed else 0.0,
+            "samples_used": completed + errors,
+            "samples_launched": launched,
+            "sample_budget": budget,
+            "errors": errors,
+            "cancelled": cancelled,
+            "abandoned": abandoned,
+            "stopped_early": stop_reason != "budget_exhausted",
+            "stop_reason": stop_reason,
+            "elapsed_seconds": time.perf_counter() - start,
+        }
+
     @staticmethod
     def default_aggregator(results: List[Any]) -> Any:
         """
@@ -7,6 +7,8 @@ import os
 import logging
 from typing import Optional, Dict, Any, List
 
+from app.core.integration_registry import integration_registry
+
 logger = logging.getLogger(__name__)
 
 # Try to import Multi-Agent-RAG-Template
@@ -109,6 +111,6 @@ class MultiAgentRAGIntegration:
 
 def get_multi_agent_rag_integration(config: Optional[Dict] = None) -> MultiAgentRAGIntegration:
     """Get or create Multi-Agent-RAG integration instance"""
-    return MultiAgentRAGIntegration(config)
+    return integration_registry.get("multi_agent_rag", MultiAgentRAGIntegration, config)
 
 
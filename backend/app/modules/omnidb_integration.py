@@ -9,6 +9,8 @@ import logging
 from typing import Optional, Dict, Any, List
 import httpx
 
+from app.core.integration_registry import integration_registry
+
 logger = logging.getLogger(__name__)
 
 # OmniDB is Rust-based, so we'll use HTTP service approach
@@ -126,6 +128,6 @@ class OmniDBIntegration:
 
 def get_omnidb_integration(config: Optional[Dict] = None) -> OmniDBIntegration:
     """Get or create OmniDB integration instance"""
-    return OmniDBIntegration(config)
+    return integration_registry.get("omnidb", OmniDBIntegration, config, env_keys=["OMNIDB_SERVICE_URL"])
 
 
@@ -7,6 +7,8 @@ import os
 import logging
 from typing import Optional, Dict, Any, List
 
+from app.core.integration_registry import integration_registry
+
 logger = logging.getLogger(__name__)
 
 # Try to import OmniParse
@@ -100,6 +102,6 @@ class OmniParseIntegration:
 
 def get_omniparse_integration(config: Optional[Dict] = None) -> OmniParseIntegration:
     """Get or create OmniParse integration instance"""
-    return OmniParseIntegration(config)
+    return integration_registry.get("omniparse", OmniParseIntegration, config)
 
 
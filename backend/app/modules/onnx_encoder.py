@@ -0,0 +1,108 @@
+"""
+ONNX Runtime sentence encoder for HDAM
+Runs a pre-exported sentence-transformers model on CPU through ONNX Runtime,
+optionally with int8 dynamic quantization, without importing torch.
+Export a model with scripts/export_hdam_onnx.py.
+"""
+
+import os
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+    ort = None
+    Tokenizer = None
+
+
+def quantize_onnx_model(model_path: str, output_path: Optional[str] = None) -> str:
+    """Apply int8 dynamic quantization to an exported model and return its path"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output_path = output_path or model_path.replace(".onnx", ".int8.onnx")
+    if not os.path.exists(output_path):
+        quantize_dynamic(model_path, output_path, weight_type=QuantType.QInt8)
+    return output_path
+
+
+class OnnxSentenceEncoder:
+    """
+    Drop-in replacement for the SentenceTransformer calls HDAM makes
+    (encode / get_sentence_embedding_dimension). Applies the same mean pooling
+    and L2 normalization as all-MiniLM-L6-v2 and returns float32 embeddings.
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantize: bool = False,
+        max_seq_length: int = 256,
+        batch_size: int = 64,
+        intra_op_threads: Optional[int] = None,
+    ):
+        if not ONNX_AVAILABLE:
+            raise ImportError("onnxruntime and tokenizers are required for the ONNX encoder backend")
+
+        model_path = os.path.join(model_dir, "model.onnx")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"No exported model at {model_path}; run scripts/export_hdam_onnx.py first"
+            )
+        if quantize:
+            model_path = quantize_onnx_model(model_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.model_path = model_path
+        self.quantized = quantize
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+        self.batch_size = batch_size
+
+        self.embedding_dim = int(self.session.get_outputs()[0].shape[-1])
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.embedding_dim
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over non-padding tokens
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        embeddings = summed / counts
+
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return (embeddings / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def encode(self, texts: List[str], convert_to_numpy: bool = True,
+               show_progress_bar: bool = False, normalize_embeddings: bool = False) -> np.ndarray:
+        """Encode texts in batches; signature mirrors SentenceTransformer.encode"""
+        if not texts:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+        return np.concatenate([
+            self._encode_batch(texts[i:i + self.batch_size])
+            for i in range(0, len(texts), self.batch_size)
+        ])
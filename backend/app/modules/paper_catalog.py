@@ -0,0 +1,270 @@
+"""
+Scholarly Paper Catalog
+Local arXiv metadata catalog on top of the hybrid retrieval engine: BM25
+full-text search over title and abstract, category and year filters, and
+embedding similarity when vectors are available. Bulk-loads arXiv metadata
+dumps (JSONL, optionally gzipped) so research lookups are answered locally
+and only misses go to the network.
+"""
+
+import os
+import gzip
+import json
+import time
+import logging
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.integration_registry import integration_registry
+from app.modules.hybrid_retrieval import HybridRetrievalEngine
+
+logger = logging.getLogger(__name__)
+
+# Only these metadata keys get filter facets; titles and authors stay out of the facet table
+FACET_KEYS = ("categories", "primary_category", "year")
+FIRST_ARXIV_YEAR = 1991
+
+
+def _authors(record: Dict[str, Any]) -> List[str]:
+    parsed = record.get("authors_parsed")
+    if parsed:
+        return [" ".join(part for part in (first, last) if part) for last, first, *_ in parsed]
+    authors = record.get("authors") or []
+    if isinstance(authors, str):
+        authors = authors.replace(" and ", ", ").split(",")
+    return [" ".join(str(author).split()) for author in authors if str(author).strip()]
+
+
+def _published(record: Dict[str, Any]) -> Optional[str]:
+    versions = record.get("versions")
+    if versions and isinstance(versions[0], dict) and versions[0].get("created"):
+        try:
+            return parsedate_to_datetime(versions[0]["created"]).strftime("%Y-%m-%d")
+        except (TypeError, ValueError):
+            pass
+    published = record.get("published") or record.get("update_date")
+    return str(published)[:10] if published else None
+
+
+def normalize_record(record: Dict[str, Any]) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Map one arXiv metadata record (Kaggle snapshot format or the shape
+    returned by ScholarlyResearcher) to (arxiv_id, text, metadata).
+    Returns None for records without an id or title.
+    """
+    arxiv_id = str(record.get("id") or record.get("arxiv_id") or "").strip()
+    title = " ".join(str(record.get("title") or "").split())
+    if not arxiv_id or not title:
+        return None
+    abstract = " ".join(str(record.get("abstract") or record.get("summary") or "").split())
+
+    categories = record.get("categories") or []
+    if isinstance(categories, str):
+        categories = categories.split()
+    published = _published(record)
+    year = record.get("year") or (int(published[:4]) if published and published[:4].isdigit() else None)
+
+    metadata = {
+        "title": title,
+        "authors": _authors(record),
+        "categories": categories,
+        "primary_category": categories[0] if categories else None,
+        "year": int(year) if year else None,
+        "published": published,
+        "url": record.get("url") or f"https://arxiv.org/abs/{arxiv_id}",
+        "doi": record.get("doi"),
+        "journal_ref": record.get("journal-ref") or record.get("journal_ref"),
+    }
+    return arxiv_id, f"{title}\n\n{abstract}", metadata
+
+
+def _to_paper(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Engine hit -> paper dict in the ScholarlyResearcher result shape"""
+    metadata = result["metadata"]
+    _, _, abstract = result["text"].partition("\n\n")
+    paper = {
+        "id": result["id"],
+        "title": metadata.get("title"),
+        "authors": metadata.get("authors", []),
+        "abstract": abstract,
+        "url": metadata.get("url"),
+        "published": metadata.get("published"),
+        "year": metadata.get("year"),
+        "categories": metadata.get("categories", []),
+        "doi": metadata.get("doi"),
+        "journal_ref": metadata.get("journal_ref"),
+    }
+    for key in ("score", "dense_score"):
+        if key in result:
+            paper[key] = result[key]
+    return paper
+
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream records from a JSONL (or .gz) dump, skipping malformed lines"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class PaperCatalog:
+    """On-disk catalog of paper metadata with full-text and similarity search"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        encode_fn: Optional[Callable[[List[str]], np.ndarray]] = None,
+    ):
+        self.path = path or os.getenv("PAPER_CATALOG_DIR", "./cache/paper_catalog")
+        self.engine = HybridRetrievalEngine(
+            self.path,
+            encode_fn=encode_fn,
+            facet_keys=FACET_KEYS,
+            # Bulk loads compact once at the end instead of every few batches
+            compact_threshold=50_000_000,
+        )
+
+    def __len__(self) -> int:
+        return int(self.engine.live.sum())
+
+    def load_jsonl(
+        self,
+        path: str,
+        batch_size: int = 5000,
+        limit: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Bulk-load an arXiv metadata dump. Papers are upserted by arXiv id, so
+        reloading a newer snapshot replaces older versions. Records may carry
+        a precomputed "embedding" to enable similarity search without an encoder.
+        """
+        start = time.perf_counter()
+        loaded = skipped = 0
+        batch: List[Tuple[str, str, Dict[str, Any]]] = []
+        embeddings: List[Any] = []
+
+        def flush():
+            nonlocal loaded
+            if not batch:
+                return
+            ids, texts, metadata = (list(column) for column in zip(*batch))
+            vectors = np.asarray(embeddings, dtype=np.float32) if len(embeddings) == len(batch) else None
+            self.engine.index_documents(texts, metadata, ids, vectors=vectors)
+            loaded += len(batch)
+            batch.clear()
+            embeddings.clear()
+            if progress:
+                progress(loaded)
+
+        for record in iter_jsonl(path):
+            if limit is not None and loaded + len(batch) >= limit:
+                break
+            normalized = normalize_record(record)
+            if normalized is None:
+                skipped += 1
+                continue
+            batch.append(normalized)
+            if record.get("embedding") is not None:
+                embeddings.append(record["embedding"])
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+        self.engine.compact()
+
+        seconds = time.perf_counter() - start
+        logger.info(f"Paper catalog loaded {loaded} papers in {seconds:.1f}s ({skipped} skipped)")
+        return {
+            "loaded": loaded,
+            "skipped": skipped,
+            "seconds": seconds,
+            "papers_per_second": loaded / seconds if seconds else 0.0,
+        }
+
+    @staticmethod
+    def _filters(
+        categories: Optional[List[str]] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        filters: Dict[str, Any] = {}
+        if categories:
+            filters["categories"] = list(categories)
+        if year_from is not None or year_to is not None:
+            first = year_from if year_from is not None else FIRST_ARXIV_YEAR
+            last = year_to if year_to is not None else datetime.utcnow().year
+            filters["year"] = list(range(int(first), int(last) + 1))
+        return filters
+
+    def search(
+        self,
+        query: str,
+        max_results: int = 10,
+        categories: Optional[List[str]] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        mode: str = "hybrid",
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search over title and abstract. Categories match any-of;
+        years are inclusive. mode is "hybrid", "bm25" or "dense".
+        """
+        results = self.engine.query(
+            query,
+            top_k=max_results,
+            filters=self._filters(categories, year_from, year_to),
+            mode=mode,
+        )
+        return [_to_paper(result) for result in results]
+
+    def similar(
+        self,
+        arxiv_id: str,
+        max_results: int = 10,
+        categories: Optional[List[str]] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Papers closest to arxiv_id by embedding (empty without vectors)"""
+        results = self.engine.similar(
+            arxiv_id, top_k=max_results, filters=self._filters(categories, year_from, year_to)
+        )
+        return [_to_paper(result) for result in results]
+
+    def get(self, arxiv_id: str) -> Optional[Dict[str, Any]]:
+        """Look up one paper by arXiv id"""
+        document = self.engine.get_document(arxiv_id)
+        return _to_paper(document) if document else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, **self.engine.stats()}
+
+    def close(self) -> None:
+        self.engine.close()
+
+
+def get_paper_catalog() -> Optional[PaperCatalog]:
+    """
+    Shared catalog at PAPER_CATALOG_DIR, or None until one has been loaded
+    (see scripts/load_paper_catalog.py).
+    """
+    path = os.getenv("PAPER_CATALOG_DIR", "./cache/paper_catalog")
+    if not os.path.exists(os.path.join(path, "documents.db")):
+        return None
+    try:
+        return integration_registry.get(
+            "paper_catalog", lambda: PaperCatalog(path), env_keys=["PAPER_CATALOG_DIR"]
+        )
+    except Exception as e:
+        logger.warning(f"Paper catalog unavailable: {e}")
+        return None
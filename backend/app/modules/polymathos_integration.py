@@ -1,14 +1,14 @@
 from typing import List, Dict, Optional
 import asyncio
 import os
-from .hdam import initialize_hdam
+from .hdam import get_hdam
 from .file_processor import FileProcessor
 
 class PolyMathOSLearningSystem:
     """Main integration point for PolyMathOS learning system"""
     
     def __init__(self, supabase_url: str = None, supabase_key: str = None):
-        self.hdam = initialize_hdam(supabase_url, supabase_key)
+        self.hdam = get_hdam(supabase_url=supabase_url, supabase_key=supabase_key)
         self.file_processor = FileProcessor(self.hdam)
         self.learning_paths = {}  # Store created learning paths
         
@@ -63,12 +63,12 @@ class PolyMathOSLearningSystem:
             domains=preferred_domains
         )
         
-        # Cross-domain reasoning
+        # Cross-domain reasoning (every learned domain when none are preferred)
         # Fallback if hdam is not EnhancedHDAM or missing method, but initialize_hdam returns EnhancedHDAM
         if hasattr(self.hdam, 'cross_domain_reasoning'):
             domain_analysis = self.hdam.cross_domain_reasoning(
                 user_query,
-                preferred_domains or list(self.hdam.skill_networks.keys())
+                preferred_domains or []
             )
         else:
             domain_analysis = {"best_domain": "general", "confidence": 0.0}
@@ -0,0 +1,178 @@
+"""
+Progress Rollups
+Quiz attempts folded into per-user daily and weekly buckets, so the
+comprehension report and the progress history read a handful of counters
+instead of every attempt a user has ever made.
+
+Two backends share one interface (record / summary / history):
+- LocalProgressRollups keeps the buckets in memory and updates them as
+  attempts are written; used when no database is configured.
+- TimescaleProgressRollups reads the quiz_progress_daily / quiz_progress_weekly
+  continuous aggregates that DatabasePersistence keeps over quiz_attempts
+  (falling back to grouping raw rows when the aggregates could not be created),
+  merged with local rollups of the attempts the database failed to store.
+
+Buckets follow TimescaleDB's time_bucket alignment: days start at midnight,
+weeks on Monday. Each bucket holds attempts, the sum of percent_correct, and
+correct/total question counts, so averages over any range of buckets are exact.
+"""
+
+import os
+import bisect
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+PERIODS = ("daily", "weekly")
+
+
+def bucket_start(timestamp: Any, period: str) -> date:
+    """Start of the daily/weekly bucket holding a datetime, date or ISO string"""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    elif timestamp is None:
+        timestamp = datetime.now()
+    day = timestamp.date() if isinstance(timestamp, datetime) else timestamp
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def rollup_point(bucket: Any, attempts: int, score_sum: float,
+                 correct: Optional[float], questions: Optional[float]) -> Dict[str, Any]:
+    """One history data point, shared by both backends"""
+    if isinstance(bucket, datetime):
+        bucket = bucket.date()
+    return {
+        "bucket": bucket.isoformat(),
+        "quizzes_completed": int(attempts),
+        "average_score": float(score_sum) / attempts if attempts else 0.0,
+        "correct_answers": int(correct or 0),
+        "questions_answered": int(questions or 0)
+    }
+
+
+def _check_period(period: str) -> None:
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+
+
+class _UserRollup:
+    __slots__ = ("attempts", "score_sum", "recent", "buckets", "order")
+
+    def __init__(self):
+        self.attempts = 0
+        self.score_sum = 0.0
+        self.recent: List[tuple] = []  # latest two (timestamp, percent_correct), oldest first
+        self.buckets: Dict[str, Dict[date, List[float]]] = {period: {} for period in PERIODS}
+        self.order: Dict[str, List[date]] = {period: [] for period in PERIODS}
+
+
+class LocalProgressRollups:
+    """In-process incremental rollups: O(1) per attempt written, O(buckets) per read"""
+
+    def __init__(self, max_buckets: Optional[int] = None):
+        # Oldest buckets beyond this are dropped per user and period; totals keep counting
+        self.max_buckets = max_buckets if max_buckets is not None else int(
+            os.getenv("PROGRESS_ROLLUP_MAX_BUCKETS", "400"))
+        self._users: Dict[str, _UserRollup] = {}
+        self._lock = threading.Lock()
+
+    def record(self, attempts: List[Dict[str, Any]]) -> None:
+        """Fold graded attempts into their user's buckets"""
+        with self._lock:
+            for attempt in attempts:
+                rollup = self._users.get(attempt["user_id"])
+                if rollup is None:
+                    rollup = self._users[attempt["user_id"]] = _UserRollup()
+                timestamp = attempt.get("timestamp") or datetime.now()
+                if isinstance(timestamp, str):
+                    timestamp = datetime.fromisoformat(timestamp)
+                percent = float(attempt.get("percent_correct") or 0)
+                rollup.attempts += 1
+                rollup.score_sum += percent
+                rollup.recent = sorted(rollup.recent + [(timestamp, percent)], key=lambda r: r[0])[-2:]
+
+                for period in PERIODS:
+                    start = bucket_start(timestamp, period)
+                    counters = rollup.buckets[period].get(start)
+                    if counters is None:
+                        counters = rollup.buckets[period][start] = [0, 0.0, 0, 0]
+                        order = rollup.order[period]
+                        bisect.insort(order, start)
+                        if self.max_buckets and len(order) > self.max_buckets:
+                            del rollup.buckets[period][order.pop(0)]
+                            if start not in rollup.buckets[period]:
+                                continue
+                    counters[0] += 1
+                    counters[1] += percent
+                    counters[2] += attempt.get("score") or 0
+                    counters[3] += attempt.get("max_score") or 0
+
+    def summary(self, user_id: str) -> Dict[str, Any]:
+        """All-time attempt count and score sum plus the two latest scores"""
+        with self._lock:
+            rollup = self._users.get(user_id)
+            if rollup is None:
+                return {"attempts": 0, "score_sum": 0.0, "recent": []}
+            return {"attempts": rollup.attempts, "score_sum": rollup.score_sum,
+                    "recent": [percent for _, percent in rollup.recent]}
+
+    def buckets(self, user_id: str, period: str = "weekly", limit: int = 12) -> List[tuple]:
+        """The latest `limit` non-empty buckets as (start, attempts, score_sum, correct, questions)"""
+        _check_period(period)
+        with self._lock:
+            rollup = self._users.get(user_id)
+            if rollup is None or limit <= 0:
+                return []
+            buckets = rollup.buckets[period]
+            return [(start, *buckets[start]) for start in rollup.order[period][-limit:]]
+
+    def history(self, user_id: str, period: str = "weekly", limit: int = 12) -> List[Dict[str, Any]]:
+        """The latest `limit` non-empty buckets, oldest first"""
+        return [rollup_point(*bucket) for bucket in self.buckets(user_id, period, limit)]
+
+
+class TimescaleProgressRollups:
+    """
+    Reads the continuous aggregates kept by DatabasePersistence. Stored
+    attempts feed those directly; record() only sees the attempts the
+    database rejected, which are kept in local rollups and merged into reads.
+    """
+
+    def __init__(self, database, max_buckets: Optional[int] = None):
+        self.database = database
+        self.fallback = LocalProgressRollups(max_buckets)
+
+    def record(self, attempts: List[Dict[str, Any]]) -> None:
+        self.fallback.record(attempts)
+
+    def summary(self, user_id: str) -> Dict[str, Any]:
+        totals = self.database.get_quiz_progress_totals(user_id) or {"attempts": 0, "score_sum": 0.0, "recent": []}
+        local = self.fallback.summary(user_id)
+        if not local["attempts"]:
+            return totals
+        # Fallback attempts were written after the database stopped taking them
+        return {"attempts": totals["attempts"] + local["attempts"],
+                "score_sum": totals["score_sum"] + local["score_sum"],
+                "recent": (list(totals["recent"]) + local["recent"])[-2:]}
+
+    def history(self, user_id: str, period: str = "weekly", limit: int = 12) -> List[Dict[str, Any]]:
+        _check_period(period)
+        rows = self.database.get_quiz_progress(user_id, period, limit)
+        merged: Dict[date, List[float]] = {}
+        for row in rows:
+            start = row["bucket"].date() if isinstance(row["bucket"], datetime) else row["bucket"]
+            merged[start] = [row["attempts"], row["score_sum"], row["correct"] or 0, row["questions"] or 0]
+        for start, *counters in self.fallback.buckets(user_id, period, limit):
+            totals = merged.setdefault(start, [0, 0.0, 0, 0])
+            for i, value in enumerate(counters):
+                totals[i] += value
+        return [rollup_point(start, *merged[start]) for start in sorted(merged)[-limit:]]
+
+
+def create_progress_rollups(database=None):
+    """Continuous aggregates when the database is up, in-memory rollups otherwise"""
+    if database is not None and getattr(database, "available", False):
+        return TimescaleProgressRollups(database)
+    return LocalProgressRollups()
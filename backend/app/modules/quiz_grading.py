@@ -0,0 +1,346 @@
+"""
+Quiz Grading Engine
+Compiles each quiz once into an id-indexed answer key with normalized
+answers, grades batches of submissions as a response matrix, and keeps
+incremental per-question statistics: difficulty (proportion correct) and
+discrimination (corrected item-total point-biserial correlation). Graded
+attempts go to storage through a buffered bulk writer.
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+UNANSWERED = -1
+# Distinct raw answers remembered per question; classroom answers repeat heavily
+VERDICT_CACHE_SIZE = 4096
+
+
+def normalize_answer(answer: Any) -> str:
+    """Case-, width- and whitespace-insensitive form; a trailing full stop is ignored"""
+    text = str(answer)
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+    return " ".join(text.casefold().split()).rstrip(".").rstrip()
+
+
+class AnswerKey:
+    """A quiz compiled for grading: question id -> column, accepted answers per column"""
+
+    def __init__(self, quiz: Dict[str, Any]):
+        self.quiz_id = quiz["id"]
+        self.questions = quiz["questions"]
+        self.index: Dict[str, int] = {}
+        self.accepted: List[frozenset] = []
+        self.verdicts: List[Dict[Any, bool]] = []
+        for column, question in enumerate(self.questions):
+            self.index[question["id"]] = column
+            answers = [question.get("correct_answer", "")] + list(question.get("accepted_answers") or [])
+            self.accepted.append(frozenset(normalize_answer(a) for a in answers))
+            self.verdicts.append({})
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def check(self, column: int, answer: Any) -> bool:
+        verdicts = self.verdicts[column]
+        verdict = verdicts.get(answer)
+        if verdict is None:
+            verdict = normalize_answer(answer) in self.accepted[column]
+            if len(verdicts) < VERDICT_CACHE_SIZE:
+                verdicts[answer] = verdict
+        return verdict
+
+    def mark(self, question_ids: Sequence[str], answers: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Grade flat (question_id, answer) pairs: returns each pair's column
+        (-1 for unknown question ids) and correctness. Each distinct
+        question id is looked up once and each distinct (column, answer)
+        checked once.
+        """
+        if not len(question_ids):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=bool)
+        ids, id_of = np.unique(np.asarray(question_ids, dtype=str), return_inverse=True)
+        columns = np.array([self.index.get(i, -1) for i in ids.tolist()], dtype=np.int64)[id_of.ravel()]
+        texts, text_of = np.unique(np.asarray([str(a) for a in answers], dtype=str), return_inverse=True)
+        n_texts = len(texts)
+        pairs, pair_of = np.unique(columns * n_texts + text_of.ravel(), return_inverse=True)
+        texts = texts.tolist()
+        verdicts = np.fromiter(
+            (column >= 0 and self.check(column, texts[text])
+             for column, text in zip((pairs // n_texts).tolist(), (pairs % n_texts).tolist())),
+            dtype=bool, count=len(pairs))
+        return columns, verdicts[pair_of.ravel()]
+
+
+class QuestionStatistics:
+    """
+    Running sums per question over all graded attempts, merged one batch at
+    a time. For question i, among attempts that answered it: x is 1/0
+    correctness and r the rest score (attempt score without question i).
+    """
+
+    def __init__(self, question_ids: Sequence[str]):
+        self.question_ids = list(question_ids)
+        n_questions = len(self.question_ids)
+        self.attempts = 0
+        self.score_sum = 0.0
+        self.score_sq_sum = 0.0
+        zeros = lambda: np.zeros(n_questions, dtype=np.float64)
+        self.n, self.sx, self.sr, self.srr, self.sxr = zeros(), zeros(), zeros(), zeros(), zeros()
+
+    def update(self, matrix: np.ndarray) -> None:
+        answered = matrix != UNANSWERED
+        correct = (matrix == 1).astype(np.float64)
+        totals = correct.sum(axis=1)
+        rest = (totals[:, None] - correct) * answered
+        self.attempts += len(matrix)
+        self.score_sum += totals.sum()
+        self.score_sq_sum += (totals ** 2).sum()
+        self.n += answered.sum(axis=0)
+        self.sx += correct.sum(axis=0)
+        self.sr += rest.sum(axis=0)
+        self.srr += (rest ** 2).sum(axis=0)
+        self.sxr += (correct * rest).sum(axis=0)
+
+    def difficulty(self) -> np.ndarray:
+        """Proportion correct per question (NaN until answered)"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.sx / self.n
+
+    def discrimination(self) -> np.ndarray:
+        """Corrected point-biserial correlation per question (NaN when undefined)"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = self.sxr / self.n - (self.sx / self.n) * (self.sr / self.n)
+            var_x = self.sx / self.n * (1 - self.sx / self.n)
+            var_r = self.srr / self.n - (self.sr / self.n) ** 2
+            return cov / np.sqrt(var_x * var_r)
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.attempts:
+            return {"attempts": 0, "mean_score": None, "score_std": None, "kr20": None}
+        mean = self.score_sum / self.attempts
+        variance = max(self.score_sq_sum / self.attempts - mean ** 2, 0.0)
+        p = self.difficulty()
+        k = int(np.count_nonzero(self.n))
+        # KR-20 reliability, assuming attempts answer every question
+        kr20 = None
+        if k > 1 and variance > 0:
+            kr20 = float(k / (k - 1) * (1 - np.nansum(p * (1 - p)) / variance))
+        return {"attempts": self.attempts, "mean_score": mean, "score_std": variance ** 0.5, "kr20": kr20}
+
+
+class QuizAttemptWriter:
+    """
+    Buffers graded attempts and hands them to `sink` (a bulk insert that
+    returns True on success) in batches of up to batch_size, from a
+    background flusher every flush_interval seconds or as soon as a batch
+    fills, so request handlers never wait on the database. With
+    flush_interval 0, add() writes synchronously. Batches the sink rejects
+    go to `fallback`.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[List[Dict[str, Any]]], bool],
+        fallback: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.sink = sink
+        self.fallback = fallback
+        self.batch_size = batch_size or int(os.getenv("QUIZ_ATTEMPT_BATCH_SIZE", "500"))
+        self.flush_interval = flush_interval if flush_interval is not None else float(
+            os.getenv("QUIZ_ATTEMPT_FLUSH_INTERVAL", "1"))
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self.written = 0
+        self.fallbacks = 0
+
+    def add(self, attempts: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._buffer.extend(attempts)
+            full = len(self._buffer) >= self.batch_size
+            if self._flusher is None and self.flush_interval > 0:
+                self._flusher = threading.Thread(target=self._run, name="quiz-attempt-writer", daemon=True)
+                self._flusher.start()
+        if self.flush_interval <= 0:
+            self.flush()
+        elif full:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Quiz attempt flush failed: {e}")
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns the number of attempts handled"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._buffer = self._buffer, []
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                if self.sink(batch):
+                    self.written += len(batch)
+                else:
+                    self.fallbacks += len(batch)
+                    if self.fallback:
+                        self.fallback(batch)
+            return len(pending)
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self.flush()
+
+
+class QuizGradingEngine:
+    """Grades quiz submissions against cached answer keys and tracks item statistics"""
+
+    def __init__(self, writer: Optional[QuizAttemptWriter] = None, max_quizzes: Optional[int] = None):
+        self.writer = writer
+        self.max_quizzes = max_quizzes or int(os.getenv("QUIZ_KEY_CACHE_SIZE", "1024"))
+        self._keys: "OrderedDict[str, AnswerKey]" = OrderedDict()
+        # Outlives key eviction: a recompiled key keeps accumulating into it
+        self._stats: Dict[str, QuestionStatistics] = {}
+        self._lock = threading.Lock()
+        self.graded = 0
+
+    def key(self, quiz_id: str) -> Optional[AnswerKey]:
+        """Cached answer key (quizzes do not change after generation)"""
+        with self._lock:
+            key = self._keys.get(quiz_id)
+            if key is not None:
+                self._keys.move_to_end(quiz_id)
+            return key
+
+    def compile(self, quiz: Dict[str, Any]) -> AnswerKey:
+        key = AnswerKey(quiz)
+        with self._lock:
+            self._keys[key.quiz_id] = key
+            while len(self._keys) > self.max_quizzes:
+                self._keys.popitem(last=False)
+        return key
+
+    def grade_batch(
+        self,
+        key: AnswerKey,
+        submissions: Sequence[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Grade submissions for one quiz. Each submission has user_id and
+        answers (dicts with question_id, user_answer and optionally
+        time_spent_seconds). Returns attempt records and queues them on the
+        writer.
+        """
+        start = time.perf_counter()
+        n = len(submissions)
+        answers = [answer for submission in submissions for answer in submission["answers"]]
+        max_scores = np.fromiter((len(s["answers"]) for s in submissions), dtype=np.int64, count=n)
+        rows = np.repeat(np.arange(n), max_scores)
+        columns, correct = key.mark([a["question_id"] for a in answers], [a["user_answer"] for a in answers])
+        known = columns >= 0
+        rows, columns, correct = rows[known], columns[known], correct[known]
+
+        matrix = np.full((n, len(key)), UNANSWERED, dtype=np.int8)
+        matrix[rows, columns] = correct
+        scores = np.bincount(rows, weights=correct, minlength=n).astype(np.int64)
+        percent = np.divide(scores, max_scores, out=np.zeros(n), where=max_scores > 0) * 100
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n)))).tolist()
+
+        questions = key.questions
+        results = [
+            {
+                "question_id": answer["question_id"],
+                "is_correct": is_correct,
+                "correct_answer": questions[column]["correct_answer"],
+                "explanation": questions[column].get("explanation", ""),
+                "time_spent": answer.get("time_spent_seconds")
+            }
+            for answer, column, is_correct in zip(
+                (a for a, k in zip(answers, known.tolist()) if k), columns.tolist(), correct.tolist())
+        ]
+        now = datetime.now()
+        attempts = [
+            {
+                "id": str(uuid.uuid4()),
+                "quiz_id": key.quiz_id,
+                "user_id": submission["user_id"],
+                "answers": results[offsets[row]:offsets[row + 1]],
+                "score": score,
+                "max_score": max_score,
+                "percent_correct": pct if max_score else 0,
+                "timestamp": now
+            }
+            for row, (submission, score, max_score, pct) in enumerate(
+                zip(submissions, scores.tolist(), max_scores.tolist(), percent.tolist()))
+        ]
+
+        with self._lock:
+            stats = self._stats.get(key.quiz_id)
+            if stats is None:
+                stats = self._stats[key.quiz_id] = QuestionStatistics([q["id"] for q in questions])
+            stats.update(matrix)
+            self.graded += n
+
+        if self.writer is not None:
+            self.writer.add(attempts)
+        logger.debug(f"Graded {len(attempts)} attempts for quiz {key.quiz_id} in {time.perf_counter() - start:.3f}s")
+        return attempts
+
+    def grade(self, key: AnswerKey, user_id: str, answers: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return self.grade_batch(key, [{"user_id": user_id, "answers": answers}])[0]
+
+    def analytics(self, quiz_id: str) -> Optional[Dict[str, Any]]:
+        """Per-question difficulty and discrimination plus score summary, since this process started"""
+        with self._lock:
+            stats = self._stats.get(quiz_id)
+            if stats is None:
+                return None
+            difficulty, discrimination = stats.difficulty(), stats.discrimination()
+            responses = stats.n.copy()
+            summary = stats.summary()
+
+        def value(x):
+            return None if np.isnan(x) else round(float(x), 4)
+
+        return {
+            "quiz_id": quiz_id,
+            **summary,
+            "questions": [
+                {
+                    "question_id": question_id,
+                    "responses": int(responses[i]),
+                    "difficulty": value(difficulty[i]),
+                    "discrimination": value(discrimination[i]),
+                }
+                for i, question_id in enumerate(stats.question_ids)
+            ],
+        }
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
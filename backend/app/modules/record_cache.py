@@ -0,0 +1,373 @@
+"""
+Record Cache
+Read-through cache in front of DatabasePersistence for the read-mostly
+records the learning endpoints fetch on every request: learning plans,
+quizzes, memory palaces and Feynman sessions.
+
+- RecordCache holds one record type: LRU-bounded (RECORD_CACHE_SIZE),
+  entries expire after RECORD_CACHE_TTL seconds, and misses are remembered
+  for RECORD_CACHE_NEGATIVE_TTL seconds so ids that only exist in the
+  in-memory fallbacks do not cost a query each time.
+- CachedPersistence wraps DatabasePersistence with the same method names:
+  get_* / get_many_* read through the caches, save_* / save_many_* write
+  through and drop the saved ids, everything else is delegated unchanged.
+- With RECORD_CACHE_NOTIFY=true every save also sends NOTIFY on
+  RECORD_CACHE_CHANNEL, and a listener thread drops the same ids in the
+  other workers; without it, other workers see a change after at most TTL.
+
+Records are stored pickled and every hit unpickles a fresh copy, so
+mutating a result (the palace imagery endpoint edits loci before saving)
+never leaks into the cache; unpickling is several times cheaper than
+copy.deepcopy of the same record.
+"""
+
+import os
+import time
+import pickle
+import select
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Record type -> plural used by the get_many_* / save_many_* methods
+RECORD_TYPES = {
+    "learning_plan": "learning_plans",
+    "quiz": "quizzes",
+    "memory_palace": "memory_palaces",
+    "feynman_session": "feynman_sessions",
+}
+
+# NOTIFY payloads are limited to 8000 bytes; larger batches drop the whole type
+NOTIFY_MAX_IDS = 100
+
+
+class RecordCache(Generic[T]):
+    """LRU + TTL cache of one record type, with negative entries for misses"""
+
+    def __init__(self, name: str, max_items: Optional[int] = None, ttl: Optional[float] = None,
+                 negative_ttl: Optional[float] = None):
+        self.name = name
+        self.max_items = max_items if max_items is not None else int(os.getenv("RECORD_CACHE_SIZE", "2048"))
+        self.ttl = ttl if ttl is not None else float(os.getenv("RECORD_CACHE_TTL", "300"))
+        self.negative_ttl = (negative_ttl if negative_ttl is not None
+                             else float(os.getenv("RECORD_CACHE_NEGATIVE_TTL", "5")))
+        # id -> (expires_at, pickled record); None marks a negative entry
+        self._entries: "OrderedDict[str, Tuple[float, Optional[bytes]]]" = OrderedDict()
+        # Bumped by every invalidation; a load that overlapped one is not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0, "negative_hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+            "invalidations": 0, "hit_seconds": 0.0, "load_seconds": 0.0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_items > 0 and self.ttl > 0
+
+    def _lookup(self, key: str, now: float) -> Tuple[bool, Optional[bytes]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= now:
+            del self._entries[key]
+            self.stats["expirations"] += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    @staticmethod
+    def _dumps(record: Optional[T]) -> Optional[bytes]:
+        return pickle.dumps(record, pickle.HIGHEST_PROTOCOL) if record is not None else None
+
+    def _store(self, key: str, data: Optional[bytes], now: float) -> None:
+        ttl = self.ttl if data is not None else self.negative_ttl
+        if ttl <= 0:
+            return
+        self._entries[key] = (now + ttl, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get(self, key: str, loader: Callable[[str], Optional[T]]) -> Optional[T]:
+        """Cached record for key, calling loader(key) on a miss"""
+        if not self.enabled:
+            return loader(key)
+
+        start = time.perf_counter()
+        with self._lock:
+            found, data = self._lookup(key, time.monotonic())
+            generation = self._generation
+            if found:
+                self.stats["hits" if data is not None else "negative_hits"] += 1
+        if found:
+            record = pickle.loads(data) if data is not None else None
+            with self._lock:
+                self.stats["hit_seconds"] += time.perf_counter() - start
+            return record
+
+        record = loader(key)
+        data = self._dumps(record)
+        with self._lock:
+            self.stats["misses"] += 1
+            self.stats["load_seconds"] += time.perf_counter() - start
+            if generation == self._generation:
+                self._store(key, data, time.monotonic())
+        return record
+
+    def get_many(self, keys: Iterable[str],
+                 loader: Callable[[List[str]], Dict[str, T]]) -> Dict[str, T]:
+        """Cached records for many keys, loading every miss with one loader(missing) call.
+
+        Keys the loader does not return get negative entries.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled:
+            return loader(keys) if keys else {}
+
+        start = time.perf_counter()
+        cached: Dict[str, bytes] = {}
+        missing: List[str] = []
+        with self._lock:
+            now = time.monotonic()
+            for key in keys:
+                hit, data = self._lookup(key, now)
+                if not hit:
+                    missing.append(key)
+                    continue
+                self.stats["hits" if data is not None else "negative_hits"] += 1
+                if data is not None:
+                    cached[key] = data
+            generation = self._generation
+        found: Dict[str, T] = {key: pickle.loads(data) for key, data in cached.items()}
+        if not missing:
+            with self._lock:
+                self.stats["hit_seconds"] += time.perf_counter() - start
+            return found
+
+        loaded = loader(missing)
+        pickled = {key: self._dumps(loaded.get(key)) for key in missing}
+        with self._lock:
+            self.stats["misses"] += len(missing)
+            self.stats["load_seconds"] += time.perf_counter() - start
+            if generation == self._generation:
+                now = time.monotonic()
+                for key in missing:
+                    self._store(key, pickled[key], now)
+        found.update(loaded)
+        return found
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generation += 1
+            self.stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.stats["invalidations"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit ratio, average hit/load latency and counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            size = len(self._entries)
+        hits = stats["hits"] + stats["negative_hits"]
+        lookups = hits + stats["misses"]
+        return {
+            "size": size,
+            "max_items": self.max_items,
+            "hits": stats["hits"],
+            "negative_hits": stats["negative_hits"],
+            "misses": stats["misses"],
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "avg_hit_ms": round(stats["hit_seconds"] * 1000 / hits, 4) if hits else 0.0,
+            "avg_load_ms": round(stats["load_seconds"] * 1000 / stats["misses"], 4) if stats["misses"] else 0.0,
+            "evictions": stats["evictions"],
+            "expirations": stats["expirations"],
+            "invalidations": stats["invalidations"],
+        }
+
+
+class _InvalidationListener:
+    """LISTEN on a channel over its own autocommit connection and publish saves to it.
+
+    Payloads are "<record type>:<id>,<id>..." or "<record type>:*"; this
+    connection's own notifications are skipped, the saving worker has already
+    invalidated locally.
+    """
+
+    def __init__(self, connection_string: str, channel: str, on_message: Callable[[str], None]):
+        import psycopg2
+
+        self.channel = channel
+        self.on_message = on_message
+        self.conn = psycopg2.connect(connection_string)
+        self.conn.autocommit = True
+        with self.conn.cursor() as cur:
+            cur.execute(f'LISTEN "{channel}"')
+        self.pid = self.conn.get_backend_pid()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="record-cache-listener", daemon=True)
+        self._thread.start()
+
+    def publish(self, payload: str) -> None:
+        try:
+            with self._lock, self.conn.cursor() as cur:
+                cur.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+        except Exception as e:
+            logger.warning(f"Failed to publish cache invalidation: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if select.select([self.conn], [], [], 1.0) == ([], [], []):
+                    continue
+                with self._lock:
+                    self.conn.poll()
+                    notifies = list(self.conn.notifies)
+                    del self.conn.notifies[:]
+                for notify in notifies:
+                    if notify.pid != self.pid:
+                        self.on_message(notify.payload)
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.error(f"Record cache listener stopped, entries now expire by TTL only: {e}")
+                return
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=2)
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+class CachedPersistence:
+    """DatabasePersistence with read-through caches for plans, quizzes, palaces and Feynman sessions"""
+
+    def __init__(self, database: Any, notify: Optional[bool] = None, channel: Optional[str] = None):
+        self.database = database
+        self.caches: Dict[str, RecordCache[Dict]] = {kind: RecordCache(kind) for kind in RECORD_TYPES}
+        self._listener: Optional[_InvalidationListener] = None
+
+        if notify is None:
+            notify = os.getenv("RECORD_CACHE_NOTIFY", "false").lower() == "true"
+        if notify and getattr(database, "available", False):
+            try:
+                self._listener = _InvalidationListener(
+                    database.connection_string,
+                    channel or os.getenv("RECORD_CACHE_CHANNEL", "record_cache"),
+                    self._on_notify
+                )
+                logger.info(f"Record cache listening for invalidations on {self._listener.channel}")
+            except Exception as e:
+                logger.warning(f"Record cache invalidation listener not available: {e}")
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes not defined here (available, save_quiz_attempts, ...)
+        return getattr(self.database, name)
+
+    def _get(self, kind: str, key: str) -> Optional[Dict]:
+        # Without a database the endpoints' in-memory dicts are the only store
+        if not self.database.available:
+            return None
+        return self.caches[kind].get(key, getattr(self.database, f"get_{kind}"))
+
+    def _get_many(self, kind: str, keys: List[str]) -> Dict[str, Dict]:
+        if not self.database.available:
+            return {}
+        return self.caches[kind].get_many(keys, getattr(self.database, f"get_many_{RECORD_TYPES[kind]}"))
+
+    def _saved(self, kind: str, records: List[Dict], saved: bool) -> bool:
+        keys = list(dict.fromkeys(record.get("id") for record in records if record.get("id")))
+        cache = self.caches[kind]
+        for key in keys:
+            cache.invalidate(key)
+        if saved and keys and self._listener:
+            ids = "*" if len(keys) > NOTIFY_MAX_IDS else ",".join(keys)
+            self._listener.publish(f"{kind}:{ids}")
+        return saved
+
+    def _on_notify(self, payload: str) -> None:
+        kind, _, ids = payload.partition(":")
+        cache = self.caches.get(kind)
+        if cache is None:
+            return
+        if ids == "*":
+            cache.clear()
+        else:
+            for key in ids.split(","):
+                cache.invalidate(key)
+
+    def get_learning_plan(self, plan_id: str) -> Optional[Dict]:
+        return self._get("learning_plan", plan_id)
+
+    def get_many_learning_plans(self, plan_ids: List[str]) -> Dict[str, Dict]:
+        return self._get_many("learning_plan", plan_ids)
+
+    def save_learning_plan(self, plan_data: Dict) -> bool:
+        return self._saved("learning_plan", [plan_data], self.database.save_learning_plan(plan_data))
+
+    def save_many_learning_plans(self, plans: List[Dict], page_size: int = 500) -> bool:
+        return self._saved("learning_plan", plans, self.database.save_many_learning_plans(plans, page_size))
+
+    def get_quiz(self, quiz_id: str) -> Optional[Dict]:
+        return self._get("quiz", quiz_id)
+
+    def get_many_quizzes(self, quiz_ids: List[str]) -> Dict[str, Dict]:
+        return self._get_many("quiz", quiz_ids)
+
+    def save_quiz(self, quiz_data: Dict) -> bool:
+        return self._saved("quiz", [quiz_data], self.database.save_quiz(quiz_data))
+
+    def save_many_quizzes(self, quizzes: List[Dict], page_size: int = 500) -> bool:
+        return self._saved("quiz", quizzes, self.database.save_many_quizzes(quizzes, page_size))
+
+    def get_memory_palace(self, palace_id: str) -> Optional[Dict]:
+        return self._get("memory_palace", palace_id)
+
+    def get_many_memory_palaces(self, palace_ids: List[str]) -> Dict[str, Dict]:
+        return self._get_many("memory_palace", palace_ids)
+
+    def save_memory_palace(self, palace_data: Dict) -> bool:
+        return self._saved("memory_palace", [palace_data], self.database.save_memory_palace(palace_data))
+
+    def save_many_memory_palaces(self, palaces: List[Dict], page_size: int = 500) -> bool:
+        return self._saved("memory_palace", palaces, self.database.save_many_memory_palaces(palaces, page_size))
+
+    def get_feynman_session(self, session_id: str) -> Optional[Dict]:
+        return self._get("feynman_session", session_id)
+
+    def get_many_feynman_sessions(self, session_ids: List[str]) -> Dict[str, Dict]:
+        return self._get_many("feynman_session", session_ids)
+
+    def save_feynman_session(self, session_data: Dict) -> bool:
+        return self._saved("feynman_session", [session_data], self.database.save_feynman_session(session_data))
+
+    def save_many_feynman_sessions(self, sessions: List[Dict], page_size: int = 500) -> bool:
+        return self._saved("feynman_session", sessions,
+                           self.database.save_many_feynman_sessions(sessions, page_size))
+
+    def cache_metrics(self) -> Dict[str, Any]:
+        """Per record type cache metrics, plus whether cross-worker invalidation is active"""
+        return {
+            "enabled": bool(self.database.available),
+            "notify": self._listener is not None,
+            "records": {kind: cache.metrics() for kind, cache in self.caches.items()},
+        }
+
+    def close(self) -> None:
+        if self._listener:
+            self._listener.close()
+            self._listener = None
@@ -8,6 +8,10 @@ import logging
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
+from app.core.integration_registry import integration_registry
+from app.modules.paper_catalog import get_paper_catalog
+from app.modules.researcher import merge_papers
+
 logger = logging.getLogger(__name__)
 
 # Try to import Research-Paper-Hive
@@ -39,6 +43,11 @@ class ResearchPaperHiveIntegration:
             logger.error(f"Failed to initialize Research-Paper-Hive: {e}")
             self.available = False
     
+    @property
+    def catalog(self):
+        """Local paper catalog; Research-Paper-Hive is only asked on catalog misses"""
+        return get_paper_catalog()
+    
     def discover_papers(
         self,
         query: str,
@@ -51,23 +60,43 @@ class ResearchPaperHiveIntegration:
         Args:
             query: Search query
             max_results: Maximum number of results
-            filters: Optional filters (year, venue, etc.)
+            filters: Optional filters (categories, year, year_from, year_to)
         
         Returns:
             List of paper dictionaries
         """
+        catalog = self.catalog
+        papers: List[Dict[str, Any]] = []
+        if catalog:
+            filters = filters or {}
+            year = filters.get("year")
+            try:
+                papers = catalog.search(
+                    query,
+                    max_results,
+                    categories=filters.get("categories"),
+                    year_from=filters.get("year_from", year),
+                    year_to=filters.get("year_to", year)
+                )
+            except Exception as e:
+                logger.warning(f"Paper catalog search failed: {e}")
+                papers = []
+            # Only a full catalog answer skips the backend; a partial one is topped up
+            if len(papers) >= max_results:
+                return papers
+        
         if not self.available:
-            # Fallback: return empty list
-            return []
+            # Fallback: whatever the catalog had
+            return papers
         
         try:
             # In production, use actual Research-Paper-Hive API
-            # papers = self.hive.discover(query, max_results, filters)
-            # For now, return empty list
-            return []
+            # discovered = self.hive.discover(query, max_results, filters)
+            discovered: List[Dict[str, Any]] = []
+            return merge_papers(papers, discovered, max_results)
         except Exception as e:
             logger.error(f"Paper discovery failed: {e}")
-            return []
+            return papers
     
     def engage_with_paper(self, paper_id: str, action: str = "read") -> Dict[str, Any]:
         """
@@ -98,6 +127,12 @@ class ResearchPaperHiveIntegration:
     
     def get_paper_details(self, paper_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a paper"""
+        catalog = self.catalog
+        if catalog:
+            paper = catalog.get(paper_id)
+            if paper:
+                return {**paper, "venue": paper.get("journal_ref")}
+        
         if not self.available:
             return None
         
@@ -118,14 +153,16 @@ class ResearchPaperHiveIntegration:
     
     def health_check(self) -> Dict[str, Any]:
         """Perform health check"""
+        catalog = self.catalog
         return {
-            "status": "healthy" if self.available else "unavailable",
-            "available": self.available
+            "status": "healthy" if self.available or catalog else "unavailable",
+            "available": self.available,
+            "catalog": catalog.stats() if catalog else None
         }
 
 
 def get_research_paper_hive_integration(config: Optional[Dict] = None) -> ResearchPaperHiveIntegration:
     """Get or create Research-Paper-Hive integration instance"""
-    return ResearchPaperHiveIntegration(config)
+    return integration_registry.get("research_paper_hive", ResearchPaperHiveIntegration, config)
 
 
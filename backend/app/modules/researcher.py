@@ -1,23 +1,299 @@
 import requests
-import arxiv
 from datetime import datetime
 import re
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+from app.modules.paper_catalog import PaperCatalog, get_paper_catalog
+
+try:
+    import arxiv
+    ARXIV_AVAILABLE = True
+except ImportError:
+    ARXIV_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, int]
+
+
+def make_search_key(query: str, max_results: int) -> CacheKey:
+    """Normalize a search into the (query, max_results) cache key"""
+    return (" ".join(query.split()).lower(), int(max_results))
+
+
+def merge_papers(first: list, second: list, max_results: int) -> list:
+    """first, then the papers of second not already in it (by title), up to max_results"""
+    seen = {" ".join(str(p.get("title") or "").split()).lower() for p in first}
+    merged = list(first)
+    for paper in second:
+        title = " ".join(str(paper.get("title") or "").split()).lower()
+        if title not in seen:
+            seen.add(title)
+            merged.append(paper)
+    return merged[:max_results]
+
+
+class ResearchCache:
+    """Persistent TTL cache of search results backed by SQLite"""
+
+    def __init__(self, path: str, ttl_seconds: float = 86400.0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                query TEXT NOT NULL,
+                max_results INTEGER NOT NULL,
+                results TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (query, max_results)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: CacheKey) -> Optional[list]:
+        """Return cached results for key, or None if missing or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, fetched_at FROM search_cache WHERE query = ? AND max_results = ?",
+                key,
+            ).fetchone()
+        if row is None:
+            return None
+        results, fetched_at = row
+        if time.time() - fetched_at > self.ttl_seconds:
+            return None
+        return json.loads(results)
+
+    def set(self, key: CacheKey, results: list) -> None:
+        """Store results for key, replacing any previous entry"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (query, max_results, results, fetched_at) VALUES (?, ?, ?, ?)",
+                (key[0], key[1], json.dumps(results), time.time()),
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM search_cache WHERE fetched_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+
+class FixtureBackend:
+    """
+    Replayable local search backend for offline runs and benchmarks.
+    The fixture file is a JSON object mapping "query|max_results" to result lists.
+    In record mode, live results are written back to the fixture file.
+    """
+
+    def __init__(self, path: str, record: bool = False, latency_ms: float = 0.0):
+        self.path = path
+        self.record = record
+        self.latency_ms = latency_ms
+        self._lock = threading.Lock()
+        self.fixtures: Dict[str, list] = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.fixtures = json.load(f)
+
+    @staticmethod
+    def _fixture_key(key: CacheKey) -> str:
+        return f"{key[0]}|{key[1]}"
+
+    def search(self, key: CacheKey) -> Optional[list]:
+        """Replay results for key; None means the fixture has no entry"""
+        if self.latency_ms:
+            # Emulate network latency so offline benchmarks stay representative
+            time.sleep(self.latency_ms / 1000.0)
+        return self.fixtures.get(self._fixture_key(key))
+
+    def save(self, key: CacheKey, results: list) -> None:
+        """Record live results into the fixture file"""
+        with self._lock:
+            self.fixtures[self._fixture_key(key)] = results
+            with open(self.path, 'w') as f:
+                json.dump(self.fixtures, f, indent=2)
+
 
 class ScholarlyResearcher:
     """Research engine for academic content from arXiv and other scholarly sources"""
-    
-    def __init__(self):
-        self.client = arxiv.Client()
-        self.session_cache = {}
-        
+
+    def __init__(self, cache_path: Optional[str] = None,
+                 cache_ttl: Optional[float] = None,
+                 fixture_path: Optional[str] = None,
+                 fixture_mode: Optional[str] = None,
+                 catalog: Optional[PaperCatalog] = None):
+        self.client = arxiv.Client() if ARXIV_AVAILABLE else None
+        # Local paper catalog answers first; the network only fills what it can't
+        self.catalog = catalog
+        cache_path = cache_path or os.getenv("RESEARCH_CACHE_PATH", "./cache/research_cache.db")
+        cache_ttl = cache_ttl if cache_ttl is not None else float(os.getenv("RESEARCH_CACHE_TTL", "86400"))
+
+        # In-process hot layer in front of the persistent cache: LRU, same TTL
+        self.session_cache: "OrderedDict[CacheKey, Tuple[float, list]]" = OrderedDict()
+        self.session_cache_size = int(os.getenv("RESEARCH_SESSION_CACHE_SIZE", "256"))
+        self.session_ttl = cache_ttl
+        self._session_lock = threading.Lock()
+        try:
+            self.cache: Optional[ResearchCache] = ResearchCache(cache_path, cache_ttl)
+        except Exception as e:
+            logger.warning(f"Research cache unavailable: {e}")
+            self.cache = None
+
+        # fixture_mode: "replay" answers only from fixtures, "record" captures live results
+        fixture_path = fixture_path or os.getenv("RESEARCH_FIXTURE_PATH")
+        self.fixture_mode = (fixture_mode or os.getenv("RESEARCH_FIXTURE_MODE", "replay")).lower()
+        self.fixtures: Optional[FixtureBackend] = None
+        if fixture_path:
+            self.fixtures = FixtureBackend(
+                fixture_path,
+                record=self.fixture_mode == "record",
+                latency_ms=float(os.getenv("RESEARCH_FIXTURE_LATENCY_MS", "0")),
+            )
+
+        # Request coalescing: concurrent identical searches share one fetch
+        self._inflight: Dict[CacheKey, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self.stats = {"session_hits": 0, "catalog_hits": 0, "cache_hits": 0, "fetches": 0, "coalesced": 0}
+
     def search_arxiv(self, query: str, max_results: int = 5) -> list:
-        """Search arXiv for relevant papers"""
+        """
+        Search arXiv for relevant papers (cached, coalesced). A catalog answer
+        short of max_results is topped up from the network, catalog hits first.
+        """
+        key = make_search_key(query, max_results)
+
+        cached = self._session_get(key)
+        if cached is not None:
+            self.stats["session_hits"] += 1
+            return cached
+
+        catalog = self.catalog or get_paper_catalog()
+        papers = []
+        if catalog:
+            try:
+                papers = catalog.search(query, max_results)
+            except Exception as e:
+                # A broken catalog must not take search down; the network still answers
+                logger.warning(f"Paper catalog search failed: {e}")
+        if len(papers) >= max_results:
+            self.stats["catalog_hits"] += 1
+            self._session_put(key, papers)
+            return papers
+
+        try:
+            fetched = self._search_remote(query, max_results, key)
+        except Exception as e:
+            if not papers:
+                raise
+            # Partial catalog answer beats none; not session-cached so a later call retries
+            logger.warning(f"arXiv search failed, returning catalog results only: {e}")
+            return papers
+        if fetched is None:
+            # Replay miss: nothing to cache, a later fixture or mode may answer
+            return papers
+
+        results = merge_papers(papers, fetched, max_results)
+        self._session_put(key, results)
+        return results
+
+    def _session_get(self, key: CacheKey) -> Optional[list]:
+        with self._session_lock:
+            entry = self.session_cache.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.session_ttl:
+                del self.session_cache[key]
+                return None
+            self.session_cache.move_to_end(key)
+            return entry[1]
+
+    def _session_put(self, key: CacheKey, results: list) -> None:
+        if self.session_cache_size <= 0:
+            return
+        with self._session_lock:
+            self.session_cache[key] = (time.time(), results)
+            self.session_cache.move_to_end(key)
+            while len(self.session_cache) > self.session_cache_size:
+                self.session_cache.popitem(last=False)
+
+    def _search_remote(self, query: str, max_results: int, key: CacheKey) -> Optional[list]:
+        """
+        Persistent cache, then one coalesced fetch per key. None means a
+        fixture replay had no entry; that is never cached.
+        """
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                return cached
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            results = self._fetch(query, max_results, key)
+            if self.cache and results is not None:
+                self.cache.set(key, results)
+            future.set_result(results)
+            return results
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _fetch(self, query: str, max_results: int, key: CacheKey) -> Optional[list]:
+        """Fetch results from the fixture backend (None on a replay miss) or the arXiv API"""
+        self.stats["fetches"] += 1
+        if self.fixtures and self.fixture_mode == "replay":
+            return self.fixtures.search(key)
+
+        results = self._search_arxiv_live(query, max_results)
+        if self.fixtures and self.fixture_mode == "record":
+            self.fixtures.save(key, results)
+        return results
+
+    def _search_arxiv_live(self, query: str, max_results: int) -> list:
+        """Query the arXiv API directly"""
+        if not ARXIV_AVAILABLE:
+            raise RuntimeError("arxiv package not installed and no fixture backend configured")
+
         search = arxiv.Search(
             query=query,
             max_results=max_results,
             sort_by=arxiv.SortCriterion.Relevance
         )
-        
+
         results = []
         for paper in self.client.results(search):
             results.append({
@@ -29,7 +305,7 @@ class ScholarlyResearcher:
                 'categories': paper.categories
             })
         return results
-    
+
     def get_dataset_info(self, topic: str) -> dict:
         """Find relevant public datasets for a learning topic"""
         # This would integrate with data repositories like Kaggle, UCI ML Repo, etc.
@@ -46,4 +322,3 @@ class ScholarlyResearcher:
         """Scan arXiv for trending categories"""
         # Mock implementation for trend scanning
         return ["cs.AI", "cs.LG", "q-bio.NC"]
-
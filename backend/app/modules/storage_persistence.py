@@ -4,8 +4,12 @@ Handles local filesystem, TimescaleDB cloud storage, and artifact management
 """
 
 import os
+import re
+import io
+import csv
 import json
 import shutil
+import itertools
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
@@ -13,8 +17,584 @@ import logging
 import hashlib
 import uuid
 
+from ..core.schema_migrations import Migration, MigrationRunner
+
 logger = logging.getLogger(__name__)
 
+PERSISTENCE_SCHEMA = """
+-- Users table
+CREATE TABLE IF NOT EXISTS users (
+    user_id VARCHAR(255) PRIMARY KEY,
+    email VARCHAR(255) UNIQUE,
+    first_name VARCHAR(100),
+    last_name VARCHAR(100),
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    metadata JSONB
+);
+
+-- Learning Plans table
+CREATE TABLE IF NOT EXISTS learning_plans (
+    plan_id VARCHAR(255) PRIMARY KEY,
+    user_id VARCHAR(255),
+    topic VARCHAR(500),
+    mode VARCHAR(50),
+    modules JSONB,
+    sources JSONB,
+    status VARCHAR(50),
+    progress JSONB,
+    metadata JSONB,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Quizzes table
+CREATE TABLE IF NOT EXISTS quizzes (
+    quiz_id VARCHAR(255) PRIMARY KEY,
+    topic VARCHAR(500),
+    questions JSONB,
+    bloom_distribution JSONB,
+    adaptive_difficulty BOOLEAN,
+    fsrs_integration BOOLEAN,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    metadata JSONB
+);
+
+-- Quiz Attempts table (time-series; the key includes timestamp so it can be a hypertable)
+CREATE TABLE IF NOT EXISTS quiz_attempts (
+    attempt_id VARCHAR(255),
+    quiz_id VARCHAR(255),
+    user_id VARCHAR(255),
+    answers JSONB,
+    score INTEGER,
+    max_score INTEGER,
+    percent_correct FLOAT,
+    timestamp TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (attempt_id, timestamp)
+);
+CREATE INDEX IF NOT EXISTS idx_quiz_attempts_user_time ON quiz_attempts (user_id, timestamp DESC);
+
+-- Feynman Sessions table
+CREATE TABLE IF NOT EXISTS feynman_sessions (
+    session_id VARCHAR(255) PRIMARY KEY,
+    concept VARCHAR(500),
+    topic VARCHAR(500),
+    target_audience VARCHAR(100),
+    iterations JSONB,
+    status VARCHAR(50),
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Memory Palaces table
+CREATE TABLE IF NOT EXISTS memory_palaces (
+    palace_id VARCHAR(255) PRIMARY KEY,
+    name VARCHAR(255),
+    template VARCHAR(100),
+    user_id VARCHAR(255),
+    description TEXT,
+    loci JSONB,
+    journey JSONB,
+    review_count INTEGER DEFAULT 0,
+    retention_rate FLOAT DEFAULT 0,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tasks table
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id VARCHAR(255) PRIMARY KEY,
+    user_id VARCHAR(255),
+    task_type VARCHAR(100),
+    status VARCHAR(50),
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    metadata JSONB
+);
+
+-- Learning sessions table (time-series)
+CREATE TABLE IF NOT EXISTS learning_sessions (
+    session_id VARCHAR(255),
+    user_id VARCHAR(255),
+    session_type VARCHAR(100),
+    topic VARCHAR(500),
+    started_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    ended_at TIMESTAMPTZ,
+    duration_minutes INTEGER,
+    score FLOAT,
+    rpe_events INTEGER DEFAULT 0,
+    metadata JSONB,
+    PRIMARY KEY (session_id, started_at)
+);
+
+-- RPE events table (time-series)
+CREATE TABLE IF NOT EXISTS rpe_events (
+    event_id VARCHAR(255),
+    user_id VARCHAR(255),
+    session_id VARCHAR(255),
+    item_id VARCHAR(255),
+    confidence FLOAT,
+    was_correct BOOLEAN,
+    rpe_value FLOAT,
+    dopamine_impact FLOAT,
+    learning_value FLOAT,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (event_id, created_at)
+);
+
+-- Spaced repetition items
+CREATE TABLE IF NOT EXISTS spaced_repetition_items (
+    item_id VARCHAR(255) PRIMARY KEY,
+    user_id VARCHAR(255),
+    content TEXT,
+    question TEXT,
+    answer TEXT,
+    difficulty INTEGER DEFAULT 0,
+    interval_days INTEGER DEFAULT 1,
+    repetitions INTEGER DEFAULT 0,
+    ease_factor FLOAT DEFAULT 2.5,
+    last_review_at TIMESTAMPTZ,
+    next_review_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Executions table
+CREATE TABLE IF NOT EXISTS executions (
+    execution_id VARCHAR(255),
+    task_id VARCHAR(255),
+    agent_id VARCHAR(255),
+    status VARCHAR(50),
+    result JSONB,
+    error TEXT,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    execution_time FLOAT,
+    PRIMARY KEY (execution_id, created_at)
+);
+
+-- Agent evolution table
+CREATE TABLE IF NOT EXISTS agent_evolution (
+    evolution_id VARCHAR(255) PRIMARY KEY,
+    agent_id VARCHAR(255),
+    version INTEGER,
+    improvements JSONB,
+    performance_before JSONB,
+    performance_after JSONB,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- User analytics (aggregated time-series)
+CREATE TABLE IF NOT EXISTS user_analytics (
+    analytics_id VARCHAR(255),
+    user_id VARCHAR(255),
+    period_start TIMESTAMPTZ,
+    period_end TIMESTAMPTZ,
+    total_sessions INTEGER,
+    total_duration_minutes INTEGER,
+    average_score FLOAT,
+    retention_rate FLOAT,
+    rpe_summary JSONB,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (analytics_id, period_start)
+);
+"""
+
+# quiz_attempts tables created before the key included timestamp
+QUIZ_ATTEMPTS_KEY_SQL = """
+UPDATE quiz_attempts SET timestamp = CURRENT_TIMESTAMP WHERE timestamp IS NULL;
+ALTER TABLE quiz_attempts ALTER COLUMN timestamp SET NOT NULL;
+ALTER TABLE quiz_attempts DROP CONSTRAINT IF EXISTS quiz_attempts_pkey;
+ALTER TABLE quiz_attempts ADD PRIMARY KEY (attempt_id, timestamp);
+"""
+
+HYPERTABLES_SQL = """
+SELECT create_hypertable('learning_sessions', 'started_at', if_not_exists => TRUE);
+SELECT create_hypertable('rpe_events', 'created_at', if_not_exists => TRUE);
+SELECT create_hypertable('executions', 'created_at', if_not_exists => TRUE);
+SELECT create_hypertable('user_analytics', 'period_start', if_not_exists => TRUE);
+"""
+
+# Continuous aggregates behind the progress and analytics reports:
+# view -> (hypertable, time column, bucket width, refresh window, aggregate columns)
+ROLLUP_VIEWS = {
+    "quiz_progress_daily": ("quiz_attempts", "timestamp", "1 day", "7 days",
+                            "COUNT(*) AS attempts, SUM(percent_correct) AS score_sum, SUM(score) AS correct, SUM(max_score) AS questions"),
+    "quiz_progress_weekly": ("quiz_attempts", "timestamp", "1 week", "4 weeks",
+                             "COUNT(*) AS attempts, SUM(percent_correct) AS score_sum, SUM(score) AS correct, SUM(max_score) AS questions"),
+    "learning_sessions_daily": ("learning_sessions", "started_at", "1 day", "7 days",
+                                "COUNT(*) AS sessions, SUM(duration_minutes) AS duration_minutes, "
+                                "SUM(score) AS score_sum, COUNT(score) AS scored_sessions, "
+                                "SUM(rpe_events) AS rpe_events"),
+}
+PROGRESS_PERIODS = {"daily": ("quiz_progress_daily", "day"), "weekly": ("quiz_progress_weekly", "week")}
+
+
+def _rollup_migration(version: int, view: str) -> Migration:
+    """Continuous aggregate with a refresh policy; real-time reads cover rows newer than the last refresh"""
+    table, column, width, window, columns = ROLLUP_VIEWS[view]
+    return Migration(version, view, f"""
+SELECT create_hypertable('{table}', '{column}', if_not_exists => TRUE, migrate_data => TRUE);
+CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT user_id, time_bucket(INTERVAL '{width}', {column}) AS bucket, {columns}
+FROM {table}
+GROUP BY user_id, bucket
+WITH NO DATA;
+SELECT add_continuous_aggregate_policy('{view}',
+    start_offset => INTERVAL '{window}', end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '1 hour', if_not_exists => TRUE);
+""", optional=True,
+        # One-off backfill of rows older than the policy window
+        after_commit=(f"CALL refresh_continuous_aggregate('{view}', NULL, NOW() - INTERVAL '1 hour')",))
+
+
+PERSISTENCE_MIGRATIONS = [
+    Migration(1, "base tables", PERSISTENCE_SCHEMA),
+    Migration(2, "quiz_attempts keyed by timestamp", QUIZ_ATTEMPTS_KEY_SQL),
+    Migration(3, "time-series hypertables", HYPERTABLES_SQL, optional=True),
+    _rollup_migration(4, "quiz_progress_daily"),
+    _rollup_migration(5, "quiz_progress_weekly"),
+    _rollup_migration(6, "learning_sessions_daily"),
+]
+
+STORAGE_MIGRATIONS = [
+    Migration(1, "artifact and embedding tables", """
+-- Artifacts storage table
+CREATE TABLE IF NOT EXISTS artifacts (
+    artifact_id VARCHAR(255) PRIMARY KEY,
+    task_id VARCHAR(255),
+    artifact_type VARCHAR(100),
+    content JSONB,
+    metadata JSONB,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Vector embeddings table (for pgvector if available)
+CREATE TABLE IF NOT EXISTS embeddings (
+    id VARCHAR(255) PRIMARY KEY,
+    content_id VARCHAR(255),
+    content_type VARCHAR(100),
+    embedding_text TEXT,
+    metadata JSONB,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+"""),
+    Migration(2, "pgvector embedding column", """
+CREATE EXTENSION IF NOT EXISTS vector;
+ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS embedding vector(1536);
+""", optional=True),
+]
+
+# Statements used on every request. DatabasePersistence PREPAREs them once per
+# connection and then sends only EXECUTE name (params); the batch variants
+# reuse the same text with one VALUES list per page.
+STATEMENTS = {
+    "save_task": """
+        INSERT INTO tasks (task_id, user_id, task_type, status, metadata)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (task_id) DO UPDATE SET
+            status = EXCLUDED.status,
+            updated_at = CURRENT_TIMESTAMP,
+            metadata = EXCLUDED.metadata
+    """,
+    "save_learning_session": """
+        INSERT INTO learning_sessions
+        (session_id, user_id, session_type, topic, duration_minutes, score, rpe_events, metadata)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """,
+    "save_rpe_event": """
+        INSERT INTO rpe_events
+        (event_id, user_id, session_id, item_id, confidence, was_correct,
+         rpe_value, dopamine_impact, learning_value)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """,
+    "save_execution": """
+        INSERT INTO executions (execution_id, task_id, agent_id, status, result, error, execution_time)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """,
+    "save_agent_evolution": """
+        INSERT INTO agent_evolution
+        (evolution_id, agent_id, version, improvements, performance_before, performance_after)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """,
+    "save_learning_plan": """
+        INSERT INTO learning_plans
+        (plan_id, user_id, topic, mode, modules, sources, status, progress, metadata)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (plan_id) DO UPDATE SET
+            modules = EXCLUDED.modules,
+            sources = EXCLUDED.sources,
+            status = EXCLUDED.status,
+            progress = EXCLUDED.progress,
+            metadata = EXCLUDED.metadata,
+            updated_at = CURRENT_TIMESTAMP
+    """,
+    "get_learning_plan": """
+        SELECT plan_id, user_id, topic, mode, modules, sources, status, progress, metadata, created_at
+        FROM learning_plans
+        WHERE plan_id = %s
+    """,
+    "get_many_learning_plans": """
+        SELECT plan_id, user_id, topic, mode, modules, sources, status, progress, metadata, created_at
+        FROM learning_plans
+        WHERE plan_id = ANY(%s::varchar[])
+    """,
+    "get_user_learning_plans": """
+        SELECT plan_id, user_id, topic, mode, modules, sources, status, progress, metadata, created_at
+        FROM learning_plans
+        WHERE user_id = %s
+        ORDER BY created_at DESC
+    """,
+    "save_quiz": """
+        INSERT INTO quizzes
+        (quiz_id, topic, questions, bloom_distribution, adaptive_difficulty, fsrs_integration, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (quiz_id) DO NOTHING
+    """,
+    "get_quiz": """
+        SELECT quiz_id, topic, questions, bloom_distribution, adaptive_difficulty, fsrs_integration, created_at
+        FROM quizzes
+        WHERE quiz_id = %s
+    """,
+    "get_many_quizzes": """
+        SELECT quiz_id, topic, questions, bloom_distribution, adaptive_difficulty, fsrs_integration, created_at
+        FROM quizzes
+        WHERE quiz_id = ANY(%s::varchar[])
+    """,
+    "save_quiz_attempt": """
+        INSERT INTO quiz_attempts
+        (attempt_id, quiz_id, user_id, answers, score, max_score, percent_correct, timestamp)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT DO NOTHING
+    """,
+    "get_user_quiz_attempts": """
+        SELECT attempt_id, quiz_id, user_id, answers, score, max_score, percent_correct, timestamp
+        FROM quiz_attempts
+        WHERE user_id = %s
+        ORDER BY timestamp DESC
+    """,
+    "save_feynman_session": """
+        INSERT INTO feynman_sessions
+        (session_id, concept, topic, target_audience, iterations, status, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (session_id) DO UPDATE SET
+            iterations = EXCLUDED.iterations,
+            status = EXCLUDED.status,
+            updated_at = CURRENT_TIMESTAMP
+    """,
+    "get_feynman_session": """
+        SELECT session_id, concept, topic, target_audience, iterations, status, created_at
+        FROM feynman_sessions
+        WHERE session_id = %s
+    """,
+    "get_many_feynman_sessions": """
+        SELECT session_id, concept, topic, target_audience, iterations, status, created_at
+        FROM feynman_sessions
+        WHERE session_id = ANY(%s::varchar[])
+    """,
+    "save_memory_palace": """
+        INSERT INTO memory_palaces
+        (palace_id, name, template, user_id, description, loci, journey, review_count, retention_rate, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (palace_id) DO UPDATE SET
+            name = EXCLUDED.name,
+            description = EXCLUDED.description,
+            loci = EXCLUDED.loci,
+            journey = EXCLUDED.journey,
+            review_count = EXCLUDED.review_count,
+            retention_rate = EXCLUDED.retention_rate,
+            updated_at = CURRENT_TIMESTAMP
+    """,
+    "get_memory_palace": """
+        SELECT palace_id, name, template, user_id, description, loci, journey, review_count, retention_rate, created_at
+        FROM memory_palaces
+        WHERE palace_id = %s
+    """,
+    "get_many_memory_palaces": """
+        SELECT palace_id, name, template, user_id, description, loci, journey, review_count, retention_rate, created_at
+        FROM memory_palaces
+        WHERE palace_id = ANY(%s::varchar[])
+    """,
+}
+
+
+def numbered_placeholders(sql: str) -> str:
+    """%s placeholders -> $1..$n, as PREPARE expects"""
+    counter = itertools.count(1)
+    return re.sub(r"%s", lambda _: f"${next(counter)}", sql)
+
+
+def multirow_insert(sql: str) -> str:
+    """Single-row INSERT ... VALUES (%s, ...) -> the VALUES %s form execute_values pages into"""
+    return re.sub(r"VALUES\s*\([^)]*\)", "VALUES %s", sql, count=1)
+
+
+def _isoformat(value: Any) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+# Row builders (record dict -> statement parameters) and parsers (row -> record dict)
+
+def _learning_session_row(session_data: Dict) -> tuple:
+    return (
+        session_data.get('session_id', str(uuid.uuid4())),
+        session_data.get('user_id'),
+        session_data.get('session_type'),
+        session_data.get('topic'),
+        session_data.get('duration_minutes'),
+        session_data.get('score'),
+        session_data.get('rpe_events', 0),
+        json.dumps(session_data.get('metadata', {}))
+    )
+
+
+def _rpe_event_row(rpe_data: Dict) -> tuple:
+    return (
+        rpe_data.get('event_id', str(uuid.uuid4())),
+        rpe_data.get('user_id'),
+        rpe_data.get('session_id'),
+        rpe_data.get('item_id'),
+        rpe_data.get('confidence'),
+        rpe_data.get('was_correct'),
+        rpe_data.get('rpe_value'),
+        rpe_data.get('dopamine_impact'),
+        rpe_data.get('learning_value')
+    )
+
+
+def _learning_plan_row(plan_data: Dict) -> tuple:
+    return (
+        plan_data.get('id'),
+        plan_data.get('user_id'),
+        plan_data.get('goals', {}).get('topic', 'Unknown'),
+        plan_data.get('mode', 'polymath'),
+        json.dumps(plan_data.get('phases', [])), # Mapping phases to modules
+        json.dumps(plan_data.get('sources', [])),
+        plan_data.get('status', 'active'),
+        json.dumps(plan_data.get('progress', {})),
+        json.dumps(plan_data.get('goals', {})) # Store goals in metadata/goals
+    )
+
+
+def _learning_plan_from_row(row: tuple) -> Dict:
+    # Reconstruct to match LearningPlanResponse structure
+    metadata = row[8] or {}
+    return {
+        "id": row[0],
+        "user_id": row[1],
+        "goals": metadata, # Assuming goals are stored in metadata
+        "phases": row[4], # modules -> phases
+        "current_phase_index": 0, # Default
+        "start_date": _isoformat(row[9]),
+        "estimated_end_date": None, # Calculate or store
+        "progress": row[7],
+        "created_at": _isoformat(row[9])
+    }
+
+
+def _quiz_row(quiz_data: Dict) -> tuple:
+    return (
+        quiz_data.get('id'),
+        quiz_data.get('topic'),
+        json.dumps(quiz_data.get('questions', [])),
+        json.dumps(quiz_data.get('bloom_distribution', {})),
+        quiz_data.get('adaptive_difficulty', True),
+        quiz_data.get('fsrs_integration', True),
+        quiz_data.get('created_at')
+    )
+
+
+def _quiz_from_row(row: tuple) -> Dict:
+    return {
+        "id": row[0],
+        "topic": row[1],
+        "questions": row[2],
+        "bloom_distribution": row[3],
+        "adaptive_difficulty": row[4],
+        "fsrs_integration": row[5],
+        "created_at": _isoformat(row[6])
+    }
+
+
+def _quiz_attempt_row(attempt: Dict) -> tuple:
+    return (
+        attempt.get('id'),
+        attempt.get('quiz_id'),
+        attempt.get('user_id'),
+        json.dumps(attempt.get('answers', [])),
+        attempt.get('score'),
+        attempt.get('max_score'),
+        attempt.get('percent_correct'),
+        attempt.get('timestamp') or datetime.now()
+    )
+
+
+def _quiz_attempt_from_row(row: tuple) -> Dict:
+    return {
+        "id": row[0],
+        "quiz_id": row[1],
+        "user_id": row[2],
+        "answers": row[3],
+        "score": row[4],
+        "max_score": row[5],
+        "percent_correct": row[6],
+        "timestamp": _isoformat(row[7])
+    }
+
+
+def _feynman_session_row(session_data: Dict) -> tuple:
+    return (
+        session_data.get('id'),
+        session_data.get('concept'),
+        session_data.get('topic'),
+        session_data.get('target_audience'),
+        json.dumps(session_data.get('iterations', [])),
+        session_data.get('status', 'active'),
+        session_data.get('created_at')
+    )
+
+
+def _feynman_session_from_row(row: tuple) -> Dict:
+    return {
+        "id": row[0],
+        "concept": row[1],
+        "topic": row[2],
+        "target_audience": row[3],
+        "iterations": row[4],
+        "status": row[5],
+        "created_at": _isoformat(row[6])
+    }
+
+
+def _memory_palace_row(palace_data: Dict) -> tuple:
+    return (
+        palace_data.get('id'),
+        palace_data.get('name'),
+        palace_data.get('template'),
+        palace_data.get('user_id'),
+        palace_data.get('description'),
+        json.dumps(palace_data.get('loci', [])),
+        json.dumps(palace_data.get('journey', [])),
+        palace_data.get('review_count', 0),
+        palace_data.get('retention_rate', 0),
+        palace_data.get('created_at')
+    )
+
+
+def _memory_palace_from_row(row: tuple) -> Dict:
+    return {
+        "id": row[0],
+        "name": row[1],
+        "template": row[2],
+        "user_id": row[3],
+        "description": row[4],
+        "loci": row[5],
+        "journey": row[6],
+        "review_count": row[7],
+        "retention_rate": row[8],
+        "created_at": _isoformat(row[9])
+    }
+
+
 class ArtifactManager:
     """Manages artifacts with versioning and organization"""
     
@@ -132,6 +712,7 @@ class TimescaleDBStorage:
         self.connection_string = connection_string or os.getenv("DATABASE_URL")
         self.available = False
         self.conn = None
+        self.schema_report = None
         
         if self.connection_string:
             try:
@@ -146,53 +727,18 @@ class TimescaleDBStorage:
                 logger.warning(f"TimescaleDB storage not available: {e}")
     
     def _initialize_storage_tables(self):
-        """Initialize storage tables in TimescaleDB"""
+        """Initialize storage tables in TimescaleDB (pgvector column when the extension is available)"""
         if not self.available or not self.conn:
             return
         
+        runner = MigrationRunner(self.conn, "storage", STORAGE_MIGRATIONS)
         try:
-            with self.conn.cursor() as cur:
-                # Artifacts storage table
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS artifacts (
-                        artifact_id VARCHAR(255) PRIMARY KEY,
-                        task_id VARCHAR(255),
-                        artifact_type VARCHAR(100),
-                        content JSONB,
-                        metadata JSONB,
-                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Vector embeddings table (for pgvector if available)
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS embeddings (
-                        id VARCHAR(255) PRIMARY KEY,
-                        content_id VARCHAR(255),
-                        content_type VARCHAR(100),
-                        embedding_text TEXT,
-                        metadata JSONB,
-                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Try to enable pgvector extension
-                try:
-                    cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
-                    cur.execute("""
-                        ALTER TABLE embeddings 
-                        ADD COLUMN IF NOT EXISTS embedding vector(1536)
-                    """)
-                    logger.info("pgvector extension enabled")
-                except Exception as e:
-                    logger.info(f"pgvector not available, using text embeddings: {e}")
-                
-                self.conn.commit()
-                logger.info("TimescaleDB storage tables initialized")
+            self.schema_report = runner.run()
+            if "pgvector embedding column" in runner.applied_names():
+                logger.info("pgvector extension enabled")
+            logger.info("TimescaleDB storage tables initialized")
         except Exception as e:
             logger.error(f"Failed to initialize TimescaleDB storage tables: {e}")
-            self.conn.rollback()
     
     def upload_artifact(
         self,
@@ -298,17 +844,22 @@ class TimescaleDBStorage:
 class DatabasePersistence:
     """TimescaleDB database persistence for PolyMathOS"""
     
-    def __init__(self, connection_string: Optional[str] = None):
+    def __init__(self, connection_string: Optional[str] = None, migrate: bool = True):
         self.connection_string = connection_string or os.getenv("DATABASE_URL")
         self.available = False
         self.conn = None
+        self.rollup_views = set()
+        self.schema_report = None
+        self._prepared = set()
         
         if self.connection_string:
             try:
                 import psycopg2
                 self.conn = psycopg2.connect(self.connection_string)
                 self.available = True
-                self._initialize_tables()
+                if migrate:
+                    self._initialize_tables()
+                self._prepare_statements()
                 logger.info("TimescaleDB persistence initialized")
             except ImportError:
                 logger.warning("psycopg2 not available. Install with: pip install psycopg2-binary")
@@ -317,356 +868,184 @@ class DatabasePersistence:
                 self.available = False
     
     def _initialize_tables(self):
-        """Initialize database tables with TimescaleDB hypertables for time-series"""
+        """Bring the schema up to date (a single query when no migration is pending)"""
         if not self.available or not self.conn:
             return
         
+        runner = MigrationRunner(self.conn, "persistence", PERSISTENCE_MIGRATIONS)
         try:
-            with self.conn.cursor() as cur:
-                # Users table
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS users (
-                        user_id VARCHAR(255) PRIMARY KEY,
-                        email VARCHAR(255) UNIQUE,
-                        first_name VARCHAR(100),
-                        last_name VARCHAR(100),
-                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                        metadata JSONB
-                    )
-                """)
-
-                # Learning Plans table
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS learning_plans (
-                        plan_id VARCHAR(255) PRIMARY KEY,
-                        user_id VARCHAR(255),
-                        topic VARCHAR(500),
-                        mode VARCHAR(50),
-                        modules JSONB,
-                        sources JSONB,
-                        status VARCHAR(50),
-                        progress JSONB,
-                        metadata JSONB,
-                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-
-                # Quizzes table
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS quizzes (
-                        quiz_id VARCHAR(255) PRIMARY KEY,
-                        topic VARCHAR(500),
-                        questions JSONB,
-                        bloom_distribution JSONB,
-                        adaptive_difficulty BOOLEAN,
-                        fsrs_integration BOOLEAN,
-                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                        metadata JSONB
-                    )
-                """)
-
-                # Quiz Attempts table
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS quiz_attempts (
-                        attempt_id VARCHAR(255) PRIMARY KEY,
-                        quiz_id VARCHAR(255),
-                        user_id VARCHAR(255),
-                        answers JSONB,
-                        score INTEGER,
-                        max_score INTEGER,
-                        percent_correct FLOAT,
-                        timestamp TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-
-                # Feynman Sessions table
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS feynman_sessions (
-                        session_id VARCHAR(255) PRIMARY KEY,
-                        concept VARCHAR(500),
-                        topic VARCHAR(500),
-                        target_audience VARCHAR(100),
-                        iterations JSONB,
-                        status VARCHAR(50),
-                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-
-                # Memory Palaces table
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS memory_palaces (
-                        palace_id VARCHAR(255) PRIMARY KEY,
-                        name VARCHAR(255),
-                        template VARCHAR(100),
-                        user_id VARCHAR(255),
-                        description TEXT,
-                        loci JSONB,
-                        journey JSONB,
-                        review_count INTEGER DEFAULT 0,
-                        retention_rate FLOAT DEFAULT 0,
-                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Tasks table
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS tasks (
-                        task_id VARCHAR(255) PRIMARY KEY,
-                        user_id VARCHAR(255),
-                        task_type VARCHAR(100),
-                        status VARCHAR(50),
-                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                        metadata JSONB
-                    )
-                """)
-                
-                # Learning sessions table (time-series)
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS learning_sessions (
-                        session_id VARCHAR(255),
-                        user_id VARCHAR(255),
-                        session_type VARCHAR(100),
-                        topic VARCHAR(500),
-                        started_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                        ended_at TIMESTAMPTZ,
-                        duration_minutes INTEGER,
-                        score FLOAT,
-                        rpe_events INTEGER DEFAULT 0,
-                        metadata JSONB,
-                        PRIMARY KEY (session_id, started_at)
-                    )
-                """)
-                
-                # RPE events table (time-series)
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS rpe_events (
-                        event_id VARCHAR(255),
-                        user_id VARCHAR(255),
-                        session_id VARCHAR(255),
-                        item_id VARCHAR(255),
-                        confidence FLOAT,
-                        was_correct BOOLEAN,
-                        rpe_value FLOAT,
-                        dopamine_impact FLOAT,
-                        learning_value FLOAT,
-                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                        PRIMARY KEY (event_id, created_at)
-                    )
-                """)
-                
-                # Spaced repetition items
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS spaced_repetition_items (
-                        item_id VARCHAR(255) PRIMARY KEY,
-                        user_id VARCHAR(255),
-                        content TEXT,
-                        question TEXT,
-                        answer TEXT,
-                        difficulty INTEGER DEFAULT 0,
-                        interval_days INTEGER DEFAULT 1,
-                        repetitions INTEGER DEFAULT 0,
-                        ease_factor FLOAT DEFAULT 2.5,
-                        last_review_at TIMESTAMPTZ,
-                        next_review_at TIMESTAMPTZ,
-                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Executions table
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS executions (
-                        execution_id VARCHAR(255),
-                        task_id VARCHAR(255),
-                        agent_id VARCHAR(255),
-                        status VARCHAR(50),
-                        result JSONB,
-                        error TEXT,
-                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                        execution_time FLOAT,
-                        PRIMARY KEY (execution_id, created_at)
-                    )
-                """)
-                
-                # Agent evolution table
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS agent_evolution (
-                        evolution_id VARCHAR(255) PRIMARY KEY,
-                        agent_id VARCHAR(255),
-                        version INTEGER,
-                        improvements JSONB,
-                        performance_before JSONB,
-                        performance_after JSONB,
-                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # User analytics (aggregated time-series)
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS user_analytics (
-                        analytics_id VARCHAR(255),
-                        user_id VARCHAR(255),
-                        period_start TIMESTAMPTZ,
-                        period_end TIMESTAMPTZ,
-                        total_sessions INTEGER,
-                        total_duration_minutes INTEGER,
-                        average_score FLOAT,
-                        retention_rate FLOAT,
-                        rpe_summary JSONB,
-                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                        PRIMARY KEY (analytics_id, period_start)
-                    )
-                """)
-                
-                # Try to convert to hypertables for time-series optimization
-                try:
-                    cur.execute("""
-                        SELECT create_hypertable('learning_sessions', 'started_at', if_not_exists => TRUE)
-                    """)
-                    cur.execute("""
-                        SELECT create_hypertable('rpe_events', 'created_at', if_not_exists => TRUE)
-                    """)
-                    cur.execute("""
-                        SELECT create_hypertable('executions', 'created_at', if_not_exists => TRUE)
-                    """)
-                    cur.execute("""
-                        SELECT create_hypertable('user_analytics', 'period_start', if_not_exists => TRUE)
-                    """)
-                    logger.info("TimescaleDB hypertables created for time-series data")
-                except Exception as e:
-                    logger.info(f"Hypertables not created (may already exist or TimescaleDB extension not available): {e}")
-                
-                self.conn.commit()
-                logger.info("Database tables initialized")
+            self.schema_report = runner.run()
+            # Report queries use a continuous aggregate only if its migration applied
+            self.rollup_views = runner.applied_names() & set(ROLLUP_VIEWS)
+            logger.info("Database tables initialized")
         except Exception as e:
             logger.error(f"Failed to initialize database tables: {e}")
-            if self.conn:
-                self.conn.rollback()
     
-    def save_task(self, task_id: str, user_id: str, task_type: str, metadata: Dict) -> bool:
-        """Save task to database"""
+    def open_writer(self) -> "DatabasePersistence":
+        """
+        Persistence on a connection of its own, for background writers: their
+        commits and rollbacks then never end a request's transaction on self.conn.
+        """
+        writer = DatabasePersistence(self.connection_string, migrate=False)
+        writer.rollup_views = self.rollup_views
+        return writer
+
+    def _prepare_statements(self):
+        """PREPARE every STATEMENTS entry in one round-trip.
+
+        Set DB_PREPARED_STATEMENTS=false behind poolers that do not keep
+        sessions (e.g. PgBouncer in transaction mode); the SQL text is then
+        sent with every call as before.
+        """
+        if os.getenv("DB_PREPARED_STATEMENTS", "true").lower() != "true":
+            return
+
+        autocommit = self.conn.autocommit
+        try:
+            self.conn.autocommit = True
+            with self.conn.cursor() as cur:
+                cur.execute(";\n".join(
+                    f"PREPARE {name} AS {numbered_placeholders(sql)}" for name, sql in STATEMENTS.items()))
+            self._prepared = set(STATEMENTS)
+            logger.info(f"Prepared {len(self._prepared)} statements")
+        except Exception as e:
+            logger.info(f"Prepared statements not available, sending SQL text per call: {e}")
+        finally:
+            self.conn.autocommit = autocommit
+
+    def _execute(self, cur, name: str, params: tuple):
+        """Run a STATEMENTS entry, as EXECUTE when it was prepared"""
+        if name in self._prepared:
+            cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+        else:
+            cur.execute(STATEMENTS[name], params)
+
+    def _save_one(self, label: str, name: str, params: tuple) -> bool:
         if not self.available or not self.conn:
             return False
-        
+
         try:
             with self.conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO tasks (task_id, user_id, task_type, status, metadata)
-                    VALUES (%s, %s, %s, %s, %s)
-                    ON CONFLICT (task_id) DO UPDATE SET
-                        status = EXCLUDED.status,
-                        updated_at = CURRENT_TIMESTAMP,
-                        metadata = EXCLUDED.metadata
-                """, (task_id, user_id, task_type, "pending", json.dumps(metadata)))
+                self._execute(cur, name, params)
                 self.conn.commit()
                 return True
         except Exception as e:
-            logger.error(f"Failed to save task: {e}")
+            logger.error(f"Failed to save {label}: {e}")
             self.conn.rollback()
             return False
-    
-    def save_learning_session(self, session_data: Dict) -> bool:
-        """Save learning session to TimescaleDB"""
+
+    def _save_many(self, label: str, name: str, rows: List[tuple], page_size: int) -> bool:
+        """Multi-row insert of a STATEMENTS entry, one statement per page, in one transaction"""
         if not self.available or not self.conn:
             return False
-        
+        if not rows:
+            return True
+
+        # ON CONFLICT DO UPDATE rejects the same key twice in one statement; the last version wins
+        rows = list({row[0]: row for row in rows}.values())
         try:
+            from psycopg2.extras import execute_values
             with self.conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO learning_sessions 
-                    (session_id, user_id, session_type, topic, duration_minutes, score, rpe_events, metadata)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    session_data.get('session_id', str(uuid.uuid4())),
-                    session_data.get('user_id'),
-                    session_data.get('session_type'),
-                    session_data.get('topic'),
-                    session_data.get('duration_minutes'),
-                    session_data.get('score'),
-                    session_data.get('rpe_events', 0),
-                    json.dumps(session_data.get('metadata', {}))
-                ))
+                execute_values(cur, multirow_insert(STATEMENTS[name]), rows, page_size=page_size)
                 self.conn.commit()
                 return True
         except Exception as e:
-            logger.error(f"Failed to save learning session: {e}")
+            logger.error(f"Failed to save {len(rows)} {label}: {e}")
             self.conn.rollback()
             return False
-    
-    def save_rpe_event(self, rpe_data: Dict) -> bool:
-        """Save RPE event to TimescaleDB"""
+
+    def _copy_rows(self, label: str, name: str, rows: List[tuple]) -> bool:
+        """COPY rows into an append-only table (the column list is taken from the STATEMENTS insert)"""
         if not self.available or not self.conn:
             return False
-        
+        if not rows:
+            return True
+
+        table, columns = re.search(r"INSERT INTO (\w+)\s*\(([^)]*)\)", STATEMENTS[name]).groups()
+        buffer = io.StringIO()
+        # Unquoted empty CSV fields are NULLs
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
         try:
             with self.conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO rpe_events 
-                    (event_id, user_id, session_id, item_id, confidence, was_correct, 
-                     rpe_value, dopamine_impact, learning_value)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    rpe_data.get('event_id', str(uuid.uuid4())),
-                    rpe_data.get('user_id'),
-                    rpe_data.get('session_id'),
-                    rpe_data.get('item_id'),
-                    rpe_data.get('confidence'),
-                    rpe_data.get('was_correct'),
-                    rpe_data.get('rpe_value'),
-                    rpe_data.get('dopamine_impact'),
-                    rpe_data.get('learning_value')
-                ))
+                cur.copy_expert(
+                    f"COPY {table} ({' '.join(columns.split())}) FROM STDIN WITH (FORMAT csv)", buffer)
                 self.conn.commit()
                 return True
         except Exception as e:
-            logger.error(f"Failed to save RPE event: {e}")
+            logger.error(f"Failed to copy {len(rows)} {label}: {e}")
             self.conn.rollback()
             return False
-    
-    def save_execution(self, execution_id: str, task_id: str, agent_id: str, 
-                      status: str, result: Dict, execution_time: float, error: Optional[str] = None) -> bool:
-        """Save execution to database"""
+
+    def _get_one(self, label: str, name: str, key: Any, parse) -> Optional[Dict]:
         if not self.available or not self.conn:
-            return False
-        
+            return None
+
         try:
             with self.conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO executions (execution_id, task_id, agent_id, status, result, error, execution_time)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """, (execution_id, task_id, agent_id, status, json.dumps(result), error, execution_time))
-                self.conn.commit()
-                return True
+                self._execute(cur, name, (key,))
+                row = cur.fetchone()
+                return parse(row) if row else None
         except Exception as e:
-            logger.error(f"Failed to save execution: {e}")
+            logger.error(f"Failed to get {label}: {e}")
             self.conn.rollback()
-            return False
-    
-    def save_agent_evolution(self, evolution_id: str, agent_id: str, version: int,
-                            improvements: List[Dict], performance_before: Dict, 
-                            performance_after: Dict) -> bool:
-        """Save agent evolution record"""
+            return None
+
+    def _get_rows(self, label: str, name: str, key: Any, parse) -> List[Dict]:
         if not self.available or not self.conn:
-            return False
-        
+            return []
+
         try:
             with self.conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO agent_evolution 
-                    (evolution_id, agent_id, version, improvements, performance_before, performance_after)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                """, (evolution_id, agent_id, version, json.dumps(improvements),
-                     json.dumps(performance_before), json.dumps(performance_after)))
-                self.conn.commit()
-                return True
+                self._execute(cur, name, (key,))
+                return [parse(row) for row in cur.fetchall()]
         except Exception as e:
-            logger.error(f"Failed to save agent evolution: {e}")
+            logger.error(f"Failed to get {label}: {e}")
             self.conn.rollback()
-            return False
-    
+            return []
+
+    def _get_many(self, label: str, name: str, ids: List[str], parse) -> Dict[str, Dict]:
+        """Records for many ids in one query, keyed by id (missing ids are absent)"""
+        if not ids:
+            return {}
+        return {record["id"]: record
+                for record in self._get_rows(label, name, list(dict.fromkeys(ids)), parse)}
+
+    def save_task(self, task_id: str, user_id: str, task_type: str, metadata: Dict) -> bool:
+        """Save task to database"""
+        return self._save_one("task", "save_task", (task_id, user_id, task_type, "pending", json.dumps(metadata)))
+
+    def save_learning_session(self, session_data: Dict) -> bool:
+        """Save learning session to TimescaleDB"""
+        return self._save_one("learning session", "save_learning_session", _learning_session_row(session_data))
+
+    def save_many_learning_sessions(self, sessions: List[Dict]) -> bool:
+        """Append many learning sessions with COPY"""
+        return self._copy_rows("learning sessions", "save_learning_session",
+                               [_learning_session_row(s) for s in sessions])
+
+    def save_rpe_event(self, rpe_data: Dict) -> bool:
+        """Save RPE event to TimescaleDB"""
+        return self._save_one("RPE event", "save_rpe_event", _rpe_event_row(rpe_data))
+
+    def save_many_rpe_events(self, events: List[Dict]) -> bool:
+        """Append many RPE events with COPY"""
+        return self._copy_rows("RPE events", "save_rpe_event", [_rpe_event_row(e) for e in events])
+
+    def save_execution(self, execution_id: str, task_id: str, agent_id: str,
+                      status: str, result: Dict, execution_time: float, error: Optional[str] = None) -> bool:
+        """Save execution to database"""
+        return self._save_one("execution", "save_execution", (
+            execution_id, task_id, agent_id, status, json.dumps(result), error, execution_time))
+
+    def save_agent_evolution(self, evolution_id: str, agent_id: str, version: int,
+                            improvements: List[Dict], performance_before: Dict,
+                            performance_after: Dict) -> bool:
+        """Save agent evolution record"""
+        return self._save_one("agent evolution", "save_agent_evolution", (
+            evolution_id, agent_id, version, json.dumps(improvements),
+            json.dumps(performance_before), json.dumps(performance_after)))
+
     def get_user_analytics(self, user_id: str, days: int = 30) -> Optional[Dict]:
         """Get user analytics from TimescaleDB"""
         if not self.available or not self.conn:
@@ -674,16 +1053,29 @@ class DatabasePersistence:
         
         try:
             with self.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT 
-                        COUNT(*) as total_sessions,
-                        COALESCE(SUM(duration_minutes), 0) as total_duration,
-                        COALESCE(AVG(score), 0) as average_score,
-                        COALESCE(SUM(rpe_events), 0) as total_rpe_events
-                    FROM learning_sessions
-                    WHERE user_id = %s 
-                    AND started_at >= NOW() - INTERVAL '%s days'
-                """, (user_id, days))
+                if "learning_sessions_daily" in self.rollup_views:
+                    # Whole days from the daily rollup: O(days) instead of O(sessions)
+                    cur.execute("""
+                        SELECT 
+                            COALESCE(SUM(sessions), 0) as total_sessions,
+                            COALESCE(SUM(duration_minutes), 0) as total_duration,
+                            COALESCE(SUM(score_sum) / NULLIF(SUM(scored_sessions), 0), 0) as average_score,
+                            COALESCE(SUM(rpe_events), 0) as total_rpe_events
+                        FROM learning_sessions_daily
+                        WHERE user_id = %s 
+                        AND bucket >= time_bucket(INTERVAL '1 day', NOW() - %s * INTERVAL '1 day')
+                    """, (user_id, days))
+                else:
+                    cur.execute("""
+                        SELECT 
+                            COUNT(*) as total_sessions,
+                            COALESCE(SUM(duration_minutes), 0) as total_duration,
+                            COALESCE(AVG(score), 0) as average_score,
+                            COALESCE(SUM(rpe_events), 0) as total_rpe_events
+                        FROM learning_sessions
+                        WHERE user_id = %s 
+                        AND started_at >= NOW() - %s * INTERVAL '1 day'
+                    """, (user_id, days))
                 
                 row = cur.fetchone()
                 if row:
@@ -696,354 +1088,171 @@ class DatabasePersistence:
                 return None
         except Exception as e:
             logger.error(f"Failed to get user analytics: {e}")
+            self.conn.rollback()
             return None
+
     def save_learning_plan(self, plan_data: Dict) -> bool:
         """Save learning plan to database"""
-        if not self.available or not self.conn:
-            return False
-        
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO learning_plans 
-                    (plan_id, user_id, topic, mode, modules, sources, status, progress, metadata)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (plan_id) DO UPDATE SET
-                        modules = EXCLUDED.modules,
-                        sources = EXCLUDED.sources,
-                        status = EXCLUDED.status,
-                        progress = EXCLUDED.progress,
-                        metadata = EXCLUDED.metadata,
-                        updated_at = CURRENT_TIMESTAMP
-                """, (
-                    plan_data.get('id'),
-                    plan_data.get('user_id'),
-                    plan_data.get('goals', {}).get('topic', 'Unknown'),
-                    plan_data.get('mode', 'polymath'),
-                    json.dumps(plan_data.get('phases', [])), # Mapping phases to modules
-                    json.dumps(plan_data.get('sources', [])),
-                    plan_data.get('status', 'active'),
-                    json.dumps(plan_data.get('progress', {})),
-                    json.dumps(plan_data.get('goals', {})) # Store goals in metadata/goals
-                ))
-                self.conn.commit()
-                return True
-        except Exception as e:
-            logger.error(f"Failed to save learning plan: {e}")
-            self.conn.rollback()
-            return False
+        return self._save_one("learning plan", "save_learning_plan", _learning_plan_row(plan_data))
+
+    def save_many_learning_plans(self, plans: List[Dict], page_size: int = 500) -> bool:
+        """Upsert many learning plans, one multi-row statement per page"""
+        return self._save_many("learning plans", "save_learning_plan",
+                               [_learning_plan_row(p) for p in plans], page_size)
 
     def get_learning_plan(self, plan_id: str) -> Optional[Dict]:
         """Get learning plan from database"""
-        if not self.available or not self.conn:
-            return None
-        
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT plan_id, user_id, topic, mode, modules, sources, status, progress, metadata, created_at
-                    FROM learning_plans
-                    WHERE plan_id = %s
-                """, (plan_id,))
-                
-                row = cur.fetchone()
-                if row:
-                    # Reconstruct to match LearningPlanResponse structure
-                    metadata = row[8] or {}
-                    return {
-                        "id": row[0],
-                        "user_id": row[1],
-                        "goals": metadata, # Assuming goals are stored in metadata
-                        "phases": row[4], # modules -> phases
-                        "current_phase_index": 0, # Default
-                        "start_date": row[9].isoformat() if row[9] else None,
-                        "estimated_end_date": None, # Calculate or store
-                        "progress": row[7],
-                        "created_at": row[9].isoformat() if row[9] else None
-                    }
-                return None
-        except Exception as e:
-            logger.error(f"Failed to get learning plan: {e}")
-            return None
+        return self._get_one("learning plan", "get_learning_plan", plan_id, _learning_plan_from_row)
+
+    def get_many_learning_plans(self, plan_ids: List[str]) -> Dict[str, Dict]:
+        """Get learning plans by id in one query"""
+        return self._get_many("learning plans", "get_many_learning_plans", plan_ids, _learning_plan_from_row)
 
     def get_user_learning_plans(self, user_id: str) -> List[Dict]:
         """Get all learning plans for a user"""
-        if not self.available or not self.conn:
-            return []
-        
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT plan_id, user_id, topic, mode, modules, sources, status, progress, metadata, created_at
-                    FROM learning_plans
-                    WHERE user_id = %s
-                    ORDER BY created_at DESC
-                """, (user_id,))
-                
-                plans = []
-                for row in cur.fetchall():
-                    metadata = row[8] or {}
-                    plans.append({
-                        "id": row[0],
-                        "user_id": row[1],
-                        "goals": metadata,
-                        "phases": row[4],
-                        "current_phase_index": 0,
-                        "start_date": row[9].isoformat() if row[9] else None,
-                        "estimated_end_date": None,
-                        "progress": row[7],
-                        "created_at": row[9].isoformat() if row[9] else None
-                    })
-                return plans
-        except Exception as e:
-            logger.error(f"Failed to get user learning plans: {e}")
-            return []
+        return self._get_rows("user learning plans", "get_user_learning_plans", user_id, _learning_plan_from_row)
 
     def save_quiz(self, quiz_data: Dict) -> bool:
         """Save quiz to database"""
-        if not self.available or not self.conn:
-            return False
-        
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO quizzes 
-                    (quiz_id, topic, questions, bloom_distribution, adaptive_difficulty, fsrs_integration, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (quiz_id) DO NOTHING
-                """, (
-                    quiz_data.get('id'),
-                    quiz_data.get('topic'),
-                    json.dumps(quiz_data.get('questions', [])),
-                    json.dumps(quiz_data.get('bloom_distribution', {})),
-                    quiz_data.get('adaptive_difficulty', True),
-                    quiz_data.get('fsrs_integration', True),
-                    quiz_data.get('created_at')
-                ))
-                self.conn.commit()
-                return True
-        except Exception as e:
-            logger.error(f"Failed to save quiz: {e}")
-            self.conn.rollback()
-            return False
+        return self._save_one("quiz", "save_quiz", _quiz_row(quiz_data))
+
+    def save_many_quizzes(self, quizzes: List[Dict], page_size: int = 500) -> bool:
+        """Save many quizzes (existing ids are kept), one multi-row statement per page"""
+        return self._save_many("quizzes", "save_quiz", [_quiz_row(q) for q in quizzes], page_size)
 
     def get_quiz(self, quiz_id: str) -> Optional[Dict]:
         """Get quiz from database"""
-        if not self.available or not self.conn:
-            return None
-        
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT quiz_id, topic, questions, bloom_distribution, adaptive_difficulty, fsrs_integration, created_at
-                    FROM quizzes
-                    WHERE quiz_id = %s
-                """, (quiz_id,))
-                
-                row = cur.fetchone()
-                if row:
-                    return {
-                        "id": row[0],
-                        "topic": row[1],
-                        "questions": row[2],
-                        "bloom_distribution": row[3],
-                        "adaptive_difficulty": row[4],
-                        "fsrs_integration": row[5],
-                        "created_at": row[6].isoformat() if row[6] else None
-                    }
-                return None
-        except Exception as e:
-            logger.error(f"Failed to get quiz: {e}")
-            return None
+        return self._get_one("quiz", "get_quiz", quiz_id, _quiz_from_row)
+
+    def get_many_quizzes(self, quiz_ids: List[str]) -> Dict[str, Dict]:
+        """Get quizzes by id in one query"""
+        return self._get_many("quizzes", "get_many_quizzes", quiz_ids, _quiz_from_row)
 
     def save_quiz_attempt(self, attempt_data: Dict) -> bool:
         """Save quiz attempt to database"""
+        return self._save_one("quiz attempt", "save_quiz_attempt", _quiz_attempt_row(attempt_data))
+
+    def save_quiz_attempts(self, attempts: List[Dict], page_size: int = 500) -> bool:
+        """Save many quiz attempts in one multi-row insert per page (retries are idempotent)"""
+        return self._save_many("quiz attempts", "save_quiz_attempt",
+                               [_quiz_attempt_row(a) for a in attempts], page_size)
+
+    def get_user_quiz_attempts(self, user_id: str) -> List[Dict]:
+        """Get all quiz attempts for a user"""
+        return self._get_rows("user quiz attempts", "get_user_quiz_attempts", user_id, _quiz_attempt_from_row)
+
+    def get_quiz_progress(self, user_id: str, period: str = "weekly", limit: int = 12) -> List[Dict]:
+        """Latest `limit` daily/weekly quiz buckets for a user, oldest first"""
         if not self.available or not self.conn:
-            return False
+            return []
         
+        view, unit = PROGRESS_PERIODS[period]
         try:
             with self.conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO quiz_attempts 
-                    (attempt_id, quiz_id, user_id, answers, score, max_score, percent_correct, timestamp)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    attempt_data.get('id'),
-                    attempt_data.get('quiz_id'),
-                    attempt_data.get('user_id'),
-                    json.dumps(attempt_data.get('answers', [])),
-                    attempt_data.get('score'),
-                    attempt_data.get('max_score'),
-                    attempt_data.get('percent_correct'),
-                    attempt_data.get('timestamp')
-                ))
-                self.conn.commit()
-                return True
+                if view in self.rollup_views:
+                    cur.execute(f"""
+                        SELECT bucket, attempts, score_sum, correct, questions
+                        FROM {view}
+                        WHERE user_id = %s
+                        ORDER BY bucket DESC
+                        LIMIT %s
+                    """, (user_id, limit))
+                else:
+                    cur.execute(f"""
+                        SELECT date_trunc('{unit}', timestamp) AS bucket, COUNT(*),
+                               SUM(percent_correct), SUM(score), SUM(max_score)
+                        FROM quiz_attempts
+                        WHERE user_id = %s
+                        GROUP BY bucket
+                        ORDER BY bucket DESC
+                        LIMIT %s
+                    """, (user_id, limit))
+                
+                return [{
+                    "bucket": row[0],
+                    "attempts": row[1],
+                    "score_sum": row[2] or 0,
+                    "correct": row[3],
+                    "questions": row[4]
+                } for row in reversed(cur.fetchall())]
         except Exception as e:
-            logger.error(f"Failed to save quiz attempt: {e}")
+            logger.error(f"Failed to get quiz progress: {e}")
             self.conn.rollback()
-            return False
+            return []
 
-    def get_user_quiz_attempts(self, user_id: str) -> List[Dict]:
-        """Get all quiz attempts for a user"""
+
+    def get_quiz_progress_totals(self, user_id: str) -> Optional[Dict]:
+        """All-time attempt count and score sum (summed over daily buckets) plus the two latest scores"""
         if not self.available or not self.conn:
-            return []
+            return None
         
+        source = "quiz_progress_daily" if "quiz_progress_daily" in self.rollup_views else None
         try:
             with self.conn.cursor() as cur:
+                if source:
+                    cur.execute(f"""
+                        SELECT COALESCE(SUM(attempts), 0), COALESCE(SUM(score_sum), 0)
+                        FROM {source}
+                        WHERE user_id = %s
+                    """, (user_id,))
+                else:
+                    cur.execute("""
+                        SELECT COUNT(*), COALESCE(SUM(percent_correct), 0)
+                        FROM quiz_attempts
+                        WHERE user_id = %s
+                    """, (user_id,))
+                attempts, score_sum = cur.fetchone()
+                
+                # Served by idx_quiz_attempts_user_time
                 cur.execute("""
-                    SELECT attempt_id, quiz_id, user_id, answers, score, max_score, percent_correct, timestamp
+                    SELECT percent_correct
                     FROM quiz_attempts
                     WHERE user_id = %s
                     ORDER BY timestamp DESC
+                    LIMIT 2
                 """, (user_id,))
+                recent = [row[0] or 0 for row in cur.fetchall()][::-1]
                 
-                attempts = []
-                for row in cur.fetchall():
-                    attempts.append({
-                        "id": row[0],
-                        "quiz_id": row[1],
-                        "user_id": row[2],
-                        "answers": row[3],
-                        "score": row[4],
-                        "max_score": row[5],
-                        "percent_correct": row[6],
-                        "timestamp": row[7].isoformat() if row[7] else None
-                    })
-                return attempts
+                return {"attempts": int(attempts), "score_sum": float(score_sum), "recent": recent}
         except Exception as e:
-            logger.error(f"Failed to get user quiz attempts: {e}")
-            return []
+            logger.error(f"Failed to get quiz progress totals: {e}")
+            self.conn.rollback()
+            return None
 
     def save_feynman_session(self, session_data: Dict) -> bool:
         """Save Feynman session to database"""
-        if not self.available or not self.conn:
-            return False
-        
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO feynman_sessions 
-                    (session_id, concept, topic, target_audience, iterations, status, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (session_id) DO UPDATE SET
-                        iterations = EXCLUDED.iterations,
-                        status = EXCLUDED.status,
-                        updated_at = CURRENT_TIMESTAMP
-                """, (
-                    session_data.get('id'),
-                    session_data.get('concept'),
-                    session_data.get('topic'),
-                    session_data.get('target_audience'),
-                    json.dumps(session_data.get('iterations', [])),
-                    session_data.get('status', 'active'),
-                    session_data.get('created_at')
-                ))
-                self.conn.commit()
-                return True
-        except Exception as e:
-            logger.error(f"Failed to save Feynman session: {e}")
-            self.conn.rollback()
-            return False
+        return self._save_one("Feynman session", "save_feynman_session", _feynman_session_row(session_data))
+
+    def save_many_feynman_sessions(self, sessions: List[Dict], page_size: int = 500) -> bool:
+        """Upsert many Feynman sessions, one multi-row statement per page"""
+        return self._save_many("Feynman sessions", "save_feynman_session",
+                               [_feynman_session_row(s) for s in sessions], page_size)
 
     def get_feynman_session(self, session_id: str) -> Optional[Dict]:
         """Get Feynman session from database"""
-        if not self.available or not self.conn:
-            return None
-        
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT session_id, concept, topic, target_audience, iterations, status, created_at
-                    FROM feynman_sessions
-                    WHERE session_id = %s
-                """, (session_id,))
-                
-                row = cur.fetchone()
-                if row:
-                    return {
-                        "id": row[0],
-                        "concept": row[1],
-                        "topic": row[2],
-                        "target_audience": row[3],
-                        "iterations": row[4],
-                        "status": row[5],
-                        "created_at": row[6].isoformat() if row[6] else None
-                    }
-                return None
-        except Exception as e:
-            logger.error(f"Failed to get Feynman session: {e}")
-            return None
+        return self._get_one("Feynman session", "get_feynman_session", session_id, _feynman_session_from_row)
+
+    def get_many_feynman_sessions(self, session_ids: List[str]) -> Dict[str, Dict]:
+        """Get Feynman sessions by id in one query"""
+        return self._get_many("Feynman sessions", "get_many_feynman_sessions", session_ids,
+                              _feynman_session_from_row)
 
     def save_memory_palace(self, palace_data: Dict) -> bool:
         """Save Memory Palace to database"""
-        if not self.available or not self.conn:
-            return False
-        
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO memory_palaces 
-                    (palace_id, name, template, user_id, description, loci, journey, review_count, retention_rate, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (palace_id) DO UPDATE SET
-                        name = EXCLUDED.name,
-                        description = EXCLUDED.description,
-                        loci = EXCLUDED.loci,
-                        journey = EXCLUDED.journey,
-                        review_count = EXCLUDED.review_count,
-                        retention_rate = EXCLUDED.retention_rate,
-                        updated_at = CURRENT_TIMESTAMP
-                """, (
-                    palace_data.get('id'),
-                    palace_data.get('name'),
-                    palace_data.get('template'),
-                    palace_data.get('user_id'),
-                    palace_data.get('description'),
-                    json.dumps(palace_data.get('loci', [])),
-                    json.dumps(palace_data.get('journey', [])),
-                    palace_data.get('review_count', 0),
-                    palace_data.get('retention_rate', 0),
-                    palace_data.get('created_at')
-                ))
-                self.conn.commit()
-                return True
-        except Exception as e:
-            logger.error(f"Failed to save Memory Palace: {e}")
-            self.conn.rollback()
-            return False
+        return self._save_one("Memory Palace", "save_memory_palace", _memory_palace_row(palace_data))
+
+    def save_many_memory_palaces(self, palaces: List[Dict], page_size: int = 500) -> bool:
+        """Upsert many Memory Palaces, one multi-row statement per page"""
+        return self._save_many("Memory Palaces", "save_memory_palace",
+                               [_memory_palace_row(p) for p in palaces], page_size)
 
     def get_memory_palace(self, palace_id: str) -> Optional[Dict]:
         """Get Memory Palace from database"""
-        if not self.available or not self.conn:
-            return None
-        
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT palace_id, name, template, user_id, description, loci, journey, review_count, retention_rate, created_at
-                    FROM memory_palaces
-                    WHERE palace_id = %s
-                """, (palace_id,))
-                
-                row = cur.fetchone()
-                if row:
-                    return {
-                        "id": row[0],
-                        "name": row[1],
-                        "template": row[2],
-                        "user_id": row[3],
-                        "description": row[4],
-                        "loci": row[5],
-                        "journey": row[6],
-                        "review_count": row[7],
-                        "retention_rate": row[8],
-                        "created_at": row[9].isoformat() if row[9] else None
-                    }
-                return None
-        except Exception as e:
-            logger.error(f"Failed to get Memory Palace: {e}")
-            return None
+        return self._get_one("Memory Palace", "get_memory_palace", palace_id, _memory_palace_from_row)
+
+    def get_many_memory_palaces(self, palace_ids: List[str]) -> Dict[str, Dict]:
+        """Get Memory Palaces by id in one query"""
+        return self._get_many("Memory Palaces", "get_many_memory_palaces", palace_ids, _memory_palace_from_row)
 
 # Global storage instances
 artifact_manager = ArtifactManager()
@@ -5,9 +5,12 @@ Enterprise-grade security system for swarm-based multi-agent communications
 
 import os
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List
 import json
 
+from app.core.integration_registry import integration_registry
+from app.modules.conversation_log import ConversationLogStore
+
 logger = logging.getLogger(__name__)
 
 # Try to import SwarmShield
@@ -29,6 +32,13 @@ class SwarmShieldIntegration:
         self.available = SWARM_SHIELD_AVAILABLE
         self.shield: Optional[SwarmShield] = None
         
+        # Conversations are kept in append-only encrypted logs, not in the SwarmShield object
+        try:
+            self.log_store: Optional[ConversationLogStore] = ConversationLogStore(self.config.get("log_dir"))
+        except Exception as e:
+            logger.error(f"Failed to open conversation log store: {e}")
+            self.log_store = None
+        
         if not self.available:
             logger.warning("SwarmShield package not installed. Security features will be unavailable.")
             return
@@ -72,78 +82,89 @@ class SwarmShieldIntegration:
     
     def create_conversation(self, name: str) -> Optional[str]:
         """Create a new secure conversation"""
-        if not self.available or not self.shield:
+        if not self.log_store:
             return None
         
         try:
-            conversation_id = self.shield.create_conversation(name)
+            conversation_id = self.log_store.create(name)
             return conversation_id
         except Exception as e:
             logger.error(f"Conversation creation failed: {e}")
             return None
     
     def add_message(self, conversation_id: str, agent_name: str, message: str) -> bool:
-        """Add a message to a conversation"""
-        if not self.available or not self.shield:
+        """Append a message to a conversation's encrypted log"""
+        if not self.log_store:
             return False
         
         try:
-            self.shield.add_message(conversation_id, agent_name, message)
+            self.log_store.get(conversation_id).append(agent_name, message)
             return True
         except Exception as e:
             logger.error(f"Add message failed: {e}")
             return False
     
-    def get_messages(self, conversation_id: str) -> List[Dict[str, Any]]:
-        """Get messages from a conversation"""
-        if not self.available or not self.shield:
+    def get_messages(self, conversation_id: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get one page of messages (all messages when limit is None)"""
+        if not self.log_store:
             return []
         
         try:
-            messages = self.shield.get_messages(conversation_id)
-            return [
-                {
-                    "agent": agent,
-                    "message": msg,
-                    "timestamp": ts
-                }
-                for agent, msg, ts in messages
-            ]
+            return list(self.log_store.get(conversation_id).read(offset, limit))
         except Exception as e:
             logger.error(f"Get messages failed: {e}")
             return []
     
     def get_conversation_summary(self, conversation_id: str) -> Optional[Dict[str, Any]]:
-        """Get summary of a conversation"""
-        if not self.available or not self.shield:
+        """Get summary of a conversation (maintained incrementally)"""
+        if not self.log_store:
             return None
         
         try:
-            summary = self.shield.get_conversation_summary(conversation_id)
+            summary = self.log_store.get(conversation_id).summary()
             return summary
         except Exception as e:
             logger.error(f"Get conversation summary failed: {e}")
             return None
     
+    def stream_conversation(self, conversation_id: str, format: str = "jsonl") -> Iterator[str]:
+        """
+        Stream a conversation export chunk by chunk.
+        Raises KeyError for unknown conversations and ValueError for unknown formats.
+        """
+        if not self.log_store:
+            raise KeyError(f"Invalid conversation ID: {conversation_id}")
+        self.log_store.get(conversation_id)
+        if format not in ("jsonl", "json", "text"):
+            raise ValueError(f"Unsupported export format: {format}")
+        return self.log_store.export_lines(conversation_id, format)
+    
     def export_conversation(self, conversation_id: str, format: str = "json", path: Optional[str] = None) -> Optional[str]:
-        """Export conversation to file"""
-        if not self.available or not self.shield:
+        """Export conversation to file, writing one message at a time"""
+        if not self.log_store:
             return None
         
         try:
-            export_path = self.shield.export_conversation(conversation_id, format=format, path=path)
-            return export_path
+            lines = self.stream_conversation(conversation_id, format)
+            if path is None:
+                extension = {"jsonl": "jsonl", "json": "json", "text": "txt"}[format]
+                os.makedirs(os.path.join(self.log_store.root, "exports"), exist_ok=True)
+                path = os.path.join(self.log_store.root, "exports", f"{conversation_id}.{extension}")
+            with open(path, "w") as f:
+                for line in lines:
+                    f.write(line)
+            return path
         except Exception as e:
             logger.error(f"Export conversation failed: {e}")
             return None
     
     def get_agent_stats(self, agent_name: str) -> Optional[Dict[str, Any]]:
-        """Get statistics for an agent"""
-        if not self.available or not self.shield:
+        """Get statistics for an agent across conversations"""
+        if not self.log_store:
             return None
         
         try:
-            stats = self.shield.get_agent_stats(agent_name)
+            stats = self.log_store.agent_stats(agent_name)
             return stats
         except Exception as e:
             logger.error(f"Get agent stats failed: {e}")
@@ -154,12 +175,21 @@ class SwarmShieldIntegration:
         return {
             "status": "healthy" if self.available else "unavailable",
             "available": self.available,
-            "initialized": self.shield is not None
+            "initialized": self.shield is not None,
+            "conversation_log": {
+                "conversations": len(self.log_store.conversations),
+                "encrypted": self.log_store.encrypted
+            } if self.log_store else None
         }
+    
+    def close(self) -> None:
+        """Persist rolling conversation stats"""
+        if self.log_store:
+            self.log_store.close()
 
 
 def get_swarm_shield_integration(config: Optional[Dict] = None) -> SwarmShieldIntegration:
     """Get or create SwarmShield integration instance"""
-    return SwarmShieldIntegration(config)
+    return integration_registry.get("swarm_shield", SwarmShieldIntegration, config)
 
 
@@ -8,6 +8,8 @@ import logging
 from typing import Optional, Dict, Any, List
 import json
 
+from app.core.integration_registry import integration_registry
+
 logger = logging.getLogger(__name__)
 
 # Try to import swarms-utils
@@ -102,6 +104,6 @@ class SwarmsUtilsIntegration:
 
 def get_swarms_utils_integration(config: Optional[Dict] = None) -> SwarmsUtilsIntegration:
     """Get or create swarms-utils integration instance"""
-    return SwarmsUtilsIntegration(config)
+    return integration_registry.get("swarms_utils", SwarmsUtilsIntegration, config)
 
 
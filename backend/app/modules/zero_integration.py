@@ -8,6 +8,8 @@ import logging
 from typing import Optional, Dict, Any, List
 import json
 
+from app.core.integration_registry import integration_registry
+
 logger = logging.getLogger(__name__)
 
 # Try to import Zero
@@ -113,6 +115,6 @@ class ZeroIntegration:
 
 def get_zero_integration(config: Optional[Dict] = None) -> ZeroIntegration:
     """Get or create Zero integration instance"""
-    return ZeroIntegration(config)
+    return integration_registry.get("zero", ZeroIntegration, config)
 
 
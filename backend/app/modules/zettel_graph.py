@@ -0,0 +1,537 @@
+"""
+Zettelkasten Graph Store
+Persistent, per-user note graph behind the /api/learning/zettel/* endpoints.
+Notes and links live in SQLite; links form an edge table indexed by source
+and by target, and every note carries its in/out degree, so creating or
+relinking a note touches only the affected rows. Neighbourhoods are walked
+hop by hop through the edge indexes and stop once a page is full; hubs are
+read in rank order straight off an index with keyset cursors. Connected
+components and PageRank are recomputed in the background for users whose
+graph changed.
+
+On-disk layout (path):
+    notes       note fields, degrees, component, pagerank
+    links       (source, target) edges in link order, indexed both ways
+    user_stats  note/link counts, change version, last metrics run
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.integration_registry import integration_registry
+
+logger = logging.getLogger(__name__)
+
+# Fields update_note() may change
+MUTABLE_FIELDS = ("title", "content", "note_type", "maturity", "tags", "source", "elaboration_score", "review_count")
+RANK_COLUMNS = ("degree", "pagerank")
+# SQLite host-parameter budget per IN (...) query
+MAX_PARAMS = 500
+PAGERANK_DAMPING = 0.85
+
+
+def _chunks(items: List[str], size: int = MAX_PARAMS) -> Iterable[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def connected_components(n: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Weakly connected component label (smallest member index) per node"""
+    labels = np.arange(n)
+    while True:
+        previous = labels
+        low = np.minimum(labels[src], labels[dst])
+        labels = labels.copy()
+        np.minimum.at(labels, src, low)
+        np.minimum.at(labels, dst, low)
+        labels = labels[labels]  # pointer jumping
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def pagerank(n: int, src: np.ndarray, dst: np.ndarray, damping: float = PAGERANK_DAMPING,
+             tol: float = 1e-10, max_iter: int = 100) -> np.ndarray:
+    """Power-iteration PageRank over directed edges; dangling mass is spread evenly"""
+    if n == 0:
+        return np.zeros(0)
+    out_degree = np.bincount(src, minlength=n).astype(float)
+    dangling = out_degree == 0
+    weight = 1.0 / out_degree[src] if len(src) else np.zeros(0)
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        spread = np.bincount(dst, weights=rank[src] * weight, minlength=n)
+        updated = (1 - damping) / n + damping * (spread + rank[dangling].sum() / n)
+        converged = np.abs(updated - rank).sum() < tol
+        rank = updated
+        if converged:
+            break
+    return rank
+
+
+class ZettelGraphStore:
+    """SQLite note graph with incremental adjacency indexes and background metrics"""
+
+    def __init__(self, path: str = "./cache/zettel_graph.db", metrics_interval: float = 30.0):
+        self.path = path
+        self.metrics_interval = metrics_interval
+        self._lock = threading.RLock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS notes (
+                id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                note_type TEXT NOT NULL,
+                maturity TEXT NOT NULL,
+                tags TEXT NOT NULL,
+                source TEXT,
+                elaboration_score REAL NOT NULL DEFAULT 0,
+                review_count INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                out_degree INTEGER NOT NULL DEFAULT 0,
+                in_degree INTEGER NOT NULL DEFAULT 0,
+                degree INTEGER NOT NULL DEFAULT 0,
+                component INTEGER,
+                pagerank REAL NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_notes_user ON notes(user_id, id);
+            CREATE INDEX IF NOT EXISTS idx_notes_degree ON notes(user_id, degree DESC, id);
+            CREATE INDEX IF NOT EXISTS idx_notes_pagerank ON notes(user_id, pagerank DESC, id);
+            CREATE TABLE IF NOT EXISTS links (
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                PRIMARY KEY (source, target)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_links_target ON links(target, source);
+            CREATE INDEX IF NOT EXISTS idx_links_user ON links(user_id);
+            CREATE TABLE IF NOT EXISTS user_stats (
+                user_id TEXT PRIMARY KEY,
+                notes INTEGER NOT NULL DEFAULT 0,
+                links INTEGER NOT NULL DEFAULT 0,
+                version INTEGER NOT NULL DEFAULT 0,
+                metrics_version INTEGER NOT NULL DEFAULT 0,
+                components INTEGER,
+                largest_component INTEGER,
+                metrics_at TEXT
+            );
+            """
+        )
+        self.db.commit()
+
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        if metrics_interval > 0:
+            self._worker = threading.Thread(target=self._metrics_loop, name="zettel-metrics", daemon=True)
+            self._worker.start()
+
+    # ------------------------------------------------------------------
+    # Rows
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _note(row: sqlite3.Row) -> Dict[str, Any]:
+        note = dict(row)
+        note["tags"] = json.loads(note["tags"])
+        note["source"] = json.loads(note["source"]) if note["source"] else None
+        for key in ("created_at", "updated_at"):
+            note[key] = datetime.fromisoformat(note[key])
+        return note
+
+    def _fetch_notes(self, user_id: str, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        notes = {}
+        for chunk in _chunks(ids):
+            rows = self.db.execute(
+                f"SELECT * FROM notes WHERE user_id = ? AND id IN ({','.join('?' * len(chunk))})",
+                [user_id, *chunk],
+            )
+            notes.update((row["id"], self._note(row)) for row in rows)
+        return notes
+
+    def _existing(self, user_id: str, ids: List[str]) -> set:
+        present = set()
+        for chunk in _chunks(ids):
+            present.update(n for (n,) in self.db.execute(
+                f"SELECT id FROM notes WHERE user_id = ? AND id IN ({','.join('?' * len(chunk))})",
+                [user_id, *chunk],
+            ))
+        return present
+
+    def _attach_links(self, notes: Dict[str, Dict[str, Any]]) -> None:
+        """Fill links (in link order) and backlinks for a batch of notes"""
+        ids = list(notes)
+        for note in notes.values():
+            note["links"], note["backlinks"] = [], []
+        for chunk in _chunks(ids):
+            marks = ",".join("?" * len(chunk))
+            for source, target in self.db.execute(
+                f"SELECT source, target FROM links WHERE source IN ({marks}) ORDER BY source, position", chunk
+            ):
+                notes[source]["links"].append(target)
+            for target, source, user_id in self.db.execute(
+                f"SELECT target, source, user_id FROM links WHERE target IN ({marks}) ORDER BY target, source", chunk
+            ):
+                if user_id == notes[target]["user_id"]:
+                    notes[target]["backlinks"].append(source)
+
+    def _bump(self, user_id: str, notes: int = 0, links: int = 0) -> None:
+        self.db.execute(
+            """
+            INSERT INTO user_stats (user_id, notes, links, version) VALUES (?, ?, ?, 1)
+            ON CONFLICT(user_id) DO UPDATE SET
+                notes = notes + excluded.notes,
+                links = links + excluded.links,
+                version = version + 1
+            """,
+            (user_id, notes, links),
+        )
+
+    def _shift_degrees(self, source: str, targets: List[str], step: int) -> None:
+        """Move source's out-degree and its targets' in-degrees by step per edge"""
+        self.db.execute(
+            "UPDATE notes SET out_degree = out_degree + ?, degree = degree + ? WHERE id = ?",
+            (step * len(targets), step * len(targets), source),
+        )
+        self.db.executemany(
+            "UPDATE notes SET in_degree = in_degree + ?, degree = degree + ? WHERE id = ?",
+            [(step, step, target) for target in targets],
+        )
+
+    def _add_links(self, user_id: str, source: str, targets: List[str], start: int = 0) -> int:
+        """
+        Insert edges and update the degrees of their endpoints. Only edges to
+        the user's existing notes count; the rest are counted when the target
+        is created. Returns the counted edges added.
+        """
+        targets = [t for t in dict.fromkeys(targets) if t != source]
+        if not targets:
+            return 0
+        self.db.executemany(
+            "INSERT OR IGNORE INTO links (source, target, user_id, position) VALUES (?, ?, ?, ?)",
+            [(source, target, user_id, start + i) for i, target in enumerate(targets)],
+        )
+        present = self._existing(user_id, targets)
+        live = [t for t in targets if t in present]
+        self._shift_degrees(source, live, 1)
+        return len(live)
+
+    def _remove_links(self, user_id: str, source: str, targets: List[str]) -> int:
+        """Delete edges and undo the degrees they counted; returns the counted edges removed"""
+        if not targets:
+            return 0
+        self.db.executemany("DELETE FROM links WHERE source = ? AND target = ?", [(source, t) for t in targets])
+        present = self._existing(user_id, targets)
+        live = [t for t in targets if t in present]
+        self._shift_degrees(source, live, -1)
+        return len(live)
+
+    # ------------------------------------------------------------------
+    # Notes
+    # ------------------------------------------------------------------
+    def create_note(self, user_id: str, note: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store a note and its outgoing links. Links may point at notes that do
+        not exist yet; they show up as backlinks, and count towards both
+        endpoints' degrees and the link total, once the target is created.
+        Only links between one user's notes count.
+        """
+        with self._lock:
+            backlinks = self.db.execute(
+                "SELECT COUNT(*) FROM links WHERE target = ? AND user_id = ?", (note["id"], user_id)
+            ).fetchone()[0]
+            self.db.execute(
+                """
+                INSERT INTO notes (id, user_id, title, content, note_type, maturity, tags, source,
+                                   elaboration_score, review_count, created_at, updated_at, in_degree, degree)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    note["id"], user_id, note["title"], note["content"], note["note_type"], note["maturity"],
+                    json.dumps(note.get("tags") or []), json.dumps(note["source"]) if note.get("source") else None,
+                    note.get("elaboration_score", 0.0), note.get("review_count", 0),
+                    note["created_at"].isoformat(), note["updated_at"].isoformat(), backlinks, backlinks,
+                ),
+            )
+            if backlinks:
+                # Links written before this note existed start counting now
+                self.db.execute(
+                    """
+                    UPDATE notes SET out_degree = out_degree + 1, degree = degree + 1
+                    WHERE id IN (SELECT source FROM links WHERE target = ? AND user_id = ?)
+                    """,
+                    (note["id"], user_id),
+                )
+            added = self._add_links(user_id, note["id"], note.get("links") or [])
+            self._bump(user_id, notes=1, links=added + backlinks)
+            self.db.commit()
+            return self.get_note(note["id"])
+
+    def get_note(self, note_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.db.execute("SELECT * FROM notes WHERE id = ?", (note_id,)).fetchone()
+            if row is None:
+                return None
+            notes = {note_id: self._note(row)}
+            self._attach_links(notes)
+            return notes[note_id]
+
+    def update_note(self, note_id: str, fields: Dict[str, Any],
+                    links: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Update note fields and, when links is given, replace its outgoing
+        links; only the edges that changed (and their endpoints' degrees)
+        are written.
+        """
+        with self._lock:
+            row = self.db.execute("SELECT user_id FROM notes WHERE id = ?", (note_id,)).fetchone()
+            if row is None:
+                return None
+            user_id = row["user_id"]
+
+            values = {key: value for key, value in fields.items() if key in MUTABLE_FIELDS}
+            if "tags" in values:
+                values["tags"] = json.dumps(values["tags"] or [])
+            if "source" in values:
+                values["source"] = json.dumps(values["source"]) if values["source"] else None
+            values["updated_at"] = datetime.now().isoformat()
+            self.db.execute(
+                f"UPDATE notes SET {', '.join(f'{key} = ?' for key in values)} WHERE id = ?",
+                [*values.values(), note_id],
+            )
+
+            if links is not None:
+                wanted = [t for t in dict.fromkeys(links) if t != note_id]
+                current = [t for (t,) in self.db.execute(
+                    "SELECT target FROM links WHERE source = ? ORDER BY position", (note_id,))]
+                removed = self._remove_links(user_id, note_id, sorted(set(current) - set(wanted)))
+                kept = set(current) & set(wanted)
+                added = self._add_links(user_id, note_id, [t for t in wanted if t not in kept], start=len(current))
+                # Keep the requested order without rewriting unchanged edges' degrees
+                self.db.executemany(
+                    "UPDATE links SET position = ? WHERE source = ? AND target = ?",
+                    [(i, note_id, target) for i, target in enumerate(wanted)],
+                )
+                if added or removed:
+                    self._bump(user_id, links=added - removed)
+            self.db.commit()
+            return self.get_note(note_id)
+
+    # ------------------------------------------------------------------
+    # Graph queries
+    # ------------------------------------------------------------------
+    def _neighbours(self, frontier: List[str], direction: str) -> List[Tuple[str, str]]:
+        """(source, target) edges touching the frontier, via the source/target indexes"""
+        edges = []
+        for chunk in _chunks(frontier):
+            marks = ",".join("?" * len(chunk))
+            if direction in ("out", "both"):
+                edges.extend(self.db.execute(
+                    f"SELECT source, target FROM links WHERE source IN ({marks})", chunk).fetchall())
+            if direction in ("in", "both"):
+                edges.extend(self.db.execute(
+                    f"SELECT source, target FROM links WHERE target IN ({marks})", chunk).fetchall())
+        return edges
+
+    def neighborhood(self, user_id: str, note_id: str, hops: int = 1, direction: str = "both",
+                     limit: int = 100, offset: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Notes within `hops` links of note_id in breadth-first order (by hop,
+        then id), one page at a time, with the edges between them. The walk
+        stops as soon as the page is filled, so cost follows offset + limit.
+        """
+        with self._lock:
+            start = self.db.execute("SELECT user_id FROM notes WHERE id = ?", (note_id,)).fetchone()
+            if start is None or start["user_id"] != user_id:
+                return None
+            hop_of = {note_id: 0}
+            frontier = [note_id]
+            truncated = False
+            for hop in range(1, hops + 1):
+                if not frontier:
+                    break
+                if len(hop_of) > offset + limit:
+                    # Every later hop sorts after this page
+                    truncated = True
+                    break
+                candidates = list({
+                    other for source, target in self._neighbours(frontier, direction)
+                    for other in (source, target) if other not in hop_of
+                })
+                # Only this user's existing notes join the walk
+                present = self._existing(user_id, candidates)
+                frontier = [n for n in candidates if n in present]
+                for n in frontier:
+                    hop_of[n] = hop
+
+            ordered = sorted(hop_of, key=lambda n: (hop_of[n], n))
+            page = ordered[offset:offset + limit]
+            notes = self._fetch_notes(user_id, page)
+            self._attach_links(notes)
+            in_page = set(page)
+            nodes = [{**notes[n], "hop": hop_of[n]} for n in page]
+            edges = [
+                {"from": n, "to": target, "type": "links_to"}
+                for n in page for target in notes[n]["links"] if target in in_page
+            ]
+            has_more = len(ordered) > offset + limit or truncated
+            return {
+                "center": note_id,
+                "hops": hops,
+                "nodes": nodes,
+                "edges": edges,
+                "next_offset": offset + limit if has_more else None,
+            }
+
+    def hubs(self, user_id: str, limit: int = 20, cursor: Optional[str] = None,
+             rank_by: str = "degree") -> Dict[str, Any]:
+        """
+        Notes ranked by degree (or background PageRank), read in index order.
+        Pass the returned next_cursor to get the following page.
+        """
+        if rank_by not in RANK_COLUMNS:
+            raise ValueError(f"rank_by must be one of {RANK_COLUMNS}")
+        params: List[Any] = [user_id]
+        where = "user_id = ?"
+        if cursor:
+            rank, _, last_id = cursor.partition("|")
+            where += f" AND ({rank_by} < ? OR ({rank_by} = ? AND id > ?))"
+            value = float(rank) if rank_by == "pagerank" else int(rank)
+            params += [value, value, last_id]
+        with self._lock:
+            rows = self.db.execute(
+                f"SELECT * FROM notes INDEXED BY idx_notes_{rank_by} WHERE {where} "
+                f"ORDER BY {rank_by} DESC, id LIMIT ?",
+                [*params, limit + 1],
+            ).fetchall()
+            notes = {row["id"]: self._note(row) for row in rows[:limit]}
+            self._attach_links(notes)
+        hubs = list(notes.values())
+        next_cursor = None
+        if len(rows) > limit and hubs:
+            last = hubs[-1]
+            next_cursor = f"{last[rank_by]!r}|{last['id']}"
+        return {"rank_by": rank_by, "hubs": hubs, "next_cursor": next_cursor}
+
+    def page(self, user_id: str, limit: int = 500, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """One page of a user's notes (by id) with their outgoing edges"""
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT * FROM notes WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (user_id, cursor or "", limit + 1),
+            ).fetchall()
+            notes = {row["id"]: self._note(row) for row in rows[:limit]}
+            self._attach_links(notes)
+        nodes = list(notes.values())
+        edges = [
+            {"from": note["id"], "to": target, "type": "links_to"}
+            for note in nodes for target in note["links"]
+        ]
+        return {
+            "nodes": nodes,
+            "edges": edges,
+            "next_cursor": nodes[-1]["id"] if len(rows) > limit else None,
+        }
+
+    def statistics(self, user_id: str) -> Dict[str, Any]:
+        """Counts kept up to date on every write, plus the last background metrics"""
+        with self._lock:
+            row = self.db.execute("SELECT * FROM user_stats WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return {"total_notes": 0, "total_connections": 0, "average_connections": 0.0,
+                    "components": None, "largest_component": None, "metrics_at": None, "metrics_stale": False}
+        return {
+            "total_notes": row["notes"],
+            "total_connections": row["links"],
+            "average_connections": row["links"] / max(row["notes"], 1),
+            "components": row["components"],
+            "largest_component": row["largest_component"],
+            "metrics_at": row["metrics_at"],
+            "metrics_stale": row["metrics_version"] < row["version"],
+        }
+
+    # ------------------------------------------------------------------
+    # Background metrics
+    # ------------------------------------------------------------------
+    def compute_metrics(self, user_id: str) -> Dict[str, Any]:
+        """
+        Connected components (ignoring link direction) and PageRank over a
+        user's notes; links to missing or other users' notes are skipped.
+        """
+        with self._lock:
+            version_row = self.db.execute("SELECT version FROM user_stats WHERE user_id = ?", (user_id,)).fetchone()
+            version = version_row["version"] if version_row else 0
+            ids = [n for (n,) in self.db.execute("SELECT id FROM notes WHERE user_id = ? ORDER BY id", (user_id,))]
+            edges = self.db.execute("SELECT source, target FROM links WHERE user_id = ?", (user_id,)).fetchall()
+
+        position = {note_id: i for i, note_id in enumerate(ids)}
+        pairs = np.array([(position[s], position[t]) for s, t in edges if s in position and t in position],
+                         dtype=np.int64).reshape(-1, 2)
+        src, dst = pairs[:, 0], pairs[:, 1]
+        n = len(ids)
+        labels = connected_components(n, src, dst)
+        ranks = pagerank(n, src, dst)
+        _, sizes = np.unique(labels, return_counts=True)
+
+        with self._lock:
+            self.db.executemany(
+                "UPDATE notes SET component = ?, pagerank = ? WHERE id = ?",
+                [(int(labels[i]), float(ranks[i]), note_id) for i, note_id in enumerate(ids)],
+            )
+            self.db.execute(
+                """
+                UPDATE user_stats SET components = ?, largest_component = ?, metrics_at = ?,
+                    metrics_version = MAX(metrics_version, ?)
+                WHERE user_id = ?
+                """,
+                (len(sizes), int(sizes.max()) if len(sizes) else 0, datetime.now().isoformat(), version, user_id),
+            )
+            self.db.commit()
+        return {"user_id": user_id, "notes": n, "edges": len(src), "components": len(sizes)}
+
+    def refresh_metrics(self) -> int:
+        """Recompute metrics for every user whose graph changed; returns users refreshed"""
+        with self._lock:
+            users = [u for (u,) in self.db.execute("SELECT user_id FROM user_stats WHERE metrics_version < version")]
+        for user_id in users:
+            try:
+                self.compute_metrics(user_id)
+            except Exception as e:
+                logger.warning(f"Zettel metrics failed for {user_id}: {e}")
+        return len(users)
+
+    def _metrics_loop(self) -> None:
+        while not self._stop.wait(self.metrics_interval):
+            self.refresh_metrics()
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            self.db.close()
+
+
+def get_zettel_graph() -> ZettelGraphStore:
+    """Shared note graph at ZETTEL_GRAPH_PATH"""
+    return integration_registry.get(
+        "zettel_graph",
+        lambda: ZettelGraphStore(
+            os.getenv("ZETTEL_GRAPH_PATH", "./cache/zettel_graph.db"),
+            metrics_interval=float(os.getenv("ZETTEL_METRICS_INTERVAL", "30")),
+        ),
+        env_keys=["ZETTEL_GRAPH_PATH", "ZETTEL_METRICS_INTERVAL"],
+    )
@@ -0,0 +1,109 @@
+"""
+Benchmark ChromaDBMemory write/query paths
+Stores BENCH_TURNS conversation turns one call at a time (the old execute()
+path), with store_many, and through the remember() write buffer, then runs
+BENCH_QUERIES queries one by one and with query_many. Uses the HDAM encoder
+when a model is available, otherwise a hashing encoder with a fixed
+per-call overhead (BENCH_ENCODE_CALL_MS) standing in for model dispatch.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import hashlib
+import tempfile
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.chromadb_memory import ChromaDBMemory, CHROMADB_AVAILABLE
+from app.modules.hdam import shared_encode_fn
+
+N_TURNS = int(os.getenv("BENCH_TURNS", "2000"))
+N_QUERIES = int(os.getenv("BENCH_QUERIES", "200"))
+ENCODE_CALL_MS = float(os.getenv("BENCH_ENCODE_CALL_MS", "5"))
+DIM = 384
+
+
+def stub_encoder(texts):
+    time.sleep(ENCODE_CALL_MS / 1000)
+    vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.split():
+            vectors[row, int(hashlib.md5(word.encode()).hexdigest()[:8], 16) % DIM] += 1
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+
+def make_memory(encode_fn, name):
+    return ChromaDBMemory({
+        "chromadb_path": os.path.join(tempfile.mkdtemp(), "chromadb"),
+        "collection_name": name,
+        "encode_fn": encode_fn,
+        "flush_interval": 0,
+    })
+
+
+async def run(encode_fn):
+    turns = [f"turn {i}: learner asks about topic {i % 97} and concept {(i * 7) % 31}" for i in range(N_TURNS)]
+    metadatas = [{"session": i // 50, "turn": i} for i in range(N_TURNS)]
+    queries = [f"topic {i % 97} concept {i % 31}" for i in range(N_QUERIES)]
+
+    memory = make_memory(encode_fn, "bench_single")
+    start = time.perf_counter()
+    for turn, metadata in zip(turns, metadatas):
+        await memory.execute(turn, {"operation": "store", "content": turn, "metadata": metadata}, {})
+    single = time.perf_counter() - start
+
+    memory = make_memory(encode_fn, "bench_batch")
+    start = time.perf_counter()
+    await memory.store_many(turns, metadatas)
+    batched = time.perf_counter() - start
+
+    # Retrying the same batch overwrites rather than duplicating
+    await memory.store_many(turns, metadatas)
+    count = memory.collection.count()
+
+    buffered_memory = make_memory(encode_fn, "bench_buffer")
+    start = time.perf_counter()
+    for turn, metadata in zip(turns, metadatas):
+        buffered_memory.remember(turn, metadata)
+    buffered_memory.flush()
+    buffered = time.perf_counter() - start
+
+    print(f"{'store one by one':<20} {single:7.2f} s  {N_TURNS / single:9.0f} turns/s")
+    print(f"{'store_many':<20} {batched:7.2f} s  {N_TURNS / batched:9.0f} turns/s  ({single / batched:.1f}x)")
+    print(f"{'remember + flush':<20} {buffered:7.2f} s  {N_TURNS / buffered:9.0f} turns/s  ({single / buffered:.1f}x)")
+    print(f"Count after retrying store_many: {count} (expected {N_TURNS})")
+
+    start = time.perf_counter()
+    for query in queries:
+        await memory.execute(query, {"operation": "query", "n_results": 5}, {})
+    one_by_one = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await memory.query_many(queries, n_results=5)
+    many = time.perf_counter() - start
+    print(f"{'query one by one':<20} {one_by_one:7.2f} s  {N_QUERIES / one_by_one:9.0f} queries/s")
+    print(f"{'query_many':<20} {many:7.2f} s  {N_QUERIES / many:9.0f} queries/s  ({one_by_one / many:.1f}x)")
+
+
+def main():
+    print("=" * 60)
+    print("ChromaDBMemory Batch Benchmark")
+    print(f"Turns: {N_TURNS}  Queries: {N_QUERIES}")
+    print("=" * 60)
+
+    if not CHROMADB_AVAILABLE:
+        print("ChromaDB not available. Install: pip install chromadb")
+        return
+
+    encode_fn = shared_encode_fn()
+    print(f"Encoder: {'HDAM' if encode_fn else f'hashing stub ({ENCODE_CALL_MS:.0f} ms/call)'}")
+    asyncio.run(run(encode_fn or stub_encoder))
+
+
+if __name__ == "__main__":
+    main()
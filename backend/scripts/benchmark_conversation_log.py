@@ -0,0 +1,114 @@
+"""
+Benchmark conversation storage
+Appends BENCH_MESSAGES agent messages to one conversation, then times a
+page read from the end, the conversation summary, agent stats, and an
+export (with peak Python heap from tracemalloc). Compares the SwarmShield
+in-memory store (when the swarm-shield package is installed) with the
+segmented ConversationLogStore, which is also run at BENCH_LARGE_MESSAGES.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.conversation_log import ConversationLogStore, CRYPTOGRAPHY_AVAILABLE
+
+N_MESSAGES = int(os.getenv("BENCH_MESSAGES", "2000"))
+N_LARGE = int(os.getenv("BENCH_LARGE_MESSAGES", "200000"))
+PAGE = 100
+MESSAGE = "Agent reasoning step with intermediate results and a short plan. " * 4
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def traced(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = (time.perf_counter() - start) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def report(label, append_s, n, page_ms, summary_ms, stats_ms, export_ms, export_peak):
+    print(f"{label}")
+    print(f"  append        {n / append_s:9.0f} msgs/s")
+    print(f"  last page     {page_ms:9.2f} ms")
+    print(f"  summary       {summary_ms:9.2f} ms")
+    print(f"  agent stats   {stats_ms:9.2f} ms")
+    print(f"  export        {export_ms:9.2f} ms   peak heap {export_peak / 1e6:.2f} MB")
+
+
+def bench_log_store(n_messages: int, tmp: str):
+    store = ConversationLogStore(os.path.join(tmp, f"logs_{n_messages}"))
+    cid = store.create("bench")
+    log = store.get(cid)
+    start = time.perf_counter()
+    for i in range(n_messages):
+        log.append(f"agent-{i % 4}", MESSAGE)
+    append_s = time.perf_counter() - start
+
+    _, page_ms = timed(lambda: list(log.read(n_messages - PAGE, PAGE)))
+    _, summary_ms = timed(log.summary)
+    _, stats_ms = timed(lambda: store.agent_stats("agent-1"))
+    export_path = os.path.join(tmp, f"export_{n_messages}.jsonl")
+
+    def export():
+        with open(export_path, "w") as f:
+            for line in store.export_lines(cid, "jsonl"):
+                f.write(line)
+
+    export_ms, export_peak = traced(export)
+    label = f"ConversationLogStore ({n_messages} msgs, {'encrypted' if store.encrypted else 'unencrypted'})"
+    report(label, append_s, n_messages, page_ms, summary_ms, stats_ms, export_ms, export_peak)
+
+
+def bench_swarm_shield(tmp: str):
+    try:
+        from swarm_shield.main import SwarmShield
+    except ImportError:
+        print("SwarmShield not available; skipping in-memory baseline")
+        return
+
+    shield = SwarmShield(storage_path=os.path.join(tmp, "shield"))
+    cid = shield.create_conversation("bench")
+    start = time.perf_counter()
+    for i in range(N_MESSAGES):
+        shield.add_message(cid, f"agent-{i % 4}", MESSAGE)
+    append_s = time.perf_counter() - start
+
+    _, page_ms = timed(lambda: shield.get_messages(cid)[-PAGE:])
+    _, summary_ms = timed(lambda: shield.get_conversation_summary(cid))
+    _, stats_ms = timed(lambda: shield.get_agent_stats("agent-1"))
+    export_ms, export_peak = traced(
+        lambda: shield.export_conversation(cid, format="json", path=os.path.join(tmp, "shield.json"))
+    )
+    report(f"SwarmShield ({N_MESSAGES} msgs)", append_s, N_MESSAGES, page_ms, summary_ms, stats_ms,
+           export_ms, export_peak)
+
+
+def main():
+    print("=" * 60)
+    print("Conversation Log Benchmark")
+    print(f"Messages: {N_MESSAGES}  Large run: {N_LARGE}  Page: {PAGE}  "
+          f"Encryption: {'AES-GCM' if CRYPTOGRAPHY_AVAILABLE else 'off'}")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_swarm_shield(tmp)
+        bench_log_store(N_MESSAGES, tmp)
+        bench_log_store(N_LARGE, tmp)
+
+
+if __name__ == "__main__":
+    main()
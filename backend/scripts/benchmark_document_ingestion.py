@@ -0,0 +1,133 @@
+"""
+Benchmark streaming document ingestion
+Generates a text PDF (500 pages by default) and compares the whole-file path
+(read all bytes, concatenate every page, one giant string) with the streaming
+IngestionPipeline. Peak Python heap in the API process is measured with
+tracemalloc using a sink that drops chunks, so only transient pipeline memory
+is counted; a second run stores into HDAM and reports per-stage throughput.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import tracemalloc
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.extraction import _extract_pdf_pages, _pdf_page_count
+from app.modules.ingestion import IngestionPipeline, TextChunker
+
+N_PAGES = int(os.getenv("BENCH_PAGES", "500"))
+LINES_PER_PAGE = int(os.getenv("BENCH_LINES_PER_PAGE", "45"))
+
+
+def write_pdf(path: str, n_pages: int, lines_per_page: int) -> None:
+    """Minimal multi-page PDF with Helvetica text, no external dependencies"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(n_pages):
+        lines = [f"Page {page + 1} line {line}: the quick brown fox studies topic {page * lines_per_page + line} "
+                 f"in chapter {page // 20}" for line in range(lines_per_page)]
+        ops = ["BT /F1 9 Tf 40 800 Td 11 TL"] + [f"({text}) '" for text in lines] + ["ET"]
+        stream = "\n".join(ops).encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Count %d /Kids [%s] >>" % (
+        n_pages, " ".join(f"{k} 0 R" for k in kids).encode())
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+class DiscardHDAM:
+    """Consumes the chunk stream without storing it"""
+
+    async def learn_stream(self, facts, batch_size=64, context="general", on_batch=None, **kwargs):
+        start = time.perf_counter()
+        stored = batches = 0
+        async for _ in facts:
+            stored += 1
+            batches += stored % batch_size == 0
+        return {"stored_facts": stored, "skipped_duplicates": 0, "batches": batches,
+                "elapsed_seconds": time.perf_counter() - start}
+
+
+def whole_file(path: str) -> int:
+    """The previous FileProcessor path: all bytes and all text in memory at once"""
+    with open(path, "rb") as f:
+        content = f.read()
+    tmp = path + ".copy.pdf"
+    with open(tmp, "wb") as f:
+        f.write(content)
+    text = ""
+    for page_text in _extract_pdf_pages(tmp, 0, _pdf_page_count(tmp)):
+        text += page_text + "\n"
+    os.unlink(tmp)
+    return len(list(TextChunker().feed(text)))
+
+
+def measure(label: str, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34} {elapsed:7.2f} s  peak heap {peak / 2**20:7.1f} MB")
+    return result
+
+
+def main():
+    print("=" * 60)
+    print("Streaming Document Ingestion Benchmark")
+    print(f"Pages: {N_PAGES}  Lines/page: {LINES_PER_PAGE}")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        small, large = os.path.join(tmp, "small.pdf"), os.path.join(tmp, "large.pdf")
+        write_pdf(small, max(1, N_PAGES // 5), LINES_PER_PAGE)
+        write_pdf(large, N_PAGES, LINES_PER_PAGE)
+        print(f"PDF size: {os.path.getsize(large) / 2**20:.1f} MB")
+
+        async def stream(path):
+            with open(path, "rb") as f:
+                return await IngestionPipeline(DiscardHDAM()).ingest_upload(f, os.path.basename(path), ["bench"])
+
+        measure(f"whole-file, {N_PAGES // 5} pages", lambda: whole_file(small))
+        measure(f"whole-file, {N_PAGES} pages", lambda: whole_file(large))
+        measure(f"streaming, {N_PAGES // 5} pages", lambda: asyncio.run(stream(small)))
+        result = measure(f"streaming, {N_PAGES} pages", lambda: asyncio.run(stream(large)))
+        print(f"Chunks: {result['chunks']}")
+
+        from app.modules.hdam import EnhancedQuantumHolographicHDAM
+        hdam = EnhancedQuantumHolographicHDAM(supabase_url=None, supabase_key=None)
+
+        async def store():
+            with open(large, "rb") as f:
+                return await IngestionPipeline(hdam).ingest_upload(f, "large.pdf", ["bench"])
+
+        print()
+        print("Per-stage metrics (HDAM sink):")
+        for stage, entry in asyncio.run(store())["metrics"].items():
+            print(f"  {stage:<8} " + "  ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}"
+                                               for k, v in entry.items()))
+
+
+if __name__ == "__main__":
+    main()
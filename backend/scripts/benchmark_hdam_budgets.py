@@ -0,0 +1,72 @@
+"""
+Benchmark HDAM per-context budgets, eviction and compaction
+Streams BENCH_BATCHES batches of BENCH_BATCH_SIZE items into BENCH_CONTEXTS
+contexts, as a long-running process would, once without limits (the
+previous behaviour: memory only grows) and once with a per-context item
+budget enforced after every write plus the periodic compaction pass. After
+every BENCH_REPORT_EVERY batches it reports stored vector bytes, bytes
+pinned by removed rows, retrieve latency and recall@1 of the most recently
+written items (each queried with its own vector).
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.hdam import AdvancedHolographicMemory
+
+BATCHES = int(os.getenv("BENCH_BATCHES", "60"))
+BATCH_SIZE = int(os.getenv("BENCH_BATCH_SIZE", "256"))
+CONTEXTS = int(os.getenv("BENCH_CONTEXTS", "4"))
+DIMENSIONS = int(os.getenv("BENCH_DIMENSIONS", "384"))
+MAX_ITEMS = int(os.getenv("BENCH_MAX_ITEMS", "2000"))
+COMPACT_RATIO = float(os.getenv("BENCH_COMPACT_RATIO", "0.25"))
+REPORT_EVERY = int(os.getenv("BENCH_REPORT_EVERY", "15"))
+PROBES = 50
+
+
+def run(label, max_items):
+    memory = AdvancedHolographicMemory(DIMENSIONS, max_items_per_context=max_items)
+    rng = np.random.default_rng(0)
+    recent = []
+    start = time.perf_counter()
+    for batch in range(1, BATCHES + 1):
+        context = f"domain{batch % CONTEXTS}"
+        ids = [f"{batch}-{i}" for i in range(BATCH_SIZE)]
+        memory.add_items_batch(ids, rng.standard_normal((BATCH_SIZE, DIMENSIONS)), context)
+        memory.enforce_budgets([context], expire=False)
+        if memory.pinned_bytes() > COMPACT_RATIO * memory.vector_bytes:
+            memory.compact(COMPACT_RATIO)
+        recent = [(context, item_id) for item_id in ids[-PROBES:]]
+
+        if batch % REPORT_EVERY == 0:
+            probe_start = time.perf_counter()
+            hits = sum(memory.retrieve(memory.items[item_id]["value"], context, top_k=1)[0]["id"] == item_id
+                       for context, item_id in recent)
+            retrieve_ms = (time.perf_counter() - probe_start) / len(recent) * 1000
+            usage = memory.memory_usage()
+            print(f"{label:<9} batch {batch:4d}  items {usage['items']:7d}  "
+                  f"vectors {usage['vector_bytes'] / 2**20:7.1f} MB  pinned {usage['pinned_bytes'] / 2**20:6.1f} MB  "
+                  f"retrieve {retrieve_ms:6.2f} ms  recall@1 {hits / len(recent):5.2f}")
+    usage = memory.memory_usage()
+    print(f"{label:<9} total {time.perf_counter() - start:6.2f} s  evicted {usage['evicted_items']}  "
+          f"compactions {usage['compactions']}")
+
+
+def main():
+    print("=" * 60)
+    print("HDAM Context Budget Benchmark")
+    print(f"Batches: {BATCHES} x {BATCH_SIZE}  Contexts: {CONTEXTS}  Dimensions: {DIMENSIONS}  "
+          f"Budget: {MAX_ITEMS} items/context")
+    print("=" * 60)
+    run("unbounded", 0)
+    run("budgeted", MAX_ITEMS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark HDAM encoder backends
+Reports startup time (imports + model load, measured in a fresh process) and
+encoding throughput in sentences/s for the torch, ONNX and ONNX int8 backends.
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+
+BACKENDS = {
+    "torch": {"HDAM_ENCODER_BACKEND": "torch"},
+    "onnx": {"HDAM_ENCODER_BACKEND": "onnx", "HDAM_ONNX_QUANTIZE": "false"},
+    "onnx-int8": {"HDAM_ENCODER_BACKEND": "onnx", "HDAM_ONNX_QUANTIZE": "int8"},
+}
+N_SENTENCES = int(os.getenv("BENCH_SENTENCES", "2000"))
+BATCH_SIZE = int(os.getenv("BENCH_BATCH_SIZE", "64"))
+
+
+def worker():
+    """Measure one backend; runs in a fresh interpreter so import cost is included"""
+    start = time.perf_counter()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from app.modules.hdam import EnhancedQuantumHolographicHDAM
+    hdam = EnhancedQuantumHolographicHDAM(supabase_url=None, supabase_key=None)
+    startup = time.perf_counter() - start
+    if hdam.encoder is None:
+        print(json.dumps({"error": "encoder failed to load"}))
+        return
+
+    sentences = [f"Sentence number {i} about learning topic {i % 50}." for i in range(N_SENTENCES)]
+    hdam.encode_texts(sentences[:BATCH_SIZE])  # warm-up
+    start = time.perf_counter()
+    for i in range(0, N_SENTENCES, BATCH_SIZE):
+        hdam.encode_texts(sentences[i:i + BATCH_SIZE])
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"startup_s": startup, "sentences_per_s": N_SENTENCES / elapsed}))
+
+
+def main():
+    print("=" * 60)
+    print("HDAM Encoder Backend Benchmark")
+    print(f"Sentences: {N_SENTENCES}  Batch size: {BATCH_SIZE}")
+    print("=" * 60)
+
+    for name, env in BACKENDS.items():
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker"],
+            env={**os.environ, **env}, capture_output=True, text=True,
+        )
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        result = json.loads(lines[-1]) if lines else {"error": proc.stderr.strip()[-200:]}
+        if "error" in result:
+            print(f"{name:<10} unavailable: {result['error']}")
+        else:
+            print(f"{name:<10} startup {result['startup_s']:6.2f} s   {result['sentences_per_s']:>9.1f} sentences/s")
+
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        worker()
+    else:
+        main()
@@ -0,0 +1,50 @@
+"""
+Benchmark HDAM async inference
+Fires concurrent reason() calls and reports throughput and latency with
+micro-batching enabled vs disabled (max batch size of one text).
+"""
+
+import os
+import sys
+import time
+import asyncio
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.hdam import EnhancedQuantumHolographicHDAM, MicroBatchEncoder
+
+CONCURRENCY = [int(c) for c in os.getenv("BENCH_CONCURRENCY", "1,8,32,128").split(",")]
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "5"))
+
+
+async def bench(hdam: EnhancedQuantumHolographicHDAM, users: int) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await asyncio.gather(*[
+            hdam.reason(f"What do we know about topic {i}?", context="bench", top_k=3)
+            for i in range(users)
+        ])
+    return users * ROUNDS / (time.perf_counter() - start)
+
+
+async def main():
+    print("=" * 60)
+    print("HDAM Async Inference Benchmark")
+    print("=" * 60)
+
+    hdam = EnhancedQuantumHolographicHDAM(supabase_url=None, supabase_key=None)
+    await hdam.learn([f"Fact about topic {i}" for i in range(500)], context="bench")
+
+    for label, max_batch in (("unbatched", 1), ("micro-batched", 64)):
+        hdam.inference = MicroBatchEncoder(hdam.encode_texts, max_batch_size=max_batch)
+        for users in CONCURRENCY:
+            qps = await bench(hdam, users)
+            metrics = hdam.inference.get_metrics()
+            print(f"{label:<14} users={users:<4} {qps:>8.1f} req/s  "
+                  f"p50={metrics['latency_ms_p50']:.1f} ms  p95={metrics['latency_ms_p95']:.1f} ms  "
+                  f"avg batch={metrics['avg_batch_size']:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
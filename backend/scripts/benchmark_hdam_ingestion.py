@@ -0,0 +1,66 @@
+"""
+Benchmark HDAM ingestion
+Compares per-fact learn() against the bulk learn_stream() path on a synthetic corpus.
+Set BENCH_STUB_ENCODER=1 to replace model inference with deterministic random
+vectors so only the memory-side overhead is measured.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.hdam import EnhancedQuantumHolographicHDAM
+
+N_FACTS = int(os.getenv("BENCH_FACTS", "20000"))
+BATCH_SIZE = int(os.getenv("BENCH_BATCH_SIZE", "512"))
+STUB_ENCODER = os.getenv("BENCH_STUB_ENCODER", "0") == "1"
+
+
+def make_hdam() -> EnhancedQuantumHolographicHDAM:
+    hdam = EnhancedQuantumHolographicHDAM(supabase_url=None, supabase_key=None)
+    if STUB_ENCODER:
+        rng = np.random.default_rng(0)
+        hdam.encode_texts = lambda texts: rng.standard_normal((len(texts), hdam.embedding_dim))
+    return hdam
+
+
+def corpus(n: int):
+    for i in range(n):
+        yield f"Synthetic fact number {i} about topic {i % 97}"
+
+
+async def bench_learn(n: int) -> float:
+    hdam = make_hdam()
+    facts = list(corpus(n))
+    start = time.perf_counter()
+    for i in range(0, n, BATCH_SIZE):
+        await hdam.learn(facts[i:i + BATCH_SIZE], context="bench")
+    return time.perf_counter() - start
+
+
+async def bench_learn_stream(n: int) -> dict:
+    hdam = make_hdam()
+    return await hdam.learn_stream(corpus(n), batch_size=BATCH_SIZE, context="bench")
+
+
+def main():
+    print("=" * 60)
+    print("HDAM Ingestion Benchmark")
+    print(f"Facts: {N_FACTS}  Batch size: {BATCH_SIZE}  Stub encoder: {STUB_ENCODER}")
+    print("=" * 60)
+
+    elapsed = asyncio.run(bench_learn(N_FACTS))
+    print(f"learn()         {elapsed:8.2f} s  {N_FACTS / elapsed:>10.0f} facts/s")
+
+    result = asyncio.run(bench_learn_stream(N_FACTS))
+    print(f"learn_stream()  {result['elapsed_seconds']:8.2f} s  {result['facts_per_second']:>10.0f} facts/s")
+    print(f"Speedup: {elapsed / result['elapsed_seconds']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark shared HDAM encoders and memory spaces
+Measures, each in a fresh process, the startup time, resident memory and
+number of loaded encoders for the HDAM consumers of one backend process
+(API, PolyMathOS, learning system, file upload): "before" gives each one a
+private instance with its own encoder, as the code did previously; "after"
+resolves them through get_hdam(), plus BENCH_EXTRA_SPACES extra named
+memory spaces. If BENCH_MODEL (default: HDAM_MODEL_NAME or MiniLM) cannot be
+loaded, a randomly initialised model of the same shape is used instead.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import subprocess
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CONSUMERS = ["api", "polymathos", "learning_system", "file_upload"]
+EXTRA_SPACES = int(os.getenv("BENCH_EXTRA_SPACES", "2"))
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def worker(mode: str):
+    """Build every consumer's HDAM; runs in a fresh interpreter so imports are included"""
+    start = time.perf_counter()
+    from app.modules import hdam as hdam_module
+    baseline_rss = rss_mb()
+    if mode == "before":
+        os.environ["HDAM_SHARED_ENCODER"] = "off"
+        instances = {name: hdam_module.initialize_hdam() for name in CONSUMERS}
+    else:
+        from app.api.hdam import get_hdam as api_get_hdam
+        instances = {
+            "api": api_get_hdam(),
+            "polymathos": hdam_module.get_hdam(),
+            "learning_system": hdam_module.get_hdam(supabase_url=os.getenv("SUPABASE_URL")),
+            "file_upload": hdam_module.get_hdam(),
+        }
+        for i in range(EXTRA_SPACES):
+            instances[f"space{i}"] = hdam_module.get_hdam(f"space{i}")
+    startup = time.perf_counter() - start
+    # Serve one query each so lazily mapped weights count towards RSS
+    for hdam in instances.values():
+        hdam.encode_texts(["warm-up query"])
+
+    asyncio.run(instances["file_upload"].learn(["Uploaded notes on photosynthesis."], context="biology"))
+    print(json.dumps({
+        "startup_s": startup,
+        "import_rss_mb": baseline_rss,
+        "rss_mb": rss_mb(),
+        "instances": len({id(h) for h in instances.values()}),
+        "encoders": len({id(h.encoder) for h in instances.values() if h.encoder is not None}),
+        "upload_visible_to_api": len(instances["api"].local_memory) > 0,
+    }))
+
+
+def synthetic_model(path: str) -> str:
+    """Randomly initialised MiniLM-L6-shaped sentence transformer saved to path"""
+    from transformers import BertConfig, BertModel, BertTokenizer
+    from sentence_transformers import SentenceTransformer, models
+
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + [f"tok{i}" for i in range(30517)]
+    base = os.path.join(path, "base")
+    os.makedirs(base)
+    with open(os.path.join(base, "vocab.txt"), "w") as f:
+        f.write("\n".join(vocab))
+    BertTokenizer(os.path.join(base, "vocab.txt")).save_pretrained(base)
+    config = BertConfig(vocab_size=len(vocab), hidden_size=384, num_hidden_layers=6,
+                        num_attention_heads=12, intermediate_size=1536)
+    BertModel(config).save_pretrained(base)
+    transformer = models.Transformer(base, max_seq_length=256)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension())
+    model_dir = os.path.join(path, "model")
+    SentenceTransformer(modules=[transformer, pooling]).save(model_dir)
+    return model_dir
+
+
+def resolve_model(tmp: str) -> str:
+    name = os.getenv("BENCH_MODEL", os.getenv("HDAM_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2"))
+    try:
+        from sentence_transformers import SentenceTransformer
+        SentenceTransformer(name)
+        return name
+    except Exception as e:
+        print(f"{name} unavailable ({type(e).__name__}); using a random model of the same shape")
+        return synthetic_model(tmp)
+
+
+def main():
+    print("=" * 60)
+    print("HDAM Shared Registry Benchmark")
+    print(f"Consumers: {', '.join(CONSUMERS)}  Extra spaces (after): {EXTRA_SPACES}")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, HDAM_MODEL_NAME=resolve_model(tmp), HDAM_ENCODER_BACKEND="torch")
+        env.pop("SUPABASE_URL", None)
+        env.pop("SUPABASE_KEY", None)
+        for mode in ("before", "after"):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", mode],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:<7} startup {result['startup_s']:6.2f} s  "
+                  f"RSS {result['rss_mb']:7.1f} MB (+{result['rss_mb'] - result['import_rss_mb']:.1f} over imports)  "
+                  f"instances {result['instances']}  encoders {result['encoders']}  "
+                  f"upload visible to API: {result['upload_visible_to_api']}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--worker":
+        worker(sys.argv[2])
+    else:
+        main()
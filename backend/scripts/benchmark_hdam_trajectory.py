@@ -0,0 +1,119 @@
+"""
+Benchmark HDAM analogy, trajectory and learning-path kernels
+Stores BENCH_ITEMS items in one context and times a single retrieval, an
+analogy, a BENCH_STEPS-step directional extrapolation and a
+BENCH_GOALS-goal learning path. Each is compared with the previous
+per-item implementations (scalar unbinding and correlation per item, one
+retrieval per trajectory step, an items x goals correlation double loop
+and a per-candidate greedy selection), reproduced here as the reference.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.hdam import AdvancedHolographicMemory, PRECISION_THRESHOLD
+
+N_ITEMS = int(os.getenv("BENCH_ITEMS", "5000"))
+DIMENSIONS = int(os.getenv("BENCH_DIMENSIONS", "384"))
+STEPS = int(os.getenv("BENCH_STEPS", "10"))
+GOALS = int(os.getenv("BENCH_GOALS", "20"))
+MAX_ITEMS = 10
+CONTEXT = "general"
+
+
+def reference_retrieve(memory, query, top_k):
+    processor = memory.processor
+    retrieved = processor.holographic_unbinding(memory.memory_traces[CONTEXT], query)
+    item_ids = memory.context_associations[CONTEXT]
+    similarities = np.array([processor.multidimensional_correlation(retrieved, memory.items[i]["value"])
+                             for i in item_ids])
+    return [item_ids[i] for i in np.argsort(-similarities)[:top_k]]
+
+
+def reference_extrapolation(memory, base, direction):
+    unit_direction = direction / np.linalg.norm(direction)
+    closest = []
+    for step in range(1, STEPS + 1):
+        point = base + step * 0.5 * unit_direction
+        norm = np.linalg.norm(point)
+        if norm > PRECISION_THRESHOLD:
+            point = point / norm
+        closest.append(reference_retrieve(memory, point, 1)[0])
+    return closest
+
+
+def reference_selection(similarities, k):
+    selected = [int(np.argmax(similarities))]
+    remaining = [i for i in range(len(similarities)) if i != selected[0]]
+    for _ in range(k - 1):
+        best_score, best_idx = -np.inf, -1
+        for idx in remaining:
+            score = similarities[idx] - 0.3 * np.mean([similarities[idx] * similarities[s] for s in selected])
+            if score > best_score:
+                best_score, best_idx = score, idx
+        selected.append(best_idx)
+        remaining.remove(best_idx)
+    return selected
+
+
+def reference_path(memory, goals):
+    processor = memory.processor
+    item_ids = memory.context_associations[CONTEXT]
+    relevance = np.array([
+        np.mean([processor.multidimensional_correlation(memory.items[i]["value"], goal) for goal in goals])
+        for i in item_ids
+    ])
+    return [item_ids[i] for i in reference_selection(relevance, MAX_ITEMS)]
+
+
+def timed(fn, repeat=3):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    print("=" * 60)
+    print("HDAM Analogy / Trajectory / Learning Path Benchmark")
+    print(f"Items: {N_ITEMS}  Dimensions: {DIMENSIONS}  Steps: {STEPS}  Goals: {GOALS}")
+    print("=" * 60)
+
+    rng = np.random.default_rng(0)
+    memory = AdvancedHolographicMemory(DIMENSIONS)
+    memory.add_items_batch([f"item{i}" for i in range(N_ITEMS)], rng.standard_normal((N_ITEMS, DIMENSIONS)), CONTEXT)
+    query, base, direction = rng.standard_normal((3, DIMENSIONS))
+    a, b, c = rng.standard_normal((3, DIMENSIONS))
+    goals = rng.standard_normal((GOALS, DIMENSIONS))
+
+    cases = [
+        ("retrieve (top 5)",
+         lambda: reference_retrieve(memory, query, 5),
+         lambda: [m["id"] for m in memory.retrieve(query, CONTEXT, top_k=5)]),
+        ("analogy (top 5)",
+         lambda: reference_retrieve(memory, (c + b - a) / np.linalg.norm(c + b - a), 5),
+         lambda: [m["id"] for m in memory.analogy_reasoning(a, b, c, CONTEXT, top_k=5)]),
+        (f"extrapolation ({STEPS} steps)",
+         lambda: reference_extrapolation(memory, base, direction),
+         lambda: [s["closest_match"]["id"] for s in memory.directional_extrapolation(base, direction, STEPS, 0.5, CONTEXT)]),
+        (f"learning path ({GOALS} goals)",
+         lambda: reference_path(memory, goals),
+         lambda: [m["id"] for m in memory.learning_acceleration_path(goals, MAX_ITEMS, CONTEXT)]),
+    ]
+    for label, reference, vectorized in cases:
+        expected, reference_ms = timed(reference, repeat=1)
+        got, vectorized_ms = timed(vectorized)
+        assert got == expected, label
+        print(f"{label:<28} per-item {reference_ms:9.1f} ms  vectorized {vectorized_ms:7.2f} ms  "
+              f"({reference_ms / vectorized_ms:5.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
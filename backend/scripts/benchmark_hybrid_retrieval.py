@@ -0,0 +1,114 @@
+"""
+Benchmark hybrid retrieval
+Indexes a synthetic Zipf-distributed corpus (1M chunks by default) into the
+built-in HybridRetrievalEngine and reports indexing throughput, query latency
+and recall@k for BM25, dense and fused retrieval. Each query is built from
+words of a known target chunk; recall is the fraction of targets in the top k.
+Dense vectors come from a fixed random projection of the bag of words so no
+model download is needed.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.hybrid_retrieval import HybridRetrievalEngine
+
+N_CHUNKS = int(os.getenv("BENCH_CHUNKS", "1000000"))
+VOCAB_SIZE = int(os.getenv("BENCH_VOCAB", "50000"))
+CHUNK_WORDS = int(os.getenv("BENCH_CHUNK_WORDS", "60"))
+DIM = int(os.getenv("BENCH_DIM", "64"))
+BATCH_SIZE = int(os.getenv("BENCH_BATCH_SIZE", "10000"))
+N_QUERIES = int(os.getenv("BENCH_QUERIES", "200"))
+TOP_K = int(os.getenv("BENCH_TOP_K", "10"))
+
+rng = np.random.default_rng(0)
+projection = rng.standard_normal((VOCAB_SIZE, DIM)).astype(np.float32)
+encoder_seconds = 0.0
+
+
+def random_projection_encoder(texts):
+    """Sum of per-word random vectors, a cheap stand-in for a sentence encoder"""
+    global encoder_seconds
+    start = time.perf_counter()
+    vectors = _project(texts)
+    encoder_seconds += time.perf_counter() - start
+    return vectors
+
+
+def _project(texts):
+    word_ids = [np.array([int(w[1:]) for w in text.split()], dtype=np.int64) for text in texts]
+    lengths = np.array([len(ids) for ids in word_ids])
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.add.reduceat(projection[np.concatenate(word_ids)], starts, axis=0)
+
+
+def synthetic_batch(n: int):
+    words = np.minimum(rng.zipf(1.2, size=(n, CHUNK_WORDS)), VOCAB_SIZE) - 1
+    texts = [" ".join(f"w{w}" for w in row) for row in words]
+    metadata = [{"shard": i % 16} for i in range(n)]
+    return texts, metadata
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+
+def main():
+    print("=" * 60)
+    print("Hybrid Retrieval Benchmark")
+    print(f"Chunks: {N_CHUNKS}  Vocab: {VOCAB_SIZE}  Words/chunk: {CHUNK_WORDS}  Dim: {DIM}")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        engine = HybridRetrievalEngine(index_dir, encode_fn=random_projection_encoder)
+        sample_texts = []
+
+        start = time.perf_counter()
+        for offset in range(0, N_CHUNKS, BATCH_SIZE):
+            texts, metadata = synthetic_batch(min(BATCH_SIZE, N_CHUNKS - offset))
+            engine.index_documents(texts, metadata, ids=[f"chunk-{offset + i}" for i in range(len(texts))])
+            sample_texts.append((offset, texts[0]))
+        engine.compact()
+        elapsed = time.perf_counter() - start
+        engine_seconds = elapsed - encoder_seconds
+        print(f"Indexing: {elapsed:8.1f} s  {N_CHUNKS / elapsed:>10.0f} chunks/s "
+              f"(engine {engine_seconds:.1f} s = {N_CHUNKS / engine_seconds:.0f} chunks/s, encoder {encoder_seconds:.1f} s)")
+
+        start = time.perf_counter()
+        engine = HybridRetrievalEngine(index_dir, encode_fn=random_projection_encoder)
+        print(f"Reload:   {time.perf_counter() - start:8.1f} s  {engine.stats()}")
+
+        picks = [sample_texts[i % len(sample_texts)] for i in rng.permutation(max(N_QUERIES, len(sample_texts)))[:N_QUERIES]]
+        queries = []
+        for offset, text in picks:
+            words = text.split()
+            queries.append((f"chunk-{offset}", " ".join(rng.choice(words, size=min(6, len(words)), replace=False))))
+
+        print()
+        print(f"{'mode':<8} {'p50 ms':>9} {'p95 ms':>9} {'recall@' + str(TOP_K):>10}")
+        for mode in ("bm25", "dense", "hybrid"):
+            latencies, hits = [], 0
+            for target, query in queries:
+                t0 = time.perf_counter()
+                results = engine.query(query, top_k=TOP_K, mode=mode)
+                latencies.append(time.perf_counter() - t0)
+                hits += any(r["id"] == target for r in results)
+            print(f"{mode:<8} {percentile_ms(latencies, 50):>9.1f} {percentile_ms(latencies, 95):>9.1f} "
+                  f"{hits / len(queries):>10.2f}")
+
+        latencies = []
+        for _, query in queries:
+            t0 = time.perf_counter()
+            engine.query(query, top_k=TOP_K, filters={"shard": [0, 1]})
+            latencies.append(time.perf_counter() - t0)
+        print(f"{'filtered':<8} {percentile_ms(latencies, 50):>9.1f} {percentile_ms(latencies, 95):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark per-request integration overhead
+Calls the /api/rag, /api/documents, /api/research and /api/swarms endpoints
+through a TestClient with offline stub backends (swarms fallbacks, BM25-only
+RAG index preloaded with synthetic chunks) and compares constructing
+integrations per request (INTEGRATION_REGISTRY=off) with the shared registry.
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+import statistics
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Missing optional packages log a warning on every construction
+logging.disable(logging.WARNING)
+
+N_REQUESTS = int(os.getenv("BENCH_REQUESTS", "200"))
+N_CHUNKS = int(os.getenv("BENCH_CHUNKS", "20000"))
+
+ENDPOINTS = [
+    ("POST", "/api/rag/agent/query", {"query": "w12 w7 w301", "top_k": 5}),
+    ("POST", "/api/documents/parse", {"content": "# Title\n\nBody text"}),
+    ("POST", "/api/research/papers/discover", {"query": "graph neural networks", "max_results": 5}),
+    ("POST", "/api/swarms/monte-carlo/run", {"task": "2 + 2", "parallel": True, "aggregator": "most_common"}),
+    ("POST", "/api/swarms/education/generate", {"subjects": "algebra"}),
+]
+
+
+def build_client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.api import rag, documents, research, swarms
+
+    app = FastAPI()
+    for module in (rag, documents, research, swarms):
+        app.include_router(module.router)
+    return TestClient(app)
+
+
+def seed_index(index_dir: str):
+    from app.modules.hybrid_retrieval import HybridRetrievalEngine
+
+    engine = HybridRetrievalEngine(index_dir)
+    for offset in range(0, N_CHUNKS, 5000):
+        texts = [" ".join(f"w{(i * 7 + j * 13) % 5000}" for j in range(50)) for i in range(offset, offset + 5000)]
+        engine.index_documents(texts)
+    engine.compact()
+    engine.close()
+
+
+def run(client, registry_mode: str):
+    os.environ["INTEGRATION_REGISTRY"] = registry_mode
+    from app.core.integration_registry import integration_registry
+    integration_registry.reset()
+
+    print(f"\nINTEGRATION_REGISTRY={registry_mode}")
+    for method, path, body in ENDPOINTS:
+        client.request(method, path, json=body)  # warm imports and first build
+        samples = []
+        for _ in range(N_REQUESTS):
+            start = time.perf_counter()
+            response = client.request(method, path, json=body)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        print(f"  {path:<34} {response.status_code}  p50 {statistics.median(samples) * 1000:7.2f} ms  "
+              f"p95 {samples[int(len(samples) * 0.95)] * 1000:7.2f} ms")
+
+
+def main():
+    print("=" * 60)
+    print("Integration Registry Benchmark")
+    print(f"Requests/endpoint: {N_REQUESTS}  RAG chunks: {N_CHUNKS}")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        os.environ["RAG_INDEX_DIR"] = index_dir
+        os.environ["RAG_DENSE_ENABLED"] = "false"
+        seed_index(index_dir)
+
+        client = build_client()
+        run(client, "off")
+        run(client, "on")
+
+        from app.core.integration_registry import integration_registry
+        print("\nRegistry stats:")
+        for name, entry in integration_registry.stats().items():
+            print(f"  {name:<20} builds={entry['builds']}  hits={entry['hits']}  "
+                  f"build {entry['build_seconds'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
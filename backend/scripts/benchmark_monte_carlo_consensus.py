@@ -0,0 +1,73 @@
+"""
+Benchmark MonteCarloSwarm majority voting
+Compares waiting for every agent (run with parallel=True and
+aggregate_most_common_result) against run_streaming, which stops once the
+vote is settled. Stub agents answer correctly with probability BENCH_P_CORRECT
+after a log-normal delay, so latency, samples used and accuracy can be
+compared. Samples count every agent call started, including abandoned ones.
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import statistics
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.monte_carlo_swarm import MonteCarloSwarm, aggregate_most_common_result
+
+N_AGENTS = int(os.getenv("BENCH_AGENTS", "9"))
+N_TRIALS = int(os.getenv("BENCH_TRIALS", "30"))
+LATENCY_MS = float(os.getenv("BENCH_LATENCY_MS", "100"))
+P_CORRECT = float(os.getenv("BENCH_P_CORRECT", "0.7"))
+CONFIDENCE = float(os.getenv("BENCH_CONFIDENCE", "0.75"))
+
+
+class StubAgent:
+    def __init__(self, index: int, rng: random.Random):
+        self.agent_name = f"Agent-{index}"
+        self.rng = rng
+
+    def run(self, task: str) -> str:
+        time.sleep(LATENCY_MS / 1000 * self.rng.lognormvariate(0, 0.5))
+        return "42" if self.rng.random() < P_CORRECT else self.rng.choice(["41", "43", "24"])
+
+
+def main():
+    print("=" * 60)
+    print("MonteCarloSwarm Consensus Benchmark")
+    print(f"Agents: {N_AGENTS}  Trials: {N_TRIALS}  Latency: {LATENCY_MS:.0f} ms  "
+          f"P(correct): {P_CORRECT}  Confidence: {CONFIDENCE}")
+    print("=" * 60)
+
+    rng = random.Random(0)
+    agents = [StubAgent(i, rng) for i in range(N_AGENTS)]
+    swarm = MonteCarloSwarm(agents=agents, parallel=True, result_aggregator=aggregate_most_common_result)
+
+    latencies, correct = [], 0
+    for _ in range(N_TRIALS):
+        start = time.perf_counter()
+        correct += swarm.run("6 * 7") == "42"
+        latencies.append(time.perf_counter() - start)
+    print(f"{'wait for all':<16} mean {statistics.mean(latencies) * 1000:7.1f} ms  "
+          f"samples {N_AGENTS:5.1f}  accuracy {correct / N_TRIALS:.2f}")
+
+    async def streaming():
+        runs = [await swarm.run_streaming("6 * 7", confidence=CONFIDENCE) for _ in range(N_TRIALS)]
+        return runs
+
+    runs = asyncio.run(streaming())
+    mean_latency = statistics.mean(r["elapsed_seconds"] for r in runs)
+    mean_samples = statistics.mean(r["samples_launched"] for r in runs)
+    accuracy = sum(r["result"] == "42" for r in runs) / N_TRIALS
+    print(f"{'streaming':<16} mean {mean_latency * 1000:7.1f} ms  samples {mean_samples:5.1f}  "
+          f"accuracy {accuracy:.2f}")
+    print(f"Stop reasons: {dict((k, sum(r['stop_reason'] == k for r in runs)) for k in {r['stop_reason'] for r in runs})}")
+    print(f"Agent calls saved: {1 - mean_samples / N_AGENTS:.0%}")
+
+
+if __name__ == "__main__":
+    main()
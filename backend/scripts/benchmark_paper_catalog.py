@@ -0,0 +1,133 @@
+"""
+Benchmark the local paper catalog
+Writes a synthetic arXiv metadata dump (Kaggle snapshot format, Zipfian
+vocabulary) of BENCH_PAPERS records, bulk-loads it, then reports load
+throughput, on-disk size, reopen time and query latency for full-text,
+category- and year-filtered search and id lookups. Similarity search is
+measured on a separate BENCH_DENSE_PAPERS catalog with hashed embeddings.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import resource
+import tempfile
+import statistics
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.paper_catalog import PaperCatalog
+
+N_PAPERS = int(os.getenv("BENCH_PAPERS", "2000000"))
+N_DENSE_PAPERS = int(os.getenv("BENCH_DENSE_PAPERS", "100000"))
+N_QUERIES = int(os.getenv("BENCH_QUERIES", "200"))
+VOCAB_SIZE = int(os.getenv("BENCH_VOCAB", "50000"))
+DIM = 256
+
+CATEGORIES = [f"{a}.{b}" for a in ("cs", "math", "physics", "q-bio", "stat") for b in ("AI", "LG", "CL", "CV", "DS", "ST", "NC", "OC")]
+VOCAB = [f"w{i}" for i in range(VOCAB_SIZE)]
+
+
+def write_dump(path: str, n_papers: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    with open(path, "w") as f:
+        for start in range(0, n_papers, 10000):
+            count = min(10000, n_papers - start)
+            words = np.minimum(rng.zipf(1.2, size=(count, 130)) - 1, VOCAB_SIZE - 1)
+            years = rng.integers(1992, 2026, size=count)
+            cats = rng.integers(0, len(CATEGORIES), size=(count, 2))
+            lines = []
+            for i in range(count):
+                row = words[i]
+                lines.append(json.dumps({
+                    "id": f"{years[i] % 100:02d}{(start + i) // 100000:02d}.{(start + i) % 100000:05d}",
+                    "authors": "A. Author, B. Writer and C. Researcher",
+                    "title": " ".join(VOCAB[w] for w in row[:10]),
+                    "abstract": " ".join(VOCAB[w] for w in row[10:]),
+                    "categories": f"{CATEGORIES[cats[i, 0]]} {CATEGORIES[cats[i, 1]]}",
+                    "versions": [{"version": "v1", "created": f"Mon, 2 Apr {years[i]} 19:18:42 GMT"}],
+                }))
+            f.write("\n".join(lines) + "\n")
+
+
+def hashed_encoder(texts):
+    vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.split():
+            vectors[row, int(hashlib.md5(word.encode()).hexdigest()[:8], 16) % DIM] += 1
+    return vectors
+
+
+def latency(label: str, fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    print(f"  {label:<28} p50 {statistics.median(samples) * 1000:8.2f} ms  "
+          f"p95 {samples[int(len(samples) * 0.95)] * 1000:8.2f} ms")
+
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def main():
+    print("=" * 60)
+    print("Paper Catalog Benchmark")
+    print(f"Papers: {N_PAPERS}  Dense papers: {N_DENSE_PAPERS}  Queries: {N_QUERIES}")
+    print("=" * 60)
+
+    rng = random.Random(0)
+    # Mid-frequency words, like topical query terms
+    queries = [" ".join(f"w{rng.randint(20, 2000)}" for _ in range(4)) for _ in range(N_QUERIES)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = os.path.join(tmp, "arxiv.jsonl")
+        start = time.perf_counter()
+        write_dump(dump, N_PAPERS)
+        print(f"Generated dump: {os.path.getsize(dump) / 1e9:.2f} GB in {time.perf_counter() - start:.1f} s")
+
+        catalog = PaperCatalog(os.path.join(tmp, "catalog"))
+        result = catalog.load_jsonl(dump)
+        print(f"Loaded {result['loaded']} papers in {result['seconds']:.1f} s "
+              f"({result['papers_per_second']:.0f} papers/s)")
+        print(f"Catalog on disk: {dir_size(catalog.path) / 1e9:.2f} GB")
+        print(f"Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e6:.2f} GB")
+        catalog.close()
+        os.remove(dump)
+
+        start = time.perf_counter()
+        catalog = PaperCatalog(os.path.join(tmp, "catalog"))
+        print(f"Reopen: {time.perf_counter() - start:.2f} s ({len(catalog)} papers)")
+
+        ids = [paper["id"] for paper in catalog.search(queries[0], 50)]
+        print("Query latency:")
+        latency("search", catalog.search, [(q, 10) for q in queries])
+        latency("search + category", lambda q: catalog.search(q, 10, categories=["cs.LG"]), [(q,) for q in queries])
+        latency("search + years 2015-2020", lambda q: catalog.search(q, 10, year_from=2015, year_to=2020),
+                [(q,) for q in queries])
+        latency("get by id", catalog.get, [(ids[i % len(ids)],) for i in range(N_QUERIES)])
+        catalog.close()
+
+        dense_dump = os.path.join(tmp, "dense.jsonl")
+        write_dump(dense_dump, N_DENSE_PAPERS, seed=1)
+        dense = PaperCatalog(os.path.join(tmp, "dense"), encode_fn=hashed_encoder)
+        result = dense.load_jsonl(dense_dump)
+        print(f"Dense catalog: {result['loaded']} papers embedded and loaded at "
+              f"{result['papers_per_second']:.0f} papers/s")
+        dense_ids = [paper["id"] for paper in dense.search(queries[0], 50, mode="bm25")]
+        latency("similar", dense.similar, [(dense_ids[i % len(dense_ids)], 10) for i in range(N_QUERIES)])
+        latency("dense search", lambda q: dense.search(q, 10, mode="dense"), [(q,) for q in queries])
+        dense.close()
+
+
+if __name__ == "__main__":
+    main()
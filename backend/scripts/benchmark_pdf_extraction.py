@@ -0,0 +1,107 @@
+"""
+Benchmark PDF text extraction
+Generates a corpus of BENCH_FILES text PDFs (BENCH_PAGES pages each) and
+reports pages/s for the old serial FileProcessor path (PyPDF2 on the event
+loop thread) and for the ExtractionService with 1..BENCH_MAX_WORKERS pool
+workers, cold and with a warm content-hash cache (the same files uploaded
+again). The longest event-loop stall during each run shows how much of the
+work blocks the API.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+from io import BytesIO
+
+import PyPDF2
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_document_ingestion import write_pdf
+from app.modules.extraction import ExtractionCache, ExtractionService, reset_extraction_pool
+
+N_FILES = int(os.getenv("BENCH_FILES", "20"))
+N_PAGES = int(os.getenv("BENCH_PAGES", "100"))
+MAX_WORKERS = int(os.getenv("BENCH_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+def serial_extract(content: bytes) -> str:
+    """The previous FileProcessor.extract_pdf_content"""
+    reader = PyPDF2.PdfReader(BytesIO(content))
+    return "".join((page.extract_text() or "") + "\n" for page in reader.pages)
+
+
+async def run_with_lag(coro_fn):
+    """Run coro_fn() while a ticker records the longest event-loop stall"""
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            stall = max(stall, now - last - 0.005)
+            last = now
+
+    task = asyncio.ensure_future(ticker())
+    start = time.perf_counter()
+    await asyncio.sleep(0)
+    await coro_fn()
+    elapsed = time.perf_counter() - start
+    done = True
+    await task
+    return elapsed, stall
+
+
+def report(label: str, elapsed: float, stall: float, pages: int):
+    print(f"{label:<28} {elapsed:7.2f} s  {pages / elapsed:8.0f} pages/s  max loop stall {stall * 1000:8.1f} ms")
+
+
+def main():
+    print("=" * 60)
+    print("PDF Extraction Benchmark")
+    print(f"Files: {N_FILES}  Pages/file: {N_PAGES}  CPUs: {os.cpu_count()}")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(N_FILES):
+            path = os.path.join(tmp, f"book{i}.pdf")
+            write_pdf(path, N_PAGES, 30 + i)
+            paths.append(path)
+        contents = [open(path, "rb").read() for path in paths]
+        total_pages = N_FILES * N_PAGES
+
+        async def serial():
+            for content in contents:
+                serial_extract(content)
+
+        report("serial (event loop)", *asyncio.run(run_with_lag(serial)), total_pages)
+
+        workers = 1
+        while workers <= MAX_WORKERS:
+            os.environ["INGEST_EXTRACT_WORKERS"] = str(workers)
+            reset_extraction_pool()
+            service = ExtractionService(ExtractionCache(os.path.join(tmp, f"cache{workers}")))
+
+            async def extract_all():
+                # Several uploads at once, as from concurrent learners
+                await asyncio.gather(*(service.extract_text(path, os.path.basename(path)) for path in paths))
+
+            # Start the workers outside the timed region
+            asyncio.run(service.extract_text(paths[0], "warmup.pdf"))
+            service.cache = ExtractionCache(os.path.join(tmp, f"cold{workers}"))
+            report(f"service, {workers} worker(s), cold", *asyncio.run(run_with_lag(extract_all)), total_pages)
+            report(f"service, {workers} worker(s), cached", *asyncio.run(run_with_lag(extract_all)), total_pages)
+            workers *= 2
+        reset_extraction_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark DatabasePersistence CRUD throughput against a local Postgres
+Point BENCH_DATABASE_URL (or DATABASE_URL) at a throwaway database: the
+schema migrations run on connect and the benchmark writes BENCH_RECORDS
+learning plans, quizzes and RPE events (ids prefixed "bench-", deleted at
+the end). Compares single-row calls sending SQL text, single-row calls
+through prepared statements, and the save_many_* / get_many_* batch methods.
+"""
+
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.storage_persistence import DatabasePersistence
+
+DATABASE_URL = os.getenv("BENCH_DATABASE_URL") or os.getenv("DATABASE_URL")
+RECORDS = int(os.getenv("BENCH_RECORDS", "2000"))
+
+
+def plan(i, run):
+    return {"id": f"bench-{run}-plan-{i}", "user_id": "bench-user", "goals": {"topic": f"Topic {i}"},
+            "phases": [{"name": "Phase 1", "modules": ["a", "b"]}], "progress": {"completed": 0}}
+
+
+def quiz(i, run):
+    return {"id": f"bench-{run}-quiz-{i}", "topic": f"Topic {i}",
+            "questions": [{"id": f"q{j}", "question": "?", "correct_answer": "a"} for j in range(10)],
+            "bloom_distribution": {"remember": 0.5, "understand": 0.5}}
+
+
+def rpe_event(i, run):
+    return {"event_id": f"bench-{run}-rpe-{i}", "user_id": "bench-user", "item_id": f"item-{i}",
+            "confidence": 0.7, "was_correct": i % 2 == 0, "rpe_value": 0.3}
+
+
+def rate(label, fn, count):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {count / elapsed:10.0f} rows/s  ({elapsed * 1000:8.1f} ms)")
+
+
+def main():
+    print("=" * 60)
+    print("DatabasePersistence Batch CRUD Benchmark")
+    print(f"Records: {RECORDS}")
+    print("=" * 60)
+    if not DATABASE_URL:
+        print("Set BENCH_DATABASE_URL to a local Postgres/TimescaleDB database")
+        return
+
+    os.environ["DB_PREPARED_STATEMENTS"] = "false"
+    plain = DatabasePersistence(DATABASE_URL)
+    os.environ["DB_PREPARED_STATEMENTS"] = "true"
+    prepared = DatabasePersistence(DATABASE_URL)
+    if not (plain.available and prepared.available):
+        print("Database not available")
+        return
+
+    for run, db, label in (("text", plain, "single-row, SQL text"), ("prep", prepared, "single-row, prepared")):
+        rate(f"save_learning_plan x{RECORDS}, {label}",
+             lambda: [db.save_learning_plan(plan(i, run)) for i in range(RECORDS)], RECORDS)
+        rate(f"save_quiz x{RECORDS}, {label}",
+             lambda: [db.save_quiz(quiz(i, run)) for i in range(RECORDS)], RECORDS)
+        rate(f"save_rpe_event x{RECORDS}, {label}",
+             lambda: [db.save_rpe_event(rpe_event(i, run)) for i in range(RECORDS)], RECORDS)
+        rate(f"get_quiz x{RECORDS}, {label}",
+             lambda: [db.get_quiz(f"bench-{run}-quiz-{i}") for i in range(RECORDS)], RECORDS)
+
+    run = "many"
+    rate("save_many_learning_plans (execute_values)",
+         lambda: prepared.save_many_learning_plans([plan(i, run) for i in range(RECORDS)]), RECORDS)
+    rate("save_many_quizzes (execute_values)",
+         lambda: prepared.save_many_quizzes([quiz(i, run) for i in range(RECORDS)]), RECORDS)
+    rate("save_many_rpe_events (COPY)",
+         lambda: prepared.save_many_rpe_events([rpe_event(i, run) for i in range(RECORDS)]), RECORDS)
+    found = {}
+    rate("get_many_quizzes",
+         lambda: found.update(prepared.get_many_quizzes([f"bench-{run}-quiz-{i}" for i in range(RECORDS)])), RECORDS)
+    assert len(found) == RECORDS
+
+    with prepared.conn.cursor() as cur:
+        cur.execute("DELETE FROM learning_plans WHERE plan_id LIKE 'bench-%'")
+        cur.execute("DELETE FROM quizzes WHERE quiz_id LIKE 'bench-%'")
+        cur.execute("DELETE FROM rpe_events WHERE event_id LIKE 'bench-%'")
+    prepared.conn.commit()
+
+
+if __name__ == "__main__":
+    main()
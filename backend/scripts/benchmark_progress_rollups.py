@@ -0,0 +1,91 @@
+"""
+Benchmark the progress rollups behind /progress/{user_id} and its history
+Writes BENCH_ATTEMPTS quiz attempts per user for BENCH_USERS users, spread
+over BENCH_DAYS days, through the in-memory rollups. Compares the previous
+report (average every attempt the user ever made) and a history built by
+grouping raw attempts into weekly buckets, with the rollup summary and
+weekly history reads. Also reports the per-attempt write cost.
+"""
+
+import os
+import sys
+import time
+import random
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.progress_rollups import LocalProgressRollups, bucket_start
+
+USERS = int(os.getenv("BENCH_USERS", "20"))
+ATTEMPTS = int(os.getenv("BENCH_ATTEMPTS", "20000"))
+DAYS = int(os.getenv("BENCH_DAYS", "365"))
+BUCKETS = 12
+
+
+def reference_report(attempts):
+    avg_score = sum(a["percent_correct"] for a in attempts) / len(attempts) if attempts else 0
+    trend = attempts[-1]["percent_correct"] - attempts[-2]["percent_correct"] if len(attempts) >= 2 else 0
+    return avg_score, trend
+
+
+def reference_history(attempts):
+    buckets = {}
+    for attempt in attempts:
+        counters = buckets.setdefault(bucket_start(attempt["timestamp"], "weekly"), [0, 0.0])
+        counters[0] += 1
+        counters[1] += attempt["percent_correct"]
+    return [(start, n, total / n) for start, (n, total) in sorted(buckets.items())[-BUCKETS:]]
+
+
+def timed(fn, repeat=20):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    print("=" * 60)
+    print("Progress Rollup Benchmark")
+    print(f"Users: {USERS}  Attempts/user: {ATTEMPTS}  Days: {DAYS}")
+    print("=" * 60)
+
+    rng = random.Random(0)
+    origin = datetime(2026, 1, 1)
+    attempts_db = {}
+    for u in range(USERS):
+        offsets = sorted(rng.uniform(0, DAYS * 86400) for _ in range(ATTEMPTS))
+        attempts_db[f"user{u}"] = [
+            {"user_id": f"user{u}", "score": s // 10, "max_score": 10, "percent_correct": float(s),
+             "timestamp": origin + timedelta(seconds=offset)}
+            for offset, s in ((offset, rng.randrange(0, 101, 10)) for offset in offsets)
+        ]
+
+    rollups = LocalProgressRollups()
+    start = time.perf_counter()
+    for attempts in attempts_db.values():
+        for i in range(0, len(attempts), 50):
+            rollups.record(attempts[i:i + 50])
+    elapsed = time.perf_counter() - start
+    print(f"rollup writes: {USERS * ATTEMPTS / elapsed:10.0f} attempts/s "
+          f"({elapsed / (USERS * ATTEMPTS) * 1e6:.2f} us each)")
+
+    user = "user0"
+    (old_avg, _), old_ms = timed(lambda: reference_report(attempts_db[user]))
+    summary, new_ms = timed(lambda: rollups.summary(user))
+    assert abs(summary["score_sum"] / summary["attempts"] - old_avg) < 1e-6
+    print(f"{'report, scan all attempts':<32} {old_ms:8.3f} ms")
+    print(f"{'report, rollup summary':<32} {new_ms:8.3f} ms")
+
+    old_history, old_ms = timed(lambda: reference_history(attempts_db[user]))
+    history, new_ms = timed(lambda: rollups.history(user, "weekly", BUCKETS))
+    assert [p["quizzes_completed"] for p in history] == [n for _, n, _ in old_history]
+    print(f"{f'history, group raw ({BUCKETS} weeks)':<32} {old_ms:8.3f} ms")
+    print(f"{f'history, rollup ({BUCKETS} weeks)':<32} {new_ms:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark quiz grading
+Grades BENCH_SUBMISSIONS submissions of a BENCH_QUESTIONS-question quiz with
+the previous /quiz/submit logic (linear question search per answer, one
+attempt insert per submission) and with QuizGradingEngine (compiled answer
+key, batched grading, incremental item statistics, bulk attempt writer).
+Storage is simulated by a sink costing BENCH_DB_CALL_MS per round trip plus
+BENCH_DB_ROW_MS per row.
+"""
+
+import os
+import sys
+import time
+import uuid
+import random
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.quiz_grading import QuizAttemptWriter, QuizGradingEngine
+
+N_SUBMISSIONS = int(os.getenv("BENCH_SUBMISSIONS", "5000"))
+N_QUESTIONS = int(os.getenv("BENCH_QUESTIONS", "50"))
+DB_CALL_MS = float(os.getenv("BENCH_DB_CALL_MS", "2"))
+DB_ROW_MS = float(os.getenv("BENCH_DB_ROW_MS", "0.02"))
+
+
+def simulated_insert(rows: int) -> bool:
+    time.sleep((DB_CALL_MS + DB_ROW_MS * rows) / 1000)
+    return True
+
+
+def linear_grade(quiz, user_id, answers):
+    """The previous /quiz/submit grading and storage path"""
+    results = []
+    correct_count = 0
+    for answer in answers:
+        question = next((q for q in quiz["questions"] if q["id"] == answer["question_id"]), None)
+        if not question:
+            continue
+        is_correct = str(answer["user_answer"]).lower().strip() == str(question["correct_answer"]).lower().strip()
+        if is_correct:
+            correct_count += 1
+        results.append({
+            "question_id": answer["question_id"],
+            "is_correct": is_correct,
+            "correct_answer": question["correct_answer"],
+            "explanation": question.get("explanation", ""),
+            "time_spent": answer["time_spent_seconds"]
+        })
+    attempt = {
+        "id": str(uuid.uuid4()),
+        "quiz_id": quiz["id"],
+        "user_id": user_id,
+        "answers": results,
+        "score": correct_count,
+        "max_score": len(answers),
+        "percent_correct": (correct_count / len(answers)) * 100 if answers else 0,
+        "timestamp": datetime.now()
+    }
+    simulated_insert(1)
+    return attempt
+
+
+def main():
+    print("=" * 60)
+    print("Quiz Grading Benchmark")
+    print(f"Submissions: {N_SUBMISSIONS}  Questions: {N_QUESTIONS}  "
+          f"DB: {DB_CALL_MS} ms/call + {DB_ROW_MS} ms/row")
+    print("=" * 60)
+
+    rng = random.Random(0)
+    questions = [{"id": str(uuid.uuid4()), "correct_answer": f"Answer {i}", "explanation": "..."}
+                 for i in range(N_QUESTIONS)]
+    quiz = {"id": "bench", "questions": questions}
+    submissions = []
+    for user in range(N_SUBMISSIONS):
+        skill = rng.random()
+        order = rng.sample(questions, len(questions))
+        submissions.append({"user_id": f"user{user}", "answers": [
+            {"question_id": q["id"],
+             "user_answer": q["correct_answer"].lower() if rng.random() < skill else "wrong",
+             "time_spent_seconds": 30}
+            for q in order
+        ]})
+
+    start = time.perf_counter()
+    baseline = [linear_grade(quiz, s["user_id"], s["answers"]) for s in submissions]
+    linear = time.perf_counter() - start
+
+    writes = []
+
+    def sink(batch):
+        writes.append(len(batch))
+        return simulated_insert(len(batch))
+
+    engine = QuizGradingEngine(QuizAttemptWriter(sink, batch_size=500))
+    start = time.perf_counter()
+    key = engine.compile(quiz)
+    one_by_one = [engine.grade(key, s["user_id"], s["answers"]) for s in submissions[:N_SUBMISSIONS // 2]]
+    per_request = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = engine.grade_batch(key, submissions[N_SUBMISSIONS // 2:])
+    batch_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    engine.close()
+    drain = time.perf_counter() - start
+
+    assert [a["score"] for a in baseline] == [a["score"] for a in one_by_one + batched]
+    half = N_SUBMISSIONS // 2
+    print(f"{'linear + insert each':<26} {N_SUBMISSIONS / linear:9.0f} submissions/s")
+    print(f"{'engine, per request':<26} {half / per_request:9.0f} submissions/s  ({linear / N_SUBMISSIONS * half / per_request:.1f}x)")
+    print(f"{'engine, grade_batch':<26} {(N_SUBMISSIONS - half) / batch_seconds:9.0f} submissions/s  "
+          f"({linear / N_SUBMISSIONS * (N_SUBMISSIONS - half) / batch_seconds:.1f}x)")
+    print(f"Attempt writes: {len(writes)} bulk inserts for {sum(writes)} attempts "
+          f"(vs {N_SUBMISSIONS}); final drain {drain * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    analytics = engine.analytics("bench")
+    print(f"Analytics: {(time.perf_counter() - start) * 1000:.2f} ms  "
+          f"mean score {analytics['mean_score']:.1f}/{N_QUESTIONS}  KR-20 {analytics['kr20']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark the read-through record cache against direct DatabasePersistence reads
+Simulates the /quiz/submit and /palace/{palace_id} read pattern: BENCH_REQUESTS
+lookups drawn from BENCH_RECORDS ids with a Zipf-like skew, plus a share of
+unknown ids (BENCH_UNKNOWN_SHARE) that only exist in the in-memory fallbacks.
+Each database read costs BENCH_DB_LATENCY_MS plus JSON decoding of the
+record, like a psycopg2 round-trip returning JSONB columns.
+"""
+
+import os
+import sys
+import json
+import random
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.record_cache import CachedPersistence
+
+RECORDS = int(os.getenv("BENCH_RECORDS", "500"))
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "5000"))
+DB_LATENCY_MS = float(os.getenv("BENCH_DB_LATENCY_MS", "0.5"))
+UNKNOWN_SHARE = float(os.getenv("BENCH_UNKNOWN_SHARE", "0.1"))
+
+
+class SimulatedDatabase:
+    """get_quiz / save_quiz with a fixed round-trip and JSON decoding per read"""
+
+    available = True
+
+    def __init__(self):
+        self.rows = {
+            f"quiz-{i}": json.dumps({"id": f"quiz-{i}", "topic": f"Topic {i}", "questions": [
+                {"id": f"q{j}", "question": "?" * 80, "options": ["a", "b", "c", "d"], "correct_answer": "a"}
+                for j in range(20)]})
+            for i in range(RECORDS)
+        }
+        self.queries = 0
+
+    def get_quiz(self, quiz_id):
+        self.queries += 1
+        time.sleep(DB_LATENCY_MS / 1000)
+        row = self.rows.get(quiz_id)
+        return json.loads(row) if row else None
+
+    def save_quiz(self, quiz):
+        self.rows[quiz["id"]] = json.dumps(quiz)
+        return True
+
+
+def workload(seed=7):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(RECORDS)]
+    ids = rng.choices([f"quiz-{i}" for i in range(RECORDS)], weights=weights, k=REQUESTS)
+    return [f"memory-{i}" if rng.random() < UNKNOWN_SHARE else quiz_id for i, quiz_id in enumerate(ids)]
+
+
+def run(label, reader, ids):
+    start = time.perf_counter()
+    for quiz_id in ids:
+        reader.get_quiz(quiz_id)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed * 1000:9.1f} ms total  {elapsed * 1e6 / len(ids):8.1f} us/request")
+
+
+def main():
+    print("=" * 60)
+    print("Record Cache Benchmark")
+    print(f"Records: {RECORDS}, requests: {REQUESTS}, DB latency: {DB_LATENCY_MS} ms")
+    print("=" * 60)
+    ids = workload()
+
+    direct = SimulatedDatabase()
+    run("direct database reads", direct, ids)
+    print(f"  queries: {direct.queries}")
+
+    database = SimulatedDatabase()
+    cached = CachedPersistence(database, notify=False)
+    run("read-through cache", cached, ids)
+    # Saves invalidate; the next read of each saved id goes back to the database
+    for i in range(0, RECORDS, 10):
+        cached.save_quiz({"id": f"quiz-{i}", "topic": "updated", "questions": []})
+    run("read-through cache after saves", cached, ids)
+    print(f"  queries: {database.queries}")
+
+    metrics = cached.cache_metrics()["records"]["quiz"]
+    print(f"  hit ratio: {metrics['hit_ratio']:.2%}  "
+          f"avg hit: {metrics['avg_hit_ms']:.4f} ms  avg load: {metrics['avg_load_ms']:.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark schema initialization cost per process start
+No database is needed: a psycopg2-shaped connection adds BENCH_RTT_MS of
+simulated network latency to every round-trip (execute, BEGIN, COMMIT) and
+counts them, so the numbers show what a remote database adds to each
+worker's startup. Compares the previous initializers (every CREATE statement
+on every start; initialize_schema split on ';') with the migration runner on
+a fresh database and on an already-migrated one.
+"""
+
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.schema_migrations import MigrationRunner
+from app.core.tigerdb_init import TIGERDB_COMPLETE_SCHEMA, TIGERDB_MIGRATIONS
+from app.models.learning_models import TIMESCALE_SCHEMA, LEARNING_MIGRATIONS
+from app.modules.storage_persistence import PERSISTENCE_MIGRATIONS, STORAGE_MIGRATIONS
+
+RTT_MS = float(os.getenv("BENCH_RTT_MS", "20"))
+
+COMPONENTS = {
+    "persistence": PERSISTENCE_MIGRATIONS,
+    "storage": STORAGE_MIGRATIONS,
+    "tigerdb": TIGERDB_MIGRATIONS,
+    "learning_models": LEARNING_MIGRATIONS,
+}
+
+
+class LatencyConnection:
+    """Sleeps RTT_MS per round-trip; remembers schema_migrations rows across 'restarts'"""
+
+    def __init__(self):
+        self.autocommit = False
+        self.round_trips = 0
+        self.in_transaction = False
+        self.rows = {}
+        self.table = False
+
+    def _round_trip(self):
+        self.round_trips += 1
+        time.sleep(RTT_MS / 1000)
+
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+            def execute(self, sql, params=None):
+                if not conn.autocommit and not conn.in_transaction:
+                    conn._round_trip()  # implicit BEGIN
+                    conn.in_transaction = True
+                conn._round_trip()
+                sql = " ".join(sql.split())
+                if sql.startswith("SELECT version, status, checksum FROM schema_migrations"):
+                    if not conn.table:
+                        raise Exception("relation does not exist")
+                    self.result = [(v, row[4], row[3]) for (component, v), row in conn.rows.items()
+                                   if component == params[0]]
+                elif sql.startswith("CREATE TABLE IF NOT EXISTS schema_migrations"):
+                    conn.table = True
+                elif sql.startswith("INSERT INTO schema_migrations"):
+                    conn.rows[(params[0], params[1])] = params
+
+            def fetchall(self):
+                return self.result
+
+        return Cursor()
+
+    def commit(self):
+        if self.in_transaction:
+            self._round_trip()
+        self.in_transaction = False
+
+    rollback = commit
+
+
+def statements(schema):
+    return [s.strip() for s in schema.split(";") if s.strip() and not s.strip().startswith("--")]
+
+
+def previous_startup(conn, component):
+    """What each initializer sent on every start before the runner"""
+    with conn.cursor() as cur:
+        if component == "learning_models":
+            for statement in statements(TIMESCALE_SCHEMA):
+                cur.execute(statement + ";")
+        elif component == "tigerdb":
+            cur.execute(TIGERDB_COMPLETE_SCHEMA)
+        else:
+            for migration in COMPONENTS[component]:
+                for statement in statements(migration.sql):
+                    cur.execute(statement)
+    conn.commit()
+
+
+def measure(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    print("=" * 60)
+    print("Schema Startup Benchmark")
+    print(f"Simulated round-trip: {RTT_MS} ms")
+    print("=" * 60)
+
+    shared = LatencyConnection()
+    totals = [0.0, 0.0, 0.0]
+    for component, migrations in COMPONENTS.items():
+        old = LatencyConnection()
+        old.autocommit = component == "tigerdb"  # TigerDBInitializer connects in autocommit mode
+        old_ms = measure(lambda: previous_startup(old, component))
+        shared.round_trips = 0
+        fresh_ms = measure(lambda: MigrationRunner(shared, component, migrations).run())
+        fresh_trips = shared.round_trips
+        shared.round_trips = 0
+        warm_ms = measure(lambda: MigrationRunner(shared, component, migrations).run())
+        print(f"{component:<16} previous {old.round_trips:3d} trips {old_ms:7.0f} ms  "
+              f"first run {fresh_trips:3d} trips {fresh_ms:6.0f} ms  "
+              f"restart {shared.round_trips:2d} trip {warm_ms:5.0f} ms")
+        totals[0] += old_ms
+        totals[1] += fresh_ms
+        totals[2] += warm_ms
+    print(f"{'per worker start':<16} previous {totals[0]:7.0f} ms  first run {totals[1]:7.0f} ms  "
+          f"restart {totals[2]:5.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark SupabaseHDAMStorage.store_embeddings against a local HTTP stub
+Starts a PostgREST-shaped stub on localhost that answers upserts after
+BENCH_LATENCY_MS (and fails every BENCH_FAIL_EVERY-th request with a 503),
+then stores BENCH_ROWS embeddings of BENCH_DIMENSIONS floats through a real
+supabase client. The previous implementation (float lists, a dummy zero
+imag array, an MD5 of the stringified vector per row and one unchunked
+upsert that echoes the rows back) is reproduced as the reference. Reports
+wall time, CPU time and bytes sent.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import hashlib
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.hdam import NP_FLOAT, SupabaseHDAMStorage
+
+N_ROWS = int(os.getenv("BENCH_ROWS", "5000"))
+DIMENSIONS = int(os.getenv("BENCH_DIMENSIONS", "384"))
+LATENCY_MS = float(os.getenv("BENCH_LATENCY_MS", "50"))
+FAIL_EVERY = int(os.getenv("BENCH_FAIL_EVERY", "0"))
+TABLE = "holographic_embeddings"
+FAKE_KEY = "bench.header.signature"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Accepts POST /rest/v1/<table>; echoes the body when return=representation is asked for"""
+    stats = {"requests": 0, "bytes": 0, "rows": 0}
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += len(body)
+            request_number = self.stats["requests"]
+        time.sleep(LATENCY_MS / 1000)
+        if FAIL_EVERY and request_number % FAIL_EVERY == 0:
+            self.send_response(503)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b'{"message": "unavailable"}')
+            return
+        with self.lock:
+            self.stats["rows"] += body.count(b'"id":')
+        echo = "return=representation" in self.headers.get("Prefer", "")
+        payload = body if echo else b""
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+async def reference_store(storage, embeddings, metadata):
+    rows = []
+    for emb, meta in zip(embeddings, metadata):
+        emb_real = emb.astype(NP_FLOAT).tolist()
+        rows.append({
+            "id": hashlib.md5((str(emb_real) + str(sorted(meta.items()))).encode()).hexdigest(),
+            "embedding": {"real": emb_real, "imag": [0.0] * len(emb_real)},
+            "embedding_vector": emb_real,
+            "metadata": meta,
+            "quantum_enhanced": False,
+            "context": meta.get("context", "general"),
+            "created_at": datetime.utcnow().isoformat(),
+        })
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(storage.executor, lambda: storage.supabase.table(TABLE).upsert(rows).execute())
+        return {"success": True, "inserted_count": len(rows)}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def measure(label, fn):
+    StubHandler.stats.update(requests=0, bytes=0, rows=0)
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = asyncio.run(fn())
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    stats = StubHandler.stats
+    print(f"{label:<22} wall {wall:6.2f} s  cpu {cpu:6.2f} s  requests {stats['requests']:4d}  "
+          f"sent {stats['bytes'] / 2**20:7.1f} MB  rows stored {stats['rows']:6d}  "
+          f"success {result['success']}")
+
+
+def main():
+    print("=" * 60)
+    print("Supabase Embedding Upsert Benchmark (local stub)")
+    print(f"Rows: {N_ROWS}  Dimensions: {DIMENSIONS}  Latency: {LATENCY_MS} ms  Fail every: {FAIL_EVERY or 'never'}")
+    print("=" * 60)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((N_ROWS, DIMENSIONS))
+    metadata = [{"original_text": f"Fact {i}", "context": "bench"} for i in range(N_ROWS)]
+
+    storage = SupabaseHDAMStorage(url, FAKE_KEY, retry_backoff=0.05)
+    measure("reference (one upsert)", lambda: reference_store(storage, embeddings, metadata))
+    for inflight in (1, storage.max_inflight):
+        pipelined = SupabaseHDAMStorage(url, FAKE_KEY, max_inflight=inflight, retry_backoff=0.05, vector_column=True)
+        measure(f"chunked, {inflight} in flight", lambda: pipelined.store_embeddings(embeddings, metadata))
+    compact = SupabaseHDAMStorage(url, FAKE_KEY, retry_backoff=0.05, vector_column=False)
+    measure("chunked, no pgvector", lambda: compact.store_embeddings(embeddings, metadata))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
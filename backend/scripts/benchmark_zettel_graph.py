@@ -0,0 +1,92 @@
+"""
+Benchmark the Zettelkasten graph store
+Creates BENCH_USERS users with BENCH_NOTES notes each (BENCH_LINKS random
+links per note) and compares the previous /zettel/{user_id}/graph handler
+(scan every note in the global dict, rebuild the edge list, return all
+users' notes) with the store's per-user queries: one graph page, a 2-hop
+neighbourhood page and the top hubs. Also reports note creation
+throughput and the background components + PageRank pass.
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.zettel_graph import ZettelGraphStore
+
+USERS = int(os.getenv("BENCH_USERS", "10"))
+NOTES = int(os.getenv("BENCH_NOTES", "5000"))
+LINKS = int(os.getenv("BENCH_LINKS", "4"))
+PAGE = 100
+
+
+def reference_graph(notes_db):
+    nodes = list(notes_db.values())
+    edges = []
+    for note in nodes:
+        for linked_id in note.get("links", []):
+            edges.append({"from": note["id"], "to": linked_id, "type": "links_to"})
+    return {"nodes": nodes, "edges": edges,
+            "statistics": {"total_notes": len(nodes), "total_connections": len(edges),
+                           "average_connections": len(edges) / max(len(nodes), 1)}}
+
+
+def timed(fn, repeat=5):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    print("=" * 60)
+    print("Zettelkasten Graph Store Benchmark")
+    print(f"Users: {USERS}  Notes/user: {NOTES}  Links/note: {LINKS}")
+    print("=" * 60)
+
+    rng = random.Random(0)
+    now = datetime.now()
+    notes_db = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ZettelGraphStore(os.path.join(tmp, "zettel.db"), metrics_interval=0)
+        start = time.perf_counter()
+        for u in range(USERS):
+            for i in range(NOTES):
+                links = [f"u{u}-{rng.randrange(NOTES)}" for _ in range(LINKS)]
+                note = {"id": f"u{u}-{i}", "title": f"Note {i}", "content": "text " * 40,
+                        "note_type": "permanent", "maturity": "seedling", "links": links,
+                        "created_at": now, "updated_at": now}
+                store.create_note(f"user{u}", note)
+                notes_db[note["id"]] = {**note, "backlinks": []}
+        create_rate = USERS * NOTES / (time.perf_counter() - start)
+        print(f"create_note: {create_rate:8.0f} notes/s (SQLite, committed per note)")
+
+        _, old_ms = timed(lambda: reference_graph(notes_db), repeat=3)
+        print(f"previous graph handler (all {len(notes_db)} notes):  {old_ms:8.1f} ms")
+        cases = [
+            (f"graph page ({PAGE} notes)", lambda: store.page("user0", limit=PAGE)),
+            (f"2-hop neighbourhood ({PAGE})", lambda: store.neighborhood("user0", "u0-0", hops=2, limit=PAGE)),
+            ("top 20 hubs (degree)", lambda: store.hubs("user0", limit=20)),
+            ("statistics", lambda: store.statistics("user0")),
+        ]
+        for label, fn in cases:
+            _, ms = timed(fn)
+            print(f"{label:<30} {ms:8.2f} ms")
+
+        start = time.perf_counter()
+        store.refresh_metrics()
+        print(f"background metrics, {USERS} users:    {(time.perf_counter() - start) * 1000:8.1f} ms")
+        _, ms = timed(lambda: store.hubs("user0", limit=20, rank_by="pagerank"))
+        print(f"{'top 20 hubs (pagerank)':<30} {ms:8.2f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
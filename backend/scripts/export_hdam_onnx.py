@@ -0,0 +1,62 @@
+"""
+Export the HDAM sentence encoder to ONNX
+Writes model.onnx and tokenizer.json for the ONNX encoder backend
+(HDAM_ENCODER_BACKEND=onnx), plus an int8 dynamically quantized copy when
+HDAM_ONNX_QUANTIZE=true. Requires torch and transformers on the export host only.
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODEL_NAME = os.getenv("HDAM_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+OUTPUT_DIR = os.getenv(
+    "HDAM_ONNX_MODEL_DIR", os.path.join("./models", MODEL_NAME.split("/")[-1] + "-onnx")
+)
+QUANTIZE = os.getenv("HDAM_ONNX_QUANTIZE", "false").lower() in ("true", "int8")
+
+
+def export_model(model_name: str, output_dir: str, quantize: bool = False) -> str:
+    """Export the transformer body (token embeddings) to ONNX with dynamic axes"""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name)
+    model.eval()
+
+    sample = tokenizer(["an example sentence"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+
+    model_path = os.path.join(output_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+    tokenizer.save_pretrained(output_dir)
+
+    if quantize:
+        from app.modules.onnx_encoder import quantize_onnx_model
+        quantize_onnx_model(model_path)
+    return model_path
+
+
+def main():
+    print(f"Exporting {MODEL_NAME} -> {OUTPUT_DIR} (int8: {QUANTIZE})")
+    model_path = export_model(MODEL_NAME, OUTPUT_DIR, QUANTIZE)
+    print(f"[OK] Wrote {model_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Paper Catalog Loader
+Bulk-loads an arXiv metadata dump (JSONL, optionally .gz; e.g. the Kaggle
+arxiv-metadata-oai-snapshot.json) into the local catalog at PAPER_CATALOG_DIR.
+
+Usage:
+    python scripts/load_paper_catalog.py <dump.jsonl> [limit]
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.modules.paper_catalog import PaperCatalog
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Main loading function"""
+    logger.info("=" * 60)
+    logger.info("Paper Catalog Loader")
+    logger.info("=" * 60)
+
+    if len(sys.argv) < 2:
+        logger.error("Usage: python scripts/load_paper_catalog.py <dump.jsonl> [limit]")
+        return 1
+    dump_path = sys.argv[1]
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    def progress(loaded):
+        if loaded % 100000 == 0:
+            logger.info(f"  {loaded} papers")
+
+    catalog = PaperCatalog()
+    logger.info(f"Loading {dump_path} into {catalog.path}")
+    result = catalog.load_jsonl(dump_path, limit=limit, progress=progress)
+    logger.info(f"Loaded {result['loaded']} papers ({result['skipped']} skipped) "
+                f"in {result['seconds']:.1f}s, {result['papers_per_second']:.0f} papers/s")
+    logger.info(f"Catalog now holds {len(catalog)} papers")
+    catalog.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
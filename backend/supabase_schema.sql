@@ -20,6 +20,10 @@ CREATE TABLE IF NOT EXISTS learning_resources (
     created_at TIMESTAMP DEFAULT NOW()
 );
 
+-- HDAM rows written with HDAM_SUPABASE_VECTOR_COLUMN=on also carry pgvector
+-- text for server-side similarity search (dimension must match the encoder)
+ALTER TABLE IF EXISTS holographic_embeddings ADD COLUMN IF NOT EXISTS embedding_vector VECTOR(384);
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_embeddings_metadata ON embeddings USING GIN (metadata);
 CREATE INDEX IF NOT EXISTS idx_learning_resources_domains ON learning_resources USING GIN (domains);
@@ -11,6 +11,13 @@ from pathlib import Path
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+@pytest.fixture(autouse=True)
+def isolated_hdam_encoders():
+    """Encoders are cached process-wide; each test loads (or mocks) its own"""
+    hdam_module = sys.modules.get("app.modules.hdam")
+    if hdam_module is not None:
+        hdam_module.reset_encoders()
+
 class TestHDAMIntegration:
     """Test HDAM integration"""
     
@@ -39,6 +46,273 @@ class TestHDAMIntegration:
             hdam = initialize_hdam(enable_quantum=False)
             result = await hdam.learn(["Test fact"], context="test")
             assert result["stored_facts"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_hdam_learn_stream(self):
+        """Test bulk streaming ingestion skips duplicate facts"""
+        from app.modules.hdam import initialize_hdam
+        
+        with patch('app.modules.hdam.SentenceTransformer', side_effect=RuntimeError):
+            hdam = initialize_hdam(enable_quantum=False)
+            facts = (f"Fact {i}" for i in range(10))
+            result = await hdam.learn_stream(facts, batch_size=4, context="bulk")
+            assert result["stored_facts"] == 10
+            assert result["batches"] == 3
+            
+            again = await hdam.learn_stream(["Fact 1", "Fact 10"], context="bulk")
+            assert again["stored_facts"] == 1
+            assert again["skipped_duplicates"] == 1
+            
+            # learn() stores under the same text-derived ids
+            learned = await hdam.learn(["Fact 2", "Fact 11"], context="bulk")
+            assert learned["item_ids"] == [hdam.text_item_id(f, "bulk") for f in ("Fact 2", "Fact 11")]
+            assert len(hdam.holographic_memory.context_associations["bulk"]) == 12
+            assert (await hdam.learn_stream(["Fact 11"], context="bulk"))["skipped_duplicates"] == 1
+
+    @pytest.mark.asyncio
+    async def test_hdam_float16_precision(self):
+        """Test float16 storage shares one vector per auto-associative fact"""
+        import numpy as np
+        from app.modules.hdam import initialize_hdam
+        
+        with patch('app.modules.hdam.SentenceTransformer', side_effect=RuntimeError):
+            hdam = initialize_hdam(enable_quantum=False, precision="float16")
+            result = await hdam.learn(["Fact one", "Fact two"], context="test")
+            
+            item = hdam.holographic_memory.items[result["item_ids"][0]]
+            assert item["value"].dtype == np.float16
+            assert item["key"] is item["value"]
+            assert hdam.local_memory[result["item_ids"][0]]["embedding"] is item["value"]
+            
+            metrics = hdam.get_memory_metrics()
+            assert metrics["precision"] == "float16"
+            assert metrics["vector_bytes"] == 2 * hdam.embedding_dim * 2
+            
+            # Scoring reads the stored float16 rows through cached inverse norms
+            hdam.holographic_memory.retrieve(item["value"], "test")
+            metrics = hdam.get_memory_metrics()
+            assert metrics["index_bytes"] < metrics["vector_bytes"]
+            assert metrics["bytes_per_item"] == pytest.approx(
+                (metrics["vector_bytes"] + metrics["trace_bytes"] + metrics["index_bytes"]) / 2)
+
+    def test_micro_batcher_serves_several_event_loops(self):
+        """Test one micro-batcher shared by callers on different threads' event loops"""
+        import asyncio
+        import threading
+        import numpy as np
+        from app.modules.hdam import MicroBatchEncoder
+        
+        encoder = MicroBatchEncoder(lambda texts: np.array([[len(t)] for t in texts], dtype=float), max_wait_ms=20)
+        results = {}
+        
+        def caller(name):
+            async def run():
+                return await asyncio.gather(*(encoder.encode([name * i]) for i in range(1, 4)))
+            results[name] = [float(r[0, 0]) for r in asyncio.run(run())]
+        
+        threads = [threading.Thread(target=caller, args=(name,)) for name in ("a", "bb")]
+        for thread in threads:
+            thread.start()
+        assert asyncio.run(encoder.encode(["main"]))[0, 0] == 4
+        for thread in threads:
+            thread.join(5)
+        encoder.close()
+        assert results == {"a": [1, 2, 3], "bb": [2, 4, 6]}
+    
+    def test_shared_encoder_and_memory_spaces(self):
+        """Test HDAM consumers share one encoder and the default memory space"""
+        from app.core.integration_registry import integration_registry
+        from app.api.hdam import get_hdam as api_get_hdam
+        from app.modules.hdam import get_hdam, loaded_encoders
+        
+        with patch('app.modules.hdam.SentenceTransformer') as mock_transformer:
+            mock_transformer.return_value.get_sentence_embedding_dimension.return_value = 384
+            try:
+                default = api_get_hdam()
+                assert get_hdam() is default
+                other = get_hdam("test-other")
+                assert other is not default
+                assert other.encoder is default.encoder
+                assert mock_transformer.call_count == 1
+                assert len(loaded_encoders()) == 1
+                
+                # Callers with their own settings never replace a live space
+                assert get_hdam(supabase_url="http://other", supabase_key="key") is default
+                assert not default.memory_executor._shutdown
+            finally:
+                integration_registry.reset("hdam:default")
+                integration_registry.reset("hdam:test-other")
+    
+    def test_vectorized_search_matches_scalar_kernels(self):
+        """Test retrieve, multi-context search, trajectories and paths against per-item correlation"""
+        import numpy as np
+        from app.modules.hdam import AdvancedHolographicMemory
+        
+        memory = AdvancedHolographicMemory(dimensions=64)
+        processor = memory.processor
+        rng = np.random.default_rng(0)
+        for c in range(4):
+            memory.add_items_batch([f"c{c}-{i}" for i in range(10)], rng.standard_normal((10, 64)), context=f"c{c}")
+        query = rng.standard_normal(64)
+        
+        def scalar_scores(vector, context):
+            retrieved = processor.holographic_unbinding(memory.memory_traces[context], vector)
+            return {item_id: processor.multidimensional_correlation(retrieved, memory.items[item_id]["value"])
+                    for item_id in memory.context_associations[context]}
+        
+        expected = {}
+        for c in range(4):
+            scores = scalar_scores(query, f"c{c}")
+            expected.update(scores)
+            top = memory.retrieve(query, f"c{c}", top_k=3)
+            assert [m["id"] for m in top] == sorted(scores, key=scores.get, reverse=True)[:3]
+            assert top[0]["similarity"] == pytest.approx(max(scores.values()))
+        
+        found = memory.search_contexts(query, top_k=5)
+        assert [m["id"] for m in found["matches"]] == sorted(expected, key=expected.get, reverse=True)[:5]
+        for c in range(4):
+            assert found["contexts"][f"c{c}"]["id"] == memory.retrieve(query, f"c{c}", top_k=1)[0]["id"]
+        
+        base, direction = rng.standard_normal(64), rng.standard_normal(64)
+        trajectory = memory.directional_extrapolation(base, direction, steps=4, step_size=0.5, context="c1")
+        for step in trajectory:
+            scores = scalar_scores(step["point"], "c1")
+            assert step["closest_match"]["id"] == max(scores, key=scores.get)
+        
+        goals = rng.standard_normal((3, 64))
+        path = memory.learning_acceleration_path(goals, max_items=10, context="c2")
+        for item in path:
+            value = memory.items[item["id"]]["value"]
+            relevance = np.mean([processor.multidimensional_correlation(value, goal) for goal in goals])
+            assert item["goal_relevance"] == pytest.approx(relevance)
+        
+        subset = memory.search_contexts(query, contexts=["c2", "missing"], top_k=3)
+        assert list(subset["contexts"]) == ["c2"]
+        assert {m["context"] for m in subset["matches"]} == {"c2"}
+        
+        # Writes update only their own context's row list, incrementally
+        c0_rows = memory._context_rows["c0"]
+        added = memory.add_item(query, query, context="c3")
+        assert memory._rows_pending == {"c3": [memory.items[added]["row"]]}
+        assert memory.retrieve(query, "c3", top_k=1)[0]["id"] == added
+        memory.remove_items(["c3-0"])
+        assert memory._context_rows["c0"] is c0_rows
+        assert [memory._row_ids[row] for row in memory._context_rows["c3"]] == [f"c3-{i}" for i in range(1, 10)] + [added]
+        assert memory.retrieve(query, "c3", top_k=1)[0]["similarity"] == pytest.approx(
+            max(scalar_scores(query, "c3").values()))
+        
+        # Scoring reads the stored vectors; only per-row norms and owners are extra
+        usage = memory.memory_usage()
+        assert usage["index_bytes"] < usage["vector_bytes"] // 8
+        
+        # Interleaved single writes leave short same-context runs, paired row by row
+        for i in range(20):
+            vector = rng.standard_normal(64)
+            memory.add_item(vector, vector, context=f"c{i % 4}", item_id=f"mixed-{i}")
+        found = memory.search_contexts(query, top_k=3)
+        for c in range(4):
+            best = memory.retrieve(query, f"c{c}", top_k=1)[0]
+            assert found["contexts"][f"c{c}"]["id"] == best["id"]
+            assert found["contexts"][f"c{c}"]["similarity"] == pytest.approx(best["similarity"])
+    
+    @pytest.mark.asyncio
+    async def test_forget_budgets_and_compaction(self):
+        """Test removal undoes bindings, LRU budgets evict and compaction frees batch rows"""
+        import numpy as np
+        from app.modules.hdam import initialize_hdam
+        
+        env = {"HDAM_CONTEXT_MAX_ITEMS": "6", "HDAM_MAINTENANCE_INTERVAL": "0"}
+        with patch('app.modules.hdam.SentenceTransformer', side_effect=RuntimeError), \
+                patch.dict('os.environ', env):
+            hdam = initialize_hdam(enable_quantum=False)
+        memory = hdam.holographic_memory
+        
+        kept, extra = (await hdam.learn(["Kept fact", "Extra fact"], context="notes"))["item_ids"]
+        vector = memory.items[kept]["value"]
+        result = await hdam.forget([extra, "missing"])
+        assert result["item_ids"] == [extra]
+        assert extra not in hdam.local_memory
+        assert np.allclose(memory.memory_traces["notes"], memory.processor.holographic_binding(vector, vector))
+        
+        await hdam.learn_stream((f"Fact {i}" for i in range(10)), batch_size=10, context="bulk")
+        ids = [hdam.text_item_id(f"Fact {i}", "bulk") for i in range(10)]
+        assert memory.context_associations["bulk"] == ids[4:]
+        assert not set(ids[:4]) & set(hdam.local_memory)
+        assert memory.pinned_bytes() == 5 * vector.nbytes
+        
+        hdam.maintain()
+        assert memory.pinned_bytes() == 0
+        assert hdam.local_memory[ids[5]]["embedding"] is memory.items[ids[5]]["value"]
+        assert memory.retrieve(memory.items[ids[5]]["value"], "bulk", top_k=1)[0]["id"] == ids[5]
+        
+        metrics = hdam.get_memory_metrics()
+        assert (metrics["removed_items"], metrics["evicted_items"], metrics["compactions"]) == (1, 4, 1)
+        assert metrics["bytes_per_context"] == {"notes": vector.nbytes, "bulk": 6 * vector.nbytes}
+        
+        await hdam.clear_context("bulk")
+        assert "bulk" not in memory.memory_traces
+        assert set(hdam.local_memory) == {kept}
+    
+    @pytest.mark.asyncio
+    async def test_supabase_chunked_upsert(self):
+        """Test Supabase upserts are chunked, retried and compactly encoded"""
+        import numpy as np
+        from app.modules.hdam import SupabaseHDAMStorage, content_item_id, decode_embedding
+        
+        with patch('app.modules.hdam.create_client') as mock_client:
+            storage = SupabaseHDAMStorage("url", "key", chunk_size=4, max_inflight=2,
+                                          max_retries=1, retry_backoff=0, vector_column=True)
+        execute = mock_client.return_value.table.return_value.upsert.return_value.execute
+        execute.side_effect = [RuntimeError("timeout")] + [None] * 3
+        
+        embeddings = np.random.default_rng(0).standard_normal((10, 8))
+        metadata = [{"original_text": f"Fact {i}", "context": "notes"} for i in range(10)]
+        result = await storage.store_embeddings(embeddings, metadata)
+        assert result == {"success": True, "inserted_count": 10, "failed_count": 0, "chunks": 3, "retries": 1}
+        
+        rows = [row for call in mock_client.return_value.table.return_value.upsert.call_args_list[1:]
+                for row in call.args[0]]
+        assert sorted(row["id"] for row in rows) == sorted(content_item_id(f"Fact {i}", "notes") for i in range(10))
+        row = next(row for row in rows if row["id"] == content_item_id("Fact 0", "notes"))
+        assert "imag" not in row["embedding"]
+        assert np.allclose(decode_embedding(row["embedding"]), embeddings[0], atol=1e-6)
+        assert np.allclose(np.array(row["embedding_vector"][1:-1].split(","), dtype=float), embeddings[0], atol=1e-6)
+        
+        execute.side_effect = RuntimeError("down")
+        failed = await storage.store_embeddings(embeddings[:2], metadata[:2])
+        assert not failed["success"] and failed["failed_count"] == 2 and failed["error"] == "down"
+
+class TestOnnxEncoder:
+    """Test the ONNX encoder backend against the torch path"""
+    
+    def test_cosine_parity_with_torch(self):
+        """Test ONNX (fp32 and int8) embeddings agree with SentenceTransformer"""
+        import os
+        import numpy as np
+        pytest.importorskip("onnxruntime")
+        sentence_transformers = pytest.importorskip("sentence_transformers")
+        from app.modules.onnx_encoder import OnnxSentenceEncoder
+        
+        model_dir = os.getenv("HDAM_ONNX_MODEL_DIR", "./models/all-MiniLM-L6-v2-onnx")
+        if not os.path.exists(os.path.join(model_dir, "model.onnx")):
+            pytest.skip("No exported ONNX model; run scripts/export_hdam_onnx.py")
+        
+        texts = [
+            "Photosynthesis converts light into chemical energy.",
+            "Linear algebra underpins machine learning.",
+            "The mitochondria is the powerhouse of the cell.",
+        ]
+        reference = sentence_transformers.SentenceTransformer(
+            "sentence-transformers/all-MiniLM-L6-v2"
+        ).encode(texts, convert_to_numpy=True)
+        reference /= np.linalg.norm(reference, axis=1, keepdims=True)
+        
+        for quantize, threshold in ((False, 0.999), (True, 0.98)):
+            encoder = OnnxSentenceEncoder(model_dir, quantize=quantize)
+            embeddings = encoder.encode(texts)
+            assert embeddings.dtype == np.float32
+            cosines = (embeddings * reference).sum(axis=1)
+            assert cosines.min() > threshold
 
 class TestMonteCarloSwarm:
     """Test MonteCarloSwarm"""
@@ -70,6 +344,37 @@ class TestMonteCarloSwarm:
         assert len(result) == 2
         agents[0].run.assert_called_once_with("Test task")
         agents[1].run.assert_called_once_with("Result 1")
+    
+    @pytest.mark.asyncio
+    async def test_streaming_stops_early(self):
+        """Test streaming votes stop before the sample budget is spent"""
+        import threading
+        from app.modules.monte_carlo_swarm import MonteCarloSwarm
+        
+        agents = [Mock() for _ in range(9)]
+        for agent in agents:
+            agent.run = Mock(return_value="42")
+        
+        swarm = MonteCarloSwarm(agents, parallel=True)
+        run = await swarm.run_streaming("6 * 7", confidence=0.75)
+        
+        assert run["result"] == "42"
+        assert run["stopped_early"]
+        assert run["samples_launched"] < 9
+        
+        # Without a confidence threshold min_samples does not force extra calls
+        run = await swarm.run_streaming("6 * 7", sample_budget=3, max_concurrency=3)
+        assert run["samples_launched"] == 2 and run["stop_reason"] == "decided"
+        
+        # A call still running at the stop is reported as abandoned, not cancelled
+        release = threading.Event()
+        slow = Mock()
+        slow.run = Mock(side_effect=lambda task: release.wait(5) and "43")
+        swarm = MonteCarloSwarm([agents[0], slow], parallel=True)
+        run = await swarm.run_streaming("6 * 7", quorum=1)
+        release.set()
+        assert run["result"] == "42"
+        assert (run["cancelled"], run["abandoned"]) == (0, 1)
 
 class TestSwarmShieldIntegration:
     """Test SwarmShield integration"""
@@ -92,6 +397,43 @@ class TestSwarmShieldIntegration:
         assert "status" in health
         assert "available" in health
 
+class TestConversationLog:
+    """Test the append-only conversation log store"""
+    
+    def test_append_read_and_recover(self, tmp_path):
+        """Messages page by offset, stats roll up, and a reopen indexes torn-off tail records"""
+        from app.modules.conversation_log import ConversationLogStore
+        
+        key_path = str(tmp_path / "keys" / "log.key")
+        store = ConversationLogStore(str(tmp_path / "logs"), segment_bytes=512, key_path=key_path)
+        cid = store.create("test")
+        log = store.get(cid)
+        for i in range(20):
+            log.append("alice" if i % 2 else "bob", f"message {i}")
+        store.get(store.create("other")).append("alice", "hi")
+        
+        page = list(log.read(offset=15, limit=10))
+        assert [m["message"] for m in page] == [f"message {i}" for i in range(15, 20)]
+        assert log.summary()["message_count"] == 20
+        assert store.agent_stats("alice")["total_messages"] == 11
+        assert store.agent_stats("alice")["conversations"] == 2
+        assert store.agent_stats("carol") is None
+        assert len(list(store.export_lines(cid, "jsonl"))) == 20
+        
+        # Simulate a crash after the record write but before its index entry
+        store.close()
+        with open(log.index_path, "r+b") as f:
+            f.truncate(log.message_count * 16 - 16)
+        reopened = ConversationLogStore(str(tmp_path / "logs"), segment_bytes=512, key_path=key_path)
+        assert reopened.get(cid).message_count == 20
+        assert list(reopened.get(cid).read(19))[0]["message"] == "message 19"
+        assert reopened.agent_stats("alice")["total_messages"] == 11
+        # The generated key never lands beside the ciphertext
+        assert not (tmp_path / "logs" / "log.key").exists()
+        
+        with pytest.raises(KeyError):
+            reopened.get("missing")
+
 class TestDocumentProcessing:
     """Test document processing integrations"""
     
@@ -119,15 +461,693 @@ class TestDocumentProcessing:
 class TestRAGIntegration:
     """Test RAG integrations"""
     
-    def test_agent_rag_unavailable(self):
-        """Test AgentRAGProtocol when unavailable"""
+    def test_agent_rag_builtin_fallback(self, tmp_path):
+        """Test built-in hybrid retrieval serves AgentRAGProtocol requests"""
+        import os
         from app.modules.agent_rag_protocol_integration import AgentRAGProtocolIntegration
         
-        with patch('app.modules.agent_rag_protocol_integration.AGENT_RAG_PROTOCOL_AVAILABLE', False):
-            rag = AgentRAGProtocolIntegration()
-            result = rag.index_documents(["doc1", "doc2"])
-            assert result["status"] == "error"
-            assert "not available" in result["message"].lower()
+        with patch('app.modules.agent_rag_protocol_integration.AGENT_RAG_PROTOCOL_AVAILABLE', False), \
+                patch.dict(os.environ, {"RAG_DENSE_ENABLED": "false"}):
+            rag = AgentRAGProtocolIntegration({"index_dir": str(tmp_path)})
+            result = rag.index_documents(
+                ["Photosynthesis converts light into chemical energy", "Mitochondria produce ATP"],
+                [{"subject": "biology", "level": 1}, {"subject": "biology", "level": 2}],
+                ids=["photo", "mito"]
+            )
+            assert result["status"] == "success"
+            assert rag.query("light energy")[0]["id"] == "photo"
+            assert [r["id"] for r in rag.query("energy", filters={"level": 2})] == []
+            
+            # Upserts replace the old text and survive a reload
+            rag.index_documents(["Mitochondria release energy"], ids=["mito"])
+            reloaded = AgentRAGProtocolIntegration({"index_dir": str(tmp_path)})
+            assert [r["id"] for r in reloaded.query("energy", filters={"level": 2})] == []
+            assert {r["id"] for r in reloaded.query("energy")} == {"photo", "mito"}
+            assert len(reloaded.get_context_for_agent("energy", context_length=8)) <= 32
+    
+    def test_hybrid_compaction_reclaims_tombstones(self, tmp_path):
+        """Test compaction drops replaced documents and reloads ignore uncommitted appends"""
+        import os
+        import numpy as np
+        from app.modules.hybrid_retrieval import HybridRetrievalEngine
+        
+        def encode(texts):
+            return np.array([[len(text), text.count("a"), text.count("e"), 1.0] for text in texts])
+        
+        engine = HybridRetrievalEngine(str(tmp_path), encode_fn=encode, compact_dead_ratio=0)
+        texts = [f"paper {i} about {'algebra' if i % 2 else 'energy'}" for i in range(6)]
+        ids = [f"p{i}" for i in range(6)]
+        engine.index_documents(texts, [{"year": 2000 + i} for i in range(6)], ids)
+        engine.index_documents(texts[:3], [{"year": 1990}] * 3, ids[:3])
+        engine.delete_documents(["p5"])
+        def ranked(index):
+            return [(r["id"], r["text"], r["metadata"]) for r in index.query("energy paper", top_k=5)]
+        
+        before = ranked(engine)
+        assert engine.stats()["tombstoned"] == 4
+        
+        engine.compact()
+        stats = engine.stats()
+        assert (stats["documents"], stats["tombstoned"], stats["dense_vectors"], stats["delta_postings"]) == (5, 0, 5, 0)
+        assert ranked(engine) == before
+        assert [r["id"] for r in engine.query("paper", filters={"year": 1990})] == ["p0", "p1", "p2"]
+        assert os.path.getsize(engine.vectors_path) == 5 * 4 * 4
+        
+        # Appends whose commit never happened are cut off on load
+        engine.index_documents(["extra energy"], ids=["p6"])
+        engine.delete_documents(["p6"])
+        before = ranked(engine)
+        for path in (engine.vectors_path, tmp_path / "delta_1.docs"):
+            with open(path, "ab") as f:
+                f.write(np.array([7, 7, 7], dtype=np.int32).tobytes())
+        engine.close()
+        reloaded = HybridRetrievalEngine(str(tmp_path), encode_fn=encode)
+        assert ranked(reloaded) == before
+        assert os.path.getsize(reloaded.vectors_path) == 6 * 4 * 4
+        assert os.path.getsize(tmp_path / "delta_1.docs") == os.path.getsize(tmp_path / "delta_1.terms")
+        assert reloaded.index_documents(["late energy paper"], ids=["p9"]) == ["p9"]
+        assert reloaded.query("late", top_k=1)[0]["id"] == "p9"
+        assert reloaded.similar("p9", top_k=1)[0]["id"] != "p9"
+    
+    def test_llamaindex_manifest_detects_changes(self, tmp_path):
+        """Test the LlamaIndex file manifest only reports changed files"""
+        import os
+        from app.modules.llamaindex_rag import FileManifest
+        
+        data = tmp_path / "docs"
+        data.mkdir()
+        (data / "a.txt").write_text("alpha")
+        (data / "b.txt").write_text("beta")
+        (data / ".hidden").write_text("skip")
+        
+        manifest = FileManifest(tmp_path / "manifest.json")
+        changed, removed = manifest.scan(data)
+        assert sorted(os.path.basename(k) for k in changed) == ["a.txt", "b.txt"]
+        for key in changed:
+            manifest.record(key, [key])
+        manifest.save()
+        
+        # Touching without editing is not a change; edits and deletions are
+        os.utime(data / "a.txt", (1, 1))
+        (data / "b.txt").write_text("beta v2")
+        (data / "a.txt").rename(data / "c.txt")
+        reloaded = FileManifest(tmp_path / "manifest.json")
+        changed, removed = reloaded.scan(data)
+        assert sorted(os.path.basename(k) for k in changed) == ["b.txt", "c.txt"]
+        assert [os.path.basename(k) for k in removed] == ["a.txt"]
+        assert reloaded.scan(data)[0] == changed
+        
+        # Keys are absolute whatever form data_dir is given in
+        assert all(os.path.isabs(k) for k in changed)
+        assert reloaded.scan(os.path.relpath(data))[0] == changed
+
+class TestChromaDBMemory:
+    """Test batched ChromaDB memory writes"""
+    
+    def test_buffered_writes_are_batched_and_idempotent(self):
+        """Test the write buffer flushes in batches under deterministic ids"""
+        from app.modules.chromadb_memory import ChromaDBMemory
+        
+        with patch('app.modules.chromadb_memory.CHROMADB_AVAILABLE', False):
+            memory = ChromaDBMemory({"buffer_size": 3, "batch_size": 2})
+        memory.available = True
+        memory.collection = Mock()
+        memory.encode_fn = lambda texts: [[1.0, 0.0] for _ in texts]
+        
+        ids = [memory.remember(f"turn {i}", {"session": 1}) for i in range(3)]
+        assert memory.collection.upsert.call_count == 2
+        assert memory.collection.upsert.call_args.kwargs["embeddings"] == [[1.0, 0.0]]
+        assert memory.remember("turn 0", {"session": 1}) == ids[0]
+        assert memory.remember("turn 0", {"session": 2}) != ids[0]
+        assert memory.flush() == 2
+        
+        # A failed write before a query keeps the rows buffered and the query still answers
+        memory.remember("turn 3")
+        memory.collection.upsert.side_effect = RuntimeError("disk full")
+        memory.collection.query.return_value = {"ids": [["a"]]}
+        assert memory.query_many_sync(["turn"])["ids"] == [["a"]]
+        assert len(memory._buffer) == 1
+
+class TestIngestionPipeline:
+    """Test streaming chunked ingestion into HDAM and the RAG index"""
+    
+    def test_chunker_overlap_across_pieces(self):
+        """Test chunks are token-bounded, overlap, and rejoin split words"""
+        from app.modules.ingestion import TextChunker
+        
+        chunker = TextChunker(max_tokens=10, overlap_tokens=3)
+        text = " ".join(f"w{i}" for i in range(30))
+        chunks = [c for piece in (text[:41], text[41:]) for c, _ in chunker.feed(piece)]
+        chunks += [c for c, _ in chunker.flush()]
+        
+        words = [c.split() for c in chunks]
+        assert all(len(w) <= 10 for w in words)
+        assert words[1][:3] == words[0][-3:]
+        assert " ".join(f"w{i}" for i in range(30)).split() == sorted(
+            {w for ws in words for w in ws}, key=lambda w: int(w[1:]))
+    
+    @pytest.mark.asyncio
+    async def test_ingest_upload_to_hdam_and_rag(self, tmp_path):
+        """Test an upload is chunked, deduplicated and stored in both sinks"""
+        from io import BytesIO
+        from app.modules.hdam import initialize_hdam
+        from app.modules.hybrid_retrieval import HybridRetrievalEngine
+        from app.modules.ingestion import IngestionPipeline
+        
+        with patch('app.modules.hdam.SentenceTransformer', side_effect=RuntimeError):
+            hdam = initialize_hdam(enable_quantum=False)
+        engine = HybridRetrievalEngine(str(tmp_path))
+        pipeline = IngestionPipeline(hdam, engine, chunk_tokens=16, overlap_tokens=4, batch_size=4, queue_size=2)
+        
+        content = " ".join(f"term{i}" for i in range(80)).encode()
+        result = await pipeline.ingest_upload(BytesIO(content), "notes.txt", ["biology"])
+        
+        assert result["stored_chunks"] == result["chunks"] > 1
+        assert engine.stats()["documents"] == result["chunks"]
+        assert engine.query("term79", top_k=1)[0]["metadata"]["filename"] == "notes.txt"
+        assert result["metrics"]["queue"]["max_depth"] <= 2
+        
+        # Re-uploading the same content stores nothing new
+        again = await pipeline.ingest_upload(BytesIO(content), "copy.txt", ["biology"])
+        assert again["resource_id"] == result["resource_id"]
+        assert again["stored_chunks"] == 0
+        assert again["skipped_duplicates"] == result["chunks"]
+        assert engine.stats()["documents"] == result["chunks"]
+        
+        # ...but a rebuilt RAG index gets every chunk back
+        pipeline.rag_engine = rebuilt = HybridRetrievalEngine(str(tmp_path / "rebuilt"))
+        await pipeline.ingest_upload(BytesIO(content), "notes.txt", ["biology"])
+        assert rebuilt.stats()["documents"] == result["chunks"]
+
+    @pytest.mark.asyncio
+    async def test_extraction_cached_by_content(self, tmp_path):
+        """Test a document is extracted once and served from the cache under any name"""
+        import docx
+        from app.modules.extraction import ExtractionCache, ExtractionService
+        
+        document = docx.Document()
+        for i in range(5):
+            document.add_paragraph(f"Paragraph {i} about photosynthesis")
+        path = str(tmp_path / "notes.docx")
+        document.save(path)
+        
+        with patch.dict('os.environ', {'INGEST_EXTRACT_WORKERS': '0'}):
+            service = ExtractionService(ExtractionCache(str(tmp_path / "cache")))
+            first = await service.extract_text(path, "notes.docx")
+            again = await service.extract_text(path, "renamed.docx")
+        
+        assert first.splitlines()[4] == "Paragraph 4 about photosynthesis"
+        assert again == first
+        assert service.cache.stats()["hits"] == 1
+
+class TestIntegrationRegistry:
+    """Test shared integration instances"""
+    
+    def test_shared_until_config_changes(self):
+        """Test instances are reused and rebuilt (and closed) on config change"""
+        from app.core.integration_registry import IntegrationRegistry
+        
+        registry = IntegrationRegistry()
+        factory = Mock(side_effect=lambda config=None: Mock())
+        
+        first = registry.get("svc", factory, {"url": "a"})
+        assert registry.get("svc", factory, {"url": "a"}) is first
+        first.warmup.assert_called_once()
+        
+        second = registry.get("svc", factory, {"url": "b"})
+        assert second is not first
+        first.close.assert_called_once()
+        assert registry.stats()["svc"]["builds"] == 2
+        assert registry.stats()["svc"]["hits"] == 0
+
+class TestScholarlyResearcher:
+    """Test cached, coalesced research fetches"""
+    
+    def test_fixture_replay_and_cache(self, tmp_path):
+        """Test replayed results are cached by (query, max_results)"""
+        import json
+        from app.modules.researcher import ScholarlyResearcher
+        
+        fixture_path = tmp_path / "fixtures.json"
+        fixture_path.write_text(json.dumps({"graph theory|3": [{"title": "Paper"}]}))
+        researcher = ScholarlyResearcher(
+            cache_path=str(tmp_path / "cache.db"),
+            fixture_path=str(fixture_path),
+            fixture_mode="replay"
+        )
+        
+        assert researcher.search_arxiv("Graph  Theory", max_results=3) == [{"title": "Paper"}]
+        assert researcher.search_arxiv("graph theory", max_results=3) == [{"title": "Paper"}]
+        assert researcher.stats["fetches"] == 1
+        
+        # Replay misses are never cached
+        assert researcher.search_arxiv("topology", max_results=3) == []
+        assert researcher.cache.get(("topology", 3)) is None
+        assert researcher._session_get(("topology", 3)) is None
+        
+        # The session layer is a bounded LRU that honours the cache TTL
+        researcher.session_cache_size = 1
+        researcher._session_put(("other", 1), [])
+        assert list(researcher.session_cache) == [("other", 1)]
+        researcher.session_ttl = -1
+        assert researcher._session_get(("other", 1)) is None
+        
+        # A fresh researcher reads the persistent cache instead of refetching
+        warm = ScholarlyResearcher(cache_path=str(tmp_path / "cache.db"),
+                                   fixture_path=str(fixture_path))
+        assert warm.search_arxiv("graph theory", max_results=3) == [{"title": "Paper"}]
+        assert warm.stats["cache_hits"] == 1
+        assert warm.stats["fetches"] == 0
+    
+    def test_concurrent_requests_coalesce(self, tmp_path):
+        """Test identical in-flight searches share one fetch"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from app.modules.researcher import ScholarlyResearcher
+        
+        researcher = ScholarlyResearcher(cache_path=str(tmp_path / "cache.db"))
+        calls = []
+        
+        def slow_fetch(query, max_results, key):
+            calls.append(key)
+            time.sleep(0.1)
+            return [{"title": query}]
+        
+        researcher._fetch = slow_fetch
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: researcher.search_arxiv("topology", 2), range(4)))
+        
+        assert len(calls) == 1
+        assert all(r == [{"title": "topology"}] for r in results)
+
+class TestPaperCatalog:
+    """Test the local arXiv metadata catalog"""
+    
+    def test_catalog_filters_and_researcher_lookup(self, tmp_path):
+        """Test bulk load, filters, id lookup and catalog-first research"""
+        import json
+        from app.modules.paper_catalog import PaperCatalog
+        from app.modules.researcher import ScholarlyResearcher
+        
+        records = [
+            {"id": "2101.00001", "title": "Graph neural networks for molecules",
+             "abstract": "We study message passing.", "categories": "cs.LG q-bio.BM",
+             "authors_parsed": [["Doe", "Jane", ""]],
+             "versions": [{"version": "v1", "created": "Mon, 4 Jan 2021 10:00:00 GMT"}]},
+            {"id": "1501.00002", "title": "Graph spectra", "abstract": "Eigenvalues of graphs.",
+             "categories": "math.CO", "authors": "A. Smith and B. Jones", "update_date": "2015-01-05"},
+        ]
+        dump = tmp_path / "arxiv.jsonl"
+        dump.write_text("\n".join(json.dumps(r) for r in records) + "\nnot json\n")
+        
+        catalog = PaperCatalog(str(tmp_path / "catalog"))
+        assert catalog.load_jsonl(str(dump))["loaded"] == 2
+        assert [p["id"] for p in catalog.search("graph", categories=["cs.LG"])] == ["2101.00001"]
+        assert [p["id"] for p in catalog.search("graph", year_to=2016)] == ["1501.00002"]
+        assert catalog.get("2101.00001")["authors"] == ["Jane Doe"]
+        assert catalog.get("1501.00002")["published"] == "2015-01-05"
+        
+        researcher = ScholarlyResearcher(cache_path=str(tmp_path / "cache.db"), catalog=catalog)
+        researcher._fetch = Mock(side_effect=AssertionError("full catalog answer should not fetch"))
+        papers = researcher.search_arxiv("message passing", max_results=1)
+        assert papers[0]["title"] == "Graph neural networks for molecules"
+        assert researcher.stats["catalog_hits"] == 1
+        
+        # A short catalog answer is topped up from arXiv, catalog hits first, no duplicates
+        researcher._fetch = Mock(return_value=[
+            {"title": "Graph  neural networks for molecules"}, {"title": "Message passing revisited"}])
+        papers = researcher.search_arxiv("message passing", max_results=3)
+        assert [p["title"] for p in papers] == [
+            "Graph neural networks for molecules", "Message passing revisited"]
+        assert papers[0]["id"] == "2101.00001"
+        
+        # A failing catalog falls back to the network instead of failing the search
+        researcher.catalog = Mock(search=Mock(side_effect=RuntimeError("catalog down")))
+        papers = researcher.search_arxiv("message passing revisited", max_results=2)
+        assert [p["title"] for p in papers] == [
+            "Graph  neural networks for molecules", "Message passing revisited"]
+
+class TestQuizGrading:
+    """Test compiled answer keys, item statistics and bulk attempt writes"""
+    
+    def test_grade_batch_and_item_statistics(self):
+        """Test normalized grading and incremental difficulty/discrimination"""
+        import numpy as np
+        from app.modules.quiz_grading import QuizAttemptWriter, QuizGradingEngine
+        
+        written, fallback = [], []
+        writer = QuizAttemptWriter(lambda batch: written.append(len(batch)) or len(written) == 1,
+                                   fallback=fallback.extend, batch_size=40, flush_interval=0)
+        engine = QuizGradingEngine(writer)
+        questions = [{"id": f"q{i}", "correct_answer": f"Answer {i}"} for i in range(4)]
+        key = engine.compile({"id": "quiz", "questions": questions})
+        
+        attempt = engine.grade(key, "u0", [
+            {"question_id": "q0", "user_answer": "  ANSWER   0. "},
+            {"question_id": "missing", "user_answer": "x"},
+        ])
+        assert attempt["score"] == 1 and attempt["max_score"] == 2
+        assert [a["question_id"] for a in attempt["answers"]] == ["q0"]
+        
+        rng = np.random.default_rng(0)
+        correct = rng.random((60, 4)) < rng.random((60, 1))
+        submissions = [{"user_id": f"u{r}", "answers": [
+            {"question_id": f"q{i}", "user_answer": f"answer {i}" if correct[r, i] else "no"} for i in range(4)
+        ]} for r in range(60)]
+        # Statistics merged over two batches match a direct computation over all attempts
+        engine.grade_batch(key, submissions[:25])
+        engine.grade_batch(key, submissions[25:])
+        
+        analytics = engine.analytics("quiz")
+        x = correct.astype(float)
+        rest = x.sum(axis=1, keepdims=True) - x
+        assert analytics["attempts"] == 61
+        assert analytics["questions"][1]["difficulty"] == pytest.approx(x[:, 1].mean(), abs=1e-4)
+        assert analytics["questions"][1]["discrimination"] == pytest.approx(
+            np.corrcoef(x[:, 1], rest[:, 1])[0, 1], abs=1e-4)
+        
+        # Statistics survive the answer key leaving the cache
+        engine.max_quizzes = 1
+        engine.compile({"id": "other", "questions": questions})
+        assert engine.key("quiz") is None and engine.analytics("quiz")["attempts"] == 61
+        
+        # 61 attempts in batches of 1, 25 and 35; only the first write succeeds
+        assert written == [1, 25, 35]
+        assert len(fallback) == 60
+
+class TestZettelGraph:
+    """Test the persistent per-user Zettelkasten graph store"""
+    
+    def test_incremental_links_queries_and_metrics(self, tmp_path):
+        """Test backlinks, relinking, k-hop pages, hub cursors and background metrics"""
+        from datetime import datetime
+        from app.modules.zettel_graph import ZettelGraphStore
+        
+        path = str(tmp_path / "zettel.db")
+        store = ZettelGraphStore(path, metrics_interval=0)
+        now = datetime.now()
+        
+        def note(note_id, links, user="u1"):
+            return store.create_note(user, {"id": note_id, "title": note_id, "content": "text",
+                                            "note_type": "permanent", "maturity": "seedling",
+                                            "links": links, "created_at": now, "updated_at": now})
+        
+        # a -> b -> c -> d chain plus a hub; "e" is linked before it exists
+        assert note("a", ["b", "e"])["out_degree"] == 0
+        note("b", ["c"])
+        assert store.get_note("a")["out_degree"] == 1
+        note("c", ["d"])
+        note("d", [])
+        note("hub", ["a", "b", "c"])
+        assert note("e", [])["backlinks"] == ["a"]
+        # Links to another user's notes or to missing notes never count
+        assert note("x", ["a", "ghost"], user="u2")["degree"] == 0
+        assert store.get_note("a")["in_degree"] == 1
+        assert store.statistics("u2")["total_connections"] == 0
+        
+        assert store.get_note("b")["backlinks"] == ["a", "hub"]
+        updated = store.update_note("c", {"title": "C"}, links=["a", "d"])
+        assert updated["title"] == "C" and updated["links"] == ["a", "d"]
+        
+        two_hops = store.neighborhood("u1", "b", hops=2, direction="out")
+        assert [(n["id"], n["hop"]) for n in two_hops["nodes"]] == [("b", 0), ("c", 1), ("a", 2), ("d", 2)]
+        first = store.neighborhood("u1", "b", hops=2, limit=3)
+        assert first["next_offset"] == 3
+        rest = store.neighborhood("u1", "b", hops=2, limit=3, offset=3)
+        assert {n["id"] for n in first["nodes"] + rest["nodes"]} == {"a", "b", "c", "d", "e", "hub"}
+        assert store.neighborhood("u2", "b") is None
+        
+        hubs = store.hubs("u1", limit=2)
+        assert [h["id"] for h in hubs["hubs"]] == ["a", "c"] and hubs["hubs"][0]["degree"] == 4
+        following = store.hubs("u1", limit=10, cursor=hubs["next_cursor"])
+        assert [h["id"] for h in following["hubs"]] == ["b", "hub", "d", "e"]
+        
+        stats = store.statistics("u1")
+        assert (stats["total_notes"], stats["total_connections"], stats["metrics_stale"]) == (6, 8, True)
+        assert store.refresh_metrics() == 2
+        stats = store.statistics("u1")
+        assert (stats["components"], stats["largest_component"], stats["metrics_stale"]) == (1, 6, False)
+        ranked = store.hubs("u1", limit=6, rank_by="pagerank")["hubs"]
+        assert sum(h["pagerank"] for h in ranked) == pytest.approx(1.0)
+        assert [h["pagerank"] for h in ranked] == sorted((h["pagerank"] for h in ranked), reverse=True)
+        store.close()
+        
+        reopened = ZettelGraphStore(path, metrics_interval=0)
+        assert reopened.get_note("a")["links"] == ["b", "e"]
+        assert reopened.page("u1", limit=4)["next_cursor"] == "d"
+        reopened.close()
+
+class TestDatabasePersistence:
+    """Test prepared statements and batch CRUD on DatabasePersistence"""
+    
+    def test_prepared_execute_batches_and_lookups(self, monkeypatch):
+        """Test EXECUTE for prepared statements, multi-row upserts, COPY and id-list lookups"""
+        from app.modules.storage_persistence import (
+            STATEMENTS, DatabasePersistence, multirow_insert, numbered_placeholders)
+        
+        assert "VALUES ($1, $2, $3, $4, $5, $6, $7)" in numbered_placeholders(STATEMENTS["save_quiz"])
+        assert "VALUES %s" in multirow_insert(STATEMENTS["save_quiz"])
+        
+        monkeypatch.delenv("DATABASE_URL", raising=False)
+        db = DatabasePersistence()
+        db.available, db.conn = True, MagicMock()
+        db._prepared = {"get_quiz"}
+        cur = db.conn.cursor.return_value.__enter__.return_value
+        
+        cur.fetchone.return_value = ("q1", "Topic", [], {}, True, True, None)
+        assert db.get_quiz("q1")["topic"] == "Topic"
+        cur.execute.assert_called_with("EXECUTE get_quiz (%s)", ("q1",))
+        
+        assert db.save_quiz({"id": "q2", "topic": "T"})
+        assert cur.execute.call_args[0][0] == STATEMENTS["save_quiz"]
+        
+        cur.fetchall.return_value = [("a", "A", [], {}, True, True, None), ("b", "B", [], {}, True, True, None)]
+        assert set(db.get_many_quizzes(["a", "a", "b", "c"])) == {"a", "b"}
+        assert cur.execute.call_args[0][1] == (["a", "b", "c"],)
+        assert db.get_many_quizzes([]) == {}
+        
+        with patch("psycopg2.extras.execute_values") as execute_values:
+            plans = [{"id": "p1", "goals": {"topic": "old"}}, {"id": "p2"}, {"id": "p1", "goals": {"topic": "new"}}]
+            assert db.save_many_learning_plans(plans)
+            sql, rows = execute_values.call_args[0][1:]
+            assert "VALUES %s" in sql and [(r[0], r[2]) for r in rows] == [("p1", "new"), ("p2", "Unknown")]
+        
+        assert db.save_many_rpe_events([{"event_id": "e1", "user_id": "u1", "was_correct": True}, {"user_id": "u2"}])
+        copy_sql, buffer = cur.copy_expert.call_args[0]
+        assert copy_sql.startswith("COPY rpe_events (event_id, user_id, session_id,")
+        assert buffer.getvalue().splitlines()[0] == "e1,u1,,,,True,,,"
+        
+        # Background writers get their own connection and skip the migrations
+        db.connection_string = "postgresql://localhost/test"
+        with patch("psycopg2.connect") as connect, \
+                patch("app.modules.storage_persistence.MigrationRunner") as runner:
+            writer = db.open_writer()
+        assert writer.available and writer.conn is connect.return_value
+        assert writer.conn is not db.conn
+        runner.assert_not_called()
+
+
+class TestProgressRollups:
+    """Test incremental daily/weekly progress rollups"""
+    
+    def test_buckets_totals_and_trend(self):
+        """Test bucket alignment, exact averages, out-of-order writes and the bucket cap"""
+        from datetime import datetime
+        from app.modules.progress_rollups import LocalProgressRollups, TimescaleProgressRollups
+        
+        rollups = LocalProgressRollups(max_buckets=3)
+        
+        def attempt(day, percent, user="u1"):
+            return {"user_id": user, "score": percent // 10, "max_score": 10, "percent_correct": percent,
+                    "timestamp": datetime(2026, 3, day, 12)}
+        
+        # 2026-03-02 is a Monday; the 4th arrives late
+        rollups.record([attempt(2, 50), attempt(3, 70), attempt(3, 90), attempt(9, 60)])
+        rollups.record([attempt(4, 80), attempt(9, 100, user="u2")])
+        
+        daily = rollups.history("u1", "daily", limit=10)
+        assert [p["bucket"] for p in daily] == ["2026-03-03", "2026-03-04", "2026-03-09"]
+        assert daily[0]["quizzes_completed"] == 2 and daily[0]["average_score"] == 80
+        weekly = rollups.history("u1", "weekly")
+        assert [(p["bucket"], p["quizzes_completed"]) for p in weekly] == [("2026-03-02", 4), ("2026-03-09", 1)]
+        assert weekly[0]["average_score"] == 72.5 and weekly[0]["correct_answers"] == 29
+        assert rollups.history("u1", "daily", limit=1)[0]["bucket"] == "2026-03-09"
+        
+        summary = rollups.summary("u1")
+        assert summary["attempts"] == 5 and summary["score_sum"] == 350
+        assert summary["recent"] == [80, 60]
+        assert rollups.summary("nobody") == {"attempts": 0, "score_sum": 0.0, "recent": []}
+        with pytest.raises(ValueError):
+            rollups.history("u1", "monthly")
+        
+        database = Mock()
+        database.get_quiz_progress.return_value = [
+            {"bucket": datetime(2026, 3, 2), "attempts": 4, "score_sum": 290.0, "correct": 29, "questions": 40}
+        ]
+        timescale = TimescaleProgressRollups(database)
+        assert timescale.history("u1", "weekly") == weekly[:1]
+        database.get_quiz_progress.assert_called_once_with("u1", "weekly", 12)
+        
+        # Attempts the database rejected still show up in history and totals
+        database.get_quiz_progress_totals.return_value = {"attempts": 4, "score_sum": 290.0, "recent": [90, 80]}
+        timescale.record([attempt(5, 40), attempt(9, 60)])
+        merged = timescale.history("u1", "weekly")
+        assert [(p["bucket"], p["quizzes_completed"]) for p in merged] == [("2026-03-02", 5), ("2026-03-09", 1)]
+        assert merged[0]["average_score"] == 66
+        assert timescale.summary("u1") == {"attempts": 6, "score_sum": 390.0, "recent": [40, 60]}
+
+
+class TestSchemaMigrations:
+    """Test the versioned schema migration runner"""
+    
+    class FakeConnection:
+        """Records statements; keeps schema_migrations rows with commit/rollback semantics"""
+        
+        def __init__(self):
+            self.autocommit = False
+            self.statements = []
+            self.commits = 0
+            self.table = False
+            self.rows, self.pending = {}, {}
+        
+        def cursor(self):
+            conn = self
+            
+            class Cursor:
+                def __enter__(self):
+                    return self
+                
+                def __exit__(self, *args):
+                    return False
+                
+                def execute(self, sql, params=None):
+                    sql = " ".join(sql.split())
+                    conn.statements.append(sql)
+                    if sql.startswith("SELECT version, status, checksum FROM schema_migrations"):
+                        if not conn.table:
+                            raise Exception('relation "schema_migrations" does not exist')
+                        self.result = [(v, row[4], row[3]) for v, row in {**conn.rows, **conn.pending}.items()]
+                    elif sql.startswith("CREATE TABLE IF NOT EXISTS schema_migrations"):
+                        conn.table = True
+                    elif sql.startswith("INSERT INTO schema_migrations"):
+                        conn.pending[params[1]] = params
+                    elif "FAIL" in sql:
+                        raise Exception("extension not available")
+                
+                def fetchall(self):
+                    return self.result
+            
+            return Cursor()
+        
+        def commit(self):
+            self.rows.update(self.pending)
+            self.pending = {}
+            self.commits += 1
+        
+        def rollback(self):
+            self.pending = {}
+    
+    def test_single_transaction_fast_path_and_optional_skips(self):
+        """Test pending migrations commit once, then startup costs one query"""
+        from app.core.schema_migrations import Migration, MigrationRunner
+        
+        migrations = [
+            Migration(1, "tables", "CREATE TABLE a (id INT);"),
+            Migration(2, "hypertables", "SELECT FAIL;", optional=True),
+            Migration(3, "rollup", "CREATE VIEW v AS SELECT 1;", optional=True,
+                      after_commit=("CALL refresh_v();",)),
+        ]
+        conn = self.FakeConnection()
+        runner = MigrationRunner(conn, "persistence", migrations)
+        report = runner.run(retry_skipped=False)
+        assert report["status"] == "migrated" and report["version"] == 3
+        assert [(m["version"], m["status"]) for m in report["migrations"]] == [
+            (1, "applied"), (2, "skipped"), (3, "applied")]
+        assert conn.commits == 1 and conn.statements[-1] == "CALL refresh_v();"
+        # Fresh database: shared table lock, CREATE TABLE, then the component lock
+        assert [s.split(" (")[0].split("(")[0] for s in conn.statements[1:4]] == [
+            "SELECT pg_advisory_xact_lock", "CREATE TABLE IF NOT EXISTS schema_migrations",
+            "SELECT pg_advisory_xact_lock"]
+        assert runner.applied_names() == {"tables", "rollup"}
+        assert conn.autocommit is False
+        
+        conn.statements = []
+        restarted = MigrationRunner(conn, "persistence", migrations)
+        assert restarted.run(retry_skipped=False)["status"] == "up_to_date"
+        assert len(conn.statements) == 1 and conn.commits == 1
+        assert restarted.applied_names() == {"tables", "rollup"}
+        
+        conn.statements = []
+        retried = MigrationRunner(conn, "persistence", migrations).run(retry_skipped=True)
+        assert [m["version"] for m in retried["migrations"]] == [2]
+        assert not any(s.startswith("CREATE TABLE") for s in conn.statements)
+        
+        broken = migrations + [Migration(4, "required", "SELECT FAIL;")]
+        with pytest.raises(RuntimeError):
+            MigrationRunner(conn, "persistence", broken).run(retry_skipped=False)
+        assert 4 not in conn.rows and conn.autocommit is False
+        with pytest.raises(ValueError):
+            MigrationRunner(conn, "other", migrations + [Migration(1, "dup", "")])
+
+
+class TestRecordCache:
+    """Test the read-through record cache in front of DatabasePersistence"""
+    
+    def test_read_through_invalidation_and_negative_entries(self):
+        """Test hits, write-through invalidation, negative caching, batches and remote invalidation"""
+        from app.modules.record_cache import CachedPersistence
+        
+        db = Mock(available=True)
+        db.get_quiz.side_effect = lambda quiz_id: {"id": quiz_id, "questions": []} if quiz_id != "gone" else None
+        db.get_many_quizzes.side_effect = lambda ids: {i: {"id": i} for i in ids if i != "gone"}
+        db.save_quiz.return_value = True
+        cached = CachedPersistence(db, notify=False)
+        
+        first = cached.get_quiz("q1")
+        first["questions"].append("mutated")
+        assert cached.get_quiz("q1") == {"id": "q1", "questions": []}
+        assert db.get_quiz.call_count == 1
+        
+        assert cached.get_quiz("gone") is None and cached.get_quiz("gone") is None
+        assert db.get_quiz.call_count == 2
+        
+        assert cached.save_quiz({"id": "q1"})
+        cached.get_quiz("q1")
+        assert db.get_quiz.call_count == 3
+        
+        assert set(cached.get_many_quizzes(["q1", "q2", "gone"])) == {"q1", "q2"}
+        db.get_many_quizzes.assert_called_once_with(["q2"])
+        
+        cached._on_notify("quiz:q2")
+        cached.get_many_quizzes(["q2"])
+        assert db.get_many_quizzes.call_args[0][0] == ["q2"]
+        
+        metrics = cached.cache_metrics()["records"]["quiz"]
+        assert metrics["hits"] == 2 and metrics["negative_hits"] == 2 and metrics["misses"] == 5
+        assert 0 < metrics["hit_ratio"] < 1
+        
+        # Unknown attributes go straight to the database
+        cached.save_quiz_attempts([])
+        db.save_quiz_attempts.assert_called_once_with([])
+    
+    def test_lru_and_ttl_bounds(self):
+        """Test LRU eviction and expiry"""
+        from app.modules.record_cache import RecordCache
+        
+        loads = []
+        load = lambda key: loads.append(key) or {"id": key}
+        cache = RecordCache("plan", max_items=2, ttl=300, negative_ttl=0)
+        for key in ("a", "b", "a", "c", "b"):
+            cache.get(key, load)
+        assert loads == ["a", "b", "c", "b"]
+        assert cache.metrics()["evictions"] == 2
+        
+        expiring = RecordCache("plan", max_items=2, ttl=0.01)
+        expiring.get("a", load)
+        with patch("app.modules.record_cache.time.monotonic", return_value=float("inf")):
+            expiring.get("a", load)
+        assert loads[-2:] == ["a", "a"] and expiring.metrics()["expirations"] == 1
+
 
 class TestIntegrationManager:
     """Test IntegrationManager"""